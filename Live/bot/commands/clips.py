@@ -4,13 +4,15 @@ import logging
 import os
 import re
 import traceback
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, urlunparse
 
 import discord
-from bot.config import JAM_USER_ID, JONESY_USER_ID
+from bot.config import CLIP_PREPROCESS_MODE, CLIP_STORE_MAX_MB, JAM_USER_ID, JONESY_USER_ID
 from bot.database import get_database
 from bot.handlers.ai_handler import upload_and_analyze_media
+from bot.utils.clip_store import ClipStore
+from bot.utils.video_preprocess import PREPROCESS_MODES, ClipPreprocessOptions, format_bytes
 from discord.ext import commands
 
 logger = logging.getLogger(__name__)
@@ -74,6 +76,66 @@ class ClipParsingService:
             logger.error(f"yt-dlp download failed for {url}: {e}")
             return None
 
+    def temp_path(self, message: discord.Message) -> str:
+        """Local download path for a clip message."""
+        os.makedirs("temp", exist_ok=True)
+        return f"temp/clip_{message.id}.mp4"
+
+    async def download(self, url: str, local_filename: str) -> bool:
+        """Download a clip with yt-dlp off the event loop. Returns True if the file exists."""
+        print(f"📥 Downloading clip: {url}")
+        download_result = await asyncio.to_thread(self._download_video_sync, url, local_filename)
+        return bool(download_result) and os.path.exists(local_filename)
+
+    def build_prompt(self) -> str:
+        """Analysis prompt with the known played games list (one query; reuse it across a batch)."""
+        played_games = self.db.games.get_all_played_games()
+        game_titles = [g.get('canonical_name') for g in played_games if g.get('canonical_name')]
+        prompt = TRIVIA_PROMPT
+
+        if game_titles:
+            game_list_str = ", ".join(game_titles)
+            prompt += f"\n\nCRITICAL INSTRUCTION FOR 'game_title': Whenever possible, match the game to one of our known played games: [{game_list_str}]. For example, if it looks like Hitman 2, use 'Hitman: World of Assassination' if that is in the list. Only use a new name if it definitely does not match any game in this list."
+        return prompt
+
+    def save_analysis(self, canonical_url: str, url: str, response_text: str, message: discord.Message) -> bool:
+        """Parse Gemini's JSON response and save it as clip lore."""
+        try:
+            # Remove markdown formatting if Gemini included it
+            clean_text = response_text.strip()
+            if clean_text.startswith("```json"):
+                clean_text = clean_text[7:]
+            if clean_text.endswith("```"):
+                clean_text = clean_text[:-3]
+
+            data = json.loads(clean_text)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse Gemini JSON: {response_text}")
+            raise RuntimeError(f"JSON Parse Error: {e}")
+
+        return self.db.trivia.add_clip_lore(
+            canonical_url=canonical_url,
+            original_url=url,
+            game_title=data.get("game_title", "Unknown"),
+            reaction=data.get("reaction", ""),
+            trigger=data.get("trigger", ""),
+            lore_summary=data.get("lore_summary", ""),
+            notable_quote=data.get("notable_quote", ""),
+            emotion_category=data.get("emotion_category", ""),
+            characters_involved=data.get("characters_involved", ""),
+            clip_outcome=data.get("clip_outcome", ""),
+            submitted_by=str(message.author.id),
+            message_id=message.id
+        )
+
+    @staticmethod
+    def remove_temp_file(local_filename: str):
+        if os.path.exists(local_filename):
+            try:
+                os.remove(local_filename)
+            except Exception as e:
+                logger.error(f"Failed to delete temp file {local_filename}: {e}")
+
     async def process_clip(self, url: str, message: discord.Message) -> bool:
         """Download, analyze, and save clip lore. Returns True on success."""
         canonical_url = canonicalize_clip_url(url)
@@ -83,63 +145,21 @@ class ClipParsingService:
             logger.info(f"Clip {canonical_url} already exists in Lore Compendium. Skipping.")
             return True
 
-        file_id = f"clip_{message.id}"
-        local_filename = f"temp/{file_id}.mp4"
-        os.makedirs("temp", exist_ok=True)
+        local_filename = self.temp_path(message)
 
         try:
             # 1. Download asynchronously
-            print(f"📥 Downloading clip: {url}")
-            download_result = await asyncio.to_thread(self._download_video_sync, url, local_filename)
-            if not download_result or not os.path.exists(local_filename):
+            if not await self.download(url, local_filename):
                 raise RuntimeError(f"Failed to download video from {url}")
 
-            # Prepare dynamic prompt with known games list
-            played_games = self.db.games.get_all_played_games()
-            game_titles = [g.get('canonical_name') for g in played_games if g.get('canonical_name')]
-            prompt = TRIVIA_PROMPT
-
-            if game_titles:
-                game_list_str = ", ".join(game_titles)
-                prompt += f"\n\nCRITICAL INSTRUCTION FOR 'game_title': Whenever possible, match the game to one of our known played games: [{game_list_str}]. For example, if it looks like Hitman 2, use 'Hitman: World of Assassination' if that is in the list. Only use a new name if it definitely does not match any game in this list."
-
             # 2. Upload and analyze via ai_handler (handles polling and deletion)
-            response_text, status = await upload_and_analyze_media(local_filename, prompt)
+            response_text, status = await upload_and_analyze_media(local_filename, self.build_prompt())
 
             if not response_text or status != "success":
                 raise RuntimeError(f"Gemini analysis failed: {status}")
 
-            # 3. Parse JSON
-            try:
-                # Remove markdown formatting if Gemini included it
-                clean_text = response_text.strip()
-                if clean_text.startswith("```json"):
-                    clean_text = clean_text[7:]
-                if clean_text.endswith("```"):
-                    clean_text = clean_text[:-3]
-
-                data = json.loads(clean_text)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Gemini JSON: {response_text}")
-                raise RuntimeError(f"JSON Parse Error: {e}")
-
-            # 4. Save to Database
-            success = self.db.trivia.add_clip_lore(
-                canonical_url=canonical_url,
-                original_url=url,
-                game_title=data.get("game_title", "Unknown"),
-                reaction=data.get("reaction", ""),
-                trigger=data.get("trigger", ""),
-                lore_summary=data.get("lore_summary", ""),
-                notable_quote=data.get("notable_quote", ""),
-                emotion_category=data.get("emotion_category", ""),
-                characters_involved=data.get("characters_involved", ""),
-                clip_outcome=data.get("clip_outcome", ""),
-                submitted_by=str(message.author.id),
-                message_id=message.id
-            )
-
-            return success
+            # 3. Parse JSON and save to Database
+            return self.save_analysis(canonical_url, url, response_text, message)
 
         except Exception as e:
             logger.error(f"Error processing clip {url}: {e}")
@@ -147,17 +167,14 @@ class ClipParsingService:
 
         finally:
             # Clean up local temp file
-            if os.path.exists(local_filename):
-                try:
-                    os.remove(local_filename)
-                except Exception as e:
-                    logger.error(f"Failed to delete temp file {local_filename}: {e}")
+            self.remove_temp_file(local_filename)
 
 
 class ClipTriviaCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.parser = ClipParsingService()
+        self.clip_store = ClipStore(max_bytes=CLIP_STORE_MAX_MB * 1024 * 1024)
         self.target_channel_id = 1210874007591718982
         self.url_pattern = re.compile(
             r'https?://(?:www\.)?(?:clips\.twitch\.tv/\S+|twitch\.tv/\w+/clip/\S+|youtube\.com/clip/\S+|youtube\.com/shorts/\S+|youtu\.be/clip/\S+)'
@@ -176,22 +193,84 @@ class ClipTriviaCog(commands.Cog):
             clip_url = match.group(0)
             canonical_url = canonicalize_clip_url(clip_url)
 
-            # Fast DB check
-            db = get_database()
-            if db.trivia.clip_lore_exists(canonical_url):
+            if self.clip_already_processed(canonical_url):
                 return
 
             # Acknowledge visually so users know it's in the queue for 8 PM
             await message.add_reaction("👀")
 
-    @commands.command(name="scan_clips")
-    async def scan_clips(self, ctx, limit: int = 20):
-        """[Admin] Scans the clips channel history for unprocessed clips backwards through time."""
-        if ctx.author.id not in [JAM_USER_ID, JONESY_USER_ID]:
-            await ctx.send("❌ Unauthorized.")
-            return
+    def clip_already_processed(self, canonical_url: str) -> bool:
+        """True if lore exists for this URL, or for the same clip posted under another URL."""
+        if self.clip_store.url_saved(canonical_url):
+            return True
+        return get_database().trivia.clip_lore_exists(canonical_url)
+
+    async def run_clip_pipeline(self, clips: List[Tuple[discord.Message, str]], ctx=None,
+                                preprocess_mode: Optional[str] = None):
+        """
+        Run (message, url) clips through the staged clip pipeline, keeping the
+        👀/✅/❌ reactions in step. Returns the finished ClipPipeline.
+
+        preprocess_mode overrides CLIP_PREPROCESS_MODE for this run
+        ("transcode", "keyframes" or "off").
+        """
+        from bot.tasks.clip_pipeline import ClipPipeline
 
-    async def process_backlog_batch(self, search_limit: int = 200, max_process: int = 25, ctx=None) -> tuple[int, int]:
+        queued_count = len(clips)
+
+        # Acknowledge processing and clear any old failure marks
+        for msg, _ in clips:
+            try:
+                await msg.remove_reaction("❌", self.bot.user)
+            except Exception:
+                pass
+            try:
+                await msg.add_reaction("👀")
+            except discord.Forbidden:
+                logger.error(f"Missing permissions to add 👀 reaction in channel {msg.channel.id}")
+            except Exception:
+                pass
+
+        async def on_result(job):
+            try:
+                await job.message.remove_reaction("👀", self.bot.user)
+            except Exception:
+                pass
+            # Aborted clips get no mark so the next scan picks them up
+            if job.status == "aborted":
+                return
+
+            summary = f"🎬 Processed clip {job.index + 1}/{queued_count} ({job.status}"
+            if job.elapsed is not None:
+                summary += f", {job.elapsed:.0f}s"
+            if job.bytes_saved:
+                summary += f", {format_bytes(job.bytes_saved)} smaller upload"
+            summary += f"): {job.url}"
+            if ctx:
+                await ctx.send(summary)
+            else:
+                logger.info(summary)
+
+            try:
+                await job.message.add_reaction("✅" if job.success else "❌")
+            except discord.Forbidden:
+                logger.error(f"Missing permissions to add ✅/❌ reaction in channel {job.message.channel.id}")
+                if ctx:
+                    await ctx.send(f"⚠️ **Permission Error:** I don't have the 'Add Reactions' permission in this channel to react to {job.url}!")
+            except Exception as e:
+                logger.error(f"Failed to add final reaction to clip {job.url}: {e}")
+
+        mode = preprocess_mode or CLIP_PREPROCESS_MODE
+        if mode not in PREPROCESS_MODES:
+            logger.warning(f"Unknown clip pre-processing mode '{mode}', uploading clips unprocessed")
+            mode = "off"
+        preprocess = ClipPreprocessOptions(mode=mode)
+        pipeline = ClipPipeline(self.parser, preprocess=preprocess, store=self.clip_store, on_result=on_result)
+        await pipeline.run(clips)
+        return pipeline
+
+    async def process_backlog_batch(self, search_limit: int = 200, max_process: int = 25, ctx=None,
+                                    preprocess_mode: Optional[str] = None) -> tuple[int, int]:
         """Scans the clips channel history for unprocessed clips backwards through time.
         Returns (found_count, queued_count)."""
         channel = self.bot.get_channel(self.target_channel_id)
@@ -228,7 +307,6 @@ class ClipTriviaCog(commands.Cog):
                 logger.info(f"🔍 Scanning the most recent {search_limit} messages for clips...")
 
         found_count = 0
-        db = get_database()
 
         oldest_message_id = None
         oldest_message_date = None
@@ -248,7 +326,7 @@ class ClipTriviaCog(commands.Cog):
                 found_count += 1
                 canonical_url = canonicalize_clip_url(clip_url)
 
-                if not db.trivia.clip_lore_exists(canonical_url):
+                if not self.clip_already_processed(canonical_url):
                     clips_to_queue.append((message, clip_url))
                     if len(clips_to_queue) >= max_process:
                         break
@@ -267,82 +345,13 @@ class ClipTriviaCog(commands.Cog):
 
         queued_count = len(clips_to_queue)
         if queued_count > 0:
-            for idx, (msg, curl) in enumerate(clips_to_queue):
+            pipeline = await self.run_clip_pipeline(clips_to_queue, ctx=ctx, preprocess_mode=preprocess_mode)
+            if pipeline.aborted:
+                msg_text = "🚫 **AI Quota Exhausted or Too Close to Limit!** Aborting the remainder of the clip scan to avoid spamming the API. We'll pick up the rest tomorrow!"
                 if ctx:
-                    await ctx.send(f"🎬 Processing clip {idx + 1}/{queued_count}: {curl}")
+                    await ctx.send(msg_text)
                 else:
-                    logger.info(f"🎬 Processing clip {idx + 1}/{queued_count}: {curl}")
-
-                # Acknowledge processing and clear any old failure marks
-                try:
-                    await msg.remove_reaction("❌", self.bot.user)
-                except Exception:
-                    pass
-                try:
-                    await msg.add_reaction("👀")
-                except discord.Forbidden:
-                    logger.error(f"Missing permissions to add 👀 reaction in channel {msg.channel.id}")
-                except Exception:
-                    pass
-
-                # Add a simple retry loop for Gemini 503 errors
-                success = False
-                for attempt in range(3):
-                    success = await self.parser.process_clip(curl, msg)
-                    if success:
-                        break
-
-                    from bot.config import MAX_DAILY_REQUESTS
-                    from bot.handlers.ai_handler import ai_usage_stats, primary_ai
-
-                    daily_used = ai_usage_stats.get("daily_requests", 0)
-                    if ai_usage_stats.get("quota_exhausted",
-                                          False) or primary_ai != "gemini" or daily_used >= MAX_DAILY_REQUESTS - 50:
-                        break
-
-                    if attempt < 2:
-                        logger.warning(f"⚠️ Clip processing failed (attempt {attempt + 1}/3). Retrying in 30s...")
-                        await asyncio.sleep(30.0)
-
-                from bot.config import MAX_DAILY_REQUESTS
-                from bot.handlers.ai_handler import ai_usage_stats, primary_ai
-
-                daily_used = ai_usage_stats.get("daily_requests", 0)
-                if ai_usage_stats.get("quota_exhausted",
-                                      False) or primary_ai != "gemini" or daily_used >= MAX_DAILY_REQUESTS - 50:
-                    msg_text = "🚫 **AI Quota Exhausted or Too Close to Limit!** Aborting the remainder of the clip scan to avoid spamming the API. We'll pick up the rest tomorrow!"
-                    if ctx:
-                        await ctx.send(msg_text)
-                    else:
-                        logger.warning(msg_text)
-                    # Clean up the 👀 reaction from the aborted clip
-                    try:
-                        await msg.remove_reaction("👀", self.bot.user)
-                    except Exception:
-                        pass
-                    break
-
-                # Update reactions based on success
-                try:
-                    await msg.remove_reaction("👀", self.bot.user)
-                except Exception:
-                    pass
-
-                try:
-                    if success:
-                        await msg.add_reaction("✅")
-                    else:
-                        await msg.add_reaction("❌")
-                except discord.Forbidden:
-                    logger.error(f"Missing permissions to add ✅/❌ reaction in channel {msg.channel.id}")
-                    if ctx:
-                        await ctx.send(f"⚠️ **Permission Error:** I don't have the 'Add Reactions' permission in this channel to react to {curl}!")
-                except Exception as e:
-                    logger.error(f"Failed to add final reaction to clip {curl}: {e}")
-
-                # Sleep to respect rate limits if not the last clip
-                if idx < queued_count - 1:
-                    await asyncio.sleep(60.0)
+                    logger.warning(msg_text)
 
         # Update state
         if oldest_message_id and oldest_message_date:
@@ -369,13 +378,18 @@ class ClipTriviaCog(commands.Cog):
         return found_count, queued_count
 
     @commands.command(name="scan_clips")
-    async def scan_clips(self, ctx, limit: int = 20):
-        """[Admin] Scans the clips channel history for unprocessed clips backwards through time."""
+    async def scan_clips(self, ctx, limit: int = 20, preprocess: Optional[str] = None):
+        """[Admin] Scans the clips channel history for unprocessed clips backwards through time.
+        Optional preprocess mode: transcode, keyframes or off."""
         if ctx.author.id not in [JAM_USER_ID, JONESY_USER_ID]:
             await ctx.send("❌ Unauthorized.")
             return
 
-        await self.process_backlog_batch(search_limit=2000, max_process=limit, ctx=ctx)
+        if preprocess and preprocess not in PREPROCESS_MODES:
+            await ctx.send(f"❌ Unknown pre-processing mode `{preprocess}`. Use one of: {', '.join(PREPROCESS_MODES)}.")
+            return
+
+        await self.process_backlog_batch(search_limit=2000, max_process=limit, ctx=ctx, preprocess_mode=preprocess)
 
     @commands.command(name="reset_clips")
     async def reset_clips(self, ctx):
@@ -386,12 +400,9 @@ class ClipTriviaCog(commands.Cog):
 
         db = get_database()
         try:
-            conn = db._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM clip_lore")
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with db.transaction() as conn, conn.cursor() as cursor:
+                cursor.execute("DELETE FROM clip_lore")
+                deleted_count = cursor.rowcount
 
             await ctx.send(f"✅ **Database Reset:** Successfully deleted **{deleted_count}** processed clips from the database.\n"
                            f"They will be picked up as 'new' clips and re-processed using the strict formatting rules on the next scan!")
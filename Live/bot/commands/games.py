@@ -1076,8 +1076,7 @@ If you want to add any other comments, you can discuss the list in 🎮game-chat
         import os
         import re
 
-        import aiohttp
-
+        from ..integrations.http_client import http_session
         from ..integrations.youtube import get_playlist_videos_with_views
 
         database = self._get_db()
@@ -1107,7 +1106,7 @@ If you want to add any other comments, you can discuss the list in 🎮game-chat
         error_count = 0
         fixed_count = 0
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session("youtube") as session:
             for idx, game in enumerate(games_with_playlists, 1):
                 try:
                     game_name = game.get('canonical_name', 'Unknown')
@@ -1542,7 +1541,7 @@ If you want to add any other comments, you can discuss the list in 🎮game-chat
             engagement_data = engagement[0] if engagement else {}
 
             # Get ranking context
-            ranking = database.get_ranking_context(game_data['canonical_name'], 'total_views')
+            ranking = database.stats.get_ranking_context(game_data['canonical_name'], 'total_views')
 
             # Platform distribution
             youtube_views = game_data.get('youtube_views', 0)
@@ -135,6 +135,13 @@ class UtilityCommands(commands.Cog):
             else:
                 status_lines.append("• **Database**: ❌ Unavailable")
 
+            pool_stats = db.get_pool_stats() if db else None
+            if isinstance(pool_stats, dict) and pool_stats.get('checkouts'):
+                status_lines.append(
+                    f"• **DB Pool**: {pool_stats['checked_out']}/{pool_stats['pool_max']} checked out "
+                    f"(peak {pool_stats['peak_checked_out']}), {pool_stats['avg_wait_ms']:.1f}ms avg wait, "
+                    f"{pool_stats['fallback_connects']} fallback connects, {pool_stats['leaked']} leaked")
+
             # Enhanced AI system status with detailed health information
             ai_status_line = f"• **AI System**: {ai_status.get('status_message', 'Unknown')}"
             if ai_status.get('enabled') and 'usage_stats' in ai_status:
@@ -176,6 +183,14 @@ class UtilityCommands(commands.Cog):
 
             status_lines.append(ai_status_line)
 
+            executor = ai_status.get('executor')
+            if executor and executor.get('priorities'):
+                waits = ", ".join(f"{p} {m['avg_queue_wait_ms']:.0f}ms wait/{m['avg_run_ms']:.0f}ms run"
+                                  for p, m in executor['priorities'].items())
+                status_lines.append(
+                    f"• **AI Calls**: {sum(executor['running'].values())}/{executor['max_workers']} running, "
+                    f"{sum(executor['queued'].values())} queued ({waits})")
+
             # Strike management
             if total_strikes != "Database unavailable":
                 if users_with_strikes != "N/A":
@@ -253,24 +268,24 @@ class UtilityCommands(commands.Cog):
             db_utc_time = None
             try:
                 database = self._get_db()
-                conn = database.get_connection()
-                if conn:
-                    with conn.cursor() as cur:
-                        # Get database time in multiple formats
-                        cur.execute("""
-                            SELECT
-                                NOW() as db_time,
-                                timezone('UTC', NOW()) as db_utc,
-                                CURRENT_SETTING('timezone') as db_timezone,
-                                EXTRACT(epoch FROM NOW()) as db_unix_timestamp
-                        """)
-                        result = cur.fetchone()
-                        if result:
-                            db_time = result[0]
-                            db_utc_time = result[1]
-                            db_timezone = result[2]
-                            db_unix_timestamp = float(
-                                result[3]) if result[3] else None
+                with database.checkout() as conn:
+                    if conn:
+                        with conn.cursor() as cur:
+                            # Get database time in multiple formats
+                            cur.execute("""
+                                SELECT
+                                    NOW() as db_time,
+                                    timezone('UTC', NOW()) as db_utc,
+                                    CURRENT_SETTING('timezone') as db_timezone,
+                                    EXTRACT(epoch FROM NOW()) as db_unix_timestamp
+                            """)
+                            result = cur.fetchone()
+                            if result:
+                                db_time = result[0]
+                                db_utc_time = result[1]
+                                db_timezone = result[2]
+                                db_unix_timestamp = float(
+                                    result[3]) if result[3] else None
             except Exception as e:
                 db_time = f"Error: {str(e)}"
 
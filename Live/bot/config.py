@@ -109,6 +109,12 @@ MODERATOR_CHANNEL_IDS = [
     1393987338329260202  # The Airlock
 ]
 
+# Clip pre-processing before Gemini upload (needs ffmpeg): "transcode", "keyframes" or "off"
+CLIP_PREPROCESS_MODE = os.getenv('CLIP_PREPROCESS_MODE', 'transcode')
+
+# Size cap (MB) for downloaded clips kept under temp/clip_store for reposts and retries
+CLIP_STORE_MAX_MB = int(os.getenv('CLIP_STORE_MAX_MB', '1024'))
+
 # Rate Limiting Configuration (from deployment fixes)
 PRIORITY_INTERVALS = {
     "high": 1.0,     # Trivia answers, direct questions, critical interactions
@@ -116,6 +122,18 @@ PRIORITY_INTERVALS = {
     "low": 3.0       # Auto-actions, background tasks, non-critical operations
 }
 
+# Gemini calls running at once (shared executor), overall and per priority.
+# Background work is capped below the total so chat and trivia always get a slot.
+AI_MAX_CONCURRENT_REQUESTS = 6
+AI_CONCURRENCY_LIMITS = {
+    "startup": 6,
+    "high": 6,
+    "medium": 4,
+    "low": 3
+}
+# Timed-out calls whose threads are still running; up to this many give their slot back
+AI_MAX_ABANDONED_CALLS = 3
+
 RATE_LIMIT_COOLDOWNS = {
     "first": 30,     # 30 seconds for first offense (was 300)
     "second": 60,    # 1 minute for second offense
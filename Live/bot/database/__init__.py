@@ -15,11 +15,15 @@ Usage:
     db.trivia.add_trivia_question(...)
     db.games.add_played_game(...)
 
+    # Non-blocking access from async handlers:
+    await db.aio.get_played_game('name')
+
 Backward Compatibility:
     All existing DatabaseManager methods are still available for gradual migration.
 """
 
 # Import domain modules
+from .async_db import AsyncDatabase
 from .config import ConfigDatabase
 
 # Import core database manager
@@ -53,6 +57,7 @@ db = get_database()
 # Export all classes and the singleton
 __all__ = [
     'DatabaseManager',
+    'AsyncDatabase',
     'ConfigDatabase',
     'SessionDatabase',
     'UserDatabase',
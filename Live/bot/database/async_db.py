@@ -0,0 +1,208 @@
+"""
+Database Async Module - Non-blocking access for async handlers
+
+This module provides the AsyncDatabase facade which runs DatabaseManager
+calls on a dedicated, bounded thread pool so that psycopg2 queries no
+longer block the Discord event loop (heartbeats, other users' messages).
+
+Usage:
+    from bot.database import get_database
+
+    db = get_database()
+    game = await db.aio.get_played_game("Hollow Knight")
+    result = await db.aio.run(db.get_games_by_playtime, 'DESC', 5)
+
+The sync facade is unchanged - every DatabaseManager method is still
+available for scripts and code that already runs off the event loop.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase:
+    """
+    Async facade over DatabaseManager.
+
+    Calls are dispatched to a long-lived executor whose worker count never
+    exceeds the connection pool size, so concurrent awaits queue in Python
+    instead of exhausting the pool and falling back to unpooled connects.
+    """
+
+    # Micro-batch window for buffered trivia answers
+    ANSWER_FLUSH_SECONDS = 0.25
+    ANSWER_FLUSH_MAX_BACKOFF_SECONDS = 5.0
+
+    def __init__(self, db_manager, max_workers: Optional[int] = None):
+        """
+        Initialize async database facade.
+
+        Args:
+            db_manager: DatabaseManager instance to delegate to
+            max_workers: Executor size (defaults to the pool's max connections)
+        """
+        self.db = db_manager
+        self.max_workers = max_workers or getattr(db_manager, 'POOL_MAX_CONNECTIONS', 10)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Lightweight call telemetry
+        self._calls = 0
+        self._errors = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+        # Buffered trivia answer flushing
+        self._answers_waiting = False
+        self._answer_flush_task: Optional[asyncio.Task] = None
+        self._answer_primes: Dict[int, asyncio.Future] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the executor on first use."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="ash-db")
+        return self._executor
+
+    def _timed_call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func in a worker thread and record how long it held the worker."""
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._calls += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run any blocking database callable without blocking the event loop.
+
+        Args:
+            func: Sync callable (usually a bound DatabaseManager method)
+            *args, **kwargs: Arguments forwarded to func
+
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._timed_call, func, *args, **kwargs)
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    # ========== HOT PATHS ==========
+
+    async def get_played_game(self, name: str) -> Optional[Dict[str, Any]]:
+        """Async version of DatabaseManager.get_played_game"""
+        return await self.run(self.db.get_played_game, name)
+
+    async def get_active_trivia_session(self) -> Optional[Dict[str, Any]]:
+        """Async version of DatabaseManager.get_active_trivia_session"""
+        return await self.run(self.db.get_active_trivia_session)
+
+    async def submit_trivia_answer(self, session_id: int, user_id: int, answer_text: str,
+                                   normalized_answer: Optional[str] = None) -> Dict[str, Any]:
+        """Async version of DatabaseManager.submit_trivia_answer"""
+        return await self.run(self.db.submit_trivia_answer, session_id, user_id, answer_text, normalized_answer)
+
+    async def queue_trivia_answer(self, session_id: int, user_id: int, answer_text: str,
+                                  normalized_answer: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Buffered trivia answer submission for the message handlers.
+
+        Duplicate and conflict checks are answered from memory, so callers can
+        react straight away; rows are written in micro-batches by a background
+        flush. Only the first answer for a session in this process waits for
+        a query (loading who has already answered).
+
+        Returns:
+            Dict with 'success' (bool) and 'queued' or 'error'
+        """
+        result = self.db.queue_trivia_answer(session_id, user_id, answer_text, normalized_answer)
+        if result is None:
+            # A burst of first answers shares one priming query
+            priming = self._answer_primes.get(session_id)
+            if priming is None:
+                priming = asyncio.ensure_future(self.run(self.db.prime_trivia_answers, session_id))
+                self._answer_primes[session_id] = priming
+                priming.add_done_callback(lambda _: self._answer_primes.pop(session_id, None))
+            if not await priming:
+                return {'success': False, 'error': 'session_unavailable'}
+            result = self.db.queue_trivia_answer(session_id, user_id, answer_text, normalized_answer)
+
+        if result and result.get('success'):
+            self._answers_waiting = True
+            if self._answer_flush_task is None or self._answer_flush_task.done():
+                self._answer_flush_task = asyncio.create_task(self._flush_trivia_answers())
+        return result or {'success': False, 'error': 'session_unavailable'}
+
+    async def _flush_trivia_answers(self):
+        """Write queued answers every ANSWER_FLUSH_SECONDS until none arrive (backs off while writes fail)."""
+        delay = self.ANSWER_FLUSH_SECONDS
+        while self._answers_waiting:
+            self._answers_waiting = False
+            await asyncio.sleep(delay)
+            try:
+                written = await self.run(self.db.flush_trivia_answers)
+            except Exception as e:
+                logger.error(f"Trivia answer flush failed: {e}")
+                written = -1
+            if written < 0:
+                self._answers_waiting = True
+                delay = min(delay * 2, self.ANSWER_FLUSH_MAX_BACKOFF_SECONDS)
+            else:
+                delay = self.ANSWER_FLUSH_SECONDS
+
+    async def get_due_reminders(self, current_time) -> List[Dict[str, Any]]:
+        """Async version of DatabaseManager.get_due_reminders"""
+        return await self.run(self.db.get_due_reminders, current_time)
+
+    async def get_reminders_awaiting_auto_action(self, current_time) -> List[Dict[str, Any]]:
+        """Async version of DatabaseManager.get_reminders_awaiting_auto_action"""
+        return await self.run(self.db.get_reminders_awaiting_auto_action, current_time)
+
+    async def update_reminder_status(self, reminder_id: int, status: str,
+                                     delivered_at=None, auto_executed_at=None) -> bool:
+        """Async version of DatabaseManager.update_reminder_status"""
+        return await self.run(self.db.update_reminder_status, reminder_id, status, delivered_at, auto_executed_at)
+
+    # ========== LIFECYCLE & STATS ==========
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor call statistics.
+
+        Returns:
+            Dict with call counts and worker hold times in milliseconds
+        """
+        with self._lock:
+            calls = self._calls
+            return {
+                'max_workers': self.max_workers,
+                'calls': calls,
+                'errors': self._errors,
+                'avg_call_ms': round((self._total_seconds / calls) * 1000, 2) if calls else 0.0,
+                'max_call_ms': round(self._max_seconds * 1000, 2),
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the executor. A new one is created if the facade is used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+            logger.info("Async database executor shut down")
@@ -15,9 +15,12 @@ from zoneinfo import ZoneInfo
 
 from psycopg2.extras import RealDictRow
 
+from .core import scoped_connections
+
 logger = logging.getLogger(__name__)
 
 
+@scoped_connections
 class ConfigDatabase:
     """
     Handles bot configuration and weekly announcements.
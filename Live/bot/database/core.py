@@ -2,16 +2,22 @@
 Database Core Module - Connection Management & Base Class
 
 This module provides the foundational DatabaseManager class with:
-- Database connection management
+- Database connection management (scoped checkouts, pool telemetry, leak detection)
 - SQL injection prevention helpers
 - Database initialization
 - Connection retry logic
 """
 
+import functools
+import inspect
 import logging
 import os
 import sys
-from typing import List, Optional
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
 
 import psycopg2
 from psycopg2 import pool
@@ -22,15 +28,200 @@ logging.basicConfig(level=logging.INFO, stream=sys.stdout)
 logger = logging.getLogger(__name__)
 
 
+# Set DB_POOL_DEBUG=1 to log where each leaked connection was checked out
+POOL_DEBUG = os.getenv('DB_POOL_DEBUG', '').lower() in ('1', 'true', 'yes', 'on')
+
+# How long get_connection waits for a pooled connection before opening an unpooled one
+POOL_WAIT_SECONDS = float(os.getenv('DB_POOL_WAIT_SECONDS', '2.0'))
+
+
+class PoolTelemetry:
+    """
+    Thread-safe counters for connection checkouts.
+
+    Tracks connections currently checked out, how long callers waited for
+    one, how often the pool was exhausted and an unpooled connection was
+    opened instead, and how long each scope (domain method) held its
+    connections. A connection still open when its scope ends is closed by
+    the scope; one dropped entirely is returned by the garbage collector.
+    Both count as leaks, and in debug mode the checkout call site is logged.
+    """
+
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.checkouts = 0
+        self.fallback_connects = 0
+        self.pool_exhausted = 0
+        self.failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.released_by_scope = 0
+        self.released_by_gc = 0
+        self._holders: Dict[str, Dict[str, Any]] = {}
+
+    def record_checkout(self, wait_seconds: float, fallback: bool = False, exhausted: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            self.wait_total += wait_seconds
+            self.wait_max = max(self.wait_max, wait_seconds)
+            if fallback:
+                self.fallback_connects += 1
+            if exhausted:
+                self.pool_exhausted += 1
+
+    def record_failure(self, exhausted: bool = False):
+        with self._lock:
+            self.failures += 1
+            if exhausted:
+                self.pool_exhausted += 1
+
+    def record_release(self, label: str, hold_seconds: float, released_by: Optional[str] = None,
+                       call_site: Optional[str] = None):
+        """Record a connection going back; released_by is "scope" or "gc" for leaked connections."""
+        with self._lock:
+            self.checked_out -= 1
+            holder = self._holders.setdefault(label, {"count": 0, "total": 0.0, "max": 0.0, "leaked": 0})
+            holder["count"] += 1
+            holder["total"] += hold_seconds
+            holder["max"] = max(holder["max"], hold_seconds)
+            if released_by:
+                holder["leaked"] += 1
+                if released_by == "scope":
+                    self.released_by_scope += 1
+                else:
+                    self.released_by_gc += 1
+        if released_by and self.debug:
+            where = call_site or "unknown call site (checked out before debug mode was enabled)"
+            logger.warning(f"🔌 Leaked database connection in {label} (held {hold_seconds * 1000:.0f}ms, "
+                           f"returned by {released_by}), checked out at {where}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus per-label hold times (milliseconds), slowest holders first."""
+        with self._lock:
+            holders = {
+                label: {
+                    "count": h["count"],
+                    "leaked": h["leaked"],
+                    "avg_hold_ms": round(h["total"] * 1000 / h["count"], 1),
+                    "max_hold_ms": round(h["max"] * 1000, 1)
+                }
+                for label, h in sorted(self._holders.items(), key=lambda item: item[1]["max"], reverse=True)
+            }
+            return {
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "fallback_connects": self.fallback_connects,
+                "pool_exhausted": self.pool_exhausted,
+                "failures": self.failures,
+                "avg_wait_ms": round(self.wait_total * 1000 / max(self.checkouts, 1), 2),
+                "max_wait_ms": round(self.wait_max * 1000, 1),
+                "leaked": self.released_by_scope + self.released_by_gc,
+                "released_by_scope": self.released_by_scope,
+                "released_by_gc": self.released_by_gc,
+                "debug": self.debug,
+                "holders": holders
+            }
+
+
+# ========== CONNECTION SCOPES ==========
+# Each thread keeps a stack of open scopes. Connections checked out through
+# DatabaseManager.get_connection join the innermost scope, and anything the
+# scope's code forgot to close is returned to the pool when the scope ends.
+
+_scope_state = threading.local()
+
+
+class _ConnectionScope:
+    __slots__ = ("label", "connections")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.connections: set = set()
+
+    def release(self):
+        for conn in list(self.connections):
+            conn.close(released_by="scope")
+        self.connections.clear()
+
+
+def _scope_stack() -> List[_ConnectionScope]:
+    stack = getattr(_scope_state, "stack", None)
+    if stack is None:
+        stack = _scope_state.stack = []
+    return stack
+
+
+def _current_scope() -> Optional[_ConnectionScope]:
+    stack = _scope_stack()
+    return stack[-1] if stack else None
+
+
+def _scoped(func, label: str):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = _scope_stack()
+        scope = _ConnectionScope(label)
+        stack.append(scope)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stack.remove(scope)
+            if scope.connections:
+                scope.release()
+    return wrapper
+
+
+def scoped_connections(cls):
+    """
+    Class decorator for domain database modules: each synchronous method runs
+    in its own connection scope labelled "<Class>.<method>", so connections it
+    checks out are returned to the pool when it returns, and its hold time is
+    reported under that label.
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("__") or name == "get_connection" or not inspect.isfunction(attr):
+            continue
+        if inspect.iscoroutinefunction(attr) or inspect.isgeneratorfunction(attr):
+            continue
+        setattr(cls, name, _scoped(attr, f"{cls.__name__}.{name}"))
+    return cls
+
+
+def _checkout_site() -> str:
+    """The first frame outside the connection plumbing (debug mode only)."""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename == __file__ or frame.name in ("get_connection", "wrapper") \
+                or frame.filename.endswith("contextlib.py"):
+            continue
+        return f"{frame.filename}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+
 class PooledConnectionWrapper:
     """
     Wraps a psycopg2 connection from a connection pool to automatically
     return it to the pool when .close() is called, preventing connection leaks.
+
+    Unpooled fallback connections (pool=None) are wrapped too, so they are
+    tracked the same way and really closed on .close().
     """
 
-    def __init__(self, pool, conn):
+    def __init__(self, pool, conn, telemetry: Optional[PoolTelemetry] = None, label: str = "unscoped",
+                 call_site: Optional[str] = None, on_release=None):
         self._pool = pool
         self._conn = conn
+        self._telemetry = telemetry
+        self._label = label
+        self._call_site = call_site
+        self._on_release = on_release
+        self._scope: Optional[_ConnectionScope] = None
+        self._checked_out_at = time.perf_counter()
 
     def cursor(self, *args, **kwargs):
         if not self._conn:
@@ -47,14 +238,27 @@ class PooledConnectionWrapper:
             raise RuntimeError("Connection is closed")
         return self._conn.rollback()
 
-    def close(self):
+    def close(self, released_by: Optional[str] = None):
         """Returns the connection to the pool instead of closing it."""
-        if hasattr(self, '_conn') and self._conn is not None:
-            try:
-                self._pool.putconn(self._conn)
-                self._conn = None
-            except Exception as e:
-                logger.error(f"Error returning connection to pool: {e}")
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            return
+        self._conn = None
+        try:
+            if self._pool is None:
+                conn.close()
+            else:
+                self._pool.putconn(conn)
+        except Exception as e:
+            logger.error(f"Error returning connection to pool: {e}")
+        if self._scope is not None:
+            self._scope.connections.discard(self)
+            self._scope = None
+        if self._telemetry is not None:
+            self._telemetry.record_release(self._label, time.perf_counter() - self._checked_out_at,
+                                           released_by, self._call_site)
+        if self._on_release is not None:
+            self._on_release()
 
     def __enter__(self):
         return self
@@ -64,10 +268,15 @@ class PooledConnectionWrapper:
 
     def __del__(self):
         """Safety net to prevent connection leaks if close() is forgotten."""
-        self.close()
+        try:
+            self.close(released_by="gc")
+        except Exception:
+            pass
 
     def __getattr__(self, name):
         """Pass any other attribute accesses to the underlying connection."""
+        if name.startswith('_'):
+            raise AttributeError(name)
         return getattr(self._conn, name)
 
 
@@ -88,6 +297,10 @@ class DatabaseManager:
         'created_at', 'updated_at'
     ]
 
+    # Connection pool bounds (the async executor is sized to the max)
+    POOL_MIN_CONNECTIONS = 1
+    POOL_MAX_CONNECTIONS = 20
+
     def __init__(self):
         """
         Initialize database manager with all domain modules.
@@ -97,6 +310,8 @@ class DatabaseManager:
         """
         self.database_url = os.getenv('DATABASE_URL')
         self._connection_pool = None
+        self.pool_telemetry = PoolTelemetry(debug=POOL_DEBUG)
+        self._connection_returned = threading.Condition()
 
         if not self.database_url:
             logger.warning(
@@ -107,7 +322,7 @@ class DatabaseManager:
             try:
                 # Initialize connection pool (min 1, max 20 connections)
                 self._connection_pool = pool.ThreadedConnectionPool(
-                    1, 20,
+                    self.POOL_MIN_CONNECTIONS, self.POOL_MAX_CONNECTIONS,
                     dsn=self.database_url,
                     cursor_factory=RealDictCursor,
                     connect_timeout=5
@@ -125,6 +340,15 @@ class DatabaseManager:
         self._stats = None
         self._trivia = None
         self._games = None
+        self._aio = None
+
+    @property
+    def aio(self):
+        """Lazy-load async facade (runs calls off the event loop)."""
+        if self._aio is None:
+            from .async_db import AsyncDatabase
+            self._aio = AsyncDatabase(self)
+        return self._aio
 
     @property
     def config(self):
@@ -294,6 +518,10 @@ class DatabaseManager:
 
         Returns a wrapped connection that safely returns to the pool
         when .close() is called, ensuring compatibility with existing code.
+        If the pool is exhausted, waits up to POOL_WAIT_SECONDS for a
+        connection to come back before opening an unpooled one.
+
+        Prefer checkout() / transaction(), which always release it.
 
         Returns:
             PooledConnectionWrapper object or None if connection fails
@@ -301,22 +529,104 @@ class DatabaseManager:
         if not self.database_url or not self._connection_pool:
             return None
 
-        try:
-            conn = self._connection_pool.getconn()
-            # Wrap the connection so .close() calls putconn() instead
-            return PooledConnectionWrapper(self._connection_pool, conn)
-        except Exception as e:
-            logger.error(f"Database pool getconn failed: {e}")
+        telemetry = self.pool_telemetry
+        started = time.perf_counter()
+        deadline = started + POOL_WAIT_SECONDS
+        exhausted = False
+        conn = None
+        while conn is None:
+            try:
+                conn = self._connection_pool.getconn()
+            except pool.PoolError as e:
+                # Every pooled connection is checked out; wait for one to be returned
+                exhausted = True
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    logger.warning(f"Database pool exhausted for {POOL_WAIT_SECONDS:.1f}s: {e}")
+                    break
+                with self._connection_returned:
+                    self._connection_returned.wait(min(remaining, 0.05))
+            except Exception as e:
+                logger.error(f"Database pool getconn failed: {e}")
+                break
 
+        scope = _current_scope()
+        label = scope.label if scope else "unscoped"
+        call_site = _checkout_site() if telemetry.debug else None
+
+        if conn is not None:
+            # Wrap the connection so .close() calls putconn() instead
+            wrapper = PooledConnectionWrapper(self._connection_pool, conn, telemetry, label,
+                                              call_site, self._notify_connection_returned)
+            telemetry.record_checkout(time.perf_counter() - started, exhausted=exhausted)
+        else:
             # Fallback to single connection if pool fails
             try:
                 logger.info("Attempting fallback single connection...")
                 fallback_conn = psycopg2.connect(
                     self.database_url, cursor_factory=RealDictCursor, connect_timeout=5)
-                return fallback_conn
             except Exception as e2:
                 logger.error(f"Database fallback connection failed: {e2}")
+                telemetry.record_failure(exhausted=exhausted)
                 return None
+            wrapper = PooledConnectionWrapper(None, fallback_conn, telemetry, label, call_site)
+            telemetry.record_checkout(time.perf_counter() - started, fallback=True, exhausted=exhausted)
+
+        if scope is not None:
+            wrapper._scope = scope
+            scope.connections.add(wrapper)
+        return wrapper
+
+    def _notify_connection_returned(self):
+        with self._connection_returned:
+            self._connection_returned.notify()
+
+    @contextmanager
+    def checkout(self):
+        """
+        Check out a connection for the duration of a with-block.
+
+        Yields None if the database is unavailable. The connection always
+        goes back to the pool when the block exits, even on error.
+
+            with db.checkout() as conn:
+                if not conn:
+                    return None
+                with conn.cursor() as cur:
+                    ...
+        """
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            if conn is not None:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Like checkout(), but commits when the block succeeds and rolls back if it raises.
+
+        Raises:
+            RuntimeError: The database is unavailable
+        """
+        with self.checkout() as conn:
+            if conn is None:
+                raise RuntimeError("Database not available")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connection pool telemetry (checked out, waits, fallbacks, hold times per method)."""
+        stats = self.pool_telemetry.snapshot()
+        stats["pool_min"] = self.POOL_MIN_CONNECTIONS
+        stats["pool_max"] = self.POOL_MAX_CONNECTIONS
+        stats["pooled"] = self._connection_pool is not None
+        return stats
 
     def init_database(self):
         """
@@ -514,6 +824,23 @@ class DatabaseManager:
                     )
                 """)
 
+                # One answer per user per session. Buffered answer ingestion relies on
+                # ON CONFLICT (session_id, user_id); drop legacy duplicates (keeping the
+                # earliest) the first time the index is created
+                cur.execute("""
+                    DO $$
+                    BEGIN
+                        IF NOT EXISTS (
+                            SELECT 1 FROM pg_indexes WHERE indexname = 'idx_trivia_answers_session_user'
+                        ) THEN
+                            DELETE FROM trivia_answers a USING trivia_answers b
+                            WHERE a.session_id = b.session_id AND a.user_id = b.user_id AND a.id > b.id;
+                            CREATE UNIQUE INDEX idx_trivia_answers_session_user
+                            ON trivia_answers(session_id, user_id);
+                        END IF;
+                    END $$;
+                """)
+
                 # Create session management tables
                 cur.execute("""
                     CREATE TABLE IF NOT EXISTS trivia_approval_sessions (
@@ -628,6 +955,26 @@ class DatabaseManager:
                     ON ai_alert_log(alert_type, severity)
                 """)
 
+                # Persistent tier for the AI response cache (survives redeploys)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS ai_response_cache (
+                        cache_key VARCHAR(64) PRIMARY KEY,
+                        original_query TEXT NOT NULL,
+                        response TEXT NOT NULL,
+                        user_id BIGINT,
+                        channel_id BIGINT,
+                        is_dm BOOLEAN DEFAULT FALSE,
+                        query_type VARCHAR(50),
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+                    )
+                """)
+
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_ai_response_cache_expires
+                    ON ai_response_cache(expires_at)
+                """)
+
                 conn.commit()
                 logger.info("✅ Database tables initialized successfully")
 
@@ -655,6 +1002,14 @@ class DatabaseManager:
         """Delegate to trivia module - get active trivia session"""
         return self.trivia.get_active_trivia_session()
 
+    def get_active_trivia_session_for_message(self, message_id):
+        """Delegate to trivia module - get active trivia session by replied-to message ID"""
+        return self.trivia.get_active_trivia_session_for_message(message_id)
+
+    def load_trivia_session_registry(self):
+        """Delegate to trivia module - load active trivia sessions into the session registry"""
+        return self.trivia.load_session_registry()
+
     # ========== REMINDER DELEGATIONS (to users module) ==========
 
     def get_due_reminders(self, current_time):
@@ -665,6 +1020,10 @@ class DatabaseManager:
         """Delegate to users module - get reminders awaiting auto action"""
         return self.users.get_reminders_awaiting_auto_action(current_time)
 
+    def get_scheduled_reminders(self):
+        """Delegate to users module - get pending reminders and outstanding auto-actions"""
+        return self.users.get_scheduled_reminders()
+
     def add_reminder(self, user_id, reminder_text, scheduled_time, delivery_channel_id=None,
                      delivery_type='dm', auto_action_enabled=False, auto_action_type=None,
                      auto_action_data=None):
@@ -681,6 +1040,10 @@ class DatabaseManager:
         """Delegate to users module - update reminder status"""
         return self.users.update_reminder_status(reminder_id, status, delivered_at, auto_executed_at)
 
+    def update_reminder_statuses(self, reminder_ids, status, delivered_at=None, auto_executed_at=None):
+        """Delegate to users module - update the status of a batch of reminders"""
+        return self.users.update_reminder_statuses(reminder_ids, status, delivered_at, auto_executed_at)
+
     def get_all_pending_reminders(self):
         """Delegate to users module - get all pending reminders"""
         return self.users.get_all_pending_reminders()
@@ -781,6 +1144,10 @@ class DatabaseManager:
         """Delegate to games module - update played game"""
         return self.games.update_played_game(game_id, **kwargs)
 
+    def bulk_update_game_stats(self, updates, page_size=500):
+        """Delegate to games module - batched stats update"""
+        return self.games.bulk_update_game_stats(updates, page_size)
+
     def add_played_game(self, canonical_name, **kwargs):
         """Delegate to games module - add played game"""
         return self.games.add_played_game(canonical_name, **kwargs)
@@ -865,9 +1232,9 @@ class DatabaseManager:
         """Delegate to games module - get engagement metrics"""
         return self.games.get_engagement_metrics(game_name, limit)
 
-    def get_gaming_timeline(self, order='ASC'):
+    def get_gaming_timeline(self, order='ASC', limit=None):
         """Delegate to games module - get gaming timeline"""
-        return self.games.get_gaming_timeline(order)
+        return self.games.get_gaming_timeline(order, limit)
 
     def get_played_games_stats(self):
         """Delegate to games module - get played games stats"""
@@ -944,6 +1311,18 @@ class DatabaseManager:
         """Delegate to trivia module - submit trivia answer"""
         return self.trivia.submit_trivia_answer(session_id, user_id, answer_text, normalized_answer)
 
+    def prime_trivia_answers(self, session_id):
+        """Delegate to trivia module - prime the answer buffer for a session"""
+        return self.trivia.prime_trivia_answers(session_id)
+
+    def queue_trivia_answer(self, session_id, user_id, answer_text, normalized_answer=None):
+        """Delegate to trivia module - queue trivia answer in the answer buffer"""
+        return self.trivia.queue_trivia_answer(session_id, user_id, answer_text, normalized_answer)
+
+    def flush_trivia_answers(self):
+        """Delegate to trivia module - write buffered trivia answers"""
+        return self.trivia.flush_trivia_answers()
+
     def get_trivia_question(self, question_id):
         """Delegate to trivia module - get trivia question"""
         return self.trivia.get_trivia_question(question_id)
@@ -980,6 +1359,10 @@ class DatabaseManager:
         """Delegate to trivia module - check question duplicate"""
         return self.trivia.check_question_duplicate(question_text, similarity_threshold)
 
+    def check_question_duplicates_batch(self, questions, similarity_threshold=0.8, within_batch=True):
+        """Delegate to trivia module - check several questions for duplicates in one pass"""
+        return self.trivia.check_question_duplicates_batch(questions, similarity_threshold, within_batch)
+
     def safe_add_trivia_question(self, **kwargs):
         """Delegate to trivia module - safe add trivia question"""
         return self.trivia.safe_add_trivia_question(**kwargs)
@@ -1056,6 +1439,10 @@ class DatabaseManager:
 
         Should be called when shutting down the bot or during cleanup.
         """
+        if self._trivia is not None and self._trivia.answer_buffer.pending_count():
+            self._trivia.flush_trivia_answers()
+        if self._aio is not None:
+            self._aio.shutdown(wait=False)
         if self.connection:
             try:
                 self.connection.close()
@@ -0,0 +1,302 @@
+"""
+Database Game Index Module - In-Memory Name Resolution
+
+This module provides the GameNameIndex used by GamesDatabase.get_played_game
+to resolve a user-supplied game name to a played_games ID without scanning
+the table. It mirrors the lookup cascade of the original SQL implementation:
+
+1. Exact canonical name (case-insensitive)
+2. Normalized canonical name (punctuation-insensitive)
+3. Alternative names (exact, then normalized)
+4. Fuzzy match over canonical + alternative names (difflib, cutoff 0.75)
+
+Fuzzy matching uses a character bigram inverted index to discard names that
+provably cannot reach the difflib cutoff, so the final difflib pass only runs
+over a small candidate set while returning exactly the same match.
+"""
+
+import difflib
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+FUZZY_CUTOFF = 0.75
+
+
+def _bigrams(text: str) -> Counter:
+    """Count overlapping character bigrams in text."""
+    return Counter(text[i:i + 2] for i in range(len(text) - 1))
+
+
+def _parse_alternative_names(raw: Any, fallback_parser: Callable[[str], List[str]]) -> List[str]:
+    """Parse stored alternative_names the same way get_played_game always has."""
+    if not raw:
+        return []
+    if isinstance(raw, list):
+        return [str(name) for name in raw if name]
+    if not isinstance(raw, str):
+        return []
+    try:
+        parsed = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        parsed = fallback_parser(raw)
+    if not isinstance(parsed, list):
+        return []
+    return [str(name) for name in parsed if name]
+
+
+class GameNameIndex:
+    """
+    Process-wide name index for played games.
+
+    Entries are keyed by game ID and hold only the name data needed for
+    resolution; full rows are always fetched by primary key so other columns
+    are never stale. The index is thread-safe because lookups also run on
+    the AsyncDatabase executor.
+    """
+
+    def __init__(self,
+                 normalizer: Callable[[str], str],
+                 list_parser: Callable[[str], List[str]],
+                 ttl_seconds: float = 600.0):
+        """
+        Initialize an empty index.
+
+        Args:
+            normalizer: Function used for punctuation-insensitive matching
+            list_parser: Fallback parser for legacy comma-separated alt names
+            ttl_seconds: Age after which the index is rebuilt from the table
+        """
+        self._normalize = normalizer
+        self._parse_list = list_parser
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+        self._reset()
+
+    def _reset(self):
+        # id -> (canonical_lower, canonical_normalized, [(alt_lower, alt_normalized)], raw_alt_lower)
+        self._entries: Dict[int, Tuple[str, str, List[Tuple[str, str]], str]] = {}
+        self._canonical: Dict[str, Set[int]] = defaultdict(set)
+        self._canonical_normalized: Dict[str, Set[int]] = defaultdict(set)
+        self._alt: Dict[str, Set[int]] = defaultdict(set)
+        self._alt_normalized: Dict[str, Set[int]] = defaultdict(set)
+        # Fuzzy structures: name key -> owner IDs, plus bigram postings
+        self._fuzzy_owners: Dict[str, List[int]] = {}
+        self._bigram_postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._keys_by_length: Dict[int, Set[str]] = defaultdict(set)
+
+    # ========== STATE ==========
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def is_stale(self) -> bool:
+        """True when the index has never been built or has outlived its TTL."""
+        with self._lock:
+            if self._loaded_at is None:
+                return True
+            return (time.monotonic() - self._loaded_at) > self.ttl_seconds
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup (used after bulk writes)."""
+        with self._lock:
+            self._loaded_at = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ========== BUILD & INCREMENTAL UPDATES ==========
+
+    def build(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Rebuild the whole index from played_games rows.
+
+        Args:
+            rows: Rows with at least id, canonical_name and alternative_names,
+                  in table order (earlier rows win ties like the SQL cascade)
+        """
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._insert(row)
+            self._loaded_at = time.monotonic()
+        logger.debug(f"Game name index built with {len(self._entries)} games")
+
+    def upsert(self, row: Dict[str, Any]):
+        """Add or refresh a single game's names."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(int(row['id']))
+            self._insert(row)
+
+    def remove(self, game_id: int):
+        """Drop a game from the index."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(game_id)
+
+    def _insert(self, row: Dict[str, Any]):
+        game_id = int(row['id'])
+        canonical = row.get('canonical_name') or ''
+        raw_alt = row.get('alternative_names')
+        alt_names = _parse_alternative_names(raw_alt, self._parse_list)
+
+        canonical_lower = str(canonical).lower().strip()
+        canonical_normalized = self._normalize(canonical) if canonical else ''
+        alts = [(alt.lower().strip(), self._normalize(alt)) for alt in alt_names]
+        raw_alt_lower = raw_alt.lower() if isinstance(raw_alt, str) else ''
+
+        self._entries[game_id] = (canonical_lower, canonical_normalized, alts, raw_alt_lower)
+
+        if canonical:
+            self._canonical[canonical_lower].add(game_id)
+            self._canonical_normalized[canonical_normalized].add(game_id)
+            self._add_fuzzy_key(canonical_lower, game_id)
+            for alt_lower, alt_normalized in alts:
+                self._add_fuzzy_key(alt_lower, game_id)
+        for alt_lower, alt_normalized in alts:
+            self._alt[alt_lower].add(game_id)
+            self._alt_normalized[alt_normalized].add(game_id)
+
+    def _remove(self, game_id: int):
+        entry = self._entries.pop(game_id, None)
+        if entry is None:
+            return
+        canonical_lower, canonical_normalized, alts, _ = entry
+        self._discard(self._canonical, canonical_lower, game_id)
+        self._discard(self._canonical_normalized, canonical_normalized, game_id)
+        self._remove_fuzzy_key(canonical_lower, game_id)
+        for alt_lower, alt_normalized in alts:
+            self._discard(self._alt, alt_lower, game_id)
+            self._discard(self._alt_normalized, alt_normalized, game_id)
+            self._remove_fuzzy_key(alt_lower, game_id)
+
+    @staticmethod
+    def _discard(mapping: Dict[str, Set[int]], key: str, game_id: int):
+        ids = mapping.get(key)
+        if ids is not None:
+            ids.discard(game_id)
+            if not ids:
+                del mapping[key]
+
+    def _add_fuzzy_key(self, key: str, game_id: int):
+        owners = self._fuzzy_owners.get(key)
+        if owners is None:
+            self._fuzzy_owners[key] = [game_id]
+            for bigram, count in _bigrams(key).items():
+                self._bigram_postings[bigram][key] = count
+            self._keys_by_length[len(key)].add(key)
+        else:
+            owners.append(game_id)
+
+    def _remove_fuzzy_key(self, key: str, game_id: int):
+        owners = self._fuzzy_owners.get(key)
+        if owners is None:
+            return
+        while game_id in owners:
+            owners.remove(game_id)
+        if owners:
+            return
+        del self._fuzzy_owners[key]
+        for bigram in _bigrams(key):
+            postings = self._bigram_postings.get(bigram)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._bigram_postings[bigram]
+        same_length = self._keys_by_length.get(len(key))
+        if same_length is not None:
+            same_length.discard(key)
+            if not same_length:
+                del self._keys_by_length[len(key)]
+
+    # ========== LOOKUP ==========
+
+    def resolve(self, name: str) -> Optional[Tuple[int, str]]:
+        """
+        Resolve a name to a game ID using the get_played_game cascade.
+
+        Args:
+            name: User-supplied game name
+
+        Returns:
+            Tuple of (game_id, match_type) or None if no game matches.
+            match_type is one of 'exact', 'normalized', 'alternative', 'fuzzy'.
+        """
+        name_lower = name.lower().strip()
+        name_normalized = self._normalize(name)
+
+        with self._lock:
+            ids = self._canonical.get(name_lower)
+            if ids:
+                return min(ids), 'exact'
+
+            ids = self._canonical_normalized.get(name_normalized)
+            if ids:
+                return min(ids), 'normalized'
+
+            # The SQL cascade pre-filtered alternative names with LIKE on the raw
+            # stored text, so only rows whose text contains the query qualify.
+            candidates = self._alt.get(name_lower, set()) | self._alt_normalized.get(name_normalized, set())
+            matching = [game_id for game_id in candidates if name_lower in self._entries[game_id][3]]
+            if matching:
+                return min(matching), 'alternative'
+
+            match = self._fuzzy_match(name_lower)
+            if match is not None:
+                return match, 'fuzzy'
+        return None
+
+    def fuzzy_candidates(self, name_lower: str, cutoff: float = FUZZY_CUTOFF) -> List[str]:
+        """
+        Return the name keys that could reach the difflib cutoff.
+
+        The bound: difflib's ratio is 2M/S (M matched chars in k blocks,
+        S = combined length). Consecutive blocks are separated by at least
+        one unmatched character, so k <= (1 - cutoff) * S + 1, and the blocks
+        share at least M - k bigrams. Keys sharing fewer bigrams, or whose
+        length alone caps the ratio below the cutoff, can never match.
+        """
+        query_len = len(name_lower)
+        query_bigrams = _bigrams(name_lower)
+
+        shared: Dict[str, int] = defaultdict(int)
+        for bigram, query_count in query_bigrams.items():
+            for key, key_count in self._bigram_postings.get(bigram, {}).items():
+                shared[key] += min(query_count, key_count)
+
+        slope = 1.5 * cutoff - 1
+        if slope <= 0:
+            # The bigram bound only holds for cutoffs above 2/3
+            return list(self._fuzzy_owners)
+
+        # Keys so short that the bigram bound is vacuous must be checked directly
+        for length in range(0, int(1 / slope) - query_len + 1):
+            for key in self._keys_by_length.get(length, ()):
+                shared.setdefault(key, 0)
+
+        candidates = []
+        for key, common in shared.items():
+            total = query_len + len(key)
+            if total == 0 or 2 * min(query_len, len(key)) < cutoff * total:
+                continue
+            if common >= slope * total - 1:
+                candidates.append(key)
+        return candidates
+
+    def _fuzzy_match(self, name_lower: str) -> Optional[int]:
+        candidates = self.fuzzy_candidates(name_lower)
+        matches = difflib.get_close_matches(name_lower, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        if not matches:
+            return None
+        # The SQL cascade built a dict in table order, so the last owner won
+        return max(self._fuzzy_owners[matches[0]])
@@ -0,0 +1,352 @@
+"""
+Database Game Rankings Module - Precomputed Played-Games Statistics
+
+This module provides the GameRankings store used by GamesDatabase to answer
+ranking, top-N and aggregate questions (most playtime, fewest episodes,
+Twitch leaders, engagement, series and genre totals, where a game ranks)
+without querying Postgres.
+
+played_games only changes during the weekly sync and manual edits, so the
+whole table is read once and every metric is sorted in the same pass:
+
+- One ascending array per metric (rows plus a parallel value list), so
+  top-N in either direction is a slice and a rank is a bisect
+- Game ID -> row, and lowercase canonical name -> game ID
+- Series, genre and platform aggregates
+
+The store is tagged with the played_games table version (bumped by a
+statement trigger on every write, including scripts and manual SQL).
+GamesDatabase checks the version at most every verify_seconds and rebuilds
+when it moved; its own writes invalidate the store immediately.
+"""
+
+import bisect
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Columns read from played_games when the store is rebuilt
+RANKED_COLUMNS = (
+    'id', 'canonical_name', 'series_name', 'genre', 'release_year', 'first_played_date',
+    'completion_status', 'total_episodes', 'total_playtime_minutes', 'youtube_views',
+    'twitch_views', 'youtube_playlist_url', 'twitch_vod_urls'
+)
+
+_COUNTERS = ('total_episodes', 'total_playtime_minutes', 'youtube_views', 'twitch_views')
+
+# Fields returned by each ranking, matching the columns of the SQL queries it replaces
+_SUMMARY_FIELDS = ('canonical_name', 'series_name', 'total_episodes', 'total_playtime_minutes',
+                   'completion_status', 'genre')
+_VIEW_FIELDS = ('canonical_name', 'series_name', 'youtube_views', 'twitch_views', 'total_views',
+                'total_episodes', 'total_playtime_minutes', 'completion_status')
+
+
+def _total_views(row: Dict[str, Any]) -> int:
+    return row['youtube_views'] + row['twitch_views']
+
+
+def _views_per_hour(row: Dict[str, Any]) -> float:
+    return _total_views(row) / (row['total_playtime_minutes'] / 60)
+
+
+class _Metric:
+    """How one ranking filters, orders and presents rows."""
+
+    __slots__ = ("include", "key", "fields")
+
+    def __init__(self, include: Callable[[Dict[str, Any]], bool], key: Callable[[Dict[str, Any]], Any],
+                 fields: Tuple[str, ...]):
+        self.include = include
+        self.key = key
+        self.fields = fields
+
+
+METRICS: Dict[str, _Metric] = {
+    'playtime': _Metric(lambda g: g['total_playtime_minutes'] > 0,
+                        lambda g: g['total_playtime_minutes'], _SUMMARY_FIELDS),
+    'episodes': _Metric(lambda g: g['total_episodes'] > 0,
+                        lambda g: g['total_episodes'], _SUMMARY_FIELDS),
+    'played_date': _Metric(lambda g: g['first_played_date'] is not None,
+                           lambda g: g['first_played_date'], ('canonical_name', 'first_played_date')),
+    'release_year': _Metric(lambda g: bool(g['release_year']) and g['release_year'] > 0,
+                            lambda g: g['release_year'], ('canonical_name', 'release_year')),
+    'youtube_views': _Metric(lambda g: g['youtube_views'] > 0,
+                             lambda g: g['youtube_views'], _VIEW_FIELDS),
+    'twitch_views': _Metric(lambda g: g['twitch_views'] > 0, lambda g: g['twitch_views'],
+                            ('canonical_name', 'series_name', 'twitch_views', 'total_episodes',
+                             'total_playtime_minutes', 'completion_status', 'twitch_vod_urls')),
+    'total_views': _Metric(lambda g: _total_views(g) > 0, _total_views,
+                           _VIEW_FIELDS + ('youtube_playlist_url', 'twitch_vod_urls')),
+    'avg_episode_length': _Metric(lambda g: g['total_episodes'] > 0 and g['total_playtime_minutes'] > 0,
+                                  lambda g: g['total_playtime_minutes'] / g['total_episodes'],
+                                  ('canonical_name', 'series_name', 'total_episodes', 'total_playtime_minutes',
+                                   'avg_minutes_per_episode', 'completion_status')),
+    'engagement': _Metric(lambda g: _total_views(g) > 0 and g['total_episodes'] > 0
+                          and g['total_playtime_minutes'] > 0,
+                          _views_per_hour, _VIEW_FIELDS + ('views_per_episode', 'views_per_hour')),
+    'completed_length': _Metric(lambda g: g['completion_status'] == 'completed'
+                                and (g['total_episodes'] > 0 or g['total_playtime_minutes'] > 0),
+                                lambda g: (g['total_playtime_minutes'], g['total_episodes']), _SUMMARY_FIELDS),
+}
+
+
+class GameRankings:
+    """
+    Process-wide precomputed rankings for played games.
+
+    Rows handed out are fresh dicts, so callers may modify them. The store
+    is thread-safe because queries also run on the AsyncDatabase executor.
+    """
+
+    def __init__(self, verify_seconds: float = 30.0):
+        """
+        Initialize an empty store.
+
+        Args:
+            verify_seconds: How long a build (or a version check) is trusted
+                            before the table version is checked again
+        """
+        self.verify_seconds = verify_seconds
+        self._lock = threading.RLock()
+        self.version: Optional[int] = None
+        self._verified_at: Optional[float] = None
+        # Bumped by invalidate(), so a build that read rows before a write can't be trusted
+        self.generation = 0
+        self.stats = {"builds": 0, "version_checks": 0, "queries": 0, "last_build_ms": 0.0}
+        self._reset()
+
+    def _reset(self):
+        self._games: Dict[int, Dict[str, Any]] = {}
+        self._ids_by_name: Dict[str, int] = {}
+        # metric -> (rows ascending by value, parallel values)
+        self._sorted: Dict[str, Tuple[List[Dict[str, Any]], List[Any]]] = {}
+        self._series: List[Dict[str, Any]] = []
+        self._genres: List[Dict[str, Any]] = []
+        self._platforms: Dict[str, Any] = {}
+
+    # ========== STATE ==========
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._verified_at is not None
+
+    def needs_check(self) -> bool:
+        """True when the store has never been built, was invalidated, or is due a version check."""
+        with self._lock:
+            if self._verified_at is None:
+                return True
+            return (time.monotonic() - self._verified_at) > self.verify_seconds
+
+    def mark_verified(self):
+        """The table version still matches; trust the store for another interval."""
+        with self._lock:
+            self.stats["version_checks"] += 1
+            if self._verified_at is not None:
+                self._verified_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a rebuild on the next query (used after writes to played_games)."""
+        with self._lock:
+            self._verified_at = None
+            self.version = None
+            self.generation += 1
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    # ========== BUILD ==========
+
+    def build(self, rows: Iterable[Dict[str, Any]], version: Optional[int] = None,
+              generation: Optional[int] = None):
+        """
+        Rebuild every ranking and aggregate from played_games rows.
+
+        Args:
+            rows: Rows with the RANKED_COLUMNS
+            version: played_games table version the rows were read at
+            generation: self.generation before the rows were read; if the store
+                        was invalidated since, the build is used but rechecked
+                        on the next query
+        """
+        started = time.perf_counter()
+        games: Dict[int, Dict[str, Any]] = {}
+        ids_by_name: Dict[str, int] = {}
+        for raw in rows:
+            row = {column: raw.get(column) for column in RANKED_COLUMNS}
+            for column in _COUNTERS:
+                row[column] = row[column] or 0
+            row['total_views'] = _total_views(row)
+            if row['total_episodes'] > 0:
+                row['avg_minutes_per_episode'] = round(row['total_playtime_minutes'] / row['total_episodes'], 1)
+                row['views_per_episode'] = round(row['total_views'] / row['total_episodes'], 1)
+            else:
+                row['avg_minutes_per_episode'] = None
+                row['views_per_episode'] = 0
+            row['views_per_hour'] = (round(_views_per_hour(row), 1)
+                                     if row['total_playtime_minutes'] > 0 else 0)
+            game_id = int(row['id'])
+            games[game_id] = row
+            name = str(row['canonical_name'] or '').lower().strip()
+            if name:
+                # Lowest ID wins duplicate names, like the SQL lookups
+                ids_by_name.setdefault(name, game_id)
+
+        ordered = sorted(games.values(), key=lambda g: g['id'])
+        sorted_metrics = {}
+        for name, metric in METRICS.items():
+            members = sorted((g for g in ordered if metric.include(g)), key=metric.key)
+            sorted_metrics[name] = (members, [metric.key(g) for g in members])
+
+        with self._lock:
+            self._reset()
+            self._games = games
+            self._ids_by_name = ids_by_name
+            self._sorted = sorted_metrics
+            self._series = self._aggregate_series(ordered)
+            self._genres = self._aggregate_genres(ordered)
+            self._platforms = self._aggregate_platforms(ordered)
+            if generation is None or generation == self.generation:
+                self.version = version
+                self._verified_at = time.monotonic()
+            self.stats["builds"] += 1
+            self.stats["last_build_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.debug(f"Game rankings built with {len(games)} games in {self.stats['last_build_ms']}ms")
+
+    @staticmethod
+    def _aggregate_series(games: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for g in games:
+            if not g['series_name'] or g['total_playtime_minutes'] <= 0:
+                continue
+            series = totals.setdefault(g['series_name'], {
+                'series_name': g['series_name'], 'game_count': 0,
+                'total_playtime_minutes': 0, 'total_episodes': 0})
+            series['game_count'] += 1
+            series['total_playtime_minutes'] += g['total_playtime_minutes']
+            series['total_episodes'] += g['total_episodes']
+        for series in totals.values():
+            series['avg_playtime_per_game'] = round(series['total_playtime_minutes'] / series['game_count'], 1)
+        return sorted(totals.values(), key=lambda s: s['total_playtime_minutes'], reverse=True)
+
+    @staticmethod
+    def _aggregate_genres(games: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for g in games:
+            if not g['genre']:
+                continue
+            genre = totals.setdefault(g['genre'], {
+                'genre': g['genre'], 'game_count': 0, 'total_episodes': 0,
+                'total_playtime_minutes': 0, 'completed_count': 0})
+            genre['game_count'] += 1
+            genre['total_episodes'] += g['total_episodes']
+            genre['total_playtime_minutes'] += g['total_playtime_minutes']
+            if g['completion_status'] == 'completed':
+                genre['completed_count'] += 1
+        for genre in totals.values():
+            genre['avg_playtime_per_game'] = round(genre['total_playtime_minutes'] / genre['game_count'], 1)
+            genre['completion_rate'] = round(genre['completed_count'] / genre['game_count'] * 100, 1)
+        return sorted(totals.values(), key=lambda g: g['total_playtime_minutes'], reverse=True)
+
+    @staticmethod
+    def _aggregate_platforms(games: List[Dict[str, Any]]) -> Dict[str, Any]:
+        youtube = [g for g in games if g['youtube_playlist_url'] and g['youtube_views'] > 0]
+        twitch = [g for g in games if g['twitch_vod_urls'] not in (None, '', '{}') and g['twitch_views'] > 0]
+
+        def summarize(members: List[Dict[str, Any]], views: str) -> Dict[str, Any]:
+            total_views = sum(g[views] for g in members)
+            return {
+                'game_count': len(members),
+                'total_views': total_views,
+                'avg_views_per_game': round(total_views / len(members), 1) if members else 0.0,
+                'total_content': sum(g['total_episodes'] for g in members)
+            }
+
+        return {
+            'youtube': summarize(youtube, 'youtube_views'),
+            'twitch': summarize(twitch, 'twitch_views'),
+            'cross_platform_count': sum(1 for g in games if g['youtube_views'] > 0 and g['twitch_views'] > 0)
+        }
+
+    # ========== QUERIES ==========
+
+    @staticmethod
+    def _project(row: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+        return {field: row[field] for field in fields}
+
+    def top(self, metric: str, order: str = 'DESC', limit: Optional[int] = 15) -> List[Dict[str, Any]]:
+        """
+        Games ranked by a metric (see METRICS).
+
+        Args:
+            metric: Metric name
+            order: 'DESC' for highest first, 'ASC' for lowest first
+            limit: Maximum rows (None for all)
+        """
+        spec = METRICS[metric]
+        with self._lock:
+            self.stats["queries"] += 1
+            rows = self._sorted.get(metric, ([], []))[0]
+            ordered = rows if order.upper() == 'ASC' else reversed(rows)
+            selected = itertools.islice(ordered, limit)
+            return [self._project(row, spec.fields) for row in selected]
+
+    def rank(self, game_id: int, metric: str) -> Optional[Dict[str, Any]]:
+        """
+        Where a game ranks for a metric, highest value first.
+
+        Games with equal values share a rank (1 + games with a strictly
+        higher value). Returns None for unknown games.
+        """
+        with self._lock:
+            self.stats["queries"] += 1
+            game = self._games.get(game_id)
+            if game is None:
+                return None
+            spec = METRICS[metric]
+            values = self._sorted.get(metric, ([], []))[1]
+            total = len(values)
+            if not spec.include(game):
+                return {'rank': total + 1, 'total': total, 'value': spec.key(game), 'ranked': False}
+            value = spec.key(game)
+            return {'rank': total - bisect.bisect_right(values, value) + 1, 'total': total,
+                    'value': value, 'ranked': True}
+
+    def game_id_for_name(self, name: str) -> Optional[int]:
+        """Game ID for an exact (case-insensitive) canonical name."""
+        with self._lock:
+            return self._ids_by_name.get(name.lower().strip())
+
+    def game(self, game_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._games.get(game_id)
+            return dict(row) if row is not None else None
+
+    def search_engagement(self, name_fragment: str) -> List[Dict[str, Any]]:
+        """Engagement rows for games whose canonical name contains name_fragment."""
+        fragment = name_fragment.lower()
+        fields = METRICS['engagement'].fields
+        with self._lock:
+            self.stats["queries"] += 1
+            return [self._project(g, fields) for g in sorted(self._games.values(), key=lambda g: g['id'])
+                    if fragment in str(g['canonical_name'] or '').lower()
+                    and g['total_views'] > 0 and g['total_episodes'] > 0]
+
+    def series_by_playtime(self, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.stats["queries"] += 1
+            return [dict(s) for s in self._series[:limit]]
+
+    def genre_statistics(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.stats["queries"] += 1
+            return [dict(g) for g in self._genres]
+
+    def platform_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            self.stats["queries"] += 1
+            return {key: dict(value) if isinstance(value, dict) else value
+                    for key, value in self._platforms.items()}
@@ -13,15 +13,21 @@ This module handles:
 
 import json
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple, cast
 from zoneinfo import ZoneInfo
 
-from psycopg2.extras import RealDictRow
+from psycopg2.extras import RealDictRow, execute_values
+
+from .core import scoped_connections
+from .game_index import GameNameIndex
+from .game_rankings import RANKED_COLUMNS, GameRankings
 
 logger = logging.getLogger(__name__)
 
 
+@scoped_connections
 class GamesDatabase:
     """
     Handles all played games database operations.
@@ -38,6 +44,11 @@ class GamesDatabase:
             db_manager: DatabaseManager instance for connection access
         """
         self.db = db_manager
+        # In-memory name index for get_played_game (built on first lookup)
+        self._name_index = GameNameIndex(self._normalize_for_matching, self._parse_comma_separated_list)
+        # Precomputed rankings and aggregates (rebuilt when played_games changes)
+        self._rankings = GameRankings()
+        self._rankings_refresh = threading.Lock()
         # Run one-time database migrations on initialization
         self._run_migrations()
 
@@ -108,6 +119,72 @@ class GamesDatabase:
                     CREATE INDEX IF NOT EXISTS idx_played_games_canonical_name ON played_games(canonical_name);
                     CREATE INDEX IF NOT EXISTS idx_played_games_skip_igdb ON played_games(skip_igdb_enrichment);
                     CREATE INDEX IF NOT EXISTS idx_played_games_genre ON played_games(genre);
+                    CREATE INDEX IF NOT EXISTS idx_played_games_canonical_lower
+                        ON played_games(LOWER(TRIM(canonical_name)));
+                """)
+
+                # Migration 5: Persistent IGDB enrichment cache (positive and negative lookups)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS igdb_cache (
+                        cache_key TEXT PRIMARY KEY,  -- normalized title
+                        query_name TEXT NOT NULL,
+                        enrichment JSONB NOT NULL,
+                        match_found BOOLEAN NOT NULL DEFAULT FALSE,
+                        cached_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                        expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_igdb_cache_expires ON igdb_cache(expires_at);
+                """)
+
+                # Migration 6: Incremental content sync cursors (per channel / per playlist).
+                # Rows with a session_id are held until that sync session is approved.
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS content_sync_cursors (
+                        source VARCHAR(50) NOT NULL,
+                        cursor_key TEXT NOT NULL,
+                        session_id VARCHAR(64) NOT NULL DEFAULT '',
+                        etag TEXT,
+                        last_item_id TEXT,
+                        last_published_at TIMESTAMP WITH TIME ZONE,
+                        item_count INTEGER,
+                        payload JSONB DEFAULT '{}',
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                        PRIMARY KEY (source, cursor_key, session_id)
+                    );
+                """)
+
+                # Migration 7: played_games table version, bumped by every write statement
+                # (including scripts and manual SQL) so cached rankings know when to rebuild
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS table_versions (
+                        table_name TEXT PRIMARY KEY,
+                        version BIGINT NOT NULL DEFAULT 0,
+                        changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                    );
+                    INSERT INTO table_versions (table_name, version)
+                    VALUES ('played_games', 0)
+                    ON CONFLICT (table_name) DO NOTHING;
+
+                    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+                    BEGIN
+                        INSERT INTO table_versions (table_name, version, changed_at)
+                        VALUES (TG_TABLE_NAME, 1, NOW())
+                        ON CONFLICT (table_name) DO UPDATE
+                        SET version = table_versions.version + 1, changed_at = NOW();
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql;
+
+                    DO $$
+                    BEGIN
+                        IF NOT EXISTS (
+                            SELECT 1 FROM pg_trigger WHERE tgname = 'played_games_version'
+                        ) THEN
+                            CREATE TRIGGER played_games_version
+                            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON played_games
+                            FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+                        END IF;
+                    END $$;
                 """)
 
                 conn.commit()
@@ -172,6 +249,7 @@ class GamesDatabase:
                         total_playtime_minutes, youtube_playlist_url, twitch_vod_urls, notes, youtube_views, twitch_views,
                         skip_igdb_enrichment, created_at, updated_at
                     ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    RETURNING id
                 """, (
                     canonical_name,
                     alt_names_str,
@@ -190,7 +268,15 @@ class GamesDatabase:
                     twitch_views,
                     skip_igdb_enrichment
                 ))
+                inserted = cur.fetchone()
                 conn.commit()
+                self._rankings.invalidate()
+                if inserted and isinstance(inserted, dict):
+                    self._name_index.upsert({
+                        'id': inserted['id'],
+                        'canonical_name': canonical_name,
+                        'alternative_names': alt_names_str,
+                    })
                 logger.info(f"Added played game: {canonical_name}")
                 return True
         except Exception as e:
@@ -198,8 +284,67 @@ class GamesDatabase:
             conn.rollback()
             return False
 
+    def get_rankings(self) -> Optional[GameRankings]:
+        """
+        Return the precomputed rankings, rebuilding them if played_games changed.
+
+        The table version is checked at most every verify_seconds; in between,
+        ranking and top-N questions are answered without touching the database.
+        Returns None only if the rankings were never built and can't be.
+        """
+        rankings = self._rankings
+        if not rankings.needs_check():
+            return rankings
+
+        with self._rankings_refresh:
+            if not rankings.needs_check():
+                return rankings
+
+            conn = self.get_connection()
+            if not conn:
+                return rankings if rankings.is_loaded else None
+
+            try:
+                with conn.cursor() as cur:
+                    generation = rankings.generation
+                    try:
+                        cur.execute("SELECT version FROM table_versions WHERE table_name = 'played_games'")
+                        row = cur.fetchone()
+                        version = int(row['version']) if row else None
+                    except Exception as e:
+                        # No version table yet: rebuild every verify interval instead
+                        logger.debug(f"played_games version unavailable: {e}")
+                        conn.rollback()
+                        version = None
+
+                    if rankings.is_loaded and version is not None and version == rankings.version:
+                        rankings.mark_verified()
+                    else:
+                        cur.execute(f"SELECT {', '.join(RANKED_COLUMNS)} FROM played_games")
+                        rankings.build((dict(row) for row in cur.fetchall()), version, generation)
+                return rankings
+            except Exception as e:
+                logger.error(f"Error building game rankings: {e}")
+                return rankings if rankings.is_loaded else None
+            finally:
+                conn.close()
+
+    def _get_name_index(self, cur) -> GameNameIndex:
+        """Return the game name index, rebuilding it from the table when stale"""
+        if self._name_index.is_stale():
+            cur.execute("SELECT id, canonical_name, alternative_names FROM played_games ORDER BY id")
+            self._name_index.build(dict(row) for row in cur.fetchall())
+        return self._name_index
+
     def get_played_game(self, name: str) -> Optional[Dict[str, Any]]:
-        """Find a played game by name (searches canonical and alternative names)"""
+        """
+        Find a played game by name (searches canonical and alternative names).
+
+        Exact canonical matches use the LOWER(TRIM(canonical_name)) index. Everything
+        else (normalized, alternative and fuzzy matches) is resolved against the
+        in-memory GameNameIndex and then fetched by primary key, so no lookup scans
+        the played_games table.
+        """
         conn = self.get_connection()
         if not conn:
             return None
@@ -207,7 +352,6 @@ class GamesDatabase:
         try:
             with conn.cursor() as cur:
                 name_lower = name.lower().strip()
-                name_normalized = self._normalize_for_matching(name)
 
                 # Search canonical name first (exact match)
                 cur.execute("""
@@ -224,110 +368,22 @@ class GamesDatabase:
                         f"Found game by exact canonical name match: {name}")
                     return result_dict
 
-                # FIX #3: Try normalized matching for punctuation variations
-                # This catches "HITMAN World of Assassination" vs "HITMAN: World of Assassination"
-                cur.execute("SELECT * FROM played_games")
-                all_games = cur.fetchall()
-
-                for game_row in all_games:
-                    game_dict = dict(game_row)
-                    canonical_name = game_dict.get('canonical_name', '')
-                    if canonical_name:
-                        canonical_normalized = self._normalize_for_matching(canonical_name)
-                        if canonical_normalized == name_normalized:
-                            result_dict = game_dict
-                            result_dict = self._convert_text_to_arrays(result_dict)
-                            logger.debug(f"FIX #3: Found game by normalized canonical name: {name} -> {canonical_name}")
-                            return result_dict
-
-                # Search alternative names (handles JSON, PostgreSQL array, and comma-separated formats)
-                # Pre-filter in the database using LIKE to avoid fetching all rows, then do precise matching in Python.
-                like_pattern = f'%{name_lower}%'
-                cur.execute("""
-                    SELECT * FROM played_games
-                    WHERE alternative_names IS NOT NULL
-                    AND alternative_names != ''
-                    AND LOWER(alternative_names) LIKE %s
-                """, (like_pattern,))
-                all_games_with_alt_names = cur.fetchall()
-
-                # Search alternative names in Python for better format compatibility
-                for game_row in all_games_with_alt_names:
-                    game_dict = dict(game_row)
-                    alt_names_text = game_dict.get('alternative_names', '')
-                    if alt_names_text:
-                        # FIX: Parse JSON array instead of comma-separated text
-                        try:
-                            alt_names = json.loads(alt_names_text) if alt_names_text else []
-                        except (json.JSONDecodeError, TypeError):
-                            # Fallback to old parsing for legacy data
-                            alt_names = self._parse_comma_separated_list(alt_names_text)
-
-                        # Check each alternative name (exact match first, then normalized)
-                        for alt_name in alt_names:
-                            if alt_name.lower().strip() == name_lower:
-                                result_dict = game_dict
-                                result_dict = self._convert_text_to_arrays(result_dict)
-                                logger.debug(f"Found game by alternative name match: {name} -> {alt_name}")
-                                return result_dict
-
-                            # FIX #3: Try normalized matching on alternative names too
-                            alt_normalized = self._normalize_for_matching(alt_name)
-                            if alt_normalized == name_normalized:
-                                result_dict = game_dict
-                                result_dict = self._convert_text_to_arrays(result_dict)
-                                logger.debug(f"FIX #3: Found game by normalized alternative name: {name} -> {alt_name}")
-                                return result_dict
-
-                # Fuzzy search on canonical names with better matching
-                cur.execute(
-                    "SELECT id, canonical_name, alternative_names FROM played_games")
-                all_games = cur.fetchall()
-
-                import difflib
-                game_names_map = {}
-
-                for game in all_games:
-                    game_dict = dict(game)
-                    canonical_name = game_dict.get('canonical_name')
-                    if canonical_name:
-                        canonical_lower = str(canonical_name).lower().strip()
-                        game_names_map[canonical_lower] = game_dict
-
-                        # Also add alternative names to the map (handle TEXT
-                        # format)
-                        alt_names_text = game_dict.get('alternative_names', '')
-                        if alt_names_text and isinstance(alt_names_text, str):
-                            # FIX: Parse JSON array instead of comma-separated text
-                            try:
-                                alt_names = json.loads(alt_names_text) if alt_names_text else []
-                            except (json.JSONDecodeError, TypeError):
-                                # Fallback to old parsing for legacy data
-                                alt_names = self._parse_comma_separated_list(alt_names_text)
-
-                            for alt_name in alt_names:
-                                alt_lower = alt_name.lower().strip()
-                                game_names_map[alt_lower] = game_dict
-
-                # Try fuzzy matching with lower threshold for better matching
-                all_name_keys = list(game_names_map.keys())
-                matches = difflib.get_close_matches(
-                    name_lower, all_name_keys, n=1, cutoff=0.75)
-
-                if matches:
-                    match_name = matches[0]
-                    matched_game = game_names_map[match_name]
-                    logger.debug(
-                        f"Found game by fuzzy match: {name} -> {matched_game.get('canonical_name')}")
+                # Normalized, alternative-name and fuzzy matches come from the name index
+                for attempt in range(2):
+                    match = self._get_name_index(cur).resolve(name)
+                    if not match:
+                        break
 
-                    # Get the full game record
-                    cur.execute(
-                        "SELECT * FROM played_games WHERE id = %s", (matched_game['id'],))
+                    game_id, match_type = match
+                    cur.execute("SELECT * FROM played_games WHERE id = %s", (game_id,))
                     full_result = cur.fetchone()
                     if full_result:
-                        result_dict = dict(full_result)
-                        result_dict = self._convert_text_to_arrays(result_dict)
-                        return result_dict
+                        logger.debug(
+                            f"Found game by {match_type} match: {name} -> {full_result.get('canonical_name')}")
+                        return self._convert_text_to_arrays(dict(full_result))
+
+                    # Row was changed outside this process - rebuild once and retry
+                    self._name_index.invalidate()
 
                 logger.debug(f"No game found for: {name}")
                 return None
@@ -437,6 +493,7 @@ class GamesDatabase:
 
                 updated_count = cur.rowcount
                 conn.commit()
+                self._rankings.invalidate()
                 cur.execute("DROP TABLE temp_youtube_updates")
                 logger.info(f"Updated YouTube cache for {updated_count} games.")
                 return updated_count
@@ -448,137 +505,18 @@ class GamesDatabase:
 
     def get_games_by_twitch_views(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get games ranked by Twitch view count."""
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        canonical_name,
-                        series_name,
-                        twitch_views,
-                        total_episodes,
-                        total_playtime_minutes,
-                        completion_status,
-                        twitch_vod_urls
-                    FROM played_games
-                    WHERE twitch_views > 0
-                    ORDER BY twitch_views DESC
-                    LIMIT %s
-                """, (limit,))
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting games by Twitch views: {e}")
-            return []
+        rankings = self.get_rankings()
+        return rankings.top('twitch_views', 'DESC', limit) if rankings is not None else []
 
     def get_games_by_total_views(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get games ranked by combined YouTube + Twitch views."""
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        canonical_name,
-                        series_name,
-                        youtube_views,
-                        twitch_views,
-                        (COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0)) as total_views,
-                        total_episodes,
-                        total_playtime_minutes,
-                        completion_status,
-                        youtube_playlist_url,
-                        twitch_vod_urls
-                    FROM played_games
-                    WHERE (youtube_views > 0 OR twitch_views > 0)
-                    ORDER BY (COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0)) DESC
-                    LIMIT %s
-                """, (limit,))
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting games by total views: {e}")
-            return []
+        rankings = self.get_rankings()
+        return rankings.top('total_views', 'DESC', limit) if rankings is not None else []
 
     def get_platform_comparison_stats(self) -> Dict[str, Any]:
         """Get comprehensive platform comparison statistics."""
-        conn = self.get_connection()
-        if not conn:
-            return {}
-
-        try:
-            with conn.cursor() as cur:
-                # YouTube statistics
-                cur.execute("""
-                    SELECT
-                        COUNT(*) as game_count,
-                        SUM(youtube_views) as total_views,
-                        AVG(youtube_views) as avg_views_per_game,
-                        SUM(total_episodes) as total_episodes
-                    FROM played_games
-                    WHERE youtube_playlist_url IS NOT NULL
-                    AND youtube_playlist_url != ''
-                    AND youtube_views > 0
-                """)
-                youtube_stats = cur.fetchone()
-
-                # Twitch statistics
-                cur.execute("""
-                    SELECT
-                        COUNT(*) as game_count,
-                        SUM(twitch_views) as total_views,
-                        AVG(twitch_views) as avg_views_per_game,
-                        SUM(total_episodes) as total_vods
-                    FROM played_games
-                    WHERE twitch_vod_urls IS NOT NULL
-                    AND twitch_vod_urls != ''
-                    AND twitch_vod_urls != '{}'
-                    AND twitch_views > 0
-                """)
-                twitch_stats = cur.fetchone()
-
-                # Cross-platform games
-                cur.execute("""
-                    SELECT COUNT(*) as cross_platform_count
-                    FROM played_games
-                    WHERE youtube_views > 0
-                    AND twitch_views > 0
-                """)
-                cross_platform = cur.fetchone()
-
-                # Safe dictionary access with proper null handling
-                youtube_dict = dict(youtube_stats) if youtube_stats else {}
-                twitch_dict = dict(twitch_stats) if twitch_stats else {}
-                cross_platform_dict = dict(cross_platform) if cross_platform else {}
-
-                return {
-                    'youtube': {
-                        'game_count': int(youtube_dict.get('game_count') or 0),
-                        'total_views': int(youtube_dict.get('total_views') or 0),
-                        'avg_views_per_game': round(float(youtube_dict.get('avg_views_per_game') or 0), 1),
-                        'total_content': int(youtube_dict.get('total_episodes') or 0)
-                    },
-                    'twitch': {
-                        'game_count': int(twitch_dict.get('game_count') or 0),
-                        'total_views': int(twitch_dict.get('total_views') or 0),
-                        'avg_views_per_game': round(float(twitch_dict.get('avg_views_per_game') or 0), 1),
-                        'total_content': int(twitch_dict.get('total_vods') or 0)
-                    },
-                    'cross_platform_count': int(cross_platform_dict.get('cross_platform_count') or 0)
-                }
-        except Exception as e:
-            # Handle known schema compatibility issue gracefully
-            error_str = str(e).lower()
-            if "youtube_views" in error_str or "column" in error_str and "does not exist" in error_str:
-                logger.info("ℹ️ Engagement metrics skipped (database schema compatibility)")
-            else:
-                logger.error(f"Error getting platform comparison stats: {e}")
-            return {}
+        rankings = self.get_rankings()
+        return rankings.platform_statistics() if rankings is not None else {}
 
     def get_engagement_metrics(self, game_name: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -586,79 +524,12 @@ class GamesDatabase:
         If game_name provided: return metrics for that specific game
         If None: return top games by engagement rate
         """
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            with conn.cursor() as cur:
-                if game_name:
-                    # Get metrics for specific game
-                    cur.execute("""
-                        SELECT
-                            canonical_name,
-                            series_name,
-                            youtube_views,
-                            twitch_views,
-                            (COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0)) as total_views,
-                            total_episodes,
-                            total_playtime_minutes,
-                            completion_status,
-                            CASE
-                                WHEN total_episodes > 0 THEN
-                                    ROUND((COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / total_episodes, 1)
-                                ELSE 0
-                            END as views_per_episode,
-                            CASE
-                                WHEN total_playtime_minutes > 0 THEN
-                                    ROUND((COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / (total_playtime_minutes::numeric / 60), 1)
-                                ELSE 0
-                            END as views_per_hour
-                        FROM played_games
-                        WHERE LOWER(canonical_name) LIKE LOWER(%s)
-                        AND (youtube_views > 0 OR twitch_views > 0)
-                        AND total_episodes > 0
-                    """, (f'%{game_name}%',))
-                else:
-                    # Get top games by engagement rate
-                    cur.execute("""
-                        SELECT
-                            canonical_name,
-                            series_name,
-                            youtube_views,
-                            twitch_views,
-                            (COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0)) as total_views,
-                            total_episodes,
-                            total_playtime_minutes,
-                            completion_status,
-                            CASE
-                                WHEN total_episodes > 0 THEN
-                                    ROUND((COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / total_episodes, 1)
-                                ELSE 0
-                            END as views_per_episode,
-                            CASE
-                                WHEN total_playtime_minutes > 0 THEN
-                                    ROUND((COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / (total_playtime_minutes::numeric / 60), 1)
-                                ELSE 0
-                            END as views_per_hour
-                        FROM played_games
-                        WHERE (youtube_views > 0 OR twitch_views > 0)
-                        AND total_episodes > 0
-                        AND total_playtime_minutes > 0
-                        ORDER BY
-                            CASE
-                                WHEN total_playtime_minutes > 0 THEN
-                                    (COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::float / (total_playtime_minutes::numeric / 60)
-                                ELSE 0
-                            END DESC
-                        LIMIT %s
-                    """, (limit,))
-
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting engagement metrics: {e}")
+        rankings = self.get_rankings()
+        if rankings is None:
             return []
+        if game_name:
+            return rankings.search_engagement(game_name)
+        return rankings.top('engagement', 'DESC', limit)
 
     def _parse_comma_separated_list(self, text: Optional[str]) -> List[str]:
         """Convert JSON string, PostgreSQL array, or comma-separated string to list"""
@@ -948,8 +819,8 @@ class GamesDatabase:
             logger.error(f"Error getting played games: {e}")
             return []
 
-    def get_gaming_timeline(self, order: str = 'ASC') -> List[Dict[str, Any]]:
-        """Get the full history of played games ordered by date"""
+    def get_gaming_timeline(self, order: str = 'ASC', limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the history of played games ordered by date (optionally only the first `limit`)"""
         conn = self.get_connection()
         if not conn:
             return []
@@ -970,7 +841,8 @@ class GamesDatabase:
                     FROM played_games
                     WHERE first_played_date IS NOT NULL
                     ORDER BY first_played_date {order_clause}
-                """)
+                    {'LIMIT %s' if limit else ''}
+                """, (limit,) if limit else None)
                 results = cur.fetchall()
                 return [dict(row) for row in results]
         except Exception as e:
@@ -1034,14 +906,95 @@ class GamesDatabase:
 
                 query = f"UPDATE played_games SET {', '.join(updates)} WHERE id = %s"
                 cur.execute(query, values)
+                updated = cur.rowcount > 0
                 conn.commit()
+                self._rankings.invalidate()
 
-                return cur.rowcount > 0
+                if updated and ('canonical_name' in kwargs or 'alternative_names' in kwargs):
+                    self._refresh_name_index_entry(cur, game_id)
+
+                return updated
         except Exception as e:
             logger.error(f"Error updating played game {game_id}: {e}")
             conn.rollback()
             return False
 
+    # Counters refreshed in bulk from the YouTube and Twitch APIs, with the SQL type of each
+    BULK_STAT_COLUMNS = {
+        'total_episodes': 'integer',
+        'total_playtime_minutes': 'integer',
+        'youtube_views': 'integer',
+        'twitch_views': 'integer',
+        'twitch_vod_urls': 'text'
+    }
+
+    def bulk_update_game_stats(self, updates: List[Dict[str, Any]], page_size: int = 500) -> Optional[int]:
+        """
+        Write refreshed stats for many games with batched UPDATE ... FROM (VALUES ...) statements.
+
+        Args:
+            updates: Dicts with the game 'id' and any of BULK_STAT_COLUMNS
+            page_size: Rows per UPDATE statement
+
+        Returns:
+            Number of games updated (0 when no rows match), or None on error;
+            nothing is committed then
+        """
+        conn = self.get_connection()
+        if not conn:
+            return None
+        if not updates:
+            return 0
+
+        # One statement shape per column set
+        groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+        for update in updates:
+            columns = tuple(column for column in self.BULK_STAT_COLUMNS if column in update)
+            if not columns or update.get('id') is None:
+                continue
+            values = [json.dumps(update[column]) if column == 'twitch_vod_urls' and isinstance(update[column], list)
+                      else update[column] for column in columns]
+            groups.setdefault(columns, []).append((update['id'], *values))
+
+        try:
+            updated = 0
+            with conn.cursor() as cur:
+                for columns, rows in groups.items():
+                    assignments = ', '.join(f"{column} = v.{column}" for column in columns)
+                    template = '(%s::integer, ' + ', '.join(
+                        f"%s::{self.BULK_STAT_COLUMNS[column]}" for column in columns) + ')'
+                    returned = execute_values(cur, f"""
+                        UPDATE played_games AS g
+                        SET {assignments}, updated_at = CURRENT_TIMESTAMP
+                        FROM (VALUES %s) AS v(id, {', '.join(columns)})
+                        WHERE g.id = v.id
+                        RETURNING g.id
+                    """, rows, template=template, page_size=page_size, fetch=True)
+                    updated += len(returned)
+            conn.commit()
+            self._rankings.invalidate()
+            return updated
+        except Exception as e:
+            logger.error(f"Error bulk updating game stats: {e}")
+            conn.rollback()
+            return None
+
+    def _refresh_name_index_entry(self, cur, game_id: int):
+        """Re-read one game's names into the name index after a rename"""
+        if not self._name_index.is_loaded:
+            return
+        try:
+            cur.execute(
+                "SELECT id, canonical_name, alternative_names FROM played_games WHERE id = %s", (game_id,))
+            row = cur.fetchone()
+            if row and isinstance(row, dict):
+                self._name_index.upsert(dict(row))
+            else:
+                self._name_index.remove(game_id)
+        except Exception as e:
+            logger.warning(f"Could not refresh name index for game {game_id}, forcing rebuild: {e}")
+            self._name_index.invalidate()
+
     def remove_played_game(self, game_id: int) -> Optional[Dict[str, Any]]:
         """Remove a played game by ID"""
         conn = self.get_connection()
@@ -1059,6 +1012,8 @@ class GamesDatabase:
                     cur.execute(
                         "DELETE FROM played_games WHERE id = %s", (game_id,))
                     conn.commit()
+                    self._name_index.remove(game_id)
+                    self._rankings.invalidate()
                     game_dict = dict(game)
                     canonical_name = game_dict.get('canonical_name', 'Unknown')
                     logger.info(f"Removed played game: {canonical_name}")
@@ -1310,6 +1265,8 @@ class GamesDatabase:
                         continue
 
                 conn.commit()
+                self._name_index.invalidate()
+                self._rankings.invalidate()
                 logger.info(
                     f"Bulk imported/updated {imported_count} played games")
                 return imported_count
@@ -1552,6 +1509,8 @@ class GamesDatabase:
                         f"Merged {len(games_to_merge)} duplicates of '{canonical_name}' into master record (ID: {master_game['id']})")
 
                 conn.commit()
+                self._name_index.invalidate()
+                self._rankings.invalidate()
                 logger.info(
                     f"Deduplication complete: merged {merged_count} duplicate records")
                 return merged_count
@@ -1941,120 +1900,25 @@ class GamesDatabase:
 
     def get_series_by_total_playtime(self) -> List[Dict[str, Any]]:
         """Get game series ranked by total playtime"""
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        series_name,
-                        COUNT(*) as game_count,
-                        SUM(total_playtime_minutes) as total_playtime_minutes,
-                        SUM(total_episodes) as total_episodes,
-                        ROUND(AVG(total_playtime_minutes), 1) as avg_playtime_per_game
-                    FROM played_games
-                    WHERE series_name IS NOT NULL
-                    AND series_name != ''
-                    AND total_playtime_minutes > 0
-                    GROUP BY series_name
-                    ORDER BY SUM(total_playtime_minutes) DESC
-                    LIMIT 10
-                """)
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting series by playtime: {e}")
-            return []
+        rankings = self.get_rankings()
+        return rankings.series_by_playtime(limit=10) if rankings is not None else []
 
     def get_games_by_average_episode_length(self) -> List[Dict[str, Any]]:
         """Get games ranked by average minutes per episode"""
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        canonical_name,
-                        series_name,
-                        total_episodes,
-                        total_playtime_minutes,
-                        ROUND(total_playtime_minutes::numeric / NULLIF(total_episodes, 0), 1) as avg_minutes_per_episode,
-                        completion_status
-                    FROM played_games
-                    WHERE total_episodes > 0
-                    AND total_playtime_minutes > 0
-                    ORDER BY (total_playtime_minutes::numeric / NULLIF(total_episodes, 0)) DESC
-                    LIMIT 15
-                """)
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting games by average episode length: {e}")
-            return []
+        rankings = self.get_rankings()
+        return rankings.top('avg_episode_length', 'DESC', 15) if rankings is not None else []
 
     def get_longest_completion_games(self) -> List[Dict[str, Any]]:
         """Get games that took longest to complete (by episodes or time)"""
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        canonical_name,
-                        series_name,
-                        total_episodes,
-                        total_playtime_minutes,
-                        completion_status,
-                        genre
-                    FROM played_games
-                    WHERE completion_status = 'completed'
-                    AND (total_episodes > 0 OR total_playtime_minutes > 0)
-                    ORDER BY
-                        total_playtime_minutes DESC,
-                        total_episodes DESC
-                    LIMIT 10
-                """)
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting longest completion games: {e}")
-            return []
+        rankings = self.get_rankings()
+        return rankings.top('completed_length', 'DESC', 10) if rankings is not None else []
 
     def get_games_by_playtime(self, order: str = 'DESC', limit: int = 15) -> List[Dict[str, Any]]:
         """Get ALL games ranked by playtime (regardless of completion status)"""
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            # Validate order direction to prevent SQL injection
-            order_clause = self.db._validate_order_direction(order)
-
-            with conn.cursor() as cur:
-                cur.execute(f"""
-                    SELECT
-                        canonical_name,
-                        series_name,
-                        total_episodes,
-                        total_playtime_minutes,
-                        completion_status,
-                        genre
-                    FROM played_games
-                    WHERE total_playtime_minutes > 0
-                    ORDER BY total_playtime_minutes {order_clause}
-                    LIMIT %s
-                """, (limit,))
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting games by playtime: {e}")
+        rankings = self.get_rankings()
+        if rankings is None:
             return []
+        return rankings.top('playtime', self.db._validate_order_direction(order), limit)
 
     # --- Platform-Specific Helper Methods ---
 
@@ -2334,109 +2198,29 @@ class GamesDatabase:
     def get_games_by_episode_count(
             self, order: str = 'DESC', limit: int = 15) -> List[Dict[str, Any]]:
         """Get games ranked by episode count"""
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            # Validate order direction to prevent SQL injection
-            order_clause = self.db._validate_order_direction(order)
-
-            with conn.cursor() as cur:
-                cur.execute(f"""
-                        SELECT
-                            canonical_name,
-                            series_name,
-                            total_episodes,
-                            total_playtime_minutes,
-                            completion_status,
-                            genre
-                        FROM played_games
-                        WHERE total_episodes > 0
-                        ORDER BY total_episodes {order_clause}
-                        LIMIT %s
-                    """, (limit,))
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting games by episode count: {e}")
+        rankings = self.get_rankings()
+        if rankings is None:
             return []
+        return rankings.top('episodes', self.db._validate_order_direction(order), limit)
 
     def get_games_by_played_date(self, order: str = 'DESC', limit: int = 1) -> List[Dict[str, Any]]:
         """Get games ranked by the date they were first played."""
-        conn = self.get_connection()
-        if not conn:
-            return []
-        try:
-            # Validate order direction to prevent SQL injection
-            order_clause = self.db._validate_order_direction(order)
-
-            with conn.cursor() as cur:
-                cur.execute(f"""
-                        SELECT canonical_name, first_played_date FROM played_games
-                        WHERE first_played_date IS NOT NULL
-                        ORDER BY first_played_date {order_clause}
-                        LIMIT %s
-                    """, (limit,))
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting games by played date: {e}")
+        rankings = self.get_rankings()
+        if rankings is None:
             return []
+        return rankings.top('played_date', self.db._validate_order_direction(order), limit)
 
     def get_games_by_release_year(self, order: str = 'DESC', limit: int = 1) -> List[Dict[str, Any]]:
         """Get games ranked by their release year."""
-        conn = self.get_connection()
-        if not conn:
-            return []
-        try:
-            # Validate order direction to prevent SQL injection
-            order_clause = self.db._validate_order_direction(order)
-
-            with conn.cursor() as cur:
-                cur.execute(f"""
-                    SELECT canonical_name, release_year FROM played_games
-                    WHERE release_year IS NOT NULL AND release_year > 0
-                    ORDER BY release_year {order_clause}
-                    LIMIT %s
-                """, (limit,))
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting games by release year: {e}")
+        rankings = self.get_rankings()
+        if rankings is None:
             return []
+        return rankings.top('release_year', self.db._validate_order_direction(order), limit)
 
     def get_genre_statistics(self) -> List[Dict[str, Any]]:
         """Get comprehensive genre statistics"""
-        conn = self.get_connection()
-        if not conn:
-            return []
-
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        genre,
-                        COUNT(*) as game_count,
-                        SUM(total_episodes) as total_episodes,
-                        SUM(total_playtime_minutes) as total_playtime_minutes,
-                        ROUND(AVG(total_playtime_minutes), 1) as avg_playtime_per_game,
-                        COUNT(CASE WHEN completion_status = 'completed' THEN 1 END) as completed_count,
-                        ROUND(
-                            COUNT(CASE WHEN completion_status = 'completed' THEN 1 END)::float / COUNT(*) * 100,
-                            1
-                        ) as completion_rate
-                    FROM played_games
-                    WHERE genre IS NOT NULL
-                    AND genre != ''
-                    GROUP BY genre
-                    ORDER BY SUM(total_playtime_minutes) DESC
-                """)
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting genre statistics: {e}")
-            return []
+        rankings = self.get_rankings()
+        return rankings.genre_statistics() if rankings is not None else []
 
     def get_temporal_gaming_data(
             self, year: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -2557,79 +2341,36 @@ class GamesDatabase:
     def get_ranking_context(self, game_name: str,
                             metric: str = "playtime") -> Dict[str, Any]:
         """Get where a specific game ranks in various metrics"""
-        game = self.get_played_game(game_name)
-        if not game:
-            return {'error': 'Game not found'}
-
-        conn = self.get_connection()
-        if not conn:
+        rankings = self.get_rankings()
+        if rankings is None:
             return {'error': 'Database connection failed'}
 
-        try:
-            with conn.cursor() as cur:
-                context = {
-                    'game_name': game['canonical_name'],
-                    'rankings': {}
-                }
-
-                # Playtime ranking
-                if metric in ['playtime', 'all']:
-                    cur.execute("""
-                        SELECT COUNT(*) + 1 as rank
-                        FROM played_games
-                        WHERE total_playtime_minutes > %s
-                    """, (game.get('total_playtime_minutes', 0),))
-                    result = cur.fetchone()
-                    playtime_rank = int(
-                        result["rank"]) if result else 0  # type: ignore
-
-                    cur.execute(
-                        "SELECT COUNT(*) as total FROM played_games WHERE total_playtime_minutes > 0")
-                    total_result = cur.fetchone()
-                    total_with_playtime = int(
-                        total_result["total"]) if total_result else 0  # type: ignore
-
-                    context["rankings"]["playtime"] = {
-                        "rank": playtime_rank,
-                        "total": total_with_playtime,
-                        "percentile": (
-                            round((1 - (playtime_rank - 1) / max(total_with_playtime, 1)) * 100, 1)
-                            if total_with_playtime > 0
-                            else 0
-                        ),
-                    }
-
-                # Episode count ranking
-                if metric in ['episodes', 'all']:
-                    cur.execute("""
-                        SELECT COUNT(*) + 1 as rank
-                        FROM played_games
-                        WHERE total_episodes > %s
-                    """, (game.get('total_episodes', 0),))
-                    result = cur.fetchone()
-                    episode_rank = int(
-                        result["rank"]) if result else 0  # type: ignore
-
-                    cur.execute(
-                        "SELECT COUNT(*) as total FROM played_games WHERE total_episodes > 0")
-                    total_result = cur.fetchone()
-                    total_with_episodes = int(
-                        total_result["total"]) if total_result else 0  # type: ignore
-
-                    context["rankings"]["episodes"] = {
-                        "rank": episode_rank,
-                        "total": total_with_episodes,
-                        "percentile": (
-                            round((1 - (episode_rank - 1) / max(total_with_episodes, 1)) * 100, 1)
-                            if total_with_episodes > 0
-                            else 0
-                        ),
-                    }
+        # Exact names resolve in memory; anything else goes through get_played_game
+        game_id = rankings.game_id_for_name(game_name)
+        if game_id is None:
+            game = self.get_played_game(game_name)
+            if not game:
+                return {'error': 'Game not found'}
+            game_id = game['id']
+        game_row = rankings.game(game_id)
+        if not game_row:
+            return {'error': 'Game not found'}
 
-                return context
-        except Exception as e:
-            logger.error(f"Error getting ranking context: {e}")
-            return {'error': str(e)}
+        context: Dict[str, Any] = {
+            'game_name': game_row['canonical_name'],
+            'rankings': {}
+        }
+        for name in ('playtime', 'episodes'):
+            if metric not in [name, 'all']:
+                continue
+            position = rankings.rank(game_id, name) or {'rank': 0, 'total': 0}
+            rank, total = position['rank'], position['total']
+            context["rankings"][name] = {
+                "rank": rank,
+                "total": total,
+                "percentile": round((1 - (rank - 1) / max(total, 1)) * 100, 1) if total > 0 else 0,
+            }
+        return context
 
     def add_reminder(
         self,
@@ -3426,6 +3167,9 @@ class GamesDatabase:
             f"{counts['skipped']} skipped"
         )
 
+        # Advance the sync cursors held back for this session
+        self.commit_sync_cursors(sync_session_id)
+
         return counts
 
     def clear_staging_session(self, sync_session_id: str) -> bool:
@@ -3449,6 +3193,11 @@ class GamesDatabase:
                     (sync_session_id,)
                 )
                 deleted_count = cur.rowcount
+                # Cursors still held for the session were not approved; drop them
+                cur.execute(
+                    "DELETE FROM content_sync_cursors WHERE session_id = %s",
+                    (str(sync_session_id),)
+                )
                 conn.commit()
                 logger.info(f"Cleared {deleted_count} staged games for session {sync_session_id}")
                 return True
@@ -3457,6 +3206,124 @@ class GamesDatabase:
             conn.rollback()
             return False
 
+    def get_sync_cursors(self, source: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the committed content sync cursors for a source.
+
+        Args:
+            source: Cursor source (e.g. 'youtube_playlist', 'twitch_channel')
+
+        Returns:
+            Dict mapping cursor_key to cursor fields
+        """
+        conn = self.get_connection()
+        if not conn:
+            return {}
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT cursor_key, etag, last_item_id, last_published_at, item_count, payload
+                    FROM content_sync_cursors
+                    WHERE source = %s AND session_id = ''
+                """, (source,))
+                cursors = {}
+                for row in cur.fetchall():
+                    cursor = dict(row)
+                    cursors[cursor.pop('cursor_key')] = cursor
+                return cursors
+        except Exception as e:
+            logger.error(f"Error getting sync cursors for {source}: {e}")
+            conn.rollback()
+            return {}
+
+    def save_sync_cursors(self, source: str, cursors: Dict[str, Dict[str, Any]], session_id: str = '') -> int:
+        """
+        Upsert content sync cursors.
+
+        Args:
+            source: Cursor source
+            cursors: Dict mapping cursor_key to cursor fields
+            session_id: Sync session to hold the cursors for ('' to commit immediately)
+
+        Returns:
+            Number of cursors saved
+        """
+        if not cursors:
+            return 0
+
+        conn = self.get_connection()
+        if not conn:
+            return 0
+
+        try:
+            with conn.cursor() as cur:
+                cur.executemany("""
+                    INSERT INTO content_sync_cursors
+                        (source, cursor_key, session_id, etag, last_item_id, last_published_at, item_count, payload,
+                         updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                    ON CONFLICT (source, cursor_key, session_id)
+                    DO UPDATE SET
+                        etag = EXCLUDED.etag,
+                        last_item_id = EXCLUDED.last_item_id,
+                        last_published_at = EXCLUDED.last_published_at,
+                        item_count = EXCLUDED.item_count,
+                        payload = EXCLUDED.payload,
+                        updated_at = NOW()
+                """, [
+                    (source, key, session_id, cursor.get('etag'), cursor.get('last_item_id'),
+                     cursor.get('last_published_at'), cursor.get('item_count'), json.dumps(cursor.get('payload') or {}))
+                    for key, cursor in cursors.items()
+                ])
+                conn.commit()
+                return len(cursors)
+        except Exception as e:
+            logger.error(f"Error saving sync cursors for {source}: {e}")
+            conn.rollback()
+            return 0
+
+    def commit_sync_cursors(self, sync_session_id: str) -> int:
+        """
+        Promote cursors held for a sync session to committed cursors.
+
+        Args:
+            sync_session_id: UUID for the sync session
+
+        Returns:
+            Number of cursors committed
+        """
+        conn = self.get_connection()
+        if not conn:
+            return 0
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO content_sync_cursors
+                        (source, cursor_key, session_id, etag, last_item_id, last_published_at, item_count, payload,
+                         updated_at)
+                    SELECT source, cursor_key, '', etag, last_item_id, last_published_at, item_count, payload, NOW()
+                    FROM content_sync_cursors
+                    WHERE session_id = %s
+                    ON CONFLICT (source, cursor_key, session_id)
+                    DO UPDATE SET
+                        etag = EXCLUDED.etag,
+                        last_item_id = EXCLUDED.last_item_id,
+                        last_published_at = EXCLUDED.last_published_at,
+                        item_count = EXCLUDED.item_count,
+                        payload = EXCLUDED.payload,
+                        updated_at = NOW()
+                """, (str(sync_session_id),))
+                committed = cur.rowcount
+                cur.execute("DELETE FROM content_sync_cursors WHERE session_id = %s", (str(sync_session_id),))
+                conn.commit()
+                return committed
+        except Exception as e:
+            logger.error(f"Error committing sync cursors for session {sync_session_id}: {e}")
+            conn.rollback()
+            return 0
+
     def get_staging_session_summary(self, sync_session_id: str) -> Dict[str, Any]:
         """
         Get summary statistics for a staging session.
@@ -3525,6 +3392,93 @@ class GamesDatabase:
             logger.error(f"Error getting IGDB excluded games: {e}")
             return []
 
+    def load_igdb_cache_entries(self, limit: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Load unexpired IGDB cache entries, newest first, purging expired rows.
+
+        Args:
+            limit: Maximum number of entries to load
+
+        Returns:
+            List of dicts with cache_key, query_name, enrichment, match_found,
+            cached_at and expires_at
+        """
+        conn = self.get_connection()
+        if not conn:
+            return []
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM igdb_cache WHERE expires_at <= NOW()")
+                cur.execute("""
+                    SELECT cache_key, query_name, enrichment, match_found, cached_at, expires_at
+                    FROM igdb_cache
+                    ORDER BY cached_at DESC
+                    LIMIT %s
+                """, (limit,))
+                results = cur.fetchall()
+                conn.commit()
+
+                entries = []
+                for row in results:
+                    entry = dict(row)
+                    if isinstance(entry['enrichment'], str):
+                        entry['enrichment'] = json.loads(entry['enrichment'])
+                    entries.append(entry)
+                return entries
+        except Exception as e:
+            logger.error(f"Error loading IGDB cache: {e}")
+            conn.rollback()
+            return []
+
+    def save_igdb_cache_entries(self, entries: List[Dict[str, Any]], max_rows: int = 5000) -> int:
+        """
+        Upsert IGDB cache entries and trim the table to the newest max_rows.
+
+        Args:
+            entries: Dicts with cache_key, query_name, enrichment, match_found,
+                     cached_at and expires_at
+            max_rows: Size bound for the table
+
+        Returns:
+            Number of entries written
+        """
+        if not entries:
+            return 0
+
+        conn = self.get_connection()
+        if not conn:
+            return 0
+
+        try:
+            with conn.cursor() as cur:
+                cur.executemany("""
+                    INSERT INTO igdb_cache (cache_key, query_name, enrichment, match_found, cached_at, expires_at)
+                    VALUES (%(cache_key)s, %(query_name)s, %(enrichment)s, %(match_found)s,
+                            %(cached_at)s, %(expires_at)s)
+                    ON CONFLICT (cache_key)
+                    DO UPDATE SET
+                        query_name = EXCLUDED.query_name,
+                        enrichment = EXCLUDED.enrichment,
+                        match_found = EXCLUDED.match_found,
+                        cached_at = EXCLUDED.cached_at,
+                        expires_at = EXCLUDED.expires_at
+                """, [dict(entry, enrichment=json.dumps(entry['enrichment'])) for entry in entries])
+                cur.execute("""
+                    DELETE FROM igdb_cache
+                    WHERE cache_key IN (
+                        SELECT cache_key FROM igdb_cache
+                        ORDER BY cached_at DESC
+                        OFFSET %s
+                    )
+                """, (max_rows,))
+                conn.commit()
+                return len(entries)
+        except Exception as e:
+            logger.error(f"Error saving IGDB cache entries: {e}")
+            conn.rollback()
+            return 0
+
     def is_igdb_excluded(self, game_name: str) -> bool:
         """
         Check if a game is excluded from IGDB enrichment.
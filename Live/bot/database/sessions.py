@@ -13,6 +13,8 @@ from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
+from .core import scoped_connections
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +34,7 @@ def _serialize_for_json(data: Any) -> Any:
         return data
 
 
+@scoped_connections
 class SessionDatabase:
     """
     Handles approval sessions and game review workflows.
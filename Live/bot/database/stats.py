@@ -7,6 +7,7 @@ This module handles:
 - Ranking context for games
 - AI usage tracking and quota management
 - AI alert logging
+- Persistent AI response cache tier
 """
 
 import json
@@ -15,9 +16,12 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
+from .core import scoped_connections
+
 logger = logging.getLogger(__name__)
 
 
+@scoped_connections
 class StatsDatabase:
     """
     Handles analytics, statistics, and AI usage tracking.
@@ -47,76 +51,7 @@ class StatsDatabase:
         Returns:
             Dict with youtube, twitch, and cross_platform stats
         """
-        conn = self.db.get_connection()
-        if not conn:
-            return {}
-
-        try:
-            with conn.cursor() as cur:
-                # YouTube statistics
-                cur.execute("""
-                    SELECT
-                        COUNT(*) as game_count,
-                        SUM(youtube_views) as total_views,
-                        AVG(youtube_views) as avg_views_per_game,
-                        SUM(total_episodes) as total_episodes
-                    FROM played_games
-                    WHERE youtube_playlist_url IS NOT NULL
-                    AND youtube_playlist_url != ''
-                    AND youtube_views > 0
-                """)
-                youtube_stats = cur.fetchone()
-
-                # Twitch statistics
-                cur.execute("""
-                    SELECT
-                        COUNT(*) as game_count,
-                        SUM(twitch_views) as total_views,
-                        AVG(twitch_views) as avg_views_per_game,
-                        SUM(total_episodes) as total_vods
-                    FROM played_games
-                    WHERE twitch_vod_urls IS NOT NULL
-                    AND twitch_vod_urls != ''
-                    AND twitch_vod_urls != '{}'
-                    AND twitch_views > 0
-                """)
-                twitch_stats = cur.fetchone()
-
-                # Cross-platform games
-                cur.execute("""
-                    SELECT COUNT(*) as cross_platform_count
-                    FROM played_games
-                    WHERE youtube_views > 0
-                    AND twitch_views > 0
-                """)
-                cross_platform = cur.fetchone()
-
-                # Safe dictionary access with proper null handling
-                youtube_dict = dict(youtube_stats) if youtube_stats else {}
-                twitch_dict = dict(twitch_stats) if twitch_stats else {}
-                cross_platform_dict = dict(cross_platform) if cross_platform else {}
-
-                return {
-                    'youtube': {
-                        'game_count': int(youtube_dict.get('game_count') or 0),
-                        'total_views': int(youtube_dict.get('total_views') or 0),
-                        'avg_views_per_game': round(float(youtube_dict.get('avg_views_per_game') or 0), 1),
-                        'total_content': int(youtube_dict.get('total_episodes') or 0)
-                    },
-                    'twitch': {
-                        'game_count': int(twitch_dict.get('game_count') or 0),
-                        'total_views': int(twitch_dict.get('total_views') or 0),
-                        'avg_views_per_game': round(float(twitch_dict.get('avg_views_per_game') or 0), 1),
-                        'total_content': int(twitch_dict.get('total_vods') or 0)
-                    },
-                    'cross_platform_count': int(cross_platform_dict.get('cross_platform_count') or 0)
-                }
-        except Exception as e:
-            logger.error(f"Error getting platform comparison stats: {e}")
-            return {}
-        finally:
-            if conn:
-                conn.close()
+        return self.db.games.get_platform_comparison_stats()
 
     def get_engagement_metrics(self, game_name: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -129,84 +64,7 @@ class StatsDatabase:
         Returns:
             List of game engagement metric dicts
         """
-        conn = self.db.get_connection()
-        if not conn:
-            return []
-
-        try:
-            with conn.cursor() as cur:
-                if game_name:
-                    # Get metrics for specific game
-                    # ✅ FIX #3: Cast to ::numeric instead of ::float for ROUND() compatibility
-                    cur.execute("""
-                        SELECT
-                            canonical_name,
-                            series_name,
-                            youtube_views,
-                            twitch_views,
-                            (COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0)) as total_views,
-                            total_episodes,
-                            total_playtime_minutes,
-                            completion_status,
-                            CASE
-                                WHEN total_episodes > 0 THEN
-                                    ROUND((COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / total_episodes, 1)
-                                ELSE 0
-                            END as views_per_episode,
-                            CASE
-                                WHEN total_playtime_minutes > 0 THEN
-                                    ROUND((COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / (total_playtime_minutes::numeric / 60), 1)
-                                ELSE 0
-                            END as views_per_hour
-                        FROM played_games
-                        WHERE LOWER(canonical_name) LIKE LOWER(%s)
-                        AND (youtube_views > 0 OR twitch_views > 0)
-                        AND total_episodes > 0
-                    """, (f'%{game_name}%',))
-                else:
-                    # Get top games by engagement rate
-                    # ✅ FIX #3: Cast to ::numeric instead of ::float for ROUND() compatibility
-                    cur.execute("""
-                        SELECT
-                            canonical_name,
-                            series_name,
-                            youtube_views,
-                            twitch_views,
-                            (COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0)) as total_views,
-                            total_episodes,
-                            total_playtime_minutes,
-                            completion_status,
-                            CASE
-                                WHEN total_episodes > 0 THEN
-                                    ROUND((COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / total_episodes, 1)
-                                ELSE 0
-                            END as views_per_episode,
-                            CASE
-                                WHEN total_playtime_minutes > 0 THEN
-                                    ROUND((COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / (total_playtime_minutes::numeric / 60), 1)
-                                ELSE 0
-                            END as views_per_hour
-                        FROM played_games
-                        WHERE (youtube_views > 0 OR twitch_views > 0)
-                        AND total_episodes > 0
-                        AND total_playtime_minutes > 0
-                        ORDER BY
-                            CASE
-                                WHEN total_playtime_minutes > 0 THEN
-                                    (COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))::numeric / (total_playtime_minutes::numeric / 60)
-                                ELSE 0
-                            END DESC
-                        LIMIT %s
-                    """, (limit,))
-
-                results = cur.fetchall()
-                return [dict(row) for row in results]
-        except Exception as e:
-            logger.error(f"Error getting engagement metrics: {e}")
-            return []
-        finally:
-            if conn:
-                conn.close()
+        return self.db.games.get_engagement_metrics(game_name, limit)
 
     def get_ranking_context(
         self,
@@ -223,65 +81,29 @@ class StatsDatabase:
         Returns:
             Dict with rank, total games, and percentile info
         """
-        conn = self.db.get_connection()
-        if not conn:
+        # Validate metric (the precomputed rankings use their own names)
+        metric_names = {'total_views': 'total_views', 'youtube_views': 'youtube_views',
+                        'twitch_views': 'twitch_views', 'total_playtime_minutes': 'playtime',
+                        'total_episodes': 'episodes'}
+        if metric not in metric_names:
+            metric = 'total_views'
+
+        rankings = self.db.games.get_rankings()
+        if rankings is None:
             return {}
-
-        try:
-            with conn.cursor() as cur:
-                # Validate metric to prevent SQL injection
-                allowed_metrics = ['total_views', 'youtube_views', 'twitch_views',
-                                   'total_playtime_minutes', 'total_episodes']
-                if metric not in allowed_metrics:
-                    metric = 'total_views'
-
-                # Get the game's value for the metric
-                if metric == 'total_views':
-                    metric_query = "(COALESCE(youtube_views, 0) + COALESCE(twitch_views, 0))"
-                else:
-                    metric_query = metric
-
-                query = f"""
-                    WITH ranked_games AS (
-                        SELECT
-                            canonical_name,
-                            {metric_query} as metric_value,
-                            ROW_NUMBER() OVER (ORDER BY {metric_query} DESC) as rank
-                        FROM played_games
-                        WHERE {metric_query} > 0
-                    )
-                    SELECT
-                        rank,
-                        metric_value,
-                        (SELECT COUNT(*) FROM ranked_games) as total_games
-                    FROM ranked_games
-                    WHERE LOWER(canonical_name) = LOWER(%s)
-                """
-
-                cur.execute(query, (game_name,))
-                result = cur.fetchone()
-
-                if result:
-                    rank_dict = dict(result)
-                    rank = int(rank_dict.get('rank', 0))
-                    total = int(rank_dict.get('total_games', 0))
-                    percentile = round((1 - (rank / total)) * 100, 1) if total > 0 else 0
-
-                    return {
-                        'rank': rank,
-                        'total_games': total,
-                        'percentile': percentile,
-                        'metric': metric,
-                        'metric_value': rank_dict.get('metric_value')
-                    }
-                return {}
-
-        except Exception as e:
-            logger.error(f"Error getting ranking context for {game_name}: {e}")
+        game_id = rankings.game_id_for_name(game_name)
+        position = rankings.rank(game_id, metric_names[metric]) if game_id is not None else None
+        if not position or not position['ranked']:
             return {}
-        finally:
-            if conn:
-                conn.close()
+
+        rank, total = position['rank'], position['total']
+        return {
+            'rank': rank,
+            'total_games': total,
+            'percentile': round((1 - (rank / total)) * 100, 1) if total > 0 else 0,
+            'metric': metric,
+            'metric_value': position['value']
+        }
 
     # --- AI Usage Tracking ---
 
@@ -634,3 +456,93 @@ class StatsDatabase:
         finally:
             if conn:
                 conn.close()
+
+    # --- Persistent AI Response Cache ---
+
+    def load_ai_cache_entries(self, limit: int = 2000) -> List[Dict[str, Any]]:
+        """
+        Load unexpired persisted AI cache entries, newest first.
+
+        Expired rows are deleted in the same transaction so the table is
+        evicted by the same TTLs as the in-memory cache.
+
+        Args:
+            limit: Maximum number of entries to load
+
+        Returns:
+            List of cache entry dicts
+        """
+        conn = self.db.get_connection()
+        if not conn:
+            return []
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM ai_response_cache WHERE expires_at <= CURRENT_TIMESTAMP")
+                purged = cur.rowcount
+                cur.execute("""
+                    SELECT cache_key, original_query, response, user_id, channel_id,
+                           is_dm, query_type, created_at, expires_at
+                    FROM ai_response_cache
+                    WHERE expires_at > CURRENT_TIMESTAMP
+                    ORDER BY created_at DESC
+                    LIMIT %s
+                """, (limit,))
+                results = cur.fetchall()
+                conn.commit()
+                if purged:
+                    logger.info(f"Purged {purged} expired persistent AI cache entries")
+                return [dict(row) for row in results]
+
+        except Exception as e:
+            logger.error(f"Error loading persistent AI cache: {e}")
+            conn.rollback()
+            return []
+        finally:
+            if conn:
+                conn.close()
+
+    def save_ai_cache_entries(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Upsert AI cache entries into the persistent tier.
+
+        Args:
+            entries: Dicts with cache_key, original_query, response, user_id,
+                     channel_id, is_dm, query_type, created_at and expires_at
+
+        Returns:
+            Number of entries written
+        """
+        if not entries:
+            return 0
+
+        conn = self.db.get_connection()
+        if not conn:
+            return 0
+
+        try:
+            with conn.cursor() as cur:
+                cur.executemany("""
+                    INSERT INTO ai_response_cache (
+                        cache_key, original_query, response, user_id, channel_id,
+                        is_dm, query_type, created_at, expires_at
+                    ) VALUES (%(cache_key)s, %(original_query)s, %(response)s, %(user_id)s, %(channel_id)s,
+                              %(is_dm)s, %(query_type)s, %(created_at)s, %(expires_at)s)
+                    ON CONFLICT (cache_key)
+                    DO UPDATE SET
+                        original_query = EXCLUDED.original_query,
+                        response = EXCLUDED.response,
+                        query_type = EXCLUDED.query_type,
+                        created_at = EXCLUDED.created_at,
+                        expires_at = EXCLUDED.expires_at
+                """, entries)
+                conn.commit()
+                return len(entries)
+
+        except Exception as e:
+            logger.error(f"Error saving persistent AI cache entries: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            if conn:
+                conn.close()
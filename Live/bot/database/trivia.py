@@ -9,7 +9,10 @@ from zoneinfo import ZoneInfo
 
 from psycopg2.extras import RealDictRow
 
-from ..utils.text_processing import calculate_concept_similarity, extract_question_concepts, normalize_trivia_answer
+from .core import scoped_connections
+from .trivia_answers import TriviaAnswerBuffer
+from .trivia_index import TriviaDuplicateIndex
+from .trivia_registry import TriviaSessionRegistry
 
 """
 Database Trivia Module - Trivia System
@@ -37,6 +40,7 @@ from psycopg2.extras import RealDictRow
 logger = logging.getLogger(__name__)
 
 
+@scoped_connections
 class TriviaDatabase:
     """
     Handles all trivia-related database operations.
@@ -53,6 +57,9 @@ class TriviaDatabase:
             db_manager: DatabaseManager instance for connection access
         """
         self.db = db_manager
+        self._duplicate_index = TriviaDuplicateIndex(self._normalize_question_text)
+        self.session_registry = TriviaSessionRegistry()
+        self.answer_buffer = TriviaAnswerBuffer(self._insert_trivia_answers)
 
     def get_connection(self):
         """Get database connection from the database manager"""
@@ -277,6 +284,14 @@ class TriviaDatabase:
                 )
                 result = cur.fetchone()
 
+                session_row = None
+                if result:
+                    cur.execute(
+                        f"{self._ACTIVE_SESSION_SELECT} WHERE ts.id = %s",
+                        (result["id"],),  # type: ignore
+                    )
+                    session_row = cur.fetchone()
+
                 # Update question usage AND mark as answered immediately
                 # This prevents question reuse even if session processing fails later
                 cur.execute(
@@ -296,6 +311,8 @@ class TriviaDatabase:
 
                 if result:
                     session_id = int(result["id"])  # type: ignore
+                    if session_row:
+                        self.session_registry.activate(dict(session_row))
                     logger.info(
                         f"Created trivia session ID {session_id} for question {question_id}")
                     return session_id
@@ -307,40 +324,57 @@ class TriviaDatabase:
         finally:
             conn.close()
 
-    def get_active_trivia_session(self) -> Optional[Dict[str, Any]]:
+    _ACTIVE_SESSION_SELECT = """
+        SELECT ts.*, tq.question_text, tq.question_type, tq.correct_answer,
+               tq.multiple_choice_options, tq.is_dynamic, tq.dynamic_query_type,
+               tq.submitted_by_user_id, tq.category
+        FROM trivia_sessions ts
+        JOIN trivia_questions tq ON ts.question_id = tq.id
+    """
+
+    def load_session_registry(self) -> int:
         """
-        Get the current active trivia session
+        Load all active trivia sessions into the in-process session registry.
 
-        ✅ FIX #6: Optimized with caching for frequent access during reply detection
+        Called at startup; afterwards the registry is kept current by the
+        session lifecycle methods and get_active_trivia_session never queries.
 
-        Performance notes:
-        - Called on EVERY message during reply detection
-        - Cached result to avoid repeated database queries
-        - Cache invalidated when session starts/ends
+        Returns:
+            Number of active sessions loaded, or -1 if the database was unavailable
         """
         conn = self.get_connection()
         if not conn:
-            return None
+            return -1
 
         try:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT ts.*, tq.question_text, tq.question_type, tq.correct_answer,
-                           tq.multiple_choice_options, tq.is_dynamic, tq.dynamic_query_type,
-                           tq.submitted_by_user_id, tq.category
-                    FROM trivia_sessions ts
-                    JOIN trivia_questions tq ON ts.question_id = tq.id
-                    WHERE ts.status = 'active'
-                    ORDER BY ts.started_at DESC
-                    LIMIT 1
-                """
-                )
-                result = cur.fetchone()
-                return dict(result) if result else None
+                cur.execute(f"{self._ACTIVE_SESSION_SELECT} WHERE ts.status = 'active'")
+                sessions = [dict(row) for row in cur.fetchall()]
+                self.session_registry.load(sessions)
+                logger.info(f"Loaded {len(sessions)} active trivia session(s) into the session registry")
+                return len(sessions)
         except Exception as e:
-            logger.error(f"Error getting active trivia session: {e}")
+            logger.error(f"Error loading trivia session registry: {e}")
+            return -1
+
+    def get_active_trivia_session(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the current active trivia session
+
+        Performance notes:
+        - Called on EVERY message during reply detection
+        - Served from the in-process session registry (no query once loaded)
+        - Registry updated when sessions are created, get messages, complete or expire
+        """
+        if not self.session_registry.loaded and self.load_session_registry() < 0:
+            return None
+        return self.session_registry.active()
+
+    def get_active_trivia_session_for_message(self, message_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Get the active session whose question or confirmation message has this ID (no query once loaded)"""
+        if not self.session_registry.loaded and self.load_session_registry() < 0:
             return None
+        return self.session_registry.session_for_message(message_id)
 
     def get_trivia_session_by_message_id(self, message_id: int) -> Optional[Dict[str, Any]]:
         """Get trivia session by question or confirmation message ID"""
@@ -433,6 +467,8 @@ class TriviaDatabase:
                 success = cur.rowcount > 0
 
                 if success:
+                    self.session_registry.set_messages(
+                        session_id, question_message_id, confirmation_message_id, channel_id)
                     logger.info(
                         f"Updated trivia session {session_id} with message tracking: Q:{question_message_id}, C:{confirmation_message_id}, Ch:{channel_id}")
                 else:
@@ -444,86 +480,152 @@ class TriviaDatabase:
             conn.rollback()
             return False
 
-    def submit_trivia_answer(
-            self,
-            session_id: int,
-            user_id: int,
-            answer_text: str,
-            normalized_answer: Optional[str] = None) -> Dict[str, Any]:
+    def prime_trivia_answers(self, session_id: int) -> bool:
         """
-        Submit an answer to a trivia session
+        Load a session's question submitter and existing answerers into the answer buffer.
 
-        ✅ FIX #6: Optimized for concurrent answer submissions
-        ✅ FIX #7: Returns Dict format for proper error handling and duplicate detection
-
-        Performance notes:
-        - Uses simple INSERT for fast write performance
-        - Conflict detection done via single query
-        - Duplicate detection prevents multiple submissions
-        - Minimal transaction scope for high concurrency
+        One query per session per process; after that duplicate and conflict
+        checks for the session are answered from memory.
 
         Returns:
-            Dict with 'success' (bool), 'answer_id' (int), or 'error' (str)
+            True if the session exists and the buffer is primed
         """
         conn = self.get_connection()
         if not conn:
-            return {'success': False, 'error': 'no_connection'}
+            return False
 
         try:
             with conn.cursor() as cur:
-                # Check for duplicate submission
                 cur.execute(
                     """
-                    SELECT id FROM trivia_answers
-                    WHERE session_id = %s AND user_id = %s
-                    LIMIT 1
+                    SELECT ts.question_submitter_id,
+                           COALESCE(ARRAY_AGG(ta.user_id) FILTER (WHERE ta.user_id IS NOT NULL), '{}') AS user_ids
+                    FROM trivia_sessions ts
+                    LEFT JOIN trivia_answers ta ON ta.session_id = ts.id
+                    WHERE ts.id = %s
+                    GROUP BY ts.question_submitter_id
                 """,
-                    (session_id, user_id),
+                    (session_id,),
                 )
+                result = cur.fetchone()
+                if not result:
+                    logger.warning(f"Cannot accept answers for unknown trivia session {session_id}")
+                    return False
 
-                existing = cur.fetchone()
-                if existing:
-                    logger.info(f"Duplicate answer submission detected for user {user_id} in session {session_id}")
-                    return {'success': False, 'error': 'duplicate'}
+                self.answer_buffer.prime(
+                    session_id, result["question_submitter_id"], result["user_ids"])  # type: ignore
+                return True
+        except Exception as e:
+            logger.error(f"Error priming trivia answers for session {session_id}: {e}")
+            conn.rollback()
+            return False
 
-                # Check for conflict (mod answering their own question)
-                cur.execute(
-                    """
-                    SELECT question_submitter_id FROM trivia_sessions WHERE id = %s
-                """,
-                    (session_id,),
-                )
-                session_result = cur.fetchone()
+    def queue_trivia_answer(
+            self,
+            session_id: int,
+            user_id: int,
+            answer_text: str,
+            normalized_answer: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Accept an answer into the answer buffer without touching the database.
+
+        The row is written by the next flush_trivia_answers call.
+
+        Returns:
+            Dict with 'success' (bool) and 'queued' or 'error', or None if the
+            session has not been primed yet (see prime_trivia_answers)
+        """
+        row = self.answer_buffer.offer(session_id, user_id, answer_text, normalized_answer)
+        if row is None:
+            return None
+        if row.get('duplicate'):
+            logger.info(f"Duplicate answer submission detected for user {user_id} in session {session_id}")
+            return {'success': False, 'error': 'duplicate'}
+        return {'success': True, 'queued': True}
 
-                conflict_detected = False
-                if session_result and cast(RealDictRow, session_result)[
-                        "question_submitter_id"] == user_id:
-                    conflict_detected = True
+    def flush_trivia_answers(self) -> int:
+        """
+        Write all buffered answers with a single multi-row INSERT.
 
+        Returns:
+            Number of answers inserted, or -1 if the write failed (answers stay
+            queued; see TriviaAnswerBuffer for how repeated failures are handled)
+        """
+        inserted = self.answer_buffer.flush()
+        return -1 if inserted is None else len(inserted)
+
+    def _insert_trivia_answers(self, rows: List[Dict[str, Any]]) -> Optional[Dict[Tuple[int, int], int]]:
+        """Answer buffer writer: insert a batch, skipping (session_id, user_id) pairs already stored"""
+        conn = self.get_connection()
+        if not conn:
+            return None
+
+        try:
+            with conn.cursor() as cur:
+                placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(rows))
+                params: List[Any] = []
+                for row in rows:
+                    params.extend((row['session_id'], row['user_id'], row['answer_text'],
+                                   row['normalized_answer'], row['conflict_detected'], row['submitted_at']))
                 cur.execute(
-                    """
+                    f"""
                     INSERT INTO trivia_answers (
                         session_id, user_id, answer_text, normalized_answer,
                         conflict_detected, submitted_at
-                    ) VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-                    RETURNING id
+                    ) VALUES {placeholders}
+                    ON CONFLICT (session_id, user_id) DO NOTHING
+                    RETURNING id, session_id, user_id
                 """,
-                    (session_id, user_id, answer_text, normalized_answer, conflict_detected),
+                    params,
                 )
-                result = cur.fetchone()
+                inserted = {(r["session_id"], r["user_id"]): int(r["id"]) for r in cur.fetchall()}  # type: ignore
                 conn.commit()
 
-                if result:
-                    answer_id = int(result["id"])  # type: ignore
-                    logger.info(
-                        f"Submitted trivia answer ID {answer_id} for session {session_id}")
-                    return {'success': True, 'answer_id': answer_id}
-                return {'success': False, 'error': 'insert_failed'}
+                logger.info(f"Inserted {len(inserted)}/{len(rows)} buffered trivia answers")
+                return inserted
         except Exception as e:
-            logger.error(f"Error submitting trivia answer: {e}")
+            logger.error(f"Error inserting trivia answers: {e}")
             conn.rollback()
+            return None
+
+    def submit_trivia_answer(
+            self,
+            session_id: int,
+            user_id: int,
+            answer_text: str,
+            normalized_answer: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Submit an answer to a trivia session and write it immediately
+
+        ✅ FIX #7: Returns Dict format for proper error handling and duplicate detection
+
+        Goes through the same answer buffer as queue_trivia_answer, so duplicate
+        and conflict checks are in memory once the session is primed; the
+        flush also writes any answers other callers have queued. The bot's
+        message handlers use the buffered path (AsyncDatabase.queue_trivia_answer).
+
+        Returns:
+            Dict with 'success' (bool), 'answer_id' (int), or 'error' (str)
+        """
+        result = self.queue_trivia_answer(session_id, user_id, answer_text, normalized_answer)
+        if result is None:
+            if not self.prime_trivia_answers(session_id):
+                return {'success': False, 'error': 'no_connection'}
+            result = self.queue_trivia_answer(session_id, user_id, answer_text, normalized_answer)
+        if not result or not result.get('success'):
+            return result or {'success': False, 'error': 'no_connection'}
+
+        inserted = self.answer_buffer.flush()
+        if inserted is None:
             return {'success': False, 'error': 'database_error'}
 
+        answer_id = inserted.get((session_id, user_id))
+        if answer_id is None:
+            # Already stored by another process; the unique index kept it to one row
+            return {'success': False, 'error': 'duplicate'}
+        logger.info(f"Submitted trivia answer ID {answer_id} for session {session_id}")
+        return {'success': True, 'answer_id': answer_id}
+
     def complete_trivia_session(
         self,
         session_id: int,
@@ -540,6 +642,11 @@ class TriviaDatabase:
         - Proper rollback on failure
         - Enhanced error logging
         """
+        # Buffered answers must be in trivia_answers before they are evaluated
+        if self.flush_trivia_answers() < 0:
+            logger.error(f"❌ Could not write buffered answers before completing session {session_id}")
+            return False
+
         conn = self.get_connection()
         if not conn:
             logger.error("❌ FIX #5: No database connection for complete_trivia_session")
@@ -596,22 +703,17 @@ class TriviaDatabase:
                         close_answer_ids = []
                         first_correct_answer = None
 
-                        # Process each answer
-                        for answer_row in all_answers:
-                            answer_dict = dict(answer_row)
+                        # Score every non-conflict answer in one pass (in submission order)
+                        from ..handlers.trivia.evaluator import evaluate_answers
+                        scored_answers = [dict(row) for row in all_answers if not row['conflict_detected']]
+                        scores = evaluate_answers(
+                            [answer['answer_text'].strip() for answer in scored_answers],
+                            correct_answer, question_type, multiple_choice_options
+                        )
+
+                        for answer_dict, (score, match_type) in zip(scored_answers, scores):
                             answer_id = answer_dict['id']
                             user_id = answer_dict['user_id']
-                            original_answer = answer_dict['answer_text'].strip()
-                            is_conflict = answer_dict['conflict_detected']
-
-                            if is_conflict:
-                                continue
-
-                            # Evaluate answer
-                            from ..handlers.trivia.evaluator import evaluate_answer
-                            score, match_type = evaluate_answer(
-                                original_answer, correct_answer, question_type, multiple_choice_options
-                            )
 
                             is_correct = score >= 1.0
                             is_close = 0.7 <= score < 1.0
@@ -723,6 +825,8 @@ class TriviaDatabase:
                         # ✅ FIX #5: Release savepoint and commit entire transaction atomically
                         cur.execute("RELEASE SAVEPOINT trivia_completion")
                         conn.commit()
+                        self.session_registry.end(session_id)
+                        self.answer_buffer.forget(session_id)
 
                         logger.info(
                             f"✅ FIX #5: Session {session_id} completed successfully - {correct_count}/{total_participants} correct")
@@ -752,6 +856,7 @@ class TriviaDatabase:
     def get_trivia_session_answers(
             self, session_id: int) -> List[Dict[str, Any]]:
         """Get all answers for a trivia session"""
+        self.flush_trivia_answers()
         conn = self.get_connection()
         if not conn:
             return []
@@ -1118,16 +1223,55 @@ class TriviaDatabase:
         - If question_answer provided, checks for same answer in retired/recent questions
         - Blocks questions with same answer as retired questions (0.3 threshold)
         - Warns about questions with same answer as recently answered questions (0.5 threshold)
+
+        Comparisons run against TriviaDuplicateIndex, which caches per-question
+        features and prefilters candidates; use check_question_duplicates_batch
+        to check several candidates with a single pool fetch.
+        """
+        if not self._sync_duplicate_index():
+            return None
+        try:
+            return self._duplicate_index.find_duplicate(question_text, similarity_threshold, question_answer)
+        except Exception as e:
+            logger.error(f"Error checking for duplicate questions: {e}")
+            return None
+
+    def check_question_duplicates_batch(self, questions: List[Tuple[str, Optional[str]]],
+                                        similarity_threshold: float = 0.8,
+                                        within_batch: bool = True) -> List[Optional[Dict[str, Any]]]:
         """
+        Check several candidate questions for duplicates in one pass.
+
+        Args:
+            questions: (question_text, question_answer) tuples; answer may be None
+            similarity_threshold: Minimum text or concept similarity
+            within_batch: Also flag candidates duplicating an earlier candidate in
+                          the batch (reported with duplicate_id None and batch_index)
+
+        Returns:
+            One duplicate info dict (or None) per candidate, in input order
+        """
+        if not questions:
+            return []
+        if not self._sync_duplicate_index():
+            return [None] * len(questions)
+        try:
+            return self._duplicate_index.find_duplicates(questions, similarity_threshold, within_batch)
+        except Exception as e:
+            logger.error(f"Error checking for duplicate questions: {e}")
+            return [None] * len(questions)
+
+    def _sync_duplicate_index(self) -> bool:
+        """Refresh the duplicate index from the active question pool. Returns False if empty or unavailable."""
         conn = self.get_connection()
         if not conn:
-            return None
+            return False
 
         try:
             with conn.cursor() as cur:
                 # ✅ FIX #2: Get ALL questions including retired ones
                 cur.execute("""
-                    SELECT id, question_text, status, created_at, correct_answer
+                    SELECT id, question_text, status, created_at, correct_answer, last_used_at
                     FROM trivia_questions
                     WHERE is_active = TRUE
                     ORDER BY
@@ -1136,116 +1280,12 @@ class TriviaDatabase:
                 """)
                 existing_questions = cur.fetchall()
 
-                if not existing_questions:
-                    return None
-
-                # ✅ FIX #3: PHASE 1 - Check for answer-based duplicates FIRST (strictest filter)
-                if question_answer:
-                    normalized_new_answer = normalize_trivia_answer(question_answer).lower()
-
-                    for existing in existing_questions:
-                        existing_dict = dict(existing)
-                        existing_answer = existing_dict.get('correct_answer')
-                        existing_status = existing_dict.get('status', '')
-
-                        if not existing_answer:
-                            continue
-
-                        normalized_existing_answer = normalize_trivia_answer(existing_answer).lower()
-
-                        # Check if answers match
-                        if normalized_new_answer == normalized_existing_answer:
-                            # ✅ FIX: Skip retired questions for answer-based duplicate check.
-                            # Retired questions have been used and are done - their answers should be
-                            # recyclable. The Trivia Director generates questions based on real DB answers,
-                            # so blocking by answer of a retired question starves the question pool.
-                            if existing_status == 'retired':
-                                continue  # Don't block new generation due to retired answer match
-
-                            # Same answer as recently ANSWERED question - warn with medium strictness
-                            elif existing_status == 'answered':
-                                # Check if it's recent (within last 10 answered questions)
-                                cur.execute("""
-                                    SELECT id FROM trivia_questions
-                                    WHERE is_active = TRUE AND status = 'answered'
-                                    ORDER BY last_used_at DESC NULLS LAST
-                                    LIMIT 10
-                                """)
-                                recent_answered_ids = [dict(row)['id'] for row in cur.fetchall()]
-
-                                if existing_dict['id'] in recent_answered_ids:
-                                    logger.warning(
-                                        f"⚠️ ANSWER DUPLICATE (RECENT): New question has same answer '{question_answer}' as recently answered question #{existing_dict['id']}")
-                                    return {
-                                        'duplicate_id': existing_dict['id'],
-                                        'duplicate_text': existing_dict.get('question_text', ''),
-                                        'similarity_score': 0.9,  # High match on answer
-                                        'status': existing_status,
-                                        'created_at': existing_dict.get('created_at'),
-                                        'match_type': 'answer_recent',
-                                        'is_retired': False,
-                                        'duplicate_reason': f"Same answer as recently used question: '{question_answer}'"
-                                    }
-
-                # Normalize the new question for comparison
-                new_question_normalized = self._normalize_question_text(question_text)
-
-                # ✅ FIX #2: Extract key concepts from the question
-                new_question_concepts = extract_question_concepts(question_text)
-
-                # Check each existing question
-                import difflib
-
-                for existing in existing_questions:
-                    existing_dict = dict(existing)
-                    existing_text = existing_dict.get('question_text', '')
-                    existing_status = existing_dict.get('status', '')
-                    existing_normalized = self._normalize_question_text(existing_text)
-
-                    # Calculate text similarity
-                    text_similarity = difflib.SequenceMatcher(
-                        None,
-                        new_question_normalized.lower(),
-                        existing_normalized.lower()
-                    ).ratio()
-
-                    # ✅ FIX #2: Calculate semantic similarity (concept overlap)
-                    existing_concepts = extract_question_concepts(existing_text)
-                    concept_similarity = calculate_concept_similarity(
-                        new_question_concepts, existing_concepts
-                    )
-
-                    # ✅ FIX #2: Use combined similarity score
-                    combined_similarity = max(text_similarity, concept_similarity)
-
-                    # ✅ FIX: Retired questions use a HIGHER threshold (harder to trigger as duplicate).
-                    # Retired = previously used, not bad. The same topic should be recyclable.
-                    # Using 1.25x multiplier (capped at 0.97) means retired questions need near-exact
-                    # text match to block, preventing the pool from being starved by old questions.
-                    if existing_status == 'retired':
-                        effective_threshold = min(similarity_threshold * 1.25, 0.97)
-                    else:
-                        effective_threshold = similarity_threshold
-
-                    if combined_similarity >= effective_threshold:
-                        match_type = "semantic" if concept_similarity > text_similarity else "text"
-                        logger.warning(
-                            f"Duplicate question detected: {combined_similarity:.2%} {match_type} similarity to question #{existing_dict['id']} (status: {existing_status})")
-                        return {
-                            'duplicate_id': existing_dict['id'],
-                            'duplicate_text': existing_text,
-                            'similarity_score': combined_similarity,
-                            'status': existing_status,
-                            'created_at': existing_dict.get('created_at'),
-                            'match_type': match_type,
-                            'is_retired': existing_status == 'retired'
-                        }
-
-                return None  # No duplicate found
+            self._duplicate_index.sync(dict(row) for row in existing_questions)
+            return bool(existing_questions)
 
         except Exception as e:
             logger.error(f"Error checking for duplicate questions: {e}")
-            return None
+            return False
 
     def _normalize_question_text(self, question_text: str) -> str:
         """Normalize question text for duplicate comparison"""
@@ -1606,6 +1646,9 @@ class TriviaDatabase:
                         continue
 
                 conn.commit()
+                for detail in session_details:
+                    self.session_registry.end(detail["session_id"])
+                    self.answer_buffer.forget(detail["session_id"])
 
                 return {
                     "cleaned_sessions": cleaned_count,
@@ -0,0 +1,186 @@
+"""
+Trivia Answer Buffer
+
+Buffered answer ingestion for Trivia Tuesday. The per-session duplicate check
+and the submitter conflict check are answered from memory, and accepted
+answers are written in micro-batches (one multi-row INSERT ... ON CONFLICT
+(session_id, user_id) DO NOTHING per flush) instead of three round trips per
+answer.
+
+TriviaDatabase owns the buffer and primes each session once per process with
+the question submitter and the users who have already answered, so the
+in-memory dedupe stays correct across restarts. The unique index on
+trivia_answers(session_id, user_id) remains the backstop.
+
+A batch that keeps failing is retried row by row, so one answer the database
+rejects is logged and dropped instead of holding back every later answer (and
+session completion, which flushes first). The member can then answer again.
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+AnswerKey = Tuple[int, int]
+
+
+class TriviaAnswerBuffer:
+    """
+    Thread-safe per-session dedupe sets plus a queue of answers awaiting insert.
+
+    The writer takes a list of answer rows and returns {(session_id, user_id):
+    answer_id} for the rows it inserted, or None if the write failed (the rows
+    are then queued again for the next flush).
+
+    After MAX_BATCH_ATTEMPTS consecutive failed flushes the rows are written one
+    at a time. Rows rejected while others go through are dropped; if nothing
+    goes through the database is likely down, so every row stays queued and
+    the caller keeps backing off.
+    """
+
+    MAX_BATCH_ATTEMPTS = 3
+
+    def __init__(self, writer: Callable[[List[Dict[str, Any]]], Optional[Dict[AnswerKey, int]]]):
+        self._writer = writer
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._submitters: Dict[int, Optional[int]] = {}
+        self._users: Dict[int, Set[int]] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._failed_batches = 0
+        self.stats = {
+            "queued": 0,
+            "duplicates": 0,
+            "batches": 0,
+            "written": 0,
+            "conflicts": 0,
+            "failed_flushes": 0,
+            "dropped": 0
+        }
+
+    def is_primed(self, session_id: int) -> bool:
+        with self._lock:
+            return session_id in self._users
+
+    def prime(self, session_id: int, submitter_id: Optional[int], user_ids: Iterable[int]):
+        """Record a session's question submitter and the users who already answered."""
+        with self._lock:
+            self._submitters[session_id] = submitter_id
+            self._users.setdefault(session_id, set()).update(user_ids)
+
+    def offer(self, session_id: int, user_id: int, answer_text: str,
+              normalized_answer: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Accept an answer into the queue.
+
+        Returns:
+            {'duplicate': True} if the user already answered, the queued row
+            otherwise, or None if the session has not been primed
+        """
+        with self._lock:
+            users = self._users.get(session_id)
+            if users is None:
+                return None
+            if user_id in users:
+                self.stats["duplicates"] += 1
+                return {'duplicate': True}
+            users.add(user_id)
+            row = {
+                'session_id': session_id,
+                'user_id': user_id,
+                'answer_text': answer_text,
+                'normalized_answer': normalized_answer,
+                'conflict_detected': self._submitters.get(session_id) == user_id,
+                # Stamped on arrival so batching doesn't change who answered first
+                'submitted_at': datetime.now(timezone.utc)
+            }
+            self._pending.append(row)
+            self.stats["queued"] += 1
+            return row
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> Optional[Dict[AnswerKey, int]]:
+        """
+        Write every queued answer in one batch.
+
+        Flushes are serialized, so a caller that flushes before reading
+        trivia_answers also waits for a batch another thread is writing.
+
+        Returns:
+            {(session_id, user_id): answer_id} for inserted rows (empty if
+            nothing was queued), or None if the write failed and answers are
+            still queued
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return {}
+
+            inserted = self._writer(rows)
+            if inserted is None:
+                with self._lock:
+                    self.stats["failed_flushes"] += 1
+                    self._failed_batches += 1
+                    if self._failed_batches < self.MAX_BATCH_ATTEMPTS:
+                        self._pending[:0] = rows
+                        return None
+                inserted, rows = self._write_rows_individually(rows)
+                if inserted is None:
+                    return None
+
+            with self._lock:
+                self._failed_batches = 0
+                self.stats["batches"] += 1
+                self.stats["written"] += len(inserted)
+                self.stats["conflicts"] += len(rows) - len(inserted)
+            return inserted
+
+    def _write_rows_individually(
+            self, rows: List[Dict[str, Any]]) -> Tuple[Optional[Dict[AnswerKey, int]], List[Dict[str, Any]]]:
+        """
+        Write rows one at a time after repeated batch failures. Caller holds the flush lock.
+
+        Returns:
+            (inserted, rows that reached the database), or (None, []) if rows
+            had to be queued again
+        """
+        inserted: Dict[AnswerKey, int] = {}
+        written: List[Dict[str, Any]] = []
+        rejected: List[Dict[str, Any]] = []
+        for row in rows:
+            result = self._writer([row])
+            if result is None:
+                rejected.append(row)
+            else:
+                inserted.update(result)
+                written.append(row)
+
+        with self._lock:
+            if not written:
+                # Nothing got through: treat it as an outage and keep every answer
+                self._pending[:0] = rejected
+                return None, []
+
+            # Other rows got through, so the database is up and rejects these ones
+            for row in rejected:
+                users = self._users.get(row['session_id'])
+                if users is not None:
+                    users.discard(row['user_id'])  # Let the member answer again
+                self.stats["dropped"] += 1
+                logger.error(
+                    f"Dropping trivia answer from user {row['user_id']} in session {row['session_id']} "
+                    f"after repeated write failures: {row['answer_text']!r}")
+        return inserted, written
+
+    def forget(self, session_id: int):
+        """Drop a finished session's dedupe state."""
+        with self._lock:
+            self._submitters.pop(session_id, None)
+            self._users.pop(session_id, None)
@@ -0,0 +1,364 @@
+"""
+Database Trivia Index Module - Duplicate Question Detection
+
+This module provides the TriviaDuplicateIndex used by
+TriviaDatabase.check_question_duplicate. It caches the expensive per-question
+features (normalized text, concept sets, normalized answers) for the active
+question pool and only recomputes them for rows that changed, so each check
+costs one pool fetch plus a handful of exact comparisons instead of a
+SequenceMatcher and concept extraction against every stored question.
+
+Candidates are prefiltered before any exact similarity check:
+
+- Text similarity: a character bigram inverted index discards questions that
+  provably cannot reach the SequenceMatcher threshold (same bound as the
+  game name index).
+- Concept similarity: a concept inverted index yields the exact Jaccard
+  overlap for every question sharing at least one concept.
+
+Results are identical to comparing the candidate against every question in
+the pool in fetch order.
+"""
+
+import difflib
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from ..utils.text_processing import extract_question_concepts, normalize_trivia_answer
+
+logger = logging.getLogger(__name__)
+
+# How many recently answered questions block a new question with the same answer
+RECENT_ANSWERED_LIMIT = 10
+
+
+def _bigrams(text: str) -> Counter:
+    """Count overlapping character bigrams in text."""
+    return Counter(text[i:i + 2] for i in range(len(text) - 1))
+
+
+class _QuestionFeatures:
+    """Cached comparison data for one stored question."""
+
+    __slots__ = ('signature', 'normalized', 'bigrams', 'concepts', 'answer_key')
+
+    def __init__(self, signature: Tuple[str, Optional[str]], normalized: str,
+                 concepts: FrozenSet[str], answer_key: Optional[str]):
+        self.signature = signature
+        self.normalized = normalized
+        self.bigrams = _bigrams(normalized)
+        self.concepts = concepts
+        self.answer_key = answer_key
+
+
+class TriviaDuplicateIndex:
+    """
+    Process-wide duplicate detection index for trivia questions.
+
+    The index is synced from the active question pool before each check (or
+    batch of checks). Features are keyed by question ID and reused while the
+    question text and answer are unchanged. Thread-safe because checks also
+    run from background generation tasks.
+    """
+
+    def __init__(self, normalizer: Callable[[str], str]):
+        """
+        Initialize an empty index.
+
+        Args:
+            normalizer: Question text normalizer used for text similarity
+        """
+        self._normalize = normalizer
+        self._lock = threading.RLock()
+        self._features: Dict[int, _QuestionFeatures] = {}
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._rank: Dict[int, int] = {}
+        self._answers: Dict[str, List[int]] = {}
+        self._recent_answered: Set[int] = set()
+        # Inverted indexes: bigram -> {id: count}, concept -> ids, text length -> ids
+        self._bigram_postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._concept_postings: Dict[str, Set[int]] = defaultdict(set)
+        self._ids_by_length: Dict[int, Set[int]] = defaultdict(set)
+        self.stats = {
+            "syncs": 0,
+            "features_computed": 0,
+            "exact_comparisons": 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ========== SYNC ==========
+
+    def sync(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Bring the index in line with the active question pool.
+
+        Args:
+            rows: Active questions with id, question_text, status, created_at,
+                  correct_answer and last_used_at, in duplicate-check order
+                  (retired first, then newest first)
+        """
+        with self._lock:
+            self._rows = {}
+            self._rank = {}
+            for position, row in enumerate(rows):
+                question_id = int(row['id'])
+                self._rows[question_id] = row
+                self._rank[question_id] = position
+
+                signature = (row.get('question_text') or '', row.get('correct_answer'))
+                features = self._features.get(question_id)
+                if features is None or features.signature != signature:
+                    if features is not None:
+                        self._unindex(question_id, features)
+                    self._index(question_id, self._compute_features(signature))
+                    self.stats["features_computed"] += 1
+
+            for question_id in [qid for qid in self._features if qid not in self._rows]:
+                self._unindex(question_id, self._features[question_id])
+
+            self._answers = defaultdict(list)
+            for question_id in self._rows:
+                answer_key = self._features[question_id].answer_key
+                if answer_key is not None:
+                    self._answers[answer_key].append(question_id)
+
+            # Mirrors: WHERE status = 'answered' ORDER BY last_used_at DESC NULLS LAST LIMIT 10
+            answered = [row for row in self._rows.values() if row.get('status') == 'answered']
+            dated = sorted((row for row in answered if row.get('last_used_at') is not None),
+                           key=lambda row: row['last_used_at'], reverse=True)
+            undated = [row for row in answered if row.get('last_used_at') is None]
+            self._recent_answered = {int(row['id']) for row in (dated + undated)[:RECENT_ANSWERED_LIMIT]}
+
+            self.stats["syncs"] += 1
+
+    def _compute_features(self, signature: Tuple[str, Optional[str]]) -> _QuestionFeatures:
+        question_text, answer = signature
+        answer_key = normalize_trivia_answer(answer).lower() if answer else None
+        return _QuestionFeatures(
+            signature,
+            self._normalize(question_text).lower(),
+            frozenset(extract_question_concepts(question_text)),
+            answer_key
+        )
+
+    def _index(self, question_id: int, features: _QuestionFeatures):
+        self._features[question_id] = features
+        for bigram, count in features.bigrams.items():
+            self._bigram_postings[bigram][question_id] = count
+        for concept in features.concepts:
+            self._concept_postings[concept].add(question_id)
+        self._ids_by_length[len(features.normalized)].add(question_id)
+
+    def _unindex(self, question_id: int, features: _QuestionFeatures):
+        del self._features[question_id]
+        for bigram in features.bigrams:
+            postings = self._bigram_postings.get(bigram)
+            if postings is not None:
+                postings.pop(question_id, None)
+                if not postings:
+                    del self._bigram_postings[bigram]
+        for concept in features.concepts:
+            ids = self._concept_postings.get(concept)
+            if ids is not None:
+                ids.discard(question_id)
+                if not ids:
+                    del self._concept_postings[concept]
+        same_length = self._ids_by_length.get(len(features.normalized))
+        if same_length is not None:
+            same_length.discard(question_id)
+            if not same_length:
+                del self._ids_by_length[len(features.normalized)]
+
+    # ========== LOOKUP ==========
+
+    def find_duplicate(self, question_text: str, similarity_threshold: float = 0.8,
+                       question_answer: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the first stored question the candidate duplicates.
+
+        Args:
+            question_text: Candidate question text
+            similarity_threshold: Minimum text or concept similarity
+            question_answer: Candidate answer for answer-based detection
+
+        Returns:
+            Duplicate info dict (see TriviaDatabase.check_question_duplicate) or None
+        """
+        with self._lock:
+            if not self._rows:
+                return None
+
+            if question_answer:
+                duplicate = self._find_answer_duplicate(question_answer)
+                if duplicate:
+                    return duplicate
+
+            candidate = self._compute_features((question_text, None))
+            return self._find_text_duplicate(candidate, question_text, similarity_threshold)
+
+    def find_duplicates(self, questions: List[Tuple[str, Optional[str]]],
+                        similarity_threshold: float = 0.8,
+                        within_batch: bool = True) -> List[Optional[Dict[str, Any]]]:
+        """
+        Check several candidates against the pool in one pass.
+
+        Args:
+            questions: (question_text, question_answer) tuples
+            similarity_threshold: Minimum text or concept similarity
+            within_batch: Also flag candidates that duplicate an earlier,
+                          non-duplicate candidate in the same batch
+
+        Returns:
+            One duplicate info dict (or None) per candidate, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = []
+        accepted: List[Tuple[int, str, _QuestionFeatures]] = []
+        with self._lock:
+            for batch_index, (question_text, question_answer) in enumerate(questions):
+                duplicate = self.find_duplicate(question_text, similarity_threshold, question_answer)
+                if duplicate is None and within_batch:
+                    duplicate = self._find_batch_duplicate(question_text, accepted, similarity_threshold)
+                if duplicate is None:
+                    accepted.append((batch_index, question_text, self._compute_features((question_text, None))))
+                results.append(duplicate)
+        return results
+
+    def _find_answer_duplicate(self, question_answer: str) -> Optional[Dict[str, Any]]:
+        answer_key = normalize_trivia_answer(question_answer).lower()
+        for question_id in self._answers.get(answer_key, ()):
+            row = self._rows[question_id]
+            # Retired answers are recyclable; only recently answered questions block
+            if row.get('status') == 'answered' and question_id in self._recent_answered:
+                logger.warning(
+                    f"⚠️ ANSWER DUPLICATE (RECENT): New question has same answer '{question_answer}' as recently answered question #{question_id}")
+                return {
+                    'duplicate_id': question_id,
+                    'duplicate_text': row.get('question_text', ''),
+                    'similarity_score': 0.9,  # High match on answer
+                    'status': 'answered',
+                    'created_at': row.get('created_at'),
+                    'match_type': 'answer_recent',
+                    'is_retired': False,
+                    'duplicate_reason': f"Same answer as recently used question: '{question_answer}'"
+                }
+        return None
+
+    def _find_text_duplicate(self, candidate: _QuestionFeatures, question_text: str,
+                             similarity_threshold: float) -> Optional[Dict[str, Any]]:
+        retired_threshold = min(similarity_threshold * 1.25, 0.97)
+        min_threshold = min(similarity_threshold, retired_threshold)
+
+        text_candidates = self._text_candidates(candidate.normalized, min_threshold)
+        concept_scores = self._concept_scores(candidate.concepts)
+        if min_threshold <= 0:
+            ids: Iterable[int] = self._rows
+        else:
+            ids = set(text_candidates) | {qid for qid, score in concept_scores.items() if score >= min_threshold}
+
+        for question_id in sorted(ids, key=self._rank.__getitem__):
+            row = self._rows[question_id]
+            status = row.get('status', '')
+            concept_similarity = concept_scores.get(question_id, 0.0)
+            if question_id in text_candidates or min_threshold <= 0:
+                self.stats["exact_comparisons"] += 1
+                text_similarity = difflib.SequenceMatcher(
+                    None, candidate.normalized, self._features[question_id].normalized).ratio()
+            else:
+                # Provably below min_threshold, so below any concept score that can match
+                text_similarity = 0.0
+
+            combined_similarity = max(text_similarity, concept_similarity)
+            effective_threshold = retired_threshold if status == 'retired' else similarity_threshold
+            if combined_similarity >= effective_threshold:
+                match_type = "semantic" if concept_similarity > text_similarity else "text"
+                logger.warning(
+                    f"Duplicate question detected: {combined_similarity:.2%} {match_type} similarity to question #{question_id} (status: {status})")
+                return {
+                    'duplicate_id': question_id,
+                    'duplicate_text': row.get('question_text', ''),
+                    'similarity_score': combined_similarity,
+                    'status': status,
+                    'created_at': row.get('created_at'),
+                    'match_type': match_type,
+                    'is_retired': status == 'retired'
+                }
+        return None
+
+    def _find_batch_duplicate(self, question_text: str,
+                              accepted: List[Tuple[int, str, _QuestionFeatures]],
+                              similarity_threshold: float) -> Optional[Dict[str, Any]]:
+        if not accepted:
+            return None
+        candidate = self._compute_features((question_text, None))
+        for batch_index, earlier_text, earlier in accepted:
+            self.stats["exact_comparisons"] += 1
+            text_similarity = difflib.SequenceMatcher(None, candidate.normalized, earlier.normalized).ratio()
+            concept_similarity = self._jaccard(candidate.concepts, earlier.concepts)
+            combined_similarity = max(text_similarity, concept_similarity)
+            if combined_similarity >= similarity_threshold:
+                return {
+                    'duplicate_id': None,
+                    'duplicate_text': earlier_text,
+                    'similarity_score': combined_similarity,
+                    'status': 'batch',
+                    'created_at': None,
+                    'match_type': "semantic" if concept_similarity > text_similarity else "text",
+                    'is_retired': False,
+                    'batch_index': batch_index
+                }
+        return None
+
+    def _text_candidates(self, normalized: str, cutoff: float) -> Set[int]:
+        """
+        IDs whose normalized text could reach the SequenceMatcher cutoff.
+
+        A ratio of at least cutoff implies at least (1.5 * cutoff - 1) * S - 1
+        shared bigrams (S = combined length), and a length ratio no worse than
+        the cutoff; anything else is discarded without running difflib.
+        """
+        slope = 1.5 * cutoff - 1
+        if slope <= 0:
+            # The bigram bound only holds for cutoffs above 2/3
+            return set(self._rows)
+
+        query_len = len(normalized)
+        shared: Dict[int, int] = defaultdict(int)
+        for bigram, query_count in _bigrams(normalized).items():
+            for question_id, count in self._bigram_postings.get(bigram, {}).items():
+                shared[question_id] += min(query_count, count)
+
+        # Texts so short that the bigram bound is vacuous must be checked directly
+        for length in range(0, int(1 / slope) - query_len + 1):
+            for question_id in self._ids_by_length.get(length, ()):
+                shared.setdefault(question_id, 0)
+
+        candidates = set()
+        for question_id, common in shared.items():
+            length = len(self._features[question_id].normalized)
+            total = query_len + length
+            if total and 2 * min(query_len, length) < cutoff * total:
+                continue
+            if common >= slope * total - 1:
+                candidates.add(question_id)
+        return candidates
+
+    def _concept_scores(self, concepts: FrozenSet[str]) -> Dict[int, float]:
+        """Exact Jaccard concept similarity for every question sharing a concept."""
+        overlap: Dict[int, int] = defaultdict(int)
+        for concept in concepts:
+            for question_id in self._concept_postings.get(concept, ()):
+                overlap[question_id] += 1
+        return {
+            question_id: shared / (len(concepts) + len(self._features[question_id].concepts) - shared)
+            for question_id, shared in overlap.items()
+        }
+
+    @staticmethod
+    def _jaccard(concepts1: FrozenSet[str], concepts2: FrozenSet[str]) -> float:
+        if not concepts1 or not concepts2:
+            return 0.0
+        return len(concepts1 & concepts2) / len(concepts1 | concepts2)
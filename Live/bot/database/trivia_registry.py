@@ -0,0 +1,109 @@
+"""
+Trivia Session Registry
+
+In-process record of active trivia sessions so answer detection in on_message
+needs no database query and no Discord API call. TriviaDatabase loads it once
+(at startup or on first use) and keeps it current from create_trivia_session,
+update_trivia_session_messages, complete_trivia_session and
+cleanup_hanging_trivia_sessions.
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _started_at(session: Dict[str, Any]) -> datetime:
+    started_at = session.get('started_at')
+    if not isinstance(started_at, datetime):
+        return _EPOCH
+    return started_at if started_at.tzinfo else started_at.replace(tzinfo=timezone.utc)
+
+
+class TriviaSessionRegistry:
+    """
+    Active trivia sessions keyed by session ID, plus a message ID → session ID map.
+
+    Session dicts have the same shape as TriviaDatabase.get_active_trivia_session
+    rows. Callers get copies, so the registry can't be mutated from outside.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[int, Dict[str, Any]] = {}
+        self._message_ids: Dict[int, int] = {}
+        self.loaded = False
+        # Bumped whenever sessions start or end, so derived caches can tell they are stale
+        self.version = 0
+        self.stats = {
+            "lookups": 0,
+            "loads": 0
+        }
+
+    def load(self, sessions: Iterable[Dict[str, Any]]):
+        """Replace the registry with the active sessions read from the database."""
+        with self._lock:
+            self._sessions = {}
+            self._message_ids = {}
+            for session in sessions:
+                self._add(dict(session))
+            self.loaded = True
+            self.version += 1
+            self.stats["loads"] += 1
+
+    def _add(self, session: Dict[str, Any]):
+        self._sessions[session['id']] = session
+        for key in ('question_message_id', 'confirmation_message_id'):
+            if session.get(key):
+                self._message_ids[int(session[key])] = session['id']
+
+    def activate(self, session: Dict[str, Any]):
+        """Register a newly created active session."""
+        with self._lock:
+            self._add(dict(session))
+            self.version += 1
+
+    def set_messages(self, session_id: int, question_message_id: Optional[int],
+                     confirmation_message_id: Optional[int], channel_id: Optional[int]):
+        """Record the Discord messages members reply to for a session."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            for key in ('question_message_id', 'confirmation_message_id'):
+                if session.get(key):
+                    self._message_ids.pop(int(session[key]), None)
+            session.update(question_message_id=question_message_id,
+                           confirmation_message_id=confirmation_message_id,
+                           channel_id=channel_id)
+            self._add(session)
+
+    def end(self, session_id: int):
+        """Forget a session that was completed, ended or expired."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return
+            self.version += 1
+            self._message_ids = {mid: sid for mid, sid in self._message_ids.items() if sid != session_id}
+
+    def active(self) -> Optional[Dict[str, Any]]:
+        """Most recently started active session (what get_active_trivia_session returns)."""
+        with self._lock:
+            self.stats["lookups"] += 1
+            if not self._sessions:
+                return None
+            return dict(max(self._sessions.values(), key=_started_at))
+
+    def session_for_message(self, message_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Active session whose question or confirmation message has this ID."""
+        if not message_id:
+            return None
+        with self._lock:
+            session_id = self._message_ids.get(int(message_id))
+            return dict(self._sessions[session_id]) if session_id is not None else None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
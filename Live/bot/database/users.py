@@ -12,9 +12,12 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
+from .core import scoped_connections
+
 logger = logging.getLogger(__name__)
 
 
+@scoped_connections
 class UserDatabase:
     """
     Handles user management: strikes, reminders, and game recommendations.
@@ -33,6 +36,9 @@ class UserDatabase:
         """
         self.db = db_manager
 
+        # Set by the reminder scheduler; told about new and cancelled reminders
+        self.reminder_observer = None
+
     # --- Strike System ---
 
     def get_user_strikes(self, user_id: int) -> int:
@@ -206,6 +212,22 @@ class UserDatabase:
 
     # --- Reminder System ---
 
+    # Reminder columns plus epoch seconds for the naive timestamps, interpreted
+    # in the session time zone they were written in
+    _REMINDER_COLUMNS = """
+        *, EXTRACT(EPOCH FROM scheduled_time::timestamptz) AS scheduled_time_epoch,
+        EXTRACT(EPOCH FROM delivered_at::timestamptz) AS delivered_at_epoch
+    """
+
+    def _notify_reminder_observer(self, event: str, payload: Any):
+        observer = self.reminder_observer
+        if observer is None:
+            return
+        try:
+            getattr(observer, event)(payload)
+        except Exception as e:
+            logger.error(f"Reminder observer {event} failed: {e}")
+
     def add_reminder(
         self,
         user_id: int,
@@ -240,13 +262,13 @@ class UserDatabase:
         try:
             with conn.cursor() as cur:
                 cur.execute(
-                    """
+                    f"""
                     INSERT INTO reminders (
                         user_id, reminder_text, scheduled_time, delivery_channel_id,
                         delivery_type, auto_action_enabled, auto_action_type, auto_action_data,
                         status, created_at
                     ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'pending', CURRENT_TIMESTAMP)
-                    RETURNING id
+                    RETURNING {self._REMINDER_COLUMNS}
                 """,
                     (
                         user_id,
@@ -265,6 +287,7 @@ class UserDatabase:
                 if result:
                     reminder_id = int(result["id"])  # type: ignore
                     logger.info(f"Added reminder ID {reminder_id} for user {user_id}")
+                    self._notify_reminder_observer("reminder_added", dict(result))
                     return reminder_id
                 return None
         except Exception as e:
@@ -426,6 +449,7 @@ class UserDatabase:
                 if reminder:
                     conn.commit()
                     logger.info(f"Cancelled reminder ID {reminder_id} for user {user_id}")
+                    self._notify_reminder_observer("reminder_cancelled", reminder_id)
                     return dict(reminder)
 
                 return None
@@ -477,6 +501,86 @@ class UserDatabase:
             if conn:
                 conn.close()
 
+    def get_scheduled_reminders(self) -> List[Dict[str, Any]]:
+        """
+        Get everything the reminder scheduler tracks: pending reminders and
+        delivered reminders whose auto-action has not run yet.
+
+        Returns:
+            List of reminder dicts with scheduled_time_epoch / delivered_at_epoch
+        """
+        conn = self.db.get_connection()
+        if not conn:
+            return []
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT {self._REMINDER_COLUMNS} FROM reminders
+                    WHERE status = 'pending'
+                    OR (status = 'delivered' AND auto_action_enabled = TRUE
+                        AND auto_executed_at IS NULL AND delivered_at IS NOT NULL)
+                    ORDER BY scheduled_time ASC
+                """
+                )
+                results = cur.fetchall()
+                return [dict(row) for row in results]
+        except Exception as e:
+            logger.error(f"Error getting scheduled reminders: {e}")
+            return []
+        finally:
+            if conn:
+                conn.close()
+
+    def update_reminder_statuses(
+        self,
+        reminder_ids: List[int],
+        status: str,
+        delivered_at: Optional[Any] = None,
+        auto_executed_at: Optional[Any] = None,
+    ) -> int:
+        """
+        Update the status of a batch of reminders with one statement.
+
+        Args:
+            reminder_ids: Reminder IDs to update
+            status: New status ('delivered', 'failed', 'auto_completed', etc.)
+            delivered_at: Optional delivery timestamp
+            auto_executed_at: Optional auto-action execution timestamp
+
+        Returns:
+            Number of reminders updated
+        """
+        if not reminder_ids:
+            return 0
+
+        conn = self.db.get_connection()
+        if not conn:
+            return 0
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE reminders
+                    SET status = %s,
+                        delivered_at = COALESCE(%s, delivered_at),
+                        auto_executed_at = COALESCE(%s, auto_executed_at)
+                    WHERE id = ANY(%s)
+                """,
+                    (status, delivered_at, auto_executed_at, list(reminder_ids)),
+                )
+                conn.commit()
+                return cur.rowcount
+        except Exception as e:
+            logger.error(f"Error updating reminder statuses: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            if conn:
+                conn.close()
+
     def get_all_pending_reminders(self) -> List[Dict[str, Any]]:
         """
         Get all pending reminders for moderator management.
@@ -571,7 +675,7 @@ class UserDatabase:
             if conn:
                 conn.close()
 
-    async def cancel_reminder(self, reminder_id: int) -> bool:
+    def cancel_reminder(self, reminder_id: int) -> bool:
         """
         Cancel a reminder by ID (admin version - no user restriction).
 
@@ -599,6 +703,7 @@ class UserDatabase:
                 success = cur.rowcount > 0
                 if success:
                     logger.info(f"Admin cancelled reminder ID {reminder_id}")
+                    self._notify_reminder_observer("reminder_cancelled", reminder_id)
                 return success
         except Exception as e:
             logger.error(f"Error admin cancelling reminder {reminder_id}: {e}")
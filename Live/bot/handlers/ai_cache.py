@@ -3,22 +3,130 @@ AI Response Cache Module
 
 PHASE 1: Intelligent caching system for AI responses to maximize Gemini free-tier quota.
 Implements hash-based caching with fuzzy matching and intelligent TTL management.
+
+An optional persistent tier (the ai_response_cache table) keeps long-lived FAQ and
+trivia responses across redeploys. It is loaded once at startup, off the event
+loop, and written through on a background thread so cache writes never wait on
+the database.
+
+Requests that miss the cache while an identical request from the same member
+in the same conversation is already waiting on Gemini are coalesced onto that
+call (single-flight) instead of spending quota on a duplicate.
 """
 
+import asyncio
 import hashlib
+import heapq
 import logging
-import random
+import os
+import queue
 import re
 import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from difflib import SequenceMatcher
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from zoneinfo import ZoneInfo
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+class PersistentCacheTier:
+    """
+    Durable second tier beneath AIResponseCache.
+
+    Wraps a backend exposing load_ai_cache_entries(limit) and
+    save_ai_cache_entries(entries) (StatsDatabase in production). Writes are
+    queued and flushed in batches by a daemon thread.
+    """
+
+    def __init__(self, backend, categories: Tuple[str, ...] = ("faq", "trivia"), batch_size: int = 50):
+        """
+        Initialize the persistent tier.
+
+        Args:
+            backend: Object with load_ai_cache_entries/save_ai_cache_entries
+            categories: Cache categories worth persisting (long TTLs)
+            batch_size: Maximum entries per database write
+        """
+        self.backend = backend
+        self.categories = set(categories)
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self.stats = {
+            "writes": 0,
+            "write_errors": 0
+        }
+
+    def should_persist(self, category: str) -> bool:
+        return category in self.categories
+
+    def load(self, limit: int) -> List[Dict[str, Any]]:
+        """Load unexpired persisted entries (blocking, done once per process)."""
+        try:
+            return self.backend.load_ai_cache_entries(limit)
+        except Exception as e:
+            logger.error(f"Persistent cache load failed: {e}")
+            return []
+
+    def write(self, row: Dict[str, Any]):
+        """Queue an entry for asynchronous write-through."""
+        self._ensure_writer()
+        self._queue.put(row)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until queued writes have been persisted.
+
+        Returns:
+            True if the queue drained, False if the timeout was hit
+        """
+        if self._writer is None:
+            return True
+        done = threading.Event()
+
+        def wait_for_queue():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=wait_for_queue, daemon=True).start()
+        return done.wait(timeout)
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="ai-cache-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                written = self.backend.save_ai_cache_entries(batch)
+                self.stats["writes"] += written
+                if written < len(batch):
+                    self.stats["write_errors"] += len(batch) - written
+            except Exception as e:
+                self.stats["write_errors"] += len(batch)
+                logger.error(f"Persistent cache write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+# Result handed to coalesced followers when the leading request failed
+_LEADER_FAILED = object()
+
+
 class AIResponseCache:
     """
     Intelligent caching system for AI responses.
@@ -26,19 +134,41 @@ class AIResponseCache:
     Features:
     - Hash-based cache with similarity matching
     - TTL (time-to-live) for different query types
+    - Size- and memory-bounded with LRU eviction
+    - Entries bucketed by conversation and query type for fuzzy lookups
     - Cache statistics tracking
-    - Automatic cleanup of expired entries
+    - Expired entries evicted as they fall due (expiry heap)
     """
 
-    def __init__(self):
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = threading.Lock()  # Thread safety for async operations
+    # Per-entry bookkeeping overhead used by the approximate memory accounting
+    ENTRY_OVERHEAD_BYTES = 512
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 8 * 1024 * 1024):
+        # Insertion/access ordered: the first key is the least recently used
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()  # Thread safety for async operations
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory_bytes = 0
+        # (user_id, context, query type, category) -> cache keys, for fuzzy lookups
+        self._buckets: Dict[Tuple[int, str, str, str], Set[str]] = {}
+        # Min-heap of (expiry timestamp, cache key); stale pairs are skipped lazily
+        self._expiry_heap: List[Tuple[float, str]] = []
         self.stats = {
             "hits": 0,
             "misses": 0,
             "saves": 0,  # API calls saved
-            "total_queries": 0
+            "total_queries": 0,
+            "evictions": 0,  # LRU evictions (size/memory bound)
+            "expirations": 0,  # TTL expiries
+            "persistent_loaded": 0,  # Entries restored from the persistent tier
+            "persistent_hits": 0,  # Hits served by restored entries (API calls saved by persistence)
+            "coalesced": 0  # Misses that shared an identical in-flight request (API calls saved)
         }
+        # Coalescing key -> future resolved with the in-flight request's result
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._persistent: Optional[PersistentCacheTier] = None
+        self._persistent_loaded = False
 
         # TTL configuration (in seconds)
         # 🚨 AGGRESSIVE TTL REDUCTION: Shorter cache times = fresher, more natural conversations
@@ -109,13 +239,60 @@ class AIResponseCache:
         context_parts = [
             normalized,
             str(user_id),
-            "dm" if is_dm else (f"channel_{channel_id}" if channel_id is not None else "unknown")
+            self._context_label(channel_id, is_dm)
         ]
         context_string = "|".join(context_parts)
 
         # Use MD5 hash for consistent key generation
         return hashlib.md5(context_string.encode()).hexdigest()
 
+    def coalescing_key(
+            self,
+            query: str,
+            user_id: int,
+            channel_id: Optional[int] = None,
+            is_dm: bool = False) -> str:
+        """
+        Key under which identical in-flight requests share one upstream call.
+
+        Responses are written for the member asking (the system instruction
+        carries their aliases, roles and persona handling), so only repeats
+        from the same member in the same conversation coalesce - the same
+        scope as the cache key.
+        """
+        return self._generate_cache_key(query, user_id, channel_id, is_dm)
+
+    async def coalesce(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run call() unless an identical request is in flight, then share its result.
+
+        Returns:
+            (result, coalesced) - coalesced is True when another request's result was reused
+        """
+        leader = self._inflight.get(key)
+        if leader is not None and not leader.done() and leader.get_loop() is asyncio.get_running_loop():
+            result = await asyncio.shield(leader)
+            if result is not _LEADER_FAILED:
+                with self._lock:
+                    self.stats["coalesced"] += 1
+                logger.info(f"CACHE COALESCED: request {key[:12]} shared an in-flight AI call")
+                return result, True
+            # The leading request raised or was cancelled; make our own call
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except BaseException:
+            future.set_result(_LEADER_FAILED)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
     def _detect_query_type(self, query: str) -> str:
         """
         Detect query type to prevent matching incompatible message types.
@@ -239,6 +416,140 @@ class AIResponseCache:
         expiry_time = entry["expires_at"]
         return now >= expiry_time
 
+    @staticmethod
+    def _context_label(channel_id: Optional[int], is_dm: bool) -> str:
+        """Conversation location label shared by cache keys and buckets"""
+        return "dm" if is_dm else (f"channel_{channel_id}" if channel_id is not None else "unknown")
+
+    def _remove_entry(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Remove an entry and its bucket/memory bookkeeping. Caller holds the lock."""
+        entry = self.cache.pop(cache_key, None)
+        if entry is None:
+            return None
+        self._memory_bytes -= entry["size_bytes"]
+        bucket = self._buckets.get(entry["bucket"])
+        if bucket is not None:
+            bucket.discard(cache_key)
+            if not bucket:
+                del self._buckets[entry["bucket"]]
+        return entry
+
+    def _evict_expired(self) -> int:
+        """Pop entries whose TTL has passed off the expiry heap. Caller holds the lock."""
+        now = datetime.now(ZoneInfo("Europe/London")).timestamp()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_ts, cache_key = heapq.heappop(self._expiry_heap)
+            entry = self.cache.get(cache_key)
+            # Skip heap pairs left behind by entries that were replaced or evicted
+            if entry is None or entry["expires_at"].timestamp() != expires_ts:
+                continue
+            self._remove_entry(cache_key)
+            removed += 1
+        self.stats["expirations"] += removed
+        return removed
+
+    def _enforce_bounds(self):
+        """Evict least recently used entries until within size/memory bounds. Caller holds the lock."""
+        while self.cache and (len(self.cache) > self.max_entries or self._memory_bytes > self.max_bytes):
+            lru_key = next(iter(self.cache))
+            self._remove_entry(lru_key)
+            self.stats["evictions"] += 1
+
+        # Rebuild the heap if replaced/evicted entries have left it mostly stale
+        if len(self._expiry_heap) > 2 * len(self.cache) + 64:
+            self._expiry_heap = [(entry["expires_at"].timestamp(), key) for key, entry in self.cache.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def attach_persistent_tier(self, tier: Optional[PersistentCacheTier]):
+        """Attach a persistent tier; its entries load when load_persistent() runs at startup."""
+        with self._lock:
+            self._persistent = tier
+            self._persistent_loaded = False
+
+    def load_persistent(self) -> int:
+        """
+        Restore persisted entries into memory. Returns the number restored.
+
+        Blocks on the database, so call it once at startup off the event loop
+        (e.g. via db.aio.run); get() and set() never load lazily.
+        """
+        with self._lock:
+            tier = self._persistent
+            if tier is None or self._persistent_loaded:
+                return 0
+            self._persistent_loaded = True
+
+        # Query outside the lock so cache traffic isn't held up by the round trip
+        rows = tier.load(self.max_entries)
+
+        now = datetime.now(ZoneInfo("Europe/London"))
+        restored = 0
+        with self._lock:
+            # Rows come newest first; insert oldest first so LRU order matches age
+            for row in reversed(rows):
+                expires_at = row["expires_at"]
+                if expires_at <= now or row["cache_key"] in self.cache:
+                    continue
+                self._store_entry(
+                    row["cache_key"], row["original_query"], row["response"], row.get("user_id"),
+                    row.get("channel_id"), bool(row.get("is_dm")), row.get("query_type") or "general",
+                    row["created_at"], expires_at, source="persistent")
+                restored += 1
+            self._enforce_bounds()
+            self.stats["persistent_loaded"] += restored
+
+        if restored:
+            logger.info(f"Cache: Restored {restored} entries from persistent tier")
+        return restored
+
+    def _store_entry(self, cache_key: str, query: str, response: str, user_id: Any,
+                     channel_id: Optional[int], is_dm: bool, query_type: str,
+                     created_at: datetime, expires_at: datetime, source: str = "memory") -> Dict[str, Any]:
+        """Insert an entry with its bucket, heap and memory bookkeeping. Caller holds the lock."""
+        # Pre-compute matching data once so lookups never re-normalize cached queries
+        normalized = self._normalize_query(query)
+        bucket_key = (user_id, self._context_label(channel_id, is_dm), self._detect_query_type(query), query_type)
+        size_bytes = len(query.encode()) + len(response.encode()) + len(normalized.encode()) \
+            + self.ENTRY_OVERHEAD_BYTES
+
+        # Replacing an entry moves it to most recently used
+        self._remove_entry(cache_key)
+        entry = {
+            "original_query": query,
+            "normalized_query": normalized,
+            "words": set(normalized.split()),
+            "response": response,
+            "user_id": user_id,
+            "channel_id": channel_id,
+            "is_dm": is_dm,
+            "query_type": query_type,
+            "bucket": bucket_key,
+            "size_bytes": size_bytes,
+            "source": source,
+            "created_at": created_at,
+            "expires_at": expires_at,
+            "last_accessed": created_at,
+            "hits": 0
+        }
+        self.cache[cache_key] = entry
+        self._memory_bytes += size_bytes
+        self._buckets.setdefault(bucket_key, set()).add(cache_key)
+        heapq.heappush(self._expiry_heap, (expires_at.timestamp(), cache_key))
+        self._enforce_bounds()
+        return entry
+
+    def _record_hit(self, cache_key: str, entry: Dict[str, Any]):
+        """Update hit stats and LRU position for a served entry. Caller holds the lock."""
+        entry["hits"] += 1
+        entry["last_accessed"] = datetime.now(ZoneInfo("Europe/London"))
+        self.cache.move_to_end(cache_key)
+
+        self.stats["hits"] += 1
+        self.stats["saves"] += 1
+        if entry.get("source") == "persistent":
+            self.stats["persistent_hits"] += 1
+
     def _find_similar_cached_query(
         self,
         query: str,
@@ -294,55 +605,18 @@ class AIResponseCache:
         best_match = None
         best_similarity = 0.0
 
-        # Optimize for large caches: search random sample instead of entire cache
-        cache_items = list(self.cache.items())
-        sample_size = min(len(cache_items), 1000)  # Search max 1000 entries
-
-        if len(cache_items) > 1000:
-            cache_items = random.sample(cache_items, sample_size)
-
-        for cache_key, entry in cache_items:
+        # CRITICAL: Only match within same conversation context and query type/category.
+        # Entries are bucketed on exactly that, so only this conversation's entries are touched.
+        bucket_key = (user_id, self._context_label(channel_id, is_dm), query_type, query_category)
+        for cache_key in self._buckets.get(bucket_key, ()):
+            entry = self.cache[cache_key]
             if self._is_expired(entry):
                 continue
 
-            # CRITICAL: Only match within same conversation context
-            entry_user_id = entry.get("user_id")
-            entry_is_dm = entry.get("is_dm", False)
-            entry_channel_id = entry.get("channel_id")
-
-            # Skip if conversation context doesn't match
-            if entry_user_id != user_id:
-                continue
-            if entry_is_dm != is_dm:
-                continue
-            if not is_dm and entry_channel_id != channel_id:
-                continue
-
-            cached_normalized = self._normalize_query(entry["original_query"])
-
-            # NEW: Detect cached query type and category
-            cached_type = self._detect_query_type(entry["original_query"])
-            cached_category = entry.get("query_type", self._detect_query_category(entry["original_query"]))
-
-            # 🚨 CRITICAL: Don't match different query types (now with sub-types)
-            # This prevents "Who is X?" from matching "What is Y?"
-            if query_type != cached_type:
-                logger.debug(f"Cache: Skipping - type mismatch ({query_type} vs {cached_type})")
-                continue
-
-            # 🚨 EXTRA SAFETY: For question types, ensure exact sub-type match
-            if query_type.startswith('question_') and cached_type.startswith('question_'):
-                if query_type != cached_type:
-                    logger.debug(f"Cache: Skipping - question sub-type mismatch ({query_type} vs {cached_type})")
-                    continue
-
-            # CRITICAL: Don't match different query categories (prevents gaming_query matching conversational_query)
-            if query_category != cached_category:
-                logger.debug(f"Cache: Skipping - category mismatch ({query_category} vs {cached_category})")
-                continue
+            cached_normalized = entry["normalized_query"]
 
             # NEW: Check word overlap for additional validation
-            cached_words = set(cached_normalized.split())
+            cached_words = entry["words"]
             word_overlap = self._calculate_word_overlap(query_words, cached_words)
 
             # Require meaningful word overlap (at least 30% shared words)
@@ -405,6 +679,7 @@ class AIResponseCache:
         """
         with self._lock:
             self.stats["total_queries"] += 1
+            self._evict_expired()
 
             # 🚨 CRITICAL FIX: Detect gaming queries and skip cache entirely
             query_category = self._detect_query_category(query)
@@ -421,16 +696,13 @@ class AIResponseCache:
 
                 # Check if expired
                 if self._is_expired(entry):
-                    del self.cache[cache_key]
+                    self._remove_entry(cache_key)
+                    self.stats["expirations"] += 1
                     self.stats["misses"] += 1
                     return None
 
                 # Update hit stats
-                entry["hits"] += 1
-                entry["last_accessed"] = datetime.now(ZoneInfo("Europe/London"))
-
-                self.stats["hits"] += 1
-                self.stats["saves"] += 1
+                self._record_hit(cache_key, entry)
 
                 context_type = "DM" if is_dm else f"channel_{channel_id}"
                 logger.info(f"CACHE HIT: {query[:50]}... (exact match in {context_type}, {entry['hits']} total hits)")
@@ -443,11 +715,7 @@ class AIResponseCache:
                 cache_key, entry = similar_match
 
                 # Update hit stats
-                entry["hits"] += 1
-                entry["last_accessed"] = datetime.now(ZoneInfo("Europe/London"))
-
-                self.stats["hits"] += 1
-                self.stats["saves"] += 1
+                self._record_hit(cache_key, entry)
 
                 context_type = "DM" if is_dm else f"channel_{channel_id}"
                 logger.info(f"CACHE HIT: {query[:50]}... (fuzzy match in {context_type}, {entry['hits']} total hits)")
@@ -480,9 +748,7 @@ class AIResponseCache:
             query_type: Optional type override, auto-detected if None
         """
         with self._lock:
-            # Periodically clean up expired entries to prevent unbounded growth
-            if len(self.cache) > 500 and len(self.cache) % 50 == 0:
-                self.cleanup_expired()
+            self._evict_expired()
 
             # Generate cache key with conversation context
             cache_key = self._generate_cache_key(query, user_id, channel_id, is_dm)
@@ -497,18 +763,21 @@ class AIResponseCache:
             expires_at = now + timedelta(seconds=ttl_seconds)
 
             # Store in cache with conversation context
-            self.cache[cache_key] = {
-                "original_query": query,
-                "response": response,
-                "user_id": user_id,
-                "channel_id": channel_id,
-                "is_dm": is_dm,
-                "query_type": query_type,
-                "created_at": now,
-                "expires_at": expires_at,
-                "last_accessed": now,
-                "hits": 0
-            }
+            self._store_entry(cache_key, query, response, user_id, channel_id, is_dm, query_type, now, expires_at)
+
+            # Write long-lived entries through to the persistent tier
+            if self._persistent is not None and self._persistent.should_persist(query_type):
+                self._persistent.write({
+                    "cache_key": cache_key,
+                    "original_query": query,
+                    "response": response,
+                    "user_id": user_id,
+                    "channel_id": channel_id,
+                    "is_dm": is_dm,
+                    "query_type": query_type,
+                    "created_at": now,
+                    "expires_at": expires_at
+                })
 
             ttl_hours = ttl_seconds / 3600
             context_type = "DM" if is_dm else f"channel_{channel_id}"
@@ -524,7 +793,8 @@ class AIResponseCache:
             ]
 
             for key in expired_keys:
-                del self.cache[key]
+                self._remove_entry(key)
+            self.stats["expirations"] += len(expired_keys)
 
             if expired_keys:
                 logger.info(f"Cache cleanup: Removed {len(expired_keys)} expired entries")
@@ -544,18 +814,33 @@ class AIResponseCache:
                 **self.stats,
                 "hit_rate": hit_rate,
                 "cache_size": len(self.cache),
-                "api_calls_saved": self.stats["saves"]
+                "max_entries": self.max_entries,
+                "memory_bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "buckets": len(self._buckets),
+                "in_flight": len(self._inflight),
+                "api_calls_saved": self.stats["saves"] + self.stats["coalesced"]
             }
 
     def clear(self):
-        """Clear all cache entries"""
+        """Clear all in-memory cache entries (persisted rows are left to expire)"""
         with self._lock:
             size = len(self.cache)
             self.cache.clear()
+            self._buckets.clear()
+            self._expiry_heap.clear()
+            self._memory_bytes = 0
             logger.info(f"Cache cleared: Removed {size} entries")
 
-    def get_cache_info(self) -> List[Dict[str, Any]]:
-        """Get information about cached entries for debugging"""
+    def get_cache_info(self) -> Dict[str, Any]:
+        """
+        Get information about cached entries for debugging.
+
+        Returns:
+            Dict with 'entries' (per-entry details, most hit first) and
+            'persistent' (persistent tier status, cold-start hit rate and
+            API calls saved by entries restored after a restart)
+        """
         with self._lock:
             info = []
 
@@ -566,6 +851,7 @@ class AIResponseCache:
                 info.append({
                     "query": entry["original_query"][:50] + "...",
                     "type": entry["query_type"],
+                    "source": entry.get("source", "memory"),
                     "hits": entry["hits"],
                     "created": entry["created_at"].strftime("%Y-%m-%d %H:%M:%S"),
                     "expires_in_hours": round(time_remaining / 3600, 1),
@@ -575,18 +861,48 @@ class AIResponseCache:
             # Sort by hits descending
             info.sort(key=lambda x: x["hits"], reverse=True)
 
-            return info
+            total_queries = self.stats["total_queries"]
+            persistent_info = {
+                "enabled": self._persistent is not None,
+                "loaded": self._persistent_loaded,
+                "restored_entries": self.stats["persistent_loaded"],
+                "restored_entries_live": sum(1 for e in self.cache.values() if e.get("source") == "persistent"),
+                "hits": self.stats["persistent_hits"],
+                "cold_start_hit_rate": (
+                    self.stats["persistent_hits"] / total_queries * 100 if total_queries > 0 else 0.0),
+                "api_calls_saved": self.stats["persistent_hits"],
+            }
+            if self._persistent is not None:
+                persistent_info.update(self._persistent.stats)
+
+            return {"entries": info, "persistent": persistent_info}
 
 
 # Global cache instance
 _global_cache: Optional[AIResponseCache] = None
 
 
+def _create_persistent_tier() -> Optional[PersistentCacheTier]:
+    """Build the database-backed tier unless disabled via AI_CACHE_PERSISTENT=false"""
+    if os.getenv("AI_CACHE_PERSISTENT", "true").lower() in ("false", "0", "no"):
+        return None
+    try:
+        from ..database import get_database
+        database = get_database()
+    except Exception as e:
+        logger.warning(f"Persistent AI cache unavailable: {e}")
+        return None
+    if database is None or not database.database_url:
+        return None
+    return PersistentCacheTier(database.stats)
+
+
 def get_cache() -> AIResponseCache:
     """Get or create global cache instance"""
     global _global_cache
     if _global_cache is None:
         _global_cache = AIResponseCache()
+        _global_cache.attach_persistent_tier(_create_persistent_tier())
     return _global_cache
 
 
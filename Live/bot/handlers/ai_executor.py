@@ -0,0 +1,287 @@
+"""
+AI Executor Module
+
+One long-lived, bounded thread pool for every blocking Gemini call (chat,
+generation, model tests and the media Files API). Each call used to build and
+tear down its own single-thread executor, which paid for a thread per request
+and put no cap on how many requests were in flight.
+
+Calls are admitted in priority order (see determine_request_priority):
+
+    startup > high > medium > low
+
+with a global concurrency cap and a cap per priority, so background work such
+as clip analysis can never take every slot from chat and trivia. A call's
+timeout covers its wait for a slot as well as the call itself. A call
+abandoned after a timeout hands its slot back while fewer than max_abandoned
+abandoned threads are still running (the pool has spare threads for them);
+beyond that it keeps its slot until the thread returns, so hung API calls
+can't grow the thread count without bound. Queue wait and run time are
+tracked per priority for the status command.
+"""
+
+import asyncio
+import functools
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import AI_CONCURRENCY_LIMITS, AI_MAX_ABANDONED_CALLS, AI_MAX_CONCURRENT_REQUESTS
+
+# Admission order; unknown priorities are treated as medium
+PRIORITY_ORDER = ("startup", "high", "medium", "low")
+
+
+class _Waiter:
+    """A call waiting for a slot."""
+
+    __slots__ = ("priority", "loop", "future", "granted", "cancelled")
+
+    def __init__(self, priority: str, loop: asyncio.AbstractEventLoop):
+        self.priority = priority
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+        self.cancelled = False
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class _Slot:
+    """An admitted call's hold on a slot."""
+
+    __slots__ = ("priority", "held")
+
+    def __init__(self, priority: str):
+        self.priority = priority
+        self.held = True
+
+
+class AIExecutor:
+    """
+    Priority-ordered admission in front of a shared ThreadPoolExecutor.
+
+    Safe to use from several event loops; bookkeeping is guarded by a
+    threading lock because slots are released from the worker threads.
+    """
+
+    def __init__(self, max_workers: int = AI_MAX_CONCURRENT_REQUESTS,
+                 priority_limits: Optional[Dict[str, int]] = None,
+                 max_abandoned: int = AI_MAX_ABANDONED_CALLS):
+        """
+        Initialize the executor (threads are started on first use).
+
+        Args:
+            max_workers: Calls running at once across all priorities
+            priority_limits: Calls running at once per priority (capped by max_workers)
+            max_abandoned: Timed-out calls that may free their slot while their thread still runs
+        """
+        self.max_workers = max_workers
+        self.max_abandoned = max_abandoned
+        self._abandoned = 0
+        limits = dict(AI_CONCURRENCY_LIMITS, **(priority_limits or {}))
+        self.priority_limits = {p: min(limits.get(p, max_workers), max_workers) for p in PRIORITY_ORDER}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._running = {p: 0 for p in PRIORITY_ORDER}
+        self._metrics = {p: {"requests": 0, "started": 0, "completed": 0, "errors": 0, "timeouts": 0,
+                             "queue_timeouts": 0, "abandoned": 0,
+                             "queue_wait_total": 0.0, "queue_wait_max": 0.0,
+                             "run_total": 0.0, "run_max": 0.0} for p in PRIORITY_ORDER}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spare threads let admitted calls start while abandoned ones are still stuck
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers + self.max_abandoned,
+                                                    thread_name_prefix="ai-call")
+            return self._executor
+
+    # ========== ADMISSION ==========
+
+    def _dispatch(self):
+        """Grant free slots to waiters in priority order (lock held)."""
+        skipped = []
+        while self._queue and sum(self._running.values()) < self.max_workers:
+            entry = heapq.heappop(self._queue)
+            waiter = entry[2]
+            if waiter.cancelled:
+                continue
+            if self._running[waiter.priority] >= self.priority_limits[waiter.priority]:
+                skipped.append(entry)
+                continue
+            try:
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+            except RuntimeError:
+                # The waiter's event loop has closed
+                waiter.cancelled = True
+                continue
+            waiter.granted = True
+            self._running[waiter.priority] += 1
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+
+    async def _acquire(self, priority: str):
+        waiter = _Waiter(priority, asyncio.get_running_loop())
+        with self._lock:
+            heapq.heappush(self._queue, (PRIORITY_ORDER.index(priority), next(self._sequence), waiter))
+            self._dispatch()
+        if waiter.granted:
+            return
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._running[priority] -= 1
+                    self._dispatch()
+                else:
+                    waiter.cancelled = True
+            raise
+
+    def _release(self, slot: _Slot):
+        """The call's thread returned: free its slot, or its abandoned-call allowance."""
+        with self._lock:
+            if slot.held:
+                slot.held = False
+                self._running[slot.priority] -= 1
+                self._dispatch()
+            else:
+                self._abandoned -= 1
+
+    def _abandon(self, slot: _Slot) -> bool:
+        """Give a timed-out call's slot back while its thread keeps running, within max_abandoned."""
+        with self._lock:
+            if not slot.held or self._abandoned >= self.max_abandoned:
+                return False
+            slot.held = False
+            self._abandoned += 1
+            self._running[slot.priority] -= 1
+            self._dispatch()
+            return True
+
+    # ========== CALLS ==========
+
+    async def run(self, func: Callable[..., Any], *args, priority: str = "medium",
+                  timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking call on the shared pool once a slot for its priority frees up.
+
+        Args:
+            func: The blocking call (e.g. gemini_client.models.generate_content)
+            priority: "startup", "high", "medium" or "low"
+            timeout: Seconds the call may take overall, waiting for a slot included
+
+        Raises:
+            asyncio.TimeoutError: No slot freed up, or the call ran past the timeout
+        """
+        if priority not in PRIORITY_ORDER:
+            priority = "medium"
+        metrics = self._metrics[priority]
+        metrics["requests"] += 1
+
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._acquire(priority), timeout)
+        except asyncio.TimeoutError:
+            metrics["queue_timeouts"] += 1
+            self._record(metrics, "queue_wait", time.perf_counter() - queued_at)
+            raise
+        started = time.perf_counter()
+        metrics["started"] += 1
+        self._record(metrics, "queue_wait", started - queued_at)
+
+        slot = _Slot(priority)
+        try:
+            future = self._get_executor().submit(functools.partial(func, *args, **kwargs))
+        except Exception:
+            self._release(slot)
+            raise
+        future.add_done_callback(lambda _: self._release(slot))
+
+        remaining = None if timeout is None else max(timeout - (started - queued_at), 0)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), remaining)
+        except asyncio.TimeoutError:
+            metrics["timeouts"] += 1
+            if self._abandon(slot):
+                metrics["abandoned"] += 1
+            raise
+        except Exception:
+            metrics["errors"] += 1
+            raise
+        finally:
+            self._record(metrics, "run", time.perf_counter() - started)
+        metrics["completed"] += 1
+        return result
+
+    @staticmethod
+    def _record(metrics: Dict[str, Any], name: str, seconds: float):
+        metrics[f"{name}_total"] += seconds
+        if seconds > metrics[f"{name}_max"]:
+            metrics[f"{name}_max"] = seconds
+
+    # ========== VISIBILITY ==========
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Running/queued counts and per-priority latency (milliseconds)."""
+        with self._lock:
+            queued = {p: 0 for p in PRIORITY_ORDER}
+            for _, _, waiter in self._queue:
+                if not waiter.cancelled:
+                    queued[waiter.priority] += 1
+            running = dict(self._running)
+            abandoned = self._abandoned
+
+        priorities = {}
+        for priority, m in self._metrics.items():
+            if not m["requests"]:
+                continue
+            finished = max(m["completed"] + m["errors"] + m["timeouts"], 1)
+            started = max(m["started"], 1)
+            priorities[priority] = {
+                "requests": m["requests"],
+                "completed": m["completed"],
+                "errors": m["errors"],
+                "timeouts": m["timeouts"],
+                "queue_timeouts": m["queue_timeouts"],
+                "abandoned": m["abandoned"],
+                "avg_queue_wait_ms": round(m["queue_wait_total"] * 1000 / started, 1),
+                "max_queue_wait_ms": round(m["queue_wait_max"] * 1000, 1),
+                "avg_run_ms": round(m["run_total"] * 1000 / finished, 1),
+                "max_run_ms": round(m["run_max"] * 1000, 1),
+            }
+        return {
+            "max_workers": self.max_workers,
+            "limits": dict(self.priority_limits),
+            "running": running,
+            "queued": queued,
+            "abandoned": abandoned,
+            "priorities": priorities
+        }
+
+    def shutdown(self):
+        """Stop the worker threads (calls still running are allowed to finish)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+_executor: Optional[AIExecutor] = None
+
+
+def get_ai_executor() -> AIExecutor:
+    """Get the process-wide AI executor."""
+    global _executor
+    if _executor is None:
+        _executor = AIExecutor()
+    return _executor
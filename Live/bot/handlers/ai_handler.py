@@ -10,6 +10,7 @@ import json
 import logging
 import os
 import random
+import time
 import traceback
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
@@ -37,6 +38,8 @@ from ..database import get_database
 from ..persona.context_builder import build_ash_context
 from ..persona.examples import ASH_FEW_SHOT_EXAMPLES
 from ..persona.prompts import ASH_SYSTEM_INSTRUCTION
+from .ai_executor import get_ai_executor
+from .context_snapshot import get_context_snapshot, get_examples_text
 
 
 # Configure user-friendly logging for AI libraries
@@ -794,10 +797,6 @@ async def test_gemini_model(model_name: str, timeout: float = 10.0) -> bool:
             print(f"❌ CRITICAL: Gemini client not initialized!")
             return False
 
-        # Use thread executor to avoid blocking
-        import asyncio
-        import concurrent.futures
-
         def sync_test():
             # New API: use client.models.generate_content()
             # Type assertion for Pylance - we already checked gemini_client is not None
@@ -808,10 +807,8 @@ async def test_gemini_model(model_name: str, timeout: float = 10.0) -> bool:
                 config={"max_output_tokens": 5}
             )
 
-        loop = asyncio.get_running_loop()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = loop.run_in_executor(executor, sync_test)
-            response = await asyncio.wait_for(future, timeout=timeout)
+        # Model tests run ahead of everything else on the shared AI executor
+        response = await get_ai_executor().run(sync_test, priority="startup", timeout=timeout)
 
         # Check response format from new API
         if response and hasattr(response, 'text') and response.text:
@@ -1023,8 +1020,6 @@ async def call_ai_with_rate_limiting(prompt: str,
         pass  # Continue without alias handling if utils not available
 
     try:
-        response_text = None
-
         # PHASE 3: LAZY INIT - Test models on first use if not tested yet
         if not models_tested and ai_enabled:
             print("🔄 First AI call detected - triggering lazy model initialization...")
@@ -1049,199 +1044,209 @@ async def call_ai_with_rate_limiting(prompt: str,
 
             # Cache miss - will need to call API and cache result
 
-        # Reset backup active flag if we're trying primary AI again
-        if ai_usage_stats.get("backup_active", False) and not ai_usage_stats.get("quota_exhausted", False):
-            ai_usage_stats["backup_active"] = False
-            print("🔄 Attempting to resume primary AI usage")
-
-        # Try primary AI first (unless quota is exhausted)
-        if primary_ai == "gemini" and gemini_client is not None and current_gemini_model and not ai_usage_stats.get(
-                "quota_exhausted", False):
-            try:
-                print(
-                    f"Making Gemini request (daily: {ai_usage_stats['daily_requests']}/{MAX_DAILY_REQUESTS})")
-                generation_config = {
-                    "max_output_tokens": 3000,  # Increased to allow complete responses (~750 words)
-                    "temperature": 0.7}
-
-                # Determine timeout based on context priority
-                # Increased startup timeout to 25s to prevent premature failures on cold starts
-                timeout_duration = 25.0 if context == "startup_validation" else 30.0
-
-                # Create truly async wrapper using thread pool to prevent blocking
-                import asyncio
-                import concurrent.futures
-
-                def sync_gemini_call():
-                    """Synchronous Gemini call using NEW CLIENT API"""
-                    if not current_gemini_model:
-                        raise ValueError("No Gemini model available")
-
-                    if not gemini_client:
-                        raise ValueError("Gemini client not initialized")
-
-                    # NEW API: Use client.models.generate_content() directly
-                    # Note: System instructions and chat history handled differently in new API
-                    # Pass the user's prompt to enable context features like "simulate_pops"
-                    # Also pass member_obj and bot for role detection
-                    base_instruction, operational_context = _build_full_system_instruction(
-                        user_id, prompt, member_obj, bot)
-
-                    # Convert few-shot examples to string format for inclusion
-                    examples_text = ""
-                    if ASH_FEW_SHOT_EXAMPLES:
-                        examples_text = "\n\n--- BEHAVIORAL EXAMPLES ---\n"
-                        examples_text += "These examples demonstrate proper response patterns:\n\n"
-                        for idx, example in enumerate(ASH_FEW_SHOT_EXAMPLES, 1):
-                            user_text = example.get('user_input', example.get('user', ''))
-                            ash_text = example.get('ash_response', example.get('assistant', ''))
-                            context_note = example.get('context', '')
-
-                            if context_note:
-                                examples_text += f"Example {idx} [{context_note}]:\n"
-                            else:
-                                examples_text += f"Example {idx}:\n"
-                            examples_text += f"User: {user_text}\n"
-                            examples_text += f"Ash: {ash_text}\n\n"
-
-                        examples_text += "--- END EXAMPLES ---\n"
-                        print(f"✅ Including {len(ASH_FEW_SHOT_EXAMPLES)} few-shot examples in prompt")
-
-                    # Build full prompt with OPERATIONAL CONTEXT first (most important for addressing)
-                    # Then base instruction, then examples, then user prompt
-                    full_prompt = f"{operational_context}\n\n{base_instruction}{examples_text}\n\nUser: {prompt}"
-
-                    # DEBUG: Enhanced logging to find where User Designation appears
-                    # Search for the OPERATIONAL CONTEXT section
-                    op_context_start = full_prompt.find("--- CURRENT OPERATIONAL CONTEXT ---")
-                    if op_context_start >= 0:
-                        # Show the OPERATIONAL CONTEXT section (about 400 chars should cover it)
-                        op_context_section = full_prompt[op_context_start:op_context_start + 400]
-                        print(f"🐛 DEBUG - OPERATIONAL CONTEXT FOUND at position {op_context_start}:")
-                        print(op_context_section)
-                    else:
-                        print(f"🚨 DEBUG - OPERATIONAL CONTEXT NOT FOUND IN PROMPT!")
-                        print(f"🐛 DEBUG - Base instruction length: {len(base_instruction)}")
-                        print(f"🐛 DEBUG - Operational context length: {len(operational_context)}")
-
-                    response = gemini_client.models.generate_content(
-                        model=current_gemini_model,
-                        contents=full_prompt,
-                        config=generation_config
-                    )
-
-                    return response
-
-                try:
-                    # Use thread pool executor to prevent blocking the event loop
-                    loop = asyncio.get_event_loop()
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                        future = loop.run_in_executor(executor, sync_gemini_call)
-                        response = await asyncio.wait_for(future, timeout=timeout_duration)
+        # Identical requests already waiting on Gemini share that call's result
+        if CACHE_AVAILABLE and get_cache is not None:
+            cache = get_cache()
+            key = cache.coalescing_key(prompt, user_id, channel_id=channel_id, is_dm=is_dm)
+            (response_text, status), coalesced = await cache.coalesce(
+                key, lambda: _request_ai_response(prompt, user_id, context, member_obj, bot,
+                                                  channel_id, is_dm, priority))
+            if coalesced and response_text and status == "success":
+                # The leading request already cached the answer under this key
+                print(f"🔗 AI request coalesced with an identical in-flight request (context: {context or 'chat'})")
+                return response_text, "coalesced"
+            return response_text, status
+
+        return await _request_ai_response(prompt, user_id, context, member_obj, bot, channel_id, is_dm, priority)
 
-                    if response and hasattr(response, "text") and response.text:
-                        response_text = response.text
-                        record_ai_request()
-                        print(f"✅ Gemini request successful (timeout: {timeout_duration}s)")
+    except Exception as e:
+        print(f"❌ AI call error: {e}")
+        record_ai_error()
+        return None, f"error:{str(e)}"
 
-                        # PHASE 1: Cache the successful response (NEW OPTIMIZATION) with conversation context
-                        if CACHE_AVAILABLE and get_cache is not None and response_text:
-                            cache = get_cache()
-                            cache.set(prompt, response_text, user_id, channel_id=channel_id, is_dm=is_dm)
 
-                        # Reset quota exhausted flag if successful
-                        if ai_usage_stats.get("quota_exhausted", False):
-                            ai_usage_stats["quota_exhausted"] = False
-                            print("✅ Primary AI quota restored")
+async def _request_ai_response(prompt: str, user_id: int, context: str, member_obj, bot,
+                               channel_id, is_dm: bool, priority: str) -> Tuple[Optional[str], str]:
+    """
+    The upstream part of call_ai_with_rate_limiting: one Gemini request (with
+    backup-model retries) whose response is cached. Runs at most once per
+    coalescing key at a time.
+    """
+    global ai_usage_stats
+    response_text = None
 
-                except asyncio.TimeoutError:
-                    print(f"❌ Gemini AI request timed out after {timeout_duration}s")
-                    record_ai_error()
+    # Reset backup active flag if we're trying primary AI again
+    if ai_usage_stats.get("backup_active", False) and not ai_usage_stats.get("quota_exhausted", False):
+        ai_usage_stats["backup_active"] = False
+        print("🔄 Attempting to resume primary AI usage")
 
-                    # Phase 3: Try backup Gemini model on timeout
-                    if len(working_gemini_models) > 1 and current_gemini_model:
-                        print("🔄 Attempting to switch to backup Gemini model after timeout...")
-                        if await switch_to_backup_gemini_model():
-                            print("✅ Switched to backup model, retrying request...")
-                            # Retry with backup model (recursive call with limited depth)
-                            if not hasattr(call_ai_with_rate_limiting, '_retry_count'):
-                                call_ai_with_rate_limiting._retry_count = 0  # type: ignore
-
-                            if call_ai_with_rate_limiting._retry_count < 2:  # type: ignore
-                                call_ai_with_rate_limiting._retry_count += 1  # type: ignore
-                                result = await call_ai_with_rate_limiting(prompt, user_id, context)
-                                call_ai_with_rate_limiting._retry_count = 0  # type: ignore
-                                return result
-
-                    # No backup available or retry failed
-                    return None, f"timeout_error:{timeout_duration}s"
+    # Try primary AI first (unless quota is exhausted)
+    if primary_ai == "gemini" and gemini_client is not None and current_gemini_model and not ai_usage_stats.get(
+            "quota_exhausted", False):
+        try:
+            print(
+                f"Making Gemini request (daily: {ai_usage_stats['daily_requests']}/{MAX_DAILY_REQUESTS})")
+            generation_config = {
+                "max_output_tokens": 3000,  # Increased to allow complete responses (~750 words)
+                "temperature": 0.7}
+
+            # Determine timeout based on context priority
+            # Increased startup timeout to 25s to prevent premature failures on cold starts
+            timeout_duration = 25.0 if context == "startup_validation" else 30.0
+
+            def sync_gemini_call():
+                """Synchronous Gemini call using NEW CLIENT API"""
+                if not current_gemini_model:
+                    raise ValueError("No Gemini model available")
+
+                if not gemini_client:
+                    raise ValueError("Gemini client not initialized")
+
+                # NEW API: Use client.models.generate_content() directly
+                # Note: System instructions and chat history handled differently in new API
+                # Pass the user's prompt to enable context features like "simulate_pops"
+                # Also pass member_obj and bot for role detection
+                assembly_started = time.perf_counter()
+                base_instruction, operational_context = _build_full_system_instruction(
+                    user_id, prompt, member_obj, bot)
+
+                # Few-shot examples are rendered once per process
+                examples_text = get_examples_text()
+                if examples_text:
+                    print(f"✅ Including {len(ASH_FEW_SHOT_EXAMPLES)} few-shot examples in prompt")
+
+                # Build full prompt with OPERATIONAL CONTEXT first (most important for addressing)
+                # Then base instruction, then examples, then user prompt
+                full_prompt = f"{operational_context}\n\n{base_instruction}{examples_text}\n\nUser: {prompt}"
+                print(f"⏱️ Prompt assembled in {(time.perf_counter() - assembly_started) * 1000:.1f}ms "
+                      f"(context snapshot v{get_context_snapshot().version})")
+
+                # DEBUG: Enhanced logging to find where User Designation appears
+                # Search for the OPERATIONAL CONTEXT section
+                op_context_start = full_prompt.find("--- CURRENT OPERATIONAL CONTEXT ---")
+                if op_context_start >= 0:
+                    # Show the OPERATIONAL CONTEXT section (about 400 chars should cover it)
+                    op_context_section = full_prompt[op_context_start:op_context_start + 400]
+                    print(f"🐛 DEBUG - OPERATIONAL CONTEXT FOUND at position {op_context_start}:")
+                    print(op_context_section)
+                else:
+                    print(f"🚨 DEBUG - OPERATIONAL CONTEXT NOT FOUND IN PROMPT!")
+                    print(f"🐛 DEBUG - Base instruction length: {len(base_instruction)}")
+                    print(f"🐛 DEBUG - Operational context length: {len(operational_context)}")
+
+                response = gemini_client.models.generate_content(
+                    model=current_gemini_model,
+                    contents=full_prompt,
+                    config=generation_config
+                )
 
-            except Exception as e:
-                error_str = str(e)
-                print(f"❌ Gemini AI error: {error_str}")
+                return response
 
-                # Phase 3: Track model-specific failures
-                global model_failure_counts
-                if current_gemini_model is not None:
-                    model_key: str = current_gemini_model
-                    model_failure_counts[model_key] = model_failure_counts.get(model_key, 0) + 1
-                    print(
-                        f"📊 Model failure count for {model_key}: {model_failure_counts[model_key]}")
-                # Phase 3: Check for model-specific errors that warrant switching
-                should_switch_model = False
+            try:
+                # Shared executor: admitted by priority, timeout covers the wait for a slot too
+                response = await get_ai_executor().run(sync_gemini_call, priority=priority,
+                                                       timeout=timeout_duration)
+
+                if response and hasattr(response, "text") and response.text:
+                    response_text = response.text
+                    record_ai_request()
+                    print(f"✅ Gemini request successful (timeout: {timeout_duration}s)")
+
+                    # PHASE 1: Cache the successful response (NEW OPTIMIZATION) with conversation context
+                    if CACHE_AVAILABLE and get_cache is not None and response_text:
+                        cache = get_cache()
+                        cache.set(prompt, response_text, user_id, channel_id=channel_id, is_dm=is_dm)
+
+                    # Reset quota exhausted flag if successful
+                    if ai_usage_stats.get("quota_exhausted", False):
+                        ai_usage_stats["quota_exhausted"] = False
+                        print("✅ Primary AI quota restored")
+
+            except asyncio.TimeoutError:
+                print(f"❌ Gemini AI request timed out after {timeout_duration}s")
+                record_ai_error()
 
-                # Check if this is a quota exhaustion error
-                if check_quota_exhaustion(error_str):
-                    print("⚠️ Quota exhausted on current model. Allowing cascade to backup models.")
-                    should_switch_model = True
-                error_lower = error_str.lower()
-
-                # Errors that indicate model-specific issues
-                model_error_indicators = [
-                    "not found", "404", "invalid model", "model not available",
-                    "limit: 0", "limit:0", "not supported on your tier"
-                ]
-
-                if any(indicator in error_lower for indicator in model_error_indicators):
-                    print(f"⚠️ Model-specific error detected: {error_str[:100]}")
-                    should_switch_model = True
-
-                # Also switch if we have too many failures on current model
-                if current_gemini_model and model_failure_counts.get(current_gemini_model, 0) >= 3:
-                    print(f"⚠️ Too many failures on {current_gemini_model}, attempting switch...")
-                    should_switch_model = True
-
-                # Phase 3: Try backup Gemini model if appropriate
-                if should_switch_model and len(working_gemini_models) > 1:
-                    print("🔄 Attempting to switch to backup Gemini model...")
+                # Phase 3: Try backup Gemini model on timeout
+                if len(working_gemini_models) > 1 and current_gemini_model:
+                    print("🔄 Attempting to switch to backup Gemini model after timeout...")
                     if await switch_to_backup_gemini_model():
                         print("✅ Switched to backup model, retrying request...")
-                        # Reset failure count for new model
-                        if current_gemini_model is not None:
-                            model_failure_counts[current_gemini_model] = 0
-
-                        # Retry with backup model (with limit)
+                        # Retry with backup model (recursive call with limited depth)
                         if not hasattr(call_ai_with_rate_limiting, '_retry_count'):
                             call_ai_with_rate_limiting._retry_count = 0  # type: ignore
 
                         if call_ai_with_rate_limiting._retry_count < 2:  # type: ignore
                             call_ai_with_rate_limiting._retry_count += 1  # type: ignore
-                            result = await call_ai_with_rate_limiting(prompt, user_id, context)
+                            result = await _request_ai_response(prompt, user_id, context, member_obj, bot,
+                                                     channel_id, is_dm, priority)
                             call_ai_with_rate_limiting._retry_count = 0  # type: ignore
                             return result
 
-                record_ai_error()
-
-        # Return response or error
-        if response_text:
-            return response_text, "success"
-        else:
-            return None, "no_ai_available"
+                # No backup available or retry failed
+                return None, f"timeout_error:{timeout_duration}s"
 
-    except Exception as e:
-        print(f"❌ AI call error: {e}")
-        record_ai_error()
-        return None, f"error:{str(e)}"
+        except Exception as e:
+            error_str = str(e)
+            print(f"❌ Gemini AI error: {error_str}")
+
+            # Phase 3: Track model-specific failures
+            global model_failure_counts
+            if current_gemini_model is not None:
+                model_key: str = current_gemini_model
+                model_failure_counts[model_key] = model_failure_counts.get(model_key, 0) + 1
+                print(
+                    f"📊 Model failure count for {model_key}: {model_failure_counts[model_key]}")
+            # Phase 3: Check for model-specific errors that warrant switching
+            should_switch_model = False
+
+            # Check if this is a quota exhaustion error
+            if check_quota_exhaustion(error_str):
+                print("⚠️ Quota exhausted on current model. Allowing cascade to backup models.")
+                should_switch_model = True
+            error_lower = error_str.lower()
+
+            # Errors that indicate model-specific issues
+            model_error_indicators = [
+                "not found", "404", "invalid model", "model not available",
+                "limit: 0", "limit:0", "not supported on your tier"
+            ]
+
+            if any(indicator in error_lower for indicator in model_error_indicators):
+                print(f"⚠️ Model-specific error detected: {error_str[:100]}")
+                should_switch_model = True
+
+            # Also switch if we have too many failures on current model
+            if current_gemini_model and model_failure_counts.get(current_gemini_model, 0) >= 3:
+                print(f"⚠️ Too many failures on {current_gemini_model}, attempting switch...")
+                should_switch_model = True
+
+            # Phase 3: Try backup Gemini model if appropriate
+            if should_switch_model and len(working_gemini_models) > 1:
+                print("🔄 Attempting to switch to backup Gemini model...")
+                if await switch_to_backup_gemini_model():
+                    print("✅ Switched to backup model, retrying request...")
+                    # Reset failure count for new model
+                    if current_gemini_model is not None:
+                        model_failure_counts[current_gemini_model] = 0
+
+                    # Retry with backup model (with limit)
+                    if not hasattr(call_ai_with_rate_limiting, '_retry_count'):
+                        call_ai_with_rate_limiting._retry_count = 0  # type: ignore
+
+                    if call_ai_with_rate_limiting._retry_count < 2:  # type: ignore
+                        call_ai_with_rate_limiting._retry_count += 1  # type: ignore
+                        result = await _request_ai_response(prompt, user_id, context, member_obj, bot,
+                                                     channel_id, is_dm, priority)
+                        call_ai_with_rate_limiting._retry_count = 0  # type: ignore
+                        return result
+
+            record_ai_error()
+
+    # Return response or error
+    if response_text:
+        return response_text, "success"
+    else:
+        return None, "no_ai_available"
 
 
 async def call_ai_for_generation(
@@ -1325,9 +1330,6 @@ async def call_ai_for_generation(
                 # Shorter timeout for generation tasks
                 timeout_duration = 40.0  # Increased for trivia generation
 
-                import asyncio
-                import concurrent.futures
-
                 def sync_generation_call():
                     """Clean generation call WITHOUT persona/context overhead"""
                     if not current_gemini_model:
@@ -1346,10 +1348,8 @@ async def call_ai_for_generation(
                     return response
 
                 try:
-                    loop = asyncio.get_event_loop()
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                        future = loop.run_in_executor(executor, sync_generation_call)
-                        response = await asyncio.wait_for(future, timeout=timeout_duration)
+                    response = await get_ai_executor().run(sync_generation_call, priority=priority,
+                                                           timeout=timeout_duration)
 
                     if response and hasattr(response, "text") and response.text:
                         response_text = response.text
@@ -1595,48 +1595,78 @@ Return strictly as JSON: {{"question_text": "...", "correct_answer": "...", "dec
     return None
 
 
-async def upload_and_analyze_media(file_path: str, prompt: str) -> Tuple[Optional[str], str]:
+# Seconds between state checks while Gemini processes an uploaded media file
+MEDIA_POLL_SECONDS = 2.0
+MEDIA_POLL_ATTEMPTS = 60  # 2 minutes max
+
+
+def media_analysis_available() -> bool:
+    """True when Gemini is the active provider and the daily quota isn't (nearly) spent."""
+    daily_used = ai_usage_stats.get("daily_requests", 0)
+    return (primary_ai == "gemini" and gemini_client is not None and bool(current_gemini_model)
+            and not ai_usage_stats.get("quota_exhausted", False) and daily_used < MAX_DAILY_REQUESTS - 50)
+
+
+async def upload_media_file(file_path: str) -> Tuple[Any, str]:
     """
-    Upload a media file (like a video clip) to Gemini, poll until ready, and generate content.
-    Returns (response_text, status)
+    Upload a media file to Gemini and poll until it is ready for generation.
+    Returns (uploaded_file, status); the file is deleted again on failure.
     """
-    global ai_usage_stats, gemini_client, current_gemini_model, primary_ai
-    import asyncio
-    import time
-
     if primary_ai != "gemini" or not gemini_client or not current_gemini_model:
         return None, "no_ai_available"
 
-    can_request, reason = check_rate_limits(priority="low")
-    if not can_request:
-        return None, f"rate_limit:{reason}"
-
     uploaded_file = None
     try:
         print(f"⬆️ Uploading file to Gemini API: {file_path}")
-        # Run upload in thread to prevent blocking
-        uploaded_file = await asyncio.to_thread(
-            gemini_client.files.upload, file=file_path
-        )
+        # Media work is background work: it queues behind chat on the shared AI executor
+        uploaded_file = await get_ai_executor().run(gemini_client.files.upload, file=file_path, priority="low")
         print(f"✅ Uploaded as {uploaded_file.name}. Polling for ACTIVE state...")
 
         # Poll state
         state = uploaded_file.state
         attempts = 0
-        while state.name == "PROCESSING" and attempts < 60:  # 2 minutes max
-            await asyncio.sleep(2)
-            uploaded_file = await asyncio.to_thread(
-                gemini_client.files.get, name=uploaded_file.name
-            )
+        while state.name == "PROCESSING" and attempts < MEDIA_POLL_ATTEMPTS:
+            await asyncio.sleep(MEDIA_POLL_SECONDS)
+            uploaded_file = await get_ai_executor().run(gemini_client.files.get, name=uploaded_file.name,
+                                                        priority="low")
             state = uploaded_file.state
             attempts += 1
 
         if state.name == "FAILED":
-            return None, "file_processing_failed"
+            status = "file_processing_failed"
         elif state.name == "PROCESSING":
-            return None, "file_processing_timeout"
+            status = "file_processing_timeout"
+        else:
+            print(f"✅ File {uploaded_file.name} is ACTIVE.")
+            return uploaded_file, "success"
+    except Exception as e:
+        error_str = str(e)
+        print(f"❌ Media upload error: {error_str}")
+        record_ai_error()
+        if check_quota_exhaustion(error_str):
+            handle_quota_exhaustion()
+        status = f"error:{error_str}"
+
+    await delete_media_file(uploaded_file)
+    return None, status
+
+
+async def generate_from_media(uploaded_file: Any, prompt: str,
+                              check_limits: bool = True) -> Tuple[Optional[str], str]:
+    """
+    Generate content for an uploaded (ACTIVE) media file. Counts as one AI request.
+    Returns (response_text, status); the file is left for the caller to delete.
+    """
+    if primary_ai != "gemini" or not gemini_client or not current_gemini_model:
+        return None, "no_ai_available"
+
+    if check_limits:
+        can_request, reason = check_rate_limits(priority="low")
+        if not can_request:
+            return None, f"rate_limit:{reason}"
 
-        print(f"✅ File {uploaded_file.name} is ACTIVE. Generating content...")
+    try:
+        print(f"🧠 Generating content for {uploaded_file.name}...")
 
         def sync_generation():
             from google.genai import types
@@ -1648,11 +1678,7 @@ async def upload_and_analyze_media(file_path: str, prompt: str) -> Tuple[Optiona
                 )
             )
 
-        import concurrent.futures
-        loop = asyncio.get_event_loop()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = loop.run_in_executor(executor, sync_generation)
-            response = await asyncio.wait_for(future, timeout=60.0)
+        response = await get_ai_executor().run(sync_generation, priority="low", timeout=60.0)
 
         record_ai_request()
 
@@ -1671,13 +1697,38 @@ async def upload_and_analyze_media(file_path: str, prompt: str) -> Tuple[Optiona
         if check_quota_exhaustion(error_str):
             handle_quota_exhaustion()
         return None, f"error:{error_str}"
+
+
+async def delete_media_file(uploaded_file: Any):
+    """Delete an uploaded media file from Gemini (best effort)."""
+    if not uploaded_file or not gemini_client:
+        return
+    try:
+        await get_ai_executor().run(gemini_client.files.delete, name=uploaded_file.name, priority="low")
+        print(f"🗑️ Deleted file {uploaded_file.name} from Gemini API")
+    except Exception as e:
+        print(f"⚠️ Failed to delete Gemini file {uploaded_file.name}: {e}")
+
+
+async def upload_and_analyze_media(file_path: str, prompt: str) -> Tuple[Optional[str], str]:
+    """
+    Upload a media file (like a video clip) to Gemini, poll until ready, and generate content.
+    Returns (response_text, status)
+    """
+    if primary_ai != "gemini" or not gemini_client or not current_gemini_model:
+        return None, "no_ai_available"
+
+    can_request, reason = check_rate_limits(priority="low")
+    if not can_request:
+        return None, f"rate_limit:{reason}"
+
+    uploaded_file, status = await upload_media_file(file_path)
+    if uploaded_file is None:
+        return None, status
+    try:
+        return await generate_from_media(uploaded_file, prompt, check_limits=False)
     finally:
-        if uploaded_file:
-            try:
-                await asyncio.to_thread(gemini_client.files.delete, name=uploaded_file.name)
-                print(f"🗑️ Deleted file {uploaded_file.name} from Gemini API")
-            except Exception as e:
-                print(f"⚠️ Failed to delete Gemini file {uploaded_file.name}: {e}")
+        await delete_media_file(uploaded_file)
 
 
 def _convert_few_shot_examples_to_gemini_format(examples: list) -> list:
@@ -1862,154 +1913,9 @@ def _build_full_system_instruction(user_id: int, user_input: str = "", member_ob
             # Build dynamic context using new structured format
             dynamic_context = build_ash_context(user_context)
 
-            # === ENHANCEMENT: Add recent trivia context ===
-            current_db = _get_db()
-            if current_db and hasattr(current_db.trivia, 'get_latest_trivia_session'):
-                try:
-                    latest_trivia = current_db.trivia.get_latest_trivia_session()
-                    if latest_trivia:
-                        trivia_context = "\n\n--- RECENT TRIVIA SESSION ---\n"
-                        trivia_context += f"The most recent trivia question asked was: \"{latest_trivia.get('question_text')}\"\n"
-                        trivia_context += f"The correct answer was: {latest_trivia.get('correct_answer')}\n"
-
-                        cat = latest_trivia.get('category', '')
-                        if cat.startswith('Clip_') and latest_trivia.get('dynamic_query_type'):
-                            import json
-                            try:
-                                dq_data = json.loads(latest_trivia['dynamic_query_type'])
-                                clip_url = dq_data.get('clip_url')
-                                commentary = dq_data.get('commentary')
-                                if clip_url and commentary:
-                                    trivia_context += f"This question was based on a clip. You provided this commentary: \"{commentary}\"\n"
-                                    trivia_context += f"The clip URL is: {clip_url}\n"
-                            except Exception:
-                                pass
-
-                        trivia_context += "If the user asks about the recent trivia, use this information to answer.\n"
-                        trivia_context += "--- END RECENT TRIVIA ---\n"
-                        dynamic_context += trivia_context
-                except Exception as trivia_context_error:
-                    pass
-
-            # === ENHANCEMENT: Add gaming timeline context for temporal questions ===
-            current_db = _get_db()
-            if current_db and hasattr(current_db, 'get_gaming_timeline'):
-                try:
-                    # Get first 3 and last 3 games chronologically for temporal awareness
-                    timeline_asc = current_db.get_gaming_timeline(order='ASC')[:3]
-                    timeline_desc = current_db.get_gaming_timeline(order='DESC')[:3]
-
-                    if timeline_asc or timeline_desc:
-                        timeline_text = "\n\n--- GAMING TIMELINE DATA ---\n"
-
-                        if timeline_asc:
-                            timeline_text += "First games played chronologically:\n"
-                            for game in timeline_asc:
-                                played_date = game.get('first_played_date', 'Unknown')
-                                release_year = game.get('release_year', 'Unknown')
-                                timeline_text += f"  • {game['canonical_name']} (played: {played_date}, released: {release_year})\n"
-
-                        if timeline_desc:
-                            timeline_text += "\nMost recently played games:\n"
-                            for game in timeline_desc:
-                                played_date = game.get('first_played_date', 'Unknown')
-                                release_year = game.get('release_year', 'Unknown')
-                                timeline_text += f"  • {game['canonical_name']} (played: {played_date}, released: {release_year})\n"
-
-                        timeline_text += "\nYou can answer temporal questions like 'what game did Jonesy play first' or 'oldest game by release year'.\n"
-                        timeline_text += "--- END TIMELINE DATA ---\n"
-
-                        # Append timeline data to operational context
-                        dynamic_context += timeline_text
-                except Exception as timeline_error:
-                    # Silently fail if timeline data unavailable - not critical
-                    pass
-
-            # === ENHANCEMENT: Add engagement metrics context for view queries ===
-            # Defensive error handling: Skip if database schema doesn't support engagement metrics
-            current_db = _get_db()
-            if current_db:
-                try:
-                    engagement_context = "\n\n--- ENGAGEMENT METRICS AVAILABLE ---\n"
-                    engagement_context += "The database tracks cross-platform engagement analytics:\n\n"
-
-                    # Get platform statistics (wrapped in try-except for schema compatibility)
-                    platform_stats = None
-                    if hasattr(current_db, 'get_platform_comparison_stats'):
-                        try:
-                            platform_stats = current_db.get_platform_comparison_stats()
-                        except Exception as platform_error:
-                            # Database schema may not have youtube_views/twitch_views columns
-                            error_str = str(platform_error).lower()
-                            if "does not exist" in error_str or "column" in error_str:
-                                print(f"⚠️ Engagement metrics unavailable (database schema outdated): {platform_error}")
-                            else:
-                                print(f"⚠️ Error fetching platform stats: {platform_error}")
-                            platform_stats = None
-
-                    if platform_stats:
-                        yt_stats = platform_stats.get('youtube', {})
-                        tw_stats = platform_stats.get('twitch', {})
-
-                        engagement_context += "📊 Platform Metrics:\n"
-                        engagement_context += f"  • YouTube: {yt_stats.get('game_count', 0)} games, {yt_stats.get('total_views', 0):,} total views\n"
-                        engagement_context += f"  • Twitch: {tw_stats.get('game_count', 0)} games, {tw_stats.get('total_views', 0):,} total views\n"
-                        engagement_context += f"  • Cross-platform titles: {platform_stats.get('cross_platform_count', 0)}\n\n"
-
-                        # Get top games by different metrics
-                        engagement_context += "🎮 Top Performers by Metric:\n"
-
-                        if hasattr(current_db, 'get_games_by_twitch_views'):
-                            try:
-                                top_twitch = current_db.get_games_by_twitch_views(limit=3)
-                                if top_twitch:
-                                    engagement_context += "  • Twitch Leaders: "
-                                    engagement_context += ", ".join(
-                                        [f"{g['canonical_name']} ({g.get('twitch_views', 0):,} views)" for g in top_twitch])
-                                    engagement_context += "\n"
-                            except Exception:
-                                pass  # Skip if query fails
-
-                        if hasattr(current_db, 'get_games_by_total_views'):
-                            try:
-                                top_total = current_db.get_games_by_total_views(limit=3)
-                                if top_total:
-                                    engagement_context += "  • Combined Leaders: "
-                                    engagement_context += ", ".join(
-                                        [f"{g['canonical_name']} ({g.get('total_views', 0):,} views)" for g in top_total])
-                                    engagement_context += "\n"
-                            except Exception:
-                                pass  # Skip if query fails
-
-                        if hasattr(current_db, 'get_engagement_metrics'):
-                            try:
-                                top_efficiency = current_db.get_engagement_metrics(limit=3)
-                                if top_efficiency:
-                                    engagement_context += "  • Engagement Efficiency: "
-                                    engagement_context += ", ".join(
-                                        [f"{g['canonical_name']} ({g.get('views_per_hour', 0):,.0f} views/hr)" for g in top_efficiency])
-                                    engagement_context += "\n"
-                            except Exception:
-                                pass  # Skip if query fails
-
-                        engagement_context += "\n📌 Query Capabilities:\n"
-                        engagement_context += "  • Twitch-specific analytics (views, VOD counts)\n"
-                        engagement_context += "  • Cross-platform comparisons (YouTube vs Twitch)\n"
-                        engagement_context += "  • Engagement efficiency (views per episode/hour)\n"
-                        engagement_context += "  • Platform performance analysis\n"
-                        engagement_context += "\nUse this data to answer engagement and popularity questions naturally.\n"
-                        engagement_context += "--- END ENGAGEMENT METRICS ---\n"
-
-                        # Append engagement data to operational context
-                        dynamic_context += engagement_context
-                    else:
-                        # Schema incompatible - skip engagement metrics silently
-                        print(f"ℹ️ Engagement metrics skipped (database schema compatibility)")
-
-                except Exception as engagement_error:
-                    # Gracefully handle any engagement context errors
-                    print(f"⚠️ Could not load engagement metrics context: {engagement_error}")
-                    pass
+            # Recent trivia, gaming timeline and engagement metrics come from the
+            # precomputed snapshot instead of being queried on every call
+            dynamic_context += get_context_snapshot().fragment(_get_db())
 
         # Return as tuple: (base_instruction, operational_context)
         # This allows the calling code to order them properly (context first for better addressing)
@@ -2408,7 +2314,8 @@ def get_ai_status() -> Dict[str, Any]:
         "status_message": ai_status_message,
         "primary_ai": primary_ai,
         "backup_ai": backup_ai,
-        "usage_stats": ai_usage_stats.copy()
+        "usage_stats": ai_usage_stats.copy(),
+        "executor": get_ai_executor().snapshot()
     }
 
 
@@ -0,0 +1,312 @@
+"""
+AI Context Snapshot Module
+
+Precomputed operational-context fragments for AI system prompts. The recent
+trivia session, the gaming timeline and the engagement metrics used to be
+queried inside every Gemini call; they are now rendered once into prompt text
+and handed out from memory, so per-request prompt assembly is plain string
+concatenation.
+
+Each section is refreshed independently:
+- trivia: rebuilt as soon as the trivia session registry's version changes
+  (a session was started, loaded or ended)
+- timeline and engagement: rebuilt when invalidated (content sync, manual
+  game edits)
+- any section older than TTL_SECONDS keeps being served while a background
+  thread rebuilds it
+
+The few-shot examples block is static and rendered once per process.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..persona.examples import ASH_FEW_SHOT_EXAMPLES
+
+# How long a section is served before it is refreshed in the background
+TTL_SECONDS = 600.0
+
+
+def build_trivia_context(db) -> str:
+    """Render the most recent trivia session for the prompt."""
+    if not hasattr(db.trivia, 'get_latest_trivia_session'):
+        return ""
+    latest_trivia = db.trivia.get_latest_trivia_session()
+    if not latest_trivia:
+        return ""
+
+    trivia_context = "\n\n--- RECENT TRIVIA SESSION ---\n"
+    trivia_context += f"The most recent trivia question asked was: \"{latest_trivia.get('question_text')}\"\n"
+    trivia_context += f"The correct answer was: {latest_trivia.get('correct_answer')}\n"
+
+    cat = latest_trivia.get('category', '') or ''
+    if cat.startswith('Clip_') and latest_trivia.get('dynamic_query_type'):
+        try:
+            dq_data = json.loads(latest_trivia['dynamic_query_type'])
+            clip_url = dq_data.get('clip_url')
+            commentary = dq_data.get('commentary')
+            if clip_url and commentary:
+                trivia_context += f"This question was based on a clip. You provided this commentary: \"{commentary}\"\n"
+                trivia_context += f"The clip URL is: {clip_url}\n"
+        except Exception:
+            pass
+
+    trivia_context += "If the user asks about the recent trivia, use this information to answer.\n"
+    trivia_context += "--- END RECENT TRIVIA ---\n"
+    return trivia_context
+
+
+def build_timeline_context(db) -> str:
+    """Render the first and most recent games played for temporal questions."""
+    if not hasattr(db, 'get_gaming_timeline'):
+        return ""
+    timeline_asc = db.get_gaming_timeline(order='ASC', limit=3)
+    timeline_desc = db.get_gaming_timeline(order='DESC', limit=3)
+    if not timeline_asc and not timeline_desc:
+        return ""
+
+    timeline_text = "\n\n--- GAMING TIMELINE DATA ---\n"
+    if timeline_asc:
+        timeline_text += "First games played chronologically:\n"
+        for game in timeline_asc:
+            played_date = game.get('first_played_date', 'Unknown')
+            release_year = game.get('release_year', 'Unknown')
+            timeline_text += f"  • {game['canonical_name']} (played: {played_date}, released: {release_year})\n"
+
+    if timeline_desc:
+        timeline_text += "\nMost recently played games:\n"
+        for game in timeline_desc:
+            played_date = game.get('first_played_date', 'Unknown')
+            release_year = game.get('release_year', 'Unknown')
+            timeline_text += f"  • {game['canonical_name']} (played: {played_date}, released: {release_year})\n"
+
+    timeline_text += "\nYou can answer temporal questions like 'what game did Jonesy play first' or 'oldest game by release year'.\n"
+    timeline_text += "--- END TIMELINE DATA ---\n"
+    return timeline_text
+
+
+def build_engagement_context(db) -> str:
+    """Render cross-platform engagement metrics (empty if the schema lacks them)."""
+    platform_stats = None
+    if hasattr(db, 'get_platform_comparison_stats'):
+        try:
+            platform_stats = db.get_platform_comparison_stats()
+        except Exception as platform_error:
+            # Database schema may not have youtube_views/twitch_views columns
+            error_str = str(platform_error).lower()
+            if "does not exist" in error_str or "column" in error_str:
+                print(f"⚠️ Engagement metrics unavailable (database schema outdated): {platform_error}")
+            else:
+                print(f"⚠️ Error fetching platform stats: {platform_error}")
+            platform_stats = None
+
+    if not platform_stats:
+        print("ℹ️ Engagement metrics skipped (database schema compatibility)")
+        return ""
+
+    yt_stats = platform_stats.get('youtube', {})
+    tw_stats = platform_stats.get('twitch', {})
+
+    engagement_context = "\n\n--- ENGAGEMENT METRICS AVAILABLE ---\n"
+    engagement_context += "The database tracks cross-platform engagement analytics:\n\n"
+    engagement_context += "📊 Platform Metrics:\n"
+    engagement_context += f"  • YouTube: {yt_stats.get('game_count', 0)} games, {yt_stats.get('total_views', 0):,} total views\n"
+    engagement_context += f"  • Twitch: {tw_stats.get('game_count', 0)} games, {tw_stats.get('total_views', 0):,} total views\n"
+    engagement_context += f"  • Cross-platform titles: {platform_stats.get('cross_platform_count', 0)}\n\n"
+    engagement_context += "🎮 Top Performers by Metric:\n"
+
+    leaders = [
+        ('get_games_by_twitch_views', "Twitch Leaders", lambda g: f"{g['canonical_name']} ({g.get('twitch_views', 0):,} views)"),
+        ('get_games_by_total_views', "Combined Leaders", lambda g: f"{g['canonical_name']} ({g.get('total_views', 0):,} views)"),
+        ('get_engagement_metrics', "Engagement Efficiency",
+         lambda g: f"{g['canonical_name']} ({g.get('views_per_hour', 0):,.0f} views/hr)"),
+    ]
+    for method, label, describe in leaders:
+        if not hasattr(db, method):
+            continue
+        try:
+            top_games = getattr(db, method)(limit=3)
+            if top_games:
+                engagement_context += f"  • {label}: " + ", ".join(describe(g) for g in top_games) + "\n"
+        except Exception:
+            pass  # Skip if query fails
+
+    engagement_context += "\n📌 Query Capabilities:\n"
+    engagement_context += "  • Twitch-specific analytics (views, VOD counts)\n"
+    engagement_context += "  • Cross-platform comparisons (YouTube vs Twitch)\n"
+    engagement_context += "  • Engagement efficiency (views per episode/hour)\n"
+    engagement_context += "  • Platform performance analysis\n"
+    engagement_context += "\nUse this data to answer engagement and popularity questions naturally.\n"
+    engagement_context += "--- END ENGAGEMENT METRICS ---\n"
+    return engagement_context
+
+
+def build_examples_text(examples: List[Dict[str, Any]]) -> str:
+    """Render few-shot examples as the BEHAVIORAL EXAMPLES prompt block."""
+    if not examples:
+        return ""
+    examples_text = "\n\n--- BEHAVIORAL EXAMPLES ---\n"
+    examples_text += "These examples demonstrate proper response patterns:\n\n"
+    for idx, example in enumerate(examples, 1):
+        user_text = example.get('user_input', example.get('user', ''))
+        ash_text = example.get('ash_response', example.get('assistant', ''))
+        context_note = example.get('context', '')
+
+        if context_note:
+            examples_text += f"Example {idx} [{context_note}]:\n"
+        else:
+            examples_text += f"Example {idx}:\n"
+        examples_text += f"User: {user_text}\n"
+        examples_text += f"Ash: {ash_text}\n\n"
+
+    examples_text += "--- END EXAMPLES ---\n"
+    return examples_text
+
+
+_examples_text: Optional[str] = None
+
+
+def get_examples_text() -> str:
+    """The few-shot examples block, rendered on first use."""
+    global _examples_text
+    if _examples_text is None:
+        _examples_text = build_examples_text(ASH_FEW_SHOT_EXAMPLES)
+    return _examples_text
+
+
+class _Section:
+    """One rendered prompt fragment and when/for which data version it was built."""
+
+    def __init__(self, name: str, builder: Callable[[Any], str]):
+        self.name = name
+        self.builder = builder
+        self.text = ""
+        self.built_at: Optional[float] = None
+        self.source_version: Any = None
+        self.refreshing = False
+
+
+class ContextSnapshot:
+    """
+    Versioned, thread-safe store of the database-derived prompt sections.
+
+    fragment(db) is what _build_full_system_instruction appends to the
+    per-user context. Only the very first call for a section (and a trivia
+    section whose registry version moved) touches the database on the
+    caller's thread.
+    """
+
+    def __init__(self, ttl_seconds: float = TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._sections = {
+            'trivia': _Section('trivia', build_trivia_context),
+            'timeline': _Section('timeline', build_timeline_context),
+            'engagement': _Section('engagement', build_engagement_context),
+        }
+        # Bumped on every rebuild; lets callers and logs tell snapshots apart
+        self.version = 0
+        self.stats = {
+            "hits": 0,
+            "builds": 0,
+            "background_refreshes": 0,
+            "build_errors": 0,
+            "last_build_ms": 0.0
+        }
+
+    @staticmethod
+    def _trivia_version(db) -> Any:
+        registry = getattr(getattr(db, 'trivia', None), 'session_registry', None)
+        return getattr(registry, 'version', None)
+
+    def invalidate(self, *sections: str):
+        """Mark sections (all if none given) for a rebuild on next use."""
+        with self._lock:
+            for name in sections or tuple(self._sections):
+                self._sections[name].built_at = None
+
+    def refresh(self, db) -> int:
+        """Rebuild every section now (startup warm-up). Returns the new version."""
+        for section in self._sections.values():
+            self._build(section, db)
+        return self.version
+
+    def _build(self, section: _Section, db):
+        source_version = self._trivia_version(db) if section.name == 'trivia' else None
+        started = time.perf_counter()
+        try:
+            text = section.builder(db)
+        except Exception as e:
+            print(f"⚠️ Could not build {section.name} context: {e}")
+            text = None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            section.refreshing = False
+            if text is None:
+                self.stats["build_errors"] += 1
+                # Keep serving the previous text; retry after another TTL
+                if section.built_at is not None:
+                    section.built_at = time.monotonic()
+                return
+            section.text = text
+            section.built_at = time.monotonic()
+            section.source_version = source_version
+            self.version += 1
+            self.stats["builds"] += 1
+            self.stats["last_build_ms"] = round(elapsed_ms, 2)
+
+    def _refresh_in_background(self, section: _Section, db):
+        thread = threading.Thread(target=self._build, args=(section, db),
+                                  name=f"context-snapshot-{section.name}", daemon=True)
+        thread.start()
+
+    def fragment(self, db) -> str:
+        """Operational-context text for the prompt, built from the snapshot."""
+        if db is None:
+            return ""
+
+        to_build, to_refresh = [], []
+        now = time.monotonic()
+        with self._lock:
+            self.stats["hits"] += 1
+            for section in self._sections.values():
+                if section.built_at is None:
+                    to_build.append(section)
+                elif section.name == 'trivia' and section.source_version != self._trivia_version(db):
+                    to_build.append(section)
+                elif now - section.built_at > self.ttl_seconds and not section.refreshing:
+                    section.refreshing = True
+                    self.stats["background_refreshes"] += 1
+                    to_refresh.append(section)
+
+        for section in to_build:
+            self._build(section, db)
+        for section in to_refresh:
+            self._refresh_in_background(section, db)
+
+        sections = self._sections
+        return sections['trivia'].text + sections['timeline'].text + sections['engagement'].text
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, version=self.version,
+                        sections={name: len(section.text) for name, section in self._sections.items()})
+
+
+_snapshot: Optional[ContextSnapshot] = None
+
+
+def get_context_snapshot() -> ContextSnapshot:
+    """Get the process-wide context snapshot."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = ContextSnapshot()
+    return _snapshot
+
+
+def invalidate_context_snapshot(*sections: str):
+    """Ask for fresh timeline/engagement figures after the games data changed."""
+    if _snapshot is not None:
+        _snapshot.invalidate(*sections)
@@ -10,7 +10,7 @@ Handles the main message processing logic for the Discord bot, including:
 """
 
 import re
-from typing import Any, Dict, Match, Optional, Tuple
+from typing import Any, Dict, List, Match, Optional, Pattern, Tuple
 
 import discord
 from discord.ext import commands
@@ -126,199 +126,221 @@ async def handle_strike_detection(
     return strikes_processed
 
 
+# Query patterns by type, in routing priority order (first matching pattern wins)
+QUERY_PATTERNS: Dict[str, List[str]] = {
+    "statistical": [
+        r"what\s+game\s+series\s+.*most\s+minutes",
+        r"what\s+game\s+series\s+.*most\s+playtime",
+        r"what\s+game\s+.*highest\s+average.*per\s+episode",
+        r"what\s+game\s+.*longest.*per\s+episode",
+        r"what\s+game\s+.*took.*longest.*complete",
+        r"which\s+game\s+.*most\s+episodes",
+        r"which\s+game\s+.*longest.*complete",
+        r"what.*game.*most.*playtime",
+        r"which.*series.*most.*playtime",
+        r"what.*(shortest|least|fewest).*(playthrough|playtime|hours)",
+        r"which.*(fewest|shortest|least).*episodes",
+        r"what.*(first|earliest).*game.*played",
+        r"what.*(most recent|latest).*game.*played",
+        r"what.*oldest.*game.*(release|year)",
+        r"how many.*(horror|survival horror|rpg|action|adventure|puzzle|strategy).*games",  # Example genres
+        r"what.*(most common|most played).*genre",
+        r"what.*game.*shortest.*episodes",
+        r"which.*game.*fastest.*complete",
+        r"what.*game.*most.*time",
+        r"which.*game.*took.*most.*time",
+        # Additional patterns for playtime queries that were falling through to AI
+        r"what\s+is\s+the\s+longest\s+game.*jonesy.*played",
+        r"which\s+is\s+the\s+longest\s+game.*jonesy.*played",
+        r"what\s+game\s+took.*longest.*for\s+jonesy",
+        r"what\s+game\s+has\s+the\s+most\s+playtime",
+        r"what\s+game\s+has\s+the\s+longest\s+playtime",
+        r"which\s+game\s+has\s+the\s+most\s+hours",
+        r"what.*longest.*game.*jonesy.*played",
+        r"what.*game.*longest.*playtime",
+        r"which.*game.*longest.*hours",
+        r"what.*game.*most.*hours",
+        # Patterns for "most played" queries
+        r"what.*most\s+played\s+game",
+        r"which.*most\s+played\s+game",
+        r"what.*jonesy.*most\s+played",
+        r"which.*jonesy.*most\s+played",
+        r"most\s+played\s+game",
+        r"what.*jonesy.*played.*most",
+        r"which.*game.*jonesy.*played.*most"
+    ],
+    "comparison": [
+        r"(?:compare|vs|versus)\s+(.+?)\s+(?:and|to|with)\s+(.+?)[\?\.]?$",
+        r"which.*(?:longer|more episodes|more playtime|shorter|fewer episodes)\s+(.+?)\s+or\s+(.+?)[\?\.]?$"
+    ],
+
+    "genre": [
+        r"what\s+(.*?)\s+games\s+has\s+jonesy\s+played",
+        r"what\s+(.*?)\s+games\s+did\s+jonesy\s+play",
+        r"has\s+jonesy\s+played\s+any\s+(.*?)\s+games",
+        r"did\s+jonesy\s+play\s+any\s+(.*?)\s+games",
+        r"list\s+(.*?)\s+games\s+jonesy\s+played",
+        r"show\s+me\s+(.*?)\s+games\s+jonesy\s+played"
+    ],
+    "year": [
+        r"what\s+games\s+from\s+(\d{4})\s+has\s+jonesy\s+played",
+        r"what\s+games\s+from\s+(\d{4})\s+did\s+jonesy\s+play",
+        r"has\s+jonesy\s+played\s+any\s+games\s+from\s+(\d{4})",
+        r"did\s+jonesy\s+play\s+any\s+games\s+from\s+(\d{4})",
+        r"list\s+(\d{4})\s+games\s+jonesy\s+played"
+    ],
+    "game_status": [
+        r"has\s+jonesy\s+played\s+(.+?)[\?\.]?$",
+        r"did\s+jonesy\s+play\s+(.+?)[\?\.]?$",
+        r"has\s+captain\s+jonesy\s+played\s+(.+?)[\?\.]?$",
+        r"did\s+captain\s+jonesy\s+play\s+(.+?)[\?\.]?$",
+        r"has\s+jonesyspacecat\s+played\s+(.+?)[\?\.]?$",
+        r"did\s+jonesyspacecat\s+play\s+(.+?)[\?\.]?$"
+    ],
+    "game_details": [
+        r"how long did jonesy play (.+?)[\?\.]?$",
+        r"how many hours did jonesy play (.+?)[\?\.]?$",
+        r"what's the playtime for (.+?)[\?\.]?$",
+        r"what is the playtime for (.+?)[\?\.]?$",
+        r"how much time did jonesy spend on (.+?)[\?\.]?$",
+        r"how long did (.+?) take jonesy[\?\.]?$",
+        r"how long did (.+?) take to complete[\?\.]?$",
+        r"what's the total time for (.+?)[\?\.]?$"
+    ],
+    "recommendation": [
+        r"^is\s+(.+?)\s+recommended[\?\.]?$",  # Must be at start of message
+        r"^has\s+(.+?)\s+been\s+recommended[\?\.]?$",  # Must be at start of message
+        r"^who\s+recommended\s+(.+?)[\?\.]?$",  # Must be at start of message
+        # More specific pattern
+        r"^what\s+(?:games?\s+)?(?:do\s+you\s+|would\s+you\s+|should\s+i\s+)?recommend\s+(.+?)[\?\.]?$"
+    ],
+    "youtube_views": [
+        r"what\s+game\s+has\s+gotten.*most\s+views",
+        r"which\s+game\s+has\s+the\s+most\s+views",
+        r"what\s+game\s+has\s+the\s+highest\s+views",
+        r"what.*game.*most.*views",
+        r"which.*game.*most.*views",
+        r"what.*game.*highest.*views",
+        r"most\s+viewed\s+game",
+        r"highest\s+viewed\s+game",
+        r"what\s+game\s+got.*most\s+views",
+        r"which\s+game\s+got.*most\s+views",
+        # Add patterns for video-specific queries
+        r"what.*most\s+viewed\s+video",
+        r"which.*most\s+viewed\s+video",
+        r"what.*highest\s+viewed\s+video",
+        r"most\s+viewed\s+video",
+        # Add patterns for "most popular" queries (popularity = views)
+        r"what.*most\s+popular\s+game",
+        r"which.*most\s+popular\s+game",
+        r"what.*jonesy.*most\s+popular",
+        r"most\s+popular\s+game",
+        r"what.*jonesy.*popular.*game",
+        r"which.*game.*most\s+popular",
+        # Add patterns for "most watched" queries
+        r"what.*most\s+watched\s+game",
+        r"which.*most\s+watched\s+game",
+        r"what.*jonesy.*most\s+watched",
+        r"most\s+watched\s+game",
+        r"what.*jonesy.*watched.*game",
+        r"which.*game.*most\s+watched",
+        # Add additional "most viewed" variants
+        r"what.*jonesy.*most\s+viewed",
+        r"which.*jonesy.*most\s+viewed",
+        r"what.*game.*most\s+viewed"
+    ],
+    "twitch_views": [
+        r"what.*game.*most.*twitch\s+views",
+        r"which.*game.*most.*twitch\s+views",
+        r"what.*twitch.*most\s+views",
+        r"which.*twitch.*most\s+views",
+        r"most.*twitch\s+views",
+        r"highest.*twitch\s+views",
+        r"what.*game.*highest.*twitch",
+        r"which.*game.*highest.*twitch",
+        r"twitch.*most\s+viewed",
+        r"most\s+viewed.*twitch",
+        r"what.*most\s+viewed.*twitch",
+        r"which.*most\s+viewed.*twitch"
+    ],
+    "total_views": [
+        r"what.*game.*most.*total\s+views",
+        r"which.*game.*most.*total\s+views",
+        r"what.*game.*combined\s+views",
+        r"which.*game.*combined\s+views",
+        r"total.*views.*ranking",
+        r"combined.*views.*ranking",
+        r"most.*total\s+views",
+        r"highest.*total\s+views",
+        r"youtube.*and.*twitch.*views",
+        r"twitch.*and.*youtube.*views",
+        r"cross[- ]?platform.*views",
+        r"what.*most\s+views.*overall",
+        r"which.*most\s+views.*overall"
+    ],
+    "platform_comparison": [
+        r"compare.*youtube.*twitch",
+        r"compare.*twitch.*youtube",
+        r"youtube\s+vs\s+twitch",
+        r"twitch\s+vs\s+youtube",
+        r"platform.*comparison",
+        r"platform.*analytics",
+        r"compare.*platforms",
+        r"youtube.*or.*twitch",
+        r"twitch.*or.*youtube",
+        r"which\s+platform.*better",
+        r"what.*platform.*most",
+        r"cross[- ]?platform.*stats",
+        r"cross[- ]?platform.*comparison"
+    ],
+    "engagement_rate": [
+        r"what.*best.*engagement\s+rate",
+        r"which.*best.*engagement\s+rate",
+        r"what.*highest.*engagement",
+        r"which.*highest.*engagement",
+        r"engagement.*efficiency",
+        r"views\s+per\s+episode",
+        r"views\s+per\s+hour",
+        r"most\s+efficient.*game",
+        r"best.*engagement.*metrics",
+        r"optimal.*engagement",
+        r"engagement.*analysis",
+        r"what.*game.*most\s+engaging"
+    ]
+}
+
+
+# Compiled once at import: each type gets a combined alternation used as a cheap
+# gate, so most chat messages are rejected in a single regex pass per type and
+# the individual patterns only run for the type that can actually match.
+_COMPILED_QUERY_PATTERNS: List[Tuple[str, Pattern[str], List[Pattern[str]]]] = [
+    (
+        query_type,
+        re.compile("|".join(f"(?:{pattern})" for pattern in patterns)),
+        [re.compile(pattern) for pattern in patterns],
+    )
+    for query_type, patterns in QUERY_PATTERNS.items()
+]
+_ANY_QUERY_PATTERN: Pattern[str] = re.compile(
+    "|".join(f"(?:{pattern})" for patterns in QUERY_PATTERNS.values() for pattern in patterns)
+)
+
+
 def route_query(content: str) -> Tuple[str, Optional[Match[str]]]:
     """Route a query to the appropriate handler based on patterns with enhanced NLTK analysis."""
     lower_content = content.lower()
 
     print(f"🔍 ROUTE_QUERY: Processing query: '{content[:100]}...'")
 
-    # Define query patterns and their types
-    query_patterns = {
-        "statistical": [
-            r"what\s+game\s+series\s+.*most\s+minutes",
-            r"what\s+game\s+series\s+.*most\s+playtime",
-            r"what\s+game\s+.*highest\s+average.*per\s+episode",
-            r"what\s+game\s+.*longest.*per\s+episode",
-            r"what\s+game\s+.*took.*longest.*complete",
-            r"which\s+game\s+.*most\s+episodes",
-            r"which\s+game\s+.*longest.*complete",
-            r"what.*game.*most.*playtime",
-            r"which.*series.*most.*playtime",
-            r"what.*(shortest|least|fewest).*(playthrough|playtime|hours)",
-            r"which.*(fewest|shortest|least).*episodes",
-            r"what.*(first|earliest).*game.*played",
-            r"what.*(most recent|latest).*game.*played",
-            r"what.*oldest.*game.*(release|year)",
-            r"how many.*(horror|survival horror|rpg|action|adventure|puzzle|strategy).*games",  # Example genres
-            r"what.*(most common|most played).*genre",
-            r"what.*game.*shortest.*episodes",
-            r"which.*game.*fastest.*complete",
-            r"what.*game.*most.*time",
-            r"which.*game.*took.*most.*time",
-            # Additional patterns for playtime queries that were falling through to AI
-            r"what\s+is\s+the\s+longest\s+game.*jonesy.*played",
-            r"which\s+is\s+the\s+longest\s+game.*jonesy.*played",
-            r"what\s+game\s+took.*longest.*for\s+jonesy",
-            r"what\s+game\s+has\s+the\s+most\s+playtime",
-            r"what\s+game\s+has\s+the\s+longest\s+playtime",
-            r"which\s+game\s+has\s+the\s+most\s+hours",
-            r"what.*longest.*game.*jonesy.*played",
-            r"what.*game.*longest.*playtime",
-            r"which.*game.*longest.*hours",
-            r"what.*game.*most.*hours",
-            # Patterns for "most played" queries
-            r"what.*most\s+played\s+game",
-            r"which.*most\s+played\s+game",
-            r"what.*jonesy.*most\s+played",
-            r"which.*jonesy.*most\s+played",
-            r"most\s+played\s+game",
-            r"what.*jonesy.*played.*most",
-            r"which.*game.*jonesy.*played.*most"
-        ],
-        "comparison": [
-            r"(?:compare|vs|versus)\s+(.+?)\s+(?:and|to|with)\s+(.+?)[\?\.]?$",
-            r"which.*(?:longer|more episodes|more playtime|shorter|fewer episodes)\s+(.+?)\s+or\s+(.+?)[\?\.]?$"
-        ],
-
-        "genre": [
-            r"what\s+(.*?)\s+games\s+has\s+jonesy\s+played",
-            r"what\s+(.*?)\s+games\s+did\s+jonesy\s+play",
-            r"has\s+jonesy\s+played\s+any\s+(.*?)\s+games",
-            r"did\s+jonesy\s+play\s+any\s+(.*?)\s+games",
-            r"list\s+(.*?)\s+games\s+jonesy\s+played",
-            r"show\s+me\s+(.*?)\s+games\s+jonesy\s+played"
-        ],
-        "year": [
-            r"what\s+games\s+from\s+(\d{4})\s+has\s+jonesy\s+played",
-            r"what\s+games\s+from\s+(\d{4})\s+did\s+jonesy\s+play",
-            r"has\s+jonesy\s+played\s+any\s+games\s+from\s+(\d{4})",
-            r"did\s+jonesy\s+play\s+any\s+games\s+from\s+(\d{4})",
-            r"list\s+(\d{4})\s+games\s+jonesy\s+played"
-        ],
-        "game_status": [
-            r"has\s+jonesy\s+played\s+(.+?)[\?\.]?$",
-            r"did\s+jonesy\s+play\s+(.+?)[\?\.]?$",
-            r"has\s+captain\s+jonesy\s+played\s+(.+?)[\?\.]?$",
-            r"did\s+captain\s+jonesy\s+play\s+(.+?)[\?\.]?$",
-            r"has\s+jonesyspacecat\s+played\s+(.+?)[\?\.]?$",
-            r"did\s+jonesyspacecat\s+play\s+(.+?)[\?\.]?$"
-        ],
-        "game_details": [
-            r"how long did jonesy play (.+?)[\?\.]?$",
-            r"how many hours did jonesy play (.+?)[\?\.]?$",
-            r"what's the playtime for (.+?)[\?\.]?$",
-            r"what is the playtime for (.+?)[\?\.]?$",
-            r"how much time did jonesy spend on (.+?)[\?\.]?$",
-            r"how long did (.+?) take jonesy[\?\.]?$",
-            r"how long did (.+?) take to complete[\?\.]?$",
-            r"what's the total time for (.+?)[\?\.]?$"
-        ],
-        "recommendation": [
-            r"^is\s+(.+?)\s+recommended[\?\.]?$",  # Must be at start of message
-            r"^has\s+(.+?)\s+been\s+recommended[\?\.]?$",  # Must be at start of message
-            r"^who\s+recommended\s+(.+?)[\?\.]?$",  # Must be at start of message
-            # More specific pattern
-            r"^what\s+(?:games?\s+)?(?:do\s+you\s+|would\s+you\s+|should\s+i\s+)?recommend\s+(.+?)[\?\.]?$"
-        ],
-        "youtube_views": [
-            r"what\s+game\s+has\s+gotten.*most\s+views",
-            r"which\s+game\s+has\s+the\s+most\s+views",
-            r"what\s+game\s+has\s+the\s+highest\s+views",
-            r"what.*game.*most.*views",
-            r"which.*game.*most.*views",
-            r"what.*game.*highest.*views",
-            r"most\s+viewed\s+game",
-            r"highest\s+viewed\s+game",
-            r"what\s+game\s+got.*most\s+views",
-            r"which\s+game\s+got.*most\s+views",
-            # Add patterns for video-specific queries
-            r"what.*most\s+viewed\s+video",
-            r"which.*most\s+viewed\s+video",
-            r"what.*highest\s+viewed\s+video",
-            r"most\s+viewed\s+video",
-            # Add patterns for "most popular" queries (popularity = views)
-            r"what.*most\s+popular\s+game",
-            r"which.*most\s+popular\s+game",
-            r"what.*jonesy.*most\s+popular",
-            r"most\s+popular\s+game",
-            r"what.*jonesy.*popular.*game",
-            r"which.*game.*most\s+popular",
-            # Add patterns for "most watched" queries
-            r"what.*most\s+watched\s+game",
-            r"which.*most\s+watched\s+game",
-            r"what.*jonesy.*most\s+watched",
-            r"most\s+watched\s+game",
-            r"what.*jonesy.*watched.*game",
-            r"which.*game.*most\s+watched",
-            # Add additional "most viewed" variants
-            r"what.*jonesy.*most\s+viewed",
-            r"which.*jonesy.*most\s+viewed",
-            r"what.*game.*most\s+viewed"
-        ],
-        "twitch_views": [
-            r"what.*game.*most.*twitch\s+views",
-            r"which.*game.*most.*twitch\s+views",
-            r"what.*twitch.*most\s+views",
-            r"which.*twitch.*most\s+views",
-            r"most.*twitch\s+views",
-            r"highest.*twitch\s+views",
-            r"what.*game.*highest.*twitch",
-            r"which.*game.*highest.*twitch",
-            r"twitch.*most\s+viewed",
-            r"most\s+viewed.*twitch",
-            r"what.*most\s+viewed.*twitch",
-            r"which.*most\s+viewed.*twitch"
-        ],
-        "total_views": [
-            r"what.*game.*most.*total\s+views",
-            r"which.*game.*most.*total\s+views",
-            r"what.*game.*combined\s+views",
-            r"which.*game.*combined\s+views",
-            r"total.*views.*ranking",
-            r"combined.*views.*ranking",
-            r"most.*total\s+views",
-            r"highest.*total\s+views",
-            r"youtube.*and.*twitch.*views",
-            r"twitch.*and.*youtube.*views",
-            r"cross[- ]?platform.*views",
-            r"what.*most\s+views.*overall",
-            r"which.*most\s+views.*overall"
-        ],
-        "platform_comparison": [
-            r"compare.*youtube.*twitch",
-            r"compare.*twitch.*youtube",
-            r"youtube\s+vs\s+twitch",
-            r"twitch\s+vs\s+youtube",
-            r"platform.*comparison",
-            r"platform.*analytics",
-            r"compare.*platforms",
-            r"youtube.*or.*twitch",
-            r"twitch.*or.*youtube",
-            r"which\s+platform.*better",
-            r"what.*platform.*most",
-            r"cross[- ]?platform.*stats",
-            r"cross[- ]?platform.*comparison"
-        ],
-        "engagement_rate": [
-            r"what.*best.*engagement\s+rate",
-            r"which.*best.*engagement\s+rate",
-            r"what.*highest.*engagement",
-            r"which.*highest.*engagement",
-            r"engagement.*efficiency",
-            r"views\s+per\s+episode",
-            r"views\s+per\s+hour",
-            r"most\s+efficient.*game",
-            r"best.*engagement.*metrics",
-            r"optimal.*engagement",
-            r"engagement.*analysis",
-            r"what.*game.*most\s+engaging"
-        ]
-    }
+    if not _ANY_QUERY_PATTERN.search(lower_content):
+        return "unknown", None
 
     # Check each query type
-    for query_type, patterns in query_patterns.items():
+    for query_type, combined, patterns in _COMPILED_QUERY_PATTERNS:
+        if not combined.search(lower_content):
+            continue
         for pattern in patterns:
-            match = re.search(pattern, lower_content)
+            match = pattern.search(lower_content)
             if match:
                 return query_type, match
 
@@ -434,7 +456,7 @@ async def handle_trivia_reply(message: discord.Message) -> bool:
 
         # Check if there's an active trivia session
         try:
-            active_session = db.get_active_trivia_session()
+            active_session = await db.aio.get_active_trivia_session()
             if not active_session:
                 return False
 
@@ -454,9 +476,9 @@ async def handle_trivia_reply(message: discord.Message) -> bool:
             # Extract the user's answer
             user_answer = message.content.strip()
 
-            # Submit answer to database
+            # Queue answer for the next batched write
             try:
-                result = db.submit_trivia_answer(
+                result = await db.aio.queue_trivia_answer(
                     session_id=session_id,
                     user_id=message.author.id,
                     answer_text=user_answer
@@ -488,7 +510,7 @@ async def handle_trivia_reply(message: discord.Message) -> bool:
                         return True  # Still return True to prevent other processing
                 else:
                     # Invalid return type
-                    print(f"❌ TRIVIA REPLY: Invalid result type from submit_trivia_answer: {type(result)}")
+                    print(f"❌ TRIVIA REPLY: Invalid result type from queue_trivia_answer: {type(result)}")
                     return True
 
             except Exception as submit_error:
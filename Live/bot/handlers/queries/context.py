@@ -316,7 +316,7 @@ async def handle_context_aware_query(message: discord.Message) -> bool:
             elif follow_up_intent['intent'] == 'episode_followup':
                 if context.last_mentioned_game:
                     # Query for episode information
-                    game_data = db.get_played_game(
+                    game_data = await db.aio.get_played_game(
                         context.last_mentioned_game)  # type: ignore
                     if game_data:
                         episodes = game_data.get('total_episodes', 0)
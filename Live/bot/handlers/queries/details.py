@@ -208,7 +208,7 @@ async def handle_game_status_query(
             return False
 
     # Search for the game in PLAYED GAMES database
-    played_game = db.get_played_game(game_name)  # type: ignore
+    played_game = await db.aio.get_played_game(game_name)  # type: ignore
 
     if played_game:
         # Generate dynamic response using AI
@@ -292,7 +292,7 @@ async def handle_game_details_query(
             return True
 
     # Search for the game in PLAYED GAMES database
-    played_game = db.get_played_game(game_name)  # type: ignore
+    played_game = await db.aio.get_played_game(game_name)  # type: ignore
 
     if played_game:
         from ..ai_handler import call_ai_for_generation
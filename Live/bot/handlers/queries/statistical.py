@@ -117,7 +117,7 @@ async def handle_statistical_query(
 
             if answer:
                 # We need to fetch the full game data to get the episode count for the response
-                game_data = db.get_played_game(answer)
+                game_data = await db.aio.get_played_game(answer)
                 episodes = game_data.get('total_episodes',
                                          'an unknown number of') if game_data else 'an unknown number of'
 
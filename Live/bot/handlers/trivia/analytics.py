@@ -474,6 +474,8 @@ def calculate_dynamic_answer(db, dynamic_query_type: str, parameter: Optional[st
     except Exception as e:
         logger.error(f"Error calculating dynamic answer for {dynamic_query_type}: {e}")
         return None
+    finally:
+        conn.close()
 
 
 def get_recent_question_patterns(db, limit: int = 10) -> List[str]:
@@ -529,6 +531,8 @@ def get_recent_question_patterns(db, limit: int = 10) -> List[str]:
     except Exception as e:
         logger.error(f"Error getting recent question patterns: {e}")
         return []
+    finally:
+        conn.close()
 
 
 def should_avoid_pattern(pattern: str, recent_patterns: List[str], threshold: int = 3) -> bool:
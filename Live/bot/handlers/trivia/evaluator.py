@@ -10,91 +10,151 @@ from ...utils.text_processing import normalize_trivia_answer
 from ..ai_handler import _get_db, pacific_tz
 
 
+try:
+    from rapidfuzz.distance import Indel
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    Indel = None
+    RAPIDFUZZ_AVAILABLE = False
+
+# Lowest similarity evaluate_answer reports (Level 8); anything below scores 0.0
+_WEAK_SIMILARITY = 0.3
+
+
+class PreparedAnswer:
+    """
+    A question's correct answer with everything evaluate_answer derives from it
+    (lowercase and normalized forms, word set, numbers, SequenceMatcher state)
+    computed once, for scoring many submissions.
+
+    Scores are identical to the one-at-a-time evaluate_answer. Similarity is
+    still difflib's SequenceMatcher ratio, but it is skipped when a cheap upper
+    bound shows it would be below the weak-similarity floor: rapidfuzz's Indel
+    similarity when rapidfuzz is installed (an LCS ratio, which can never be
+    lower than SequenceMatcher's), otherwise SequenceMatcher.quick_ratio().
+    Repeated answers (everyone replying "B") are scored once.
+    """
+
+    def __init__(self, correct_answer: str, question_type: str,
+                 multiple_choice_options: Optional[List[str]] = None):
+        self.question_type = question_type
+        self.multiple_choice_options = multiple_choice_options
+
+        self.correct_clean = correct_answer.strip()
+        self.correct_lower = self.correct_clean.lower()
+        self.correct_normalized_lower = normalize_trivia_answer(self.correct_clean).lower()
+        self.correct_words = set(word.lower() for word in self.correct_clean.split())
+        self.multi_word = len(self.correct_clean.split()) > 1
+        self.correct_nums = _extract_numbers(self.correct_clean) if _contains_numbers(self.correct_clean) else None
+
+        # SequenceMatcher caches its analysis of seq2, so keep the correct answer there
+        self._matcher = difflib.SequenceMatcher(None)
+        self._matcher.set_seq2(self.correct_lower)
+        self._scores: Dict[str, Tuple[float, str]] = {}
+
+    def _similarity(self, user_lower: str) -> Optional[float]:
+        """SequenceMatcher ratio against the correct answer, or None if it is certainly below 0.3"""
+        if Indel is not None:
+            bound = Indel.normalized_similarity(user_lower, self.correct_lower)
+        else:
+            self._matcher.set_seq1(user_lower)
+            bound = self._matcher.quick_ratio()
+        # The margin keeps float rounding in the bound from skipping a ratio of exactly 0.3
+        if bound < _WEAK_SIMILARITY - 1e-9:
+            return None
+        self._matcher.set_seq1(user_lower)
+        return self._matcher.ratio()
+
+    def score(self, user_answer: str) -> Tuple[float, str]:
+        """Score one submission; see evaluate_answer."""
+        user_clean = user_answer.strip()
+
+        # Handle multiple choice letter mappings (A, B, C, D)
+        if self.question_type == 'multiple_choice' and self.multiple_choice_options:
+            match = re.match(r'^([a-dA-D])[\.\)]?$', user_clean)
+            if match:
+                index = ord(match.group(1).upper()) - ord('A')
+                if 0 <= index < len(self.multiple_choice_options):
+                    user_clean = self.multiple_choice_options[index].strip()
+
+        cached = self._scores.get(user_clean)
+        if cached is None:
+            cached = self._scores[user_clean] = self._score_clean(user_clean)
+        return cached
+
+    def _score_clean(self, user_clean: str) -> Tuple[float, str]:
+        user_lower = user_clean.lower()
+
+        # Level 1: Exact match (case-insensitive)
+        if user_lower == self.correct_lower:
+            return 1.0, "exact_case_insensitive"
+
+        # Level 2: Normalized exact match
+        if normalize_trivia_answer(user_clean).lower() == self.correct_normalized_lower:
+            return 1.0, "normalized_exact"
+
+        # Level 3/4: Fuzzy string matching (correct, then close)
+        similarity_exact = self._similarity(user_lower)
+        if similarity_exact is not None:
+            if similarity_exact >= 0.9:
+                return 1.0, "fuzzy_high"
+            if similarity_exact >= 0.7:
+                return 0.8, "fuzzy_close"
+
+        # Level 5: Word-based matching for multi-word answers
+        if self.multi_word and self.correct_words:
+            answer_words = set(word.lower() for word in user_clean.split())
+            overlap_ratio = len(self.correct_words.intersection(answer_words)) / len(self.correct_words)
+            if overlap_ratio >= 0.8:
+                return 1.0, "word_overlap_high"
+            elif overlap_ratio >= 0.6:
+                return 0.75, "word_overlap_medium"
+
+        # Level 6: Handle numerical/time answers
+        if self.correct_nums is not None and _contains_numbers(user_clean):
+            answer_nums = _extract_numbers(user_clean)
+            for c_num in self.correct_nums:
+                for a_num in answer_nums:
+                    tolerance = max(1, c_num * 0.05) if c_num > 20 else 0
+                    if abs(c_num - a_num) <= tolerance:
+                        if abs(c_num - a_num) == 0:
+                            return 1.0, "numerical_exact"
+                        else:
+                            return 0.8, "numerical_close"
+
+        # Level 7: Common abbreviations and variations
+        if _check_abbreviation_match(user_clean, self.correct_clean):
+            return 1.0, "abbreviation_match"
+
+        # Level 8: Weak similarity for debugging
+        if similarity_exact is not None and similarity_exact >= _WEAK_SIMILARITY:
+            return similarity_exact, "weak_similarity"
+
+        return 0.0, "no_match"
+
+
+def evaluate_answers(user_answers: List[str], correct_answer: str, question_type: str,
+                     multiple_choice_options: Optional[List[str]] = None) -> List[Tuple[float, str]]:
+    """
+    Evaluate all of a session's answers in one pass.
+    Returns: [(score, match_type), ...] in the same order, identical to evaluate_answer per answer
+    """
+    prepared = PreparedAnswer(correct_answer, question_type, multiple_choice_options)
+    return [prepared.score(answer) for answer in user_answers]
+
+
 def evaluate_answer(user_answer: str, correct_answer: str, question_type: str,
                     multiple_choice_options: Optional[List[str]] = None) -> Tuple[float, str]:
     """
     Evaluate a trivia answer with enhanced fuzzy matching.
     Returns: (score, match_type) where score is 0.0-1.0
-    """
-    import difflib
-
-    # Clean up inputs
-    user_clean = user_answer.strip()
-    correct_clean = correct_answer.strip()
-
-    # Handle multiple choice letter mappings (A, B, C, D)
-    if question_type == 'multiple_choice' and multiple_choice_options:
-        import re
-
-        # Check if the user answer is exactly a letter A-D (case insensitive), with optional period/parenthesis
-        match = re.match(r'^([a-dA-D])[\.\)]?$', user_clean)
-        if match:
-            letter = match.group(1).upper()
-            index = ord(letter) - ord('A')
-            if 0 <= index < len(multiple_choice_options):
-                # Replace user's letter guess with the actual full text from the options
-                user_clean = multiple_choice_options[index].strip()
-
-    # Normalize answers for better matching
-    user_normalized = normalize_trivia_answer(user_clean)
-    correct_normalized = normalize_trivia_answer(correct_clean)
-
-    # Level 1: Exact match (case-insensitive)
-    if user_clean.lower() == correct_clean.lower():
-        return 1.0, "exact_case_insensitive"
-
-    # Level 2: Normalized exact match
-    if user_normalized.lower() == correct_normalized.lower():
-        return 1.0, "normalized_exact"
-
-    # Level 3: Fuzzy string matching with high threshold (correct answers)
-    similarity_exact = difflib.SequenceMatcher(None, user_clean.lower(), correct_clean.lower()).ratio()
-    if similarity_exact >= 0.9:  # 90% similarity = correct
-        return 1.0, "fuzzy_high"
-
-    # Level 4: Close matches (partial credit)
-    if similarity_exact >= 0.7:  # 70-89% similarity = close
-        return 0.8, "fuzzy_close"
-
-    # Level 5: Word-based matching for multi-word answers
-    if len(correct_clean.split()) > 1:
-        correct_words = set(word.lower() for word in correct_clean.split())
-        answer_words = set(word.lower() for word in user_clean.split())
-
-        # Calculate word overlap
-        if len(correct_words) > 0:
-            overlap_ratio = len(correct_words.intersection(answer_words)) / len(correct_words)
-
-            if overlap_ratio >= 0.8:  # 80% word overlap = correct
-                return 1.0, "word_overlap_high"
-            elif overlap_ratio >= 0.6:  # 60% word overlap = close
-                return 0.75, "word_overlap_medium"
 
-    # Level 6: Handle numerical/time answers
-    if _contains_numbers(correct_clean) and _contains_numbers(user_clean):
-        correct_nums = _extract_numbers(correct_clean)
-        answer_nums = _extract_numbers(user_clean)
-
-        # Check for numerical matches with tolerance
-        for c_num in correct_nums:
-            for a_num in answer_nums:
-                # Within 5% tolerance for large numbers, exact for small numbers
-                tolerance = max(1, c_num * 0.05) if c_num > 20 else 0
-                if abs(c_num - a_num) <= tolerance:
-                    if abs(c_num - a_num) == 0:
-                        return 1.0, "numerical_exact"
-                    else:
-                        return 0.8, "numerical_close"
-
-    # Level 7: Common abbreviations and variations
-    if _check_abbreviation_match(user_clean, correct_clean):
-        return 1.0, "abbreviation_match"
-
-    # Level 8: Weak similarity for debugging
-    if similarity_exact >= 0.3:
-        return similarity_exact, "weak_similarity"
-
-    return 0.0, "no_match"
+    Levels, in order: exact (case-insensitive), normalized exact, fuzzy
+    (>= 0.9 correct, >= 0.7 close), word overlap for multi-word answers,
+    numbers within tolerance, colour abbreviations, weak similarity (>= 0.3).
+    Use evaluate_answers to score a whole session.
+    """
+    return PreparedAnswer(correct_answer, question_type, multiple_choice_options).score(user_answer)
 
 
 def _normalize_answer_for_matching(answer: str) -> str:
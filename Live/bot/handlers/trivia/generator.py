@@ -59,7 +59,7 @@ async def generate_ai_trivia_question(context: str = "trivia",
         # Fetch recently generated questions from the database to avoid repetition across manual triggers
         avoid_clips = []
         try:
-            with current_db.get_connection().cursor() as cur:
+            with current_db.checkout() as conn, conn.cursor() as cur:
                 cur.execute("SELECT question_text, dynamic_query_type FROM trivia_questions ORDER BY id DESC LIMIT 20")
                 rows = cur.fetchall()
                 for row in rows:
@@ -896,8 +896,8 @@ Each object in the JSON array MUST follow this exact format:
                     else:
                         raw_questions = []
 
-            # Validate and filter generated questions
-            valid_questions = []
+            # Keep well-formed candidates only
+            candidates = []
             for q_data in raw_questions:
                 if not q_data or not all(
                     key in q_data for key in ["question_text", "question_type", "correct_answer"]
@@ -910,16 +910,24 @@ Each object in the JSON array MUST follow this exact format:
                         print(f"⚠️ TRIVIA DIRECTOR: Discarding multiple_choice question missing decoys")
                         continue
 
-                # Check for duplicates before accepting
-                duplicate_info = current_db.check_question_duplicate(
-                    q_data["question_text"],  # type: ignore
-                    similarity_threshold=0.8
-                )
+                candidates.append(q_data)
+
+            # Check all candidates for duplicates in one pass
+            duplicate_results = current_db.check_question_duplicates_batch(
+                [(q_data["question_text"], None) for q_data in candidates],  # type: ignore
+                similarity_threshold=0.8
+            )
 
+            # Filter out duplicates
+            valid_questions = []
+            for q_data, duplicate_info in zip(candidates, duplicate_results):
+                # Skip duplicates before accepting
                 if duplicate_info:
+                    duplicate_of = (f"question #{duplicate_info['duplicate_id']}" if duplicate_info['duplicate_id']
+                                    else "another question in this batch")
                     print(
                         f"🔍 TRIVIA DIRECTOR: Duplicate detected: "
-                        f"{duplicate_info['similarity_score']:.2f} similarity to question #{duplicate_info['duplicate_id']}")
+                        f"{duplicate_info['similarity_score']:.2f} similarity to {duplicate_of}")
                     continue  # Skip this specific duplicate
 
                 # Add metadata
@@ -1073,6 +1081,19 @@ Generate diverse, engaging questions about Jonesy's gaming journey."""
         duplicate_count = 0
         error_count = 0
 
+        # Check every well-formed candidate for duplicates in one pass,
+        # including against earlier questions in this batch
+        candidate_indexes = [
+            idx for idx, question_data in enumerate(questions_array)
+            if isinstance(question_data, dict)
+            and all(key in question_data for key in ["question_text", "question_type", "correct_answer"])
+            and question_data.get("question_text") and question_data.get("correct_answer")
+        ]
+        duplicate_results = dict(zip(candidate_indexes, current_db.check_question_duplicates_batch(
+            [(questions_array[idx]["question_text"], None) for idx in candidate_indexes],
+            similarity_threshold=0.8
+        )))
+
         for idx, question_data in enumerate(questions_array):
             try:
                 # Type check: must be a dict
@@ -1100,10 +1121,7 @@ Generate diverse, engaging questions about Jonesy's gaming journey."""
                     continue
 
                 # Check for duplicates
-                duplicate_info = current_db.check_question_duplicate(
-                    question_text,
-                    similarity_threshold=0.8
-                )
+                duplicate_info = duplicate_results.get(idx)
 
                 if duplicate_info:
                     print(
@@ -0,0 +1,309 @@
+"""
+Shared HTTP Client Module
+
+Provides one pooled aiohttp session per upstream service (Twitch, IGDB,
+YouTube) so requests reuse keep-alive connections instead of paying a new
+TCP+TLS handshake per call, plus a shared OAuth token cache and an async
+token-bucket rate limiter for upstreams with request quotas.
+
+Usage:
+    from .http_client import http_session, get_twitch_app_token
+
+    async with http_session("youtube") as session:
+        async with session.get(url, params=params) as response:
+            ...
+
+    token = await get_twitch_app_token(client_id, client_secret)
+
+The session is owned by the client manager; leaving the `async with` block
+does not close it. Call close_http_client() on shutdown (wired into bot close).
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+TWITCH_OAUTH_TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+
+# Maximum concurrent connections per host for each upstream.
+# IGDB rejects more than 8 open requests per client.
+UPSTREAM_LIMITS = {
+    "twitch": 8,
+    "igdb": 8,
+    "youtube": 10,
+    "default": 4
+}
+
+TokenFetcher = Callable[[], Awaitable[Optional[Tuple[str, float]]]]
+
+
+class TokenCache:
+    """
+    OAuth token cache shared by all integrations.
+
+    Tokens are reused until shortly before they expire. Concurrent callers
+    for the same key wait on a single fetch instead of each requesting a token.
+    """
+
+    def __init__(self, refresh_margin_seconds: float = 300.0):
+        """
+        Initialize the token cache.
+
+        Args:
+            refresh_margin_seconds: Refresh tokens this long before they expire
+        """
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+        self.stats = {
+            "hits": 0,
+            "fetches": 0,
+            "failures": 0
+        }
+
+    def _cached(self, key: str) -> Optional[str]:
+        cached = self._tokens.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        return None
+
+    async def get(self, key: str, fetcher: TokenFetcher) -> Optional[str]:
+        """
+        Return a cached token or fetch a new one.
+
+        Args:
+            key: Cache key (e.g. "twitch:<client_id>")
+            fetcher: Coroutine function returning (token, expires_in_seconds) or None
+
+        Returns:
+            Access token, or None if it could not be fetched
+        """
+        token = self._cached(key)
+        if token:
+            self.stats["hits"] += 1
+            return token
+
+        # asyncio locks are bound to the loop they are used on
+        lock_key = (id(asyncio.get_running_loop()), key)
+        lock = self._locks.setdefault(lock_key, asyncio.Lock())
+        async with lock:
+            token = self._cached(key)
+            if token:
+                self.stats["hits"] += 1
+                return token
+
+            result = await fetcher()
+            if not result:
+                self.stats["failures"] += 1
+                return None
+
+            token, expires_in = result
+            self._tokens[key] = (token, time.monotonic() + max(0.0, expires_in - self.refresh_margin_seconds))
+            self.stats["fetches"] += 1
+            return token
+
+    def invalidate(self, key: str):
+        """Drop a token (e.g. after the API rejected it with 401)."""
+        self._tokens.pop(key, None)
+
+    def clear(self):
+        self._tokens.clear()
+        self._locks.clear()
+
+
+class AsyncTokenBucket:
+    """
+    Token-bucket rate limiter for asyncio tasks.
+
+    Allows bursts of up to `capacity` requests, refilling at `rate` tokens per
+    second. Each acquire reserves a token synchronously (the bucket may go
+    negative), then sleeps until that token is due, so concurrent callers are
+    spaced correctly without a lock.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second (sustained request rate)
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self.stats = {
+            "acquired": 0,
+            "waited": 0,
+            "total_wait_seconds": 0.0
+        }
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        wait_seconds = self._reserve()
+        self.stats["acquired"] += 1
+        if wait_seconds > 0:
+            self.stats["waited"] += 1
+            self.stats["total_wait_seconds"] += wait_seconds
+            await asyncio.sleep(wait_seconds)
+
+
+class HTTPClientManager:
+    """
+    Owns one keep-alive aiohttp session per upstream service.
+
+    Sessions are created lazily on first use and recreated if they were
+    closed or belong to a different event loop.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, timeout_seconds: float = 60.0,
+                 keepalive_timeout: float = 60.0):
+        """
+        Initialize the client manager.
+
+        Args:
+            limits: Per-host connection limits by upstream (defaults to UPSTREAM_LIMITS)
+            timeout_seconds: Default total timeout per request
+            keepalive_timeout: Seconds an idle connection is kept open for reuse
+        """
+        self.limits = dict(UPSTREAM_LIMITS)
+        if limits:
+            self.limits.update(limits)
+        self.timeout_seconds = timeout_seconds
+        self.keepalive_timeout = keepalive_timeout
+        self.tokens = TokenCache()
+        self._sessions: Dict[str, Tuple[aiohttp.ClientSession, asyncio.AbstractEventLoop]] = {}
+        self.stats = {
+            "sessions_created": 0,
+            "leases": 0
+        }
+
+    def session(self, upstream: str) -> aiohttp.ClientSession:
+        """
+        Get the pooled session for an upstream (must be called from a running loop).
+
+        Args:
+            upstream: Upstream name ("twitch", "igdb", "youtube", ...)
+        """
+        loop = asyncio.get_running_loop()
+        existing = self._sessions.get(upstream)
+        if existing is not None:
+            session, session_loop = existing
+            if not session.closed and session_loop is loop:
+                self.stats["leases"] += 1
+                return session
+            if not session.closed:
+                logger.debug(f"Discarding {upstream} HTTP session from a previous event loop")
+
+        limit_per_host = self.limits.get(upstream, self.limits["default"])
+        connector = aiohttp.TCPConnector(
+            limit=limit_per_host * 4,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout_seconds)
+        )
+        self._sessions[upstream] = (session, loop)
+        self.stats["sessions_created"] += 1
+        self.stats["leases"] += 1
+        return session
+
+    async def close(self):
+        """Close every session owned by the manager on the current loop."""
+        loop = asyncio.get_running_loop()
+        sessions = self._sessions
+        self._sessions = {}
+        for upstream, (session, session_loop) in sessions.items():
+            if session.closed or session_loop is not loop:
+                continue
+            try:
+                await session.close()
+            except Exception as e:
+                logger.warning(f"Error closing {upstream} HTTP session: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "open_sessions": sorted(name for name, (s, _) in self._sessions.items() if not s.closed),
+            **self.stats,
+            "tokens": dict(self.tokens.stats)
+        }
+
+
+# Global client instance
+_http_client: Optional[HTTPClientManager] = None
+
+
+def get_http_client() -> HTTPClientManager:
+    """Get or create the global HTTP client manager"""
+    global _http_client
+    if _http_client is None:
+        _http_client = HTTPClientManager()
+    return _http_client
+
+
+@asynccontextmanager
+async def http_session(upstream: str) -> AsyncIterator[aiohttp.ClientSession]:
+    """Borrow the pooled session for an upstream; the session stays open afterwards."""
+    yield get_http_client().session(upstream)
+
+
+async def close_http_client():
+    """Close all pooled sessions (called from bot shutdown)."""
+    if _http_client is not None:
+        await _http_client.close()
+
+
+async def get_twitch_app_token(client_id: str, client_secret: str) -> Optional[str]:
+    """
+    Get a Twitch app access token (also used by IGDB), cached until expiry.
+
+    Args:
+        client_id: Twitch/IGDB client ID
+        client_secret: Twitch/IGDB client secret
+
+    Returns:
+        Access token, or None on failure
+    """
+    async def fetch_token() -> Optional[Tuple[str, float]]:
+        try:
+            async with http_session("twitch") as session:
+                async with session.post(
+                    TWITCH_OAUTH_TOKEN_URL,
+                    params={
+                        'client_id': client_id,
+                        'client_secret': client_secret,
+                        'grant_type': 'client_credentials'
+                    }
+                ) as response:
+                    if response.status != 200:
+                        print(f"❌ Failed to get Twitch app token: {response.status}")
+                        return None
+                    data = await response.json()
+                    return data['access_token'], float(data.get('expires_in', 3600))
+        except Exception as e:
+            print(f"❌ Error getting Twitch app token: {e}")
+            return None
+
+    return await get_http_client().tokens.get(f"twitch:{client_id}", fetch_token)
+
+
+def invalidate_twitch_app_token(client_id: str):
+    """Forget a cached Twitch app token so the next call fetches a new one."""
+    get_http_client().tokens.invalidate(f"twitch:{client_id}")
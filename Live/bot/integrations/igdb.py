@@ -5,28 +5,41 @@ Provides lightweight game validation and metadata enrichment using the IGDB API.
 Uses Twitch OAuth for authentication (IGDB is owned by Twitch).
 
 Focus: Validate extracted game names and enrich existing database fields only.
+
+Requests share a token-bucket limiter (4 req/sec with a small burst).
+validate_and_enrich_many resolves many titles at once through IGDB's
+multi-query endpoint (10 searches per request) with bounded concurrency.
+
+Results (including "no match") are cached by normalized title in a bounded
+LRU backed by the igdb_cache table (see igdb_cache.py). Failed requests
+(auth errors, 429/5xx, timeouts) come back as errors and are never cached
+as "no match"; warm_cache_from_played_games
+prefetches every played game so bulk re-runs are mostly cache hits.
 """
 
 import asyncio
 import os
 import re
-from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-import aiohttp
+from .http_client import AsyncTokenBucket, get_twitch_app_token, http_session, invalidate_twitch_app_token
+from .igdb_cache import create_enrichment_cache
+
+# Cache to avoid redundant API calls (persisted across restarts)
+_enrichment_cache = create_enrichment_cache()
 
-# Cache to avoid redundant API calls
-_igdb_cache: Dict[str, Dict[str, Any]] = {}
-_cache_expiry: Dict[str, datetime] = {}
-CACHE_DURATION = timedelta(hours=24)
+IGDB_GAMES_URL = 'https://api.igdb.com/v4/games'
+IGDB_MULTIQUERY_URL = 'https://api.igdb.com/v4/multiquery'
+IGDB_SEARCH_FIELDS = 'name,alternative_names.name,franchises.name,genres.name,release_dates.y,cover.url'
+MULTIQUERY_BATCH_SIZE = 10  # IGDB accepts up to 10 queries per multi-query request
+MAX_CONCURRENT_REQUESTS = 4  # IGDB allows 8 open requests; stay well under it
 
 # Rate limiting: IGDB allows 4 requests per second
-_last_request_time = datetime.now()
-_request_interval = 0.25  # 250ms between requests = 4 req/sec
+_rate_limiter = AsyncTokenBucket(rate=4.0, capacity=4)
 
 
 async def get_igdb_access_token() -> Optional[str]:
-    """Get OAuth access token for IGDB API using Twitch credentials"""
+    """Get OAuth access token for IGDB API using Twitch credentials (cached until expiry)"""
     client_id = os.getenv('IGDB_CLIENT_ID') or os.getenv('TWITCH_CLIENT_ID')
     client_secret = os.getenv('IGDB_CLIENT_SECRET') or os.getenv(
         'IGDB_TWITCH_SECRET') or os.getenv('TWITCH_CLIENT_SECRET')
@@ -35,98 +48,140 @@ async def get_igdb_access_token() -> Optional[str]:
         print("⚠️ IGDB credentials not configured")
         return None
 
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                'https://id.twitch.tv/oauth2/token',
-                params={
-                    'client_id': client_id,
-                    'client_secret': client_secret,
-                    'grant_type': 'client_credentials'
-                }
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('access_token')
-                else:
-                    print(f"❌ Failed to get IGDB token: {response.status}")
-                    return None
-    except Exception as e:
-        print(f"❌ Error getting IGDB token: {e}")
-        return None
+    return await get_twitch_app_token(client_id, client_secret)
 
 
 async def _rate_limit():
-    """Ensure we don't exceed IGDB rate limit (4 req/sec)"""
-    global _last_request_time
-    now = datetime.now()
-    time_since_last = (now - _last_request_time).total_seconds()
-
-    if time_since_last < _request_interval:
-        await asyncio.sleep(_request_interval - time_since_last)
+    """Ensure we don't exceed IGDB rate limit (4 req/sec), safe for concurrent callers"""
+    await _rate_limiter.acquire()
 
-    _last_request_time = datetime.now()
 
-
-async def search_igdb(game_name: str, access_token: str) -> List[Dict[str, Any]]:
-    """Search IGDB for a game by name"""
+async def search_igdb(game_name: str, access_token: str) -> Optional[List[Dict[str, Any]]]:
+    """Search IGDB for a game by name (None if the request failed)"""
     await _rate_limit()
 
     client_id = os.getenv('IGDB_CLIENT_ID') or os.getenv('TWITCH_CLIENT_ID')
 
     if not client_id:
         print("⚠️ IGDB Client ID not configured")
-        return []
+        return None
 
     try:
         # Escape double quotes to prevent query injection
         game_name_escaped = game_name.replace('"', '\\"')
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session("igdb") as session:
             # IGDB uses Twitch API-like syntax with POST and body query
             async with session.post(
-                'https://api.igdb.com/v4/games',
+                IGDB_GAMES_URL,
                 headers={
                     'Client-ID': client_id,
                     'Authorization': f'Bearer {access_token}'
                 },
-                data=f'search "{game_name_escaped}"; fields name,alternative_names.name,franchises.name,genres.name,release_dates.y,cover.url; limit 5;'
+                data=f'search "{game_name_escaped}"; fields {IGDB_SEARCH_FIELDS}; limit 5;'
             ) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
+                    if response.status == 401:
+                        # Token revoked or expired early; fetch a fresh one next time
+                        invalidate_twitch_app_token(client_id)
                     print(f"⚠️ IGDB search failed: {response.status}")
-                    return []
+                    return None
     except Exception as e:
         print(f"❌ Error searching IGDB: {e}")
-        return []
+        return None
 
 
-async def validate_and_enrich(game_name: str) -> Dict[str, Any]:
+async def search_igdb_many(game_names: List[str], access_token: str) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Validate a game name against IGDB and return enrichment data.
+    Search IGDB for several names using the multi-query endpoint.
+
+    Names are sent MULTIQUERY_BATCH_SIZE per request, with up to
+    MAX_CONCURRENT_REQUESTS requests in flight under the shared rate limiter.
 
     Returns:
-        Dict with canonical_name, alternative_names, genre, series_name,
-        release_year, igdb_id, and confidence score.
+        Dict mapping each searched name to its results (missing if the request failed)
     """
-    # Check cache first
-    cache_key = game_name.lower().strip()
-    if cache_key in _igdb_cache:
-        if datetime.now() - _cache_expiry.get(cache_key, datetime.min) < CACHE_DURATION:
-            print(f"💾 IGDB cache hit: {game_name}")
-            return _igdb_cache[cache_key]
+    client_id = os.getenv('IGDB_CLIENT_ID') or os.getenv('TWITCH_CLIENT_ID')
 
-    # Get access token
-    access_token = await get_igdb_access_token()
-    if not access_token:
-        return {
-            'canonical_name': game_name,
-            'confidence': 0.0,
-            'error': 'No IGDB access token'
-        }
+    if not client_id:
+        print("⚠️ IGDB Client ID not configured")
+        return {}
 
-    # Try multiple search variants for better matching
+    unique_names = list(dict.fromkeys(game_names))
+    batches = [unique_names[i:i + MULTIQUERY_BATCH_SIZE] for i in range(0, len(unique_names), MULTIQUERY_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def run_batch(batch: List[str]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        async with semaphore:
+            return await _multiquery(batch, client_id, access_token)
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for batch_results in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+        # A failed batch leaves its names out, so callers can tell it from "no results"
+        if batch_results is not None:
+            results.update(batch_results)
+    return results
+
+
+async def _multiquery(game_names: List[str], client_id: str,
+                      access_token: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """Run one multi-query request; each search is named by its index in game_names (None if it failed)"""
+    await _rate_limit()
+
+    queries = []
+    for index, game_name in enumerate(game_names):
+        # Escape double quotes to prevent query injection
+        game_name_escaped = game_name.replace('"', '\\"')
+        queries.append(
+            f'query games "{index}" {{ search "{game_name_escaped}"; fields {IGDB_SEARCH_FIELDS}; limit 5; }};')
+
+    try:
+        async with http_session("igdb") as session:
+            async with session.post(
+                IGDB_MULTIQUERY_URL,
+                headers={
+                    'Client-ID': client_id,
+                    'Authorization': f'Bearer {access_token}'
+                },
+                data='\n'.join(queries)
+            ) as response:
+                if response.status != 200:
+                    if response.status == 401:
+                        invalidate_twitch_app_token(client_id)
+                    print(f"⚠️ IGDB multi-query failed: {response.status}")
+                    return None
+                data = await response.json()
+    except Exception as e:
+        print(f"❌ Error running IGDB multi-query: {e}")
+        return None
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in data or []:
+        try:
+            index = int(entry.get('name'))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(game_names):
+            results[game_names[index]] = entry.get('result') or []
+    return results
+
+
+def _get_cached_enrichment(game_name: str) -> Optional[Dict[str, Any]]:
+    """Return a cached enrichment result if it has not expired"""
+    cached = _enrichment_cache.get(normalize_title(game_name), game_name)
+    if cached is None:
+        return None
+    print(f"💾 IGDB cache hit: {game_name}")
+    if not cached.get('match_found'):
+        return dict(cached, canonical_name=game_name)
+    # Same key can be reached by another spelling ("GTA V"), so score against this one
+    return dict(cached, confidence=calculate_confidence(game_name, cached['canonical_name']))
+
+
+def _search_variants(game_name: str) -> List[str]:
+    """Search terms to try in order until one returns results"""
     search_variants = [game_name]
 
     # If name has colon, try without colon (e.g., "HITMAN: World" → "HITMAN World")
@@ -141,20 +196,137 @@ async def validate_and_enrich(game_name: str) -> Dict[str, Any]:
         with_colon = re.sub(r'\s+(World of)', r': \1', game_name, count=1, flags=re.IGNORECASE)
         search_variants.append(with_colon)
 
+    return search_variants
+
+
+async def validate_and_enrich(game_name: str) -> Dict[str, Any]:
+    """
+    Validate a game name against IGDB and return enrichment data.
+
+    Returns:
+        Dict with canonical_name, alternative_names, genre, series_name,
+        release_year, igdb_id, and confidence score.
+    """
+    # Check cache first
+    await _enrichment_cache.ensure_loaded()
+    cached = _get_cached_enrichment(game_name)
+    if cached is not None:
+        return cached
+
+    # Get access token
+    access_token = await get_igdb_access_token()
+    if not access_token:
+        return {
+            'canonical_name': game_name,
+            'confidence': 0.0,
+            'error': 'No IGDB access token'
+        }
+
+    # Try multiple search variants for better matching
     results = []
-    for variant in search_variants:
+    for variant in _search_variants(game_name):
         # Search IGDB
         variant_results = await search_igdb(variant, access_token)
+        if variant_results is None:
+            # Request failed: report it rather than caching a "no match"
+            return _request_failed(game_name)
         if variant_results:
             results.extend(variant_results)
             break  # Found results, no need to try more variants
 
+    enrichment = _build_enrichment(game_name, results)
+    await _enrichment_cache.flush()
+    return enrichment
+
+
+async def validate_and_enrich_many(game_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Validate and enrich several game names concurrently.
+
+    Uncached names are searched with IGDB multi-queries, one round per search
+    variant, so 50 titles take a handful of requests instead of 50+ serial
+    ones. Each result is the same as validate_and_enrich would return.
+
+    Returns:
+        Dict mapping each input name to its enrichment data
+    """
+    await _enrichment_cache.ensure_loaded()
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = []
+    for game_name in dict.fromkeys(game_names):
+        cached = _get_cached_enrichment(game_name)
+        if cached is not None:
+            results[game_name] = cached
+        else:
+            pending.append(game_name)
+
+    if not pending:
+        return results
+
+    access_token = await get_igdb_access_token()
+    if not access_token:
+        for game_name in pending:
+            results[game_name] = {
+                'canonical_name': game_name,
+                'confidence': 0.0,
+                'error': 'No IGDB access token'
+            }
+        return results
+
+    variants = {game_name: _search_variants(game_name) for game_name in pending}
+    search_results: Dict[str, List[Dict[str, Any]]] = {game_name: [] for game_name in pending}
+    failed = set()
+
+    # Round N searches the Nth variant of every name that has no results yet
+    remaining = pending
+    round_index = 0
+    while remaining:
+        found = await search_igdb_many([variants[name][round_index] for name in remaining], access_token)
+        still_missing = []
+        for game_name in remaining:
+            variant = variants[game_name][round_index]
+            if variant not in found:
+                # The request for this name failed; don't try later variants or record "no match"
+                failed.add(game_name)
+                continue
+            variant_results = found[variant]
+            if variant_results:
+                search_results[game_name] = variant_results
+            elif round_index + 1 < len(variants[game_name]):
+                still_missing.append(game_name)
+        remaining = still_missing
+        round_index += 1
+
+    for game_name in pending:
+        if game_name in failed:
+            results[game_name] = _request_failed(game_name)
+        else:
+            results[game_name] = _build_enrichment(game_name, search_results[game_name])
+    await _enrichment_cache.flush()
+    return results
+
+
+def _request_failed(game_name: str) -> Dict[str, Any]:
+    """Enrichment result for a failed IGDB request (never cached)"""
+    return {
+        'canonical_name': game_name,
+        'confidence': 0.0,
+        'error': 'IGDB request failed'
+    }
+
+
+def _build_enrichment(game_name: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Pick the best IGDB result for a name and turn it into enrichment data (cached)"""
+    cache_key = normalize_title(game_name)
+
     if not results:
-        return {
+        enrichment = {
             'canonical_name': game_name,
             'confidence': 0.0,
             'match_found': False
         }
+        _enrichment_cache.put(cache_key, game_name, enrichment)
+        return enrichment
 
     # Find best match from results (don't just take first)
     best_match = None
@@ -195,11 +367,13 @@ async def validate_and_enrich(game_name: str) -> Dict[str, Any]:
     # If no decent match found, return no match
     if best_match is None or best_confidence < 0.3:
         print(f"⚠️ IGDB: No acceptable match for '{game_name}' (best confidence: {best_confidence:.2f})")
-        return {
+        enrichment = {
             'canonical_name': game_name,
             'confidence': best_confidence,
             'match_found': False
         }
+        _enrichment_cache.put(cache_key, game_name, enrichment)
+        return enrichment
 
     # Use best match
     igdb_name = best_match.get('name', '')
@@ -246,14 +420,67 @@ async def validate_and_enrich(game_name: str) -> Dict[str, Any]:
             enrichment['release_year'] = year
 
     # Cache the result
-    _igdb_cache[cache_key] = enrichment
-    _cache_expiry[cache_key] = datetime.now()
+    _enrichment_cache.put(cache_key, game_name, enrichment)
 
     print(f"✅ IGDB: {game_name} → {igdb_name} (confidence: {confidence:.2f})")
 
     return enrichment
 
 
+# Gaming abbreviation mapping
+GAME_ABBREVIATIONS = {
+    'gta': 'grand theft auto',
+    'cod': 'call of duty',
+    'tlou': 'the last of us',
+    'rdr': 'red dead redemption',
+    'mgs': 'metal gear solid',
+    'ffvii': 'final fantasy vii',
+    'ffxv': 'final fantasy xv',
+    'rottr': 'rise of the tomb raider',
+    'sottr': 'shadow of the tomb raider',
+}
+
+# Roman numeral to Arabic number mapping
+ROMAN_TO_ARABIC = {
+    'i': '1', 'ii': '2', 'iii': '3', 'iv': '4', 'v': '5',
+    'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9', 'x': '10'
+}
+
+
+def _remove_articles(text: str) -> str:
+    """Remove common articles (the, a, an) for comparison"""
+    # Remove articles at the beginning
+    text = re.sub(r'^\s*(the|a|an)\s+', '', text, flags=re.IGNORECASE)
+    # Remove articles after colons (e.g., "Game: The Subtitle")
+    text = re.sub(r':\s*(the|a|an)\s+', ': ', text, flags=re.IGNORECASE)
+    return text.strip()
+
+
+def _expand_abbreviations(text: str) -> str:
+    for abbr, full in GAME_ABBREVIATIONS.items():
+        # Match word boundaries to avoid partial matches
+        text = re.sub(r'\b' + re.escape(abbr) + r'\b', full, text)
+    return text
+
+
+def _normalize_numbers(text: str) -> str:
+    # Replace Roman numerals at word boundaries
+    for roman, arabic in ROMAN_TO_ARABIC.items():
+        text = re.sub(r'\b' + roman + r'\b', arabic, text)
+    return text
+
+
+def normalize_title(name: str) -> str:
+    """
+    Normalize a game title the way calculate_confidence compares names
+    (abbreviations expanded, Roman numerals converted, articles removed).
+
+    Edition suffixes are kept: a remake or remaster has its own IGDB entry.
+    """
+    text = _remove_articles(_normalize_numbers(_expand_abbreviations(name.lower().strip())))
+    return ' '.join(text.split())
+
+
 def calculate_confidence(extracted_name: str, igdb_name: str) -> float:
     """
     Calculate confidence score for name match with gaming-specific rules.
@@ -282,58 +509,17 @@ def calculate_confidence(extracted_name: str, igdb_name: str) -> float:
     if igdb_lower.endswith(extracted_lower):
         return 0.85
 
-    # Function to remove articles for comparison
-    def remove_articles(text):
-        """Remove common articles (the, a, an) for comparison"""
-        # Remove articles at the beginning
-        text = re.sub(r'^\s*(the|a|an)\s+', '', text, flags=re.IGNORECASE)
-        # Remove articles after colons (e.g., "Game: The Subtitle")
-        text = re.sub(r':\s*(the|a|an)\s+', ': ', text, flags=re.IGNORECASE)
-        return text.strip()
-
     # Check match without articles (handles "Cronos: A New Dawn" vs "Cronos: The New Dawn")
-    extracted_no_articles = remove_articles(extracted_lower)
-    igdb_no_articles = remove_articles(igdb_lower)
+    extracted_no_articles = _remove_articles(extracted_lower)
+    igdb_no_articles = _remove_articles(igdb_lower)
 
     if extracted_no_articles == igdb_no_articles:
         return 0.95  # Very high confidence - only difference is articles
 
-    # Gaming abbreviation mapping
-    abbreviations = {
-        'gta': 'grand theft auto',
-        'cod': 'call of duty',
-        'tlou': 'the last of us',
-        'rdr': 'red dead redemption',
-        'mgs': 'metal gear solid',
-        'ffvii': 'final fantasy vii',
-        'ffxv': 'final fantasy xv',
-        'rottr': 'rise of the tomb raider',
-        'sottr': 'shadow of the tomb raider',
-    }
-
-    # Expand abbreviations in extracted name
-    expanded_extracted = extracted_lower
-    for abbr, full in abbreviations.items():
-        # Match word boundaries to avoid partial matches
-        pattern = r'\b' + re.escape(abbr) + r'\b'
-        expanded_extracted = re.sub(pattern, full, expanded_extracted)
-
-    # Roman numeral to Arabic number mapping
-    roman_to_arabic = {
-        'i': '1', 'ii': '2', 'iii': '3', 'iv': '4', 'v': '5',
-        'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9', 'x': '10'
-    }
-
-    # Convert Roman numerals to Arabic in both names for comparison
-    def normalize_numbers(text):
-        # Replace Roman numerals at word boundaries
-        for roman, arabic in roman_to_arabic.items():
-            text = re.sub(r'\b' + roman + r'\b', arabic, text)
-        return text
-
-    # Apply article removal to expanded/normalized versions too
-    normalized_extracted = remove_articles(normalize_numbers(expanded_extracted))
-    normalized_igdb = remove_articles(normalize_numbers(igdb_lower))
+    # Expand abbreviations in extracted name, convert Roman numerals in both names
+    # and apply article removal to the normalized versions too
+    normalized_extracted = _remove_articles(_normalize_numbers(_expand_abbreviations(extracted_lower)))
+    normalized_igdb = _remove_articles(_normalize_numbers(igdb_lower))
 
     # Remove edition suffixes for comparison
     edition_suffixes = [
@@ -461,22 +647,52 @@ def should_use_igdb_data(confidence: float) -> bool:
 
 
 async def bulk_validate_games(game_names: List[str]) -> List[Dict[str, Any]]:
-    """Validate multiple games efficiently with rate limiting"""
-    results = []
+    """Validate multiple games efficiently with rate limiting (results in input order)"""
+    results = await validate_and_enrich_many(game_names)
+    return [results[game_name] for game_name in game_names]
 
-    for game_name in game_names:
-        result = await validate_and_enrich(game_name)
-        results.append(result)
 
-        # Add small delay between requests for politeness
-        await asyncio.sleep(0.1)
+async def warm_cache_from_played_games(games: Optional[List[Dict[str, Any]]] = None) -> Dict[str, int]:
+    """
+    Prefetch IGDB data for every played game that is not cached yet.
 
-    return results
+    Loads the persisted cache, then resolves the remaining titles with
+    validate_and_enrich_many, so per-game lookups that follow are cache hits.
+
+    Args:
+        games: played_games rows (fetched from the database if omitted)
+
+    Returns:
+        Dict with titles, already_cached and fetched counts
+    """
+    if games is None:
+        from ..database import get_database
+        games = await asyncio.to_thread(get_database().get_all_played_games)
+
+    await _enrichment_cache.ensure_loaded()
+    titles = list(dict.fromkeys(
+        game['canonical_name'] for game in games
+        if game.get('canonical_name') and not game.get('skip_igdb_enrichment')
+    ))
+    uncached = [title for title in titles if not _enrichment_cache.contains(normalize_title(title), title)]
+
+    if uncached:
+        print(f"🔥 IGDB: Warming cache for {len(uncached)} of {len(titles)} played games...")
+        await validate_and_enrich_many(uncached)
+
+    return {
+        'titles': len(titles),
+        'already_cached': len(titles) - len(uncached),
+        'fetched': len(uncached)
+    }
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Get IGDB cache statistics"""
+    return _enrichment_cache.get_stats()
 
 
 def clear_cache():
-    """Clear the IGDB cache (for testing/debugging)"""
-    global _igdb_cache, _cache_expiry
-    _igdb_cache.clear()
-    _cache_expiry.clear()
+    """Clear the in-memory IGDB cache (for testing/debugging)"""
+    _enrichment_cache.clear()
     print("🗑️ IGDB cache cleared")
@@ -0,0 +1,237 @@
+"""
+IGDB Enrichment Cache Module
+
+Size-bounded LRU cache for IGDB enrichment results with an optional durable
+tier in the igdb_cache table, so weekly syncs and bulk scripts reuse lookups
+across restarts instead of re-querying IGDB.
+
+Entries are keyed by normalized title (see igdb.normalize_title). Successful
+matches and "no match" results are both cached, with separate TTLs; errors
+(missing credentials, failed requests) are never cached.
+
+Configuration (environment):
+    IGDB_CACHE_TTL_DAYS            TTL for matches (default 30)
+    IGDB_NEGATIVE_CACHE_TTL_DAYS   TTL for "no match" results (default 7)
+    IGDB_CACHE_MAX_ENTRIES         Size bound in memory and in the table (default 5000)
+    IGDB_CACHE_PERSISTENT          Set to false to keep the cache in memory only
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_NEGATIVE_TTL_DAYS = 7
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def _literal(name: str) -> str:
+    return ' '.join(name.lower().split())
+
+
+class IGDBEnrichmentCache:
+    """
+    LRU cache of enrichment dicts with per-entry expiry.
+
+    The backend (GamesDatabase in production) exposes
+    load_igdb_cache_entries(limit) and save_igdb_cache_entries(entries, max_rows).
+    It is loaded once per process on first use; new entries are written back
+    on flush().
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_DAYS * 86400,
+                 negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_DAYS * 86400, backend=None,
+                 backend_factory: Optional[Callable[[], Any]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached titles
+            ttl_seconds: Lifetime of a successful match
+            negative_ttl_seconds: Lifetime of a "no match" result
+            backend: Persistence backend, or None for memory only
+            backend_factory: Called on first load to resolve the backend lazily
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.backend = backend
+        self._backend_factory = backend_factory
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], str, float]]" = OrderedDict()
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self.stats = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "loaded": 0,
+            "writes": 0,
+            "write_errors": 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: str, query_name: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        enrichment, cached_query, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        # A "no match" only says this spelling found nothing; a different
+        # spelling with the same key may still search differently
+        if not enrichment.get('match_found') and _literal(cached_query) != _literal(query_name):
+            return None
+        return enrichment
+
+    def contains(self, key: str, query_name: str) -> bool:
+        """Check for a usable entry without touching stats or LRU order."""
+        return self._lookup(key, query_name) is not None
+
+    def get(self, key: str, query_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached enrichment result.
+
+        Args:
+            key: Normalized title
+            query_name: Name as queried (negative entries only match the same spelling)
+
+        Returns:
+            The cached enrichment dict, or None on a miss
+        """
+        enrichment = self._lookup(key, query_name)
+        if enrichment is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits" if enrichment.get('match_found') else "negative_hits"] += 1
+        return enrichment
+
+    def put(self, key: str, query_name: str, enrichment: Dict[str, Any]):
+        """Cache an enrichment result (error results are ignored)."""
+        if not key or 'error' in enrichment:
+            return
+        ttl = self.ttl_seconds if enrichment.get('match_found') else self.negative_ttl_seconds
+        if ttl <= 0:
+            return
+        now = time.time()
+        self._set(key, enrichment, query_name, now + ttl)
+        if self.backend is not None or self._backend_factory is not None:
+            self._dirty[key] = {
+                'cache_key': key,
+                'query_name': query_name,
+                'enrichment': enrichment,
+                'match_found': bool(enrichment.get('match_found')),
+                'cached_at': datetime.fromtimestamp(now, timezone.utc),
+                'expires_at': datetime.fromtimestamp(now + ttl, timezone.utc)
+            }
+
+    def _set(self, key: str, enrichment: Dict[str, Any], query_name: str, expires_at: float):
+        self._entries[key] = (enrichment, query_name, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._dirty.pop(evicted, None)
+            self.stats["evictions"] += 1
+
+    def _resolve_backend(self):
+        if self.backend is None and self._backend_factory is not None:
+            factory, self._backend_factory = self._backend_factory, None
+            try:
+                self.backend = factory()
+            except Exception as e:
+                logger.warning(f"Persistent IGDB cache unavailable: {e}")
+        if self.backend is None:
+            self._dirty.clear()
+        return self.backend
+
+    async def ensure_loaded(self):
+        """Load persisted entries once per process (older than any in-memory entry)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        backend = self._resolve_backend()
+        if backend is None:
+            return
+        try:
+            rows = await asyncio.to_thread(backend.load_igdb_cache_entries, self.max_entries)
+        except Exception as e:
+            logger.error(f"IGDB cache load failed: {e}")
+            return
+
+        fresh = self._entries
+        self._entries = OrderedDict()
+        # Rows arrive newest first; insert oldest first so LRU order matches age
+        for row in reversed(rows):
+            expires_at = row['expires_at']
+            if isinstance(expires_at, datetime):
+                expires_at = expires_at.timestamp()
+            self._set(row['cache_key'], row['enrichment'], row['query_name'], expires_at)
+        self.stats["loaded"] += len(rows)
+        for key, (enrichment, query_name, expires_at) in fresh.items():
+            self._set(key, enrichment, query_name, expires_at)
+
+    async def flush(self) -> int:
+        """
+        Write entries added since the last flush to the backend.
+
+        Returns:
+            Number of entries written
+        """
+        if not self._dirty or self._resolve_backend() is None:
+            return 0
+        rows: List[Dict[str, Any]] = list(self._dirty.values())
+        self._dirty = {}
+        try:
+            written = await asyncio.to_thread(self.backend.save_igdb_cache_entries, rows, self.max_entries)
+        except Exception as e:
+            logger.error(f"IGDB cache write failed: {e}")
+            written = 0
+        if written:
+            self.stats["writes"] += written
+        else:
+            self.stats["write_errors"] += 1
+        return written
+
+    def clear(self):
+        """Drop in-memory entries (persisted rows are kept)."""
+        self._entries.clear()
+        self._dirty.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent": self.backend is not None,
+            "hit_rate": round((lookups - self.stats["misses"]) / lookups * 100, 1) if lookups else 0.0,
+            **self.stats
+        }
+
+
+def _default_backend():
+    from ..database import get_database
+    database = get_database()
+    if database is None or not database.database_url:
+        return None
+    return database.games
+
+
+def create_enrichment_cache() -> IGDBEnrichmentCache:
+    """Build the IGDB cache from environment settings"""
+    persistent = os.getenv("IGDB_CACHE_PERSISTENT", "true").lower() not in ("false", "0", "no")
+    return IGDBEnrichmentCache(
+        max_entries=int(os.getenv("IGDB_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        ttl_seconds=float(os.getenv("IGDB_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS)) * 86400,
+        negative_ttl_seconds=float(os.getenv("IGDB_NEGATIVE_CACHE_TTL_DAYS", DEFAULT_NEGATIVE_TTL_DAYS)) * 86400,
+        backend_factory=_default_backend if persistent else None
+    )
@@ -0,0 +1,117 @@
+"""
+Content Sync Cursors Module
+
+Persisted per-channel / per-playlist sync state (ETag, last seen item,
+publishedAt, item count) so the weekly content sync only touches what changed.
+
+Usage:
+    cursors = SyncCursors(db.games)
+    await cursors.load('youtube_playlist')
+    cursor = cursors.get('youtube_playlist', playlist_id)
+    ...
+    cursors.update('youtube_playlist', playlist_id, etag=..., item_count=...)
+    cursors.hold('youtube_playlist', playlist_id)   # wait for sync approval
+    cursors.discard('youtube_playlist', playlist_id)  # processing failed: retry next sync
+    await cursors.flush(sync_session_id)
+
+Updates are buffered until flush(). Held updates are saved under the sync
+session and only become the committed cursor when that session's staged
+games are committed (GamesDatabase.commit_staged_games), so a cancelled
+sync is offered again next time.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SyncCursors:
+    """
+    Buffered view of the content_sync_cursors table.
+
+    The backend (GamesDatabase in production) exposes get_sync_cursors(source)
+    and save_sync_cursors(source, cursors, session_id). Without a backend the
+    cursors only live for the lifetime of the object.
+    """
+
+    def __init__(self, backend=None):
+        """
+        Initialize the cursor set.
+
+        Args:
+            backend: Persistence backend, or None for memory only
+        """
+        self.backend = backend
+        self._cursors: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._held: Set[Tuple[str, str]] = set()
+        self.stats = {
+            "not_modified": 0,
+            "unchanged": 0,
+            "changed": 0
+        }
+
+    async def load(self, source: str) -> Dict[str, Dict[str, Any]]:
+        """Load committed cursors for a source (once per object)."""
+        if source not in self._cursors:
+            cursors: Dict[str, Dict[str, Any]] = {}
+            if self.backend is not None:
+                try:
+                    cursors = await asyncio.to_thread(self.backend.get_sync_cursors, source)
+                except Exception as e:
+                    logger.error(f"Sync cursor load failed for {source}: {e}")
+            self._cursors[source] = cursors
+        return self._cursors[source]
+
+    def get(self, source: str, key: str) -> Optional[Dict[str, Any]]:
+        """Get the committed cursor for a key (call load(source) first)."""
+        return self._cursors.get(source, {}).get(key)
+
+    def update(self, source: str, key: str, **fields):
+        """Record a new cursor value; saved on the next flush()."""
+        self._pending[(source, key)] = fields
+
+    def hold(self, source: str, key: str):
+        """Keep a pending update back until the sync session is approved."""
+        if (source, key) in self._pending:
+            self._held.add((source, key))
+
+    def discard(self, source: str, key: str):
+        """Drop a pending update so the key is processed again on the next sync."""
+        self._pending.pop((source, key), None)
+        self._held.discard((source, key))
+
+    def pending(self, source: str, key: str) -> Optional[Dict[str, Any]]:
+        return self._pending.get((source, key))
+
+    async def flush(self, session_id: str = '') -> int:
+        """
+        Save pending updates; held ones are saved under session_id.
+
+        Returns:
+            Number of cursors saved
+        """
+        if not self._pending:
+            return 0
+
+        batches: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+        for (source, key), fields in self._pending.items():
+            held = (source, key) in self._held and bool(session_id)
+            batches.setdefault((source, str(session_id) if held else ''), {})[key] = fields
+            if not held:
+                self._cursors.setdefault(source, {})[key] = fields
+        self._pending = {}
+        self._held = set()
+
+        if self.backend is None:
+            return sum(len(batch) for batch in batches.values())
+
+        saved = 0
+        for (source, batch_session), batch in batches.items():
+            try:
+                saved += await asyncio.to_thread(self.backend.save_sync_cursors, source, batch, batch_session)
+            except Exception as e:
+                logger.error(f"Sync cursor save failed for {source}: {e}")
+        return saved
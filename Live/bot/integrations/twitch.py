@@ -14,8 +14,6 @@ import re
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-import aiohttp
-
 # Database import
 from ..database import get_database
 
@@ -30,6 +28,12 @@ from ..utils.text_processing import (
 # IGDB integration
 from . import igdb
 
+# Shared HTTP sessions and token cache
+from .http_client import get_twitch_app_token, http_session
+from .sync_cursors import SyncCursors
+
+TWITCH_HELIX_URL = "https://api.twitch.tv/helix"
+
 
 async def smart_extract_with_validation(title: str) -> tuple[Optional[str], float]:
     """
@@ -354,23 +358,12 @@ async def fetch_twitch_games(username: str) -> List[str]:
 
     games = []
 
-    async with aiohttp.ClientSession() as session:
+    async with http_session("twitch") as session:
         try:
-            # Get OAuth token
-            token_url = "https://id.twitch.tv/oauth2/token"
-            token_data = {
-                'client_id': twitch_client_id,
-                'client_secret': twitch_client_secret,
-                'grant_type': 'client_credentials'
-            }
-
-            async with session.post(token_url, data=token_data) as response:
-                if response.status == 200:
-                    token_info = await response.json()
-                    access_token = token_info['access_token']
-                else:
-                    raise Exception(
-                        f"Failed to get Twitch OAuth token: {response.status}")
+            # Get OAuth token (cached until expiry)
+            access_token = await get_twitch_app_token(twitch_client_id, twitch_client_secret)
+            if not access_token:
+                raise Exception("Failed to get Twitch OAuth token")
 
             headers = {
                 "Client-ID": twitch_client_id,
@@ -413,40 +406,50 @@ async def fetch_twitch_games(username: str) -> List[str]:
     return games
 
 
-async def fetch_new_vods_since(username: str, start_timestamp: datetime) -> List[Dict[str, Any]]:
-    """Fetch all new VODs from a Twitch channel since a given timestamp."""
+async def fetch_new_vods_since(username: str, start_timestamp: datetime,
+                               cursors: Optional[SyncCursors] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch all new VODs from a Twitch channel since a given timestamp.
+
+    With cursors, the channel's user ID and previously resolved game names are
+    reused from the 'twitch_channel' cursor, so a sync only requests the video
+    pages inside the window. The window itself is not narrowed by the cursor:
+    VODs that timed out waiting for a manual name must be offered again.
+    """
     twitch_client_id, twitch_client_secret = get_twitch_api_credentials()
     if not twitch_client_id or not twitch_client_secret:
         print("⚠️ Twitch credentials not configured for fetching new VODs.")
         return []
 
     new_vods = []
-    async with aiohttp.ClientSession() as session:
+    async with http_session("twitch") as session:
         try:
-            # Get OAuth token
-            token_url = "https://id.twitch.tv/oauth2/token"
-            token_data = {
-                'client_id': twitch_client_id,
-                'client_secret': twitch_client_secret,
-                'grant_type': 'client_credentials'}
-            async with session.post(token_url, data=token_data) as response:
-                if response.status != 200:
-                    return []
-                token_info = await response.json()
-                access_token = token_info['access_token']
+            # Get OAuth token (cached until expiry)
+            access_token = await get_twitch_app_token(twitch_client_id, twitch_client_secret)
+            if not access_token:
+                return []
 
             headers = {"Client-ID": twitch_client_id, "Authorization": f"Bearer {access_token}"}
 
-            # Get user ID
-            user_url = f"https://api.twitch.tv/helix/users?login={username}"
-            async with session.get(user_url, headers=headers) as response:
-                if response.status != 200:
-                    return []
-                user_data = await response.json()
-                user_id = user_data['data'][0]['id']
+            channel_cursor = None
+            if cursors:
+                await cursors.load('twitch_channel')
+                channel_cursor = cursors.get('twitch_channel', username)
+            cursor_payload = (channel_cursor or {}).get('payload') or {}
+            game_names: Dict[str, str] = dict(cursor_payload.get('game_names', {}))
+
+            # Get user ID (stable, so reuse the one stored in the cursor)
+            user_id = cursor_payload.get('user_id')
+            if not user_id:
+                user_url = f"{TWITCH_HELIX_URL}/users?login={username}"
+                async with session.get(user_url, headers=headers) as response:
+                    if response.status != 200:
+                        return []
+                    user_data = await response.json()
+                    user_id = user_data['data'][0]['id']
 
             # Get recent videos with pagination
-            videos_url = f"https://api.twitch.tv/helix/videos"
+            videos_url = f"{TWITCH_HELIX_URL}/videos"
             cursor = None
             more_videos = True
 
@@ -481,17 +484,20 @@ async def fetch_new_vods_since(username: str, start_timestamp: datetime) -> List
                         game_id = video.get('game_id')
                         if game_id and game_id != '0' and game_id != '':
                             try:
-                                # Fetch the game name from Twitch API
-                                game_url = f"https://api.twitch.tv/helix/games?id={game_id}"
-                                async with session.get(game_url, headers=headers) as game_response:
-                                    if game_response.status == 200:
-                                        game_data = await game_response.json()
-                                        if game_data.get('data') and len(game_data['data']) > 0:
-                                            twitch_game_name = game_data['data'][0].get('name')
-                                            if twitch_game_name:
-                                                print(f"🎮 TWITCH API: VOD '{title}' → Game: '{twitch_game_name}'")
-                                                extracted_name = twitch_game_name
-                                                data_confidence = 1.0  # High confidence since it's from Twitch API
+                                # Fetch the game name from Twitch API (once per game ID)
+                                twitch_game_name = game_names.get(game_id)
+                                if not twitch_game_name:
+                                    game_url = f"{TWITCH_HELIX_URL}/games?id={game_id}"
+                                    async with session.get(game_url, headers=headers) as game_response:
+                                        if game_response.status == 200:
+                                            game_data = await game_response.json()
+                                            if game_data.get('data') and len(game_data['data']) > 0:
+                                                twitch_game_name = game_data['data'][0].get('name')
+                                if twitch_game_name:
+                                    game_names[game_id] = twitch_game_name
+                                    print(f"🎮 TWITCH API: VOD '{title}' → Game: '{twitch_game_name}'")
+                                    extracted_name = twitch_game_name
+                                    data_confidence = 1.0  # High confidence since it's from Twitch API
                             except Exception as game_fetch_error:
                                 print(f"⚠️ Failed to fetch game name from Twitch API: {game_fetch_error}")
 
@@ -564,6 +570,7 @@ async def fetch_new_vods_since(username: str, start_timestamp: datetime) -> List
                         view_count = video.get('view_count', 0)
 
                         new_vods.append({
+                            'id': video.get('id'),
                             'title': title,
                             'url': video['url'],
                             'duration_seconds': parse_twitch_duration(video.get('duration', '0s')),
@@ -582,6 +589,17 @@ async def fetch_new_vods_since(username: str, start_timestamp: datetime) -> List
                     if not cursor:
                         break
 
+            if cursors:
+                latest = new_vods[0] if new_vods else None
+                cursors.update(
+                    'twitch_channel', username,
+                    last_item_id=latest['id'] if latest else (channel_cursor or {}).get('last_item_id'),
+                    last_published_at=latest['published_at'] if latest else (
+                        channel_cursor or {}).get('last_published_at'),
+                    item_count=len(new_vods),
+                    payload={'user_id': user_id, 'game_names': game_names}
+                )
+
         except Exception as e:
             print(f"❌ Failed to fetch new Twitch VODs: {e}")
 
@@ -600,23 +618,12 @@ async def fetch_comprehensive_twitch_games(
 
     games_data = []
 
-    async with aiohttp.ClientSession() as session:
+    async with http_session("twitch") as session:
         try:
-            # Get OAuth token
-            token_url = "https://id.twitch.tv/oauth2/token"
-            token_data = {
-                'client_id': twitch_client_id,
-                'client_secret': twitch_client_secret,
-                'grant_type': 'client_credentials'
-            }
-
-            async with session.post(token_url, data=token_data) as response:
-                if response.status == 200:
-                    token_info = await response.json()
-                    access_token = token_info['access_token']
-                else:
-                    raise Exception(
-                        f"Failed to get Twitch OAuth token: {response.status}")
+            # Get OAuth token (cached until expiry)
+            access_token = await get_twitch_app_token(twitch_client_id, twitch_client_secret)
+            if not access_token:
+                raise Exception("Failed to get Twitch OAuth token")
 
             headers = {
                 "Client-ID": twitch_client_id,
@@ -878,22 +885,12 @@ async def validate_twitch_username(username: str) -> bool:
 
     twitch_client_id, twitch_client_secret = get_twitch_api_credentials()
 
-    async with aiohttp.ClientSession() as session:
+    async with http_session("twitch") as session:
         try:
-            # Get OAuth token
-            token_url = "https://id.twitch.tv/oauth2/token"
-            token_data = {
-                'client_id': twitch_client_id,
-                'client_secret': twitch_client_secret,
-                'grant_type': 'client_credentials'
-            }
-
-            async with session.post(token_url, data=token_data) as response:
-                if response.status != 200:
-                    return False
-
-                token_info = await response.json()
-                access_token = token_info['access_token']
+            # Get OAuth token (cached until expiry)
+            access_token = await get_twitch_app_token(twitch_client_id, twitch_client_secret)
+            if not access_token:
+                return False
 
             headers = {
                 "Client-ID": twitch_client_id,
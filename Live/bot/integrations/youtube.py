@@ -7,23 +7,31 @@ Handles all YouTube API interactions including:
 - Auto-posting functionality
 - Playlist management
 - IGDB validation for game names
+
+Playlist sync is incremental when given SyncCursors: playlist listings are
+requested with If-None-Match, and playlists whose ETag matches the stored
+cursor are skipped without fetching their videos. Changed playlists are
+fetched by a bounded pool of workers and their video statistics are
+requested in full 50-ID batches across playlists.
 """
 
 import asyncio
 import os
 import re
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-import aiohttp  # type: ignore
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 # Database import
 from ..database import DatabaseManager, get_database
 from ..utils.text_processing import extract_game_name_from_title
 from . import igdb
+from .http_client import http_session
+from .sync_cursors import SyncCursors
 
 db = get_database()
 
+YOUTUBE_API_URL = "https://www.googleapis.com/youtube/v3"
+
 # Text processing utilities
 
 # IGDB integration
@@ -40,7 +48,7 @@ async def fetch_youtube_games(channel_id: str) -> List[str]:
     max_videos = 200  # Reasonable limit
     video_count = 0
 
-    async with aiohttp.ClientSession() as session:
+    async with http_session("youtube") as session:
         try:
             # Get channel uploads playlist
             url = f"https://www.googleapis.com/youtube/v3/channels"
@@ -105,7 +113,7 @@ async def fetch_comprehensive_youtube_games(
 
     games_data = []
 
-    async with aiohttp.ClientSession() as session:
+    async with http_session("youtube") as session:
         try:
             # STEP 1: Get all playlists from the channel (primary source)
             url = f"https://www.googleapis.com/youtube/v3/playlists"
@@ -401,7 +409,7 @@ async def fetch_new_videos_since(channel_id: str, start_timestamp: datetime) ->
         return []
 
     new_videos = []
-    async with aiohttp.ClientSession() as session:
+    async with http_session("youtube") as session:
         try:
             # 1. Get the channel's uploads playlist ID
             url = "https://www.googleapis.com/youtube/v3/channels"
@@ -453,7 +461,7 @@ async def fetch_new_videos_since(channel_id: str, start_timestamp: datetime) ->
     # After fetching IDs, get their stats (duration, views) in a batch
     if new_videos:
         video_ids = [v['video_id'] for v in new_videos]
-        async with aiohttp.ClientSession() as session:
+        async with http_session("youtube") as session:
             stats = await get_video_statistics(session, video_ids, youtube_api_key)
             for video in new_videos:
                 if video['video_id'] in stats:
@@ -462,7 +470,271 @@ async def fetch_new_videos_since(channel_id: str, start_timestamp: datetime) ->
     return new_videos
 
 
-async def fetch_playlist_based_content_since(channel_id: str, start_timestamp: datetime) -> List[Dict[str, Any]]:
+async def _get_json_conditional(session, url: str, params: Dict[str, Any],
+                                etag: Optional[str]) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+    """
+    GET a YouTube API resource, sending If-None-Match when an ETag is known.
+
+    Returns:
+        (status, data, etag) - data is None for 304 Not Modified and errors
+    """
+    headers = {'If-None-Match': etag} if etag else None
+    async with session.get(url, params=params, headers=headers) as response:
+        if response.status == 304:
+            return 304, None, etag
+        if response.status != 200:
+            error_body = await response.text()
+            print(f"❌ YouTube API error: {response.status}")
+            print(f"❌ Error details: {error_body[:500]}")  # Log first 500 chars of error
+            return response.status, None, None
+        data = await response.json()
+        return 200, data, data.get('etag') or response.headers.get('ETag')
+
+
+async def _fetch_channel_playlists(session, channel_id: str, api_key: str,
+                                   cursors: Optional[SyncCursors]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get all playlists of a channel (with pagination).
+
+    With cursors, each page is requested conditionally and a 304 reuses the
+    page stored in the 'youtube_playlists' cursor.
+    """
+    page_cursors = await cursors.load('youtube_playlists') if cursors else {}
+    all_playlists: List[Dict[str, Any]] = []
+    next_page_token = None
+    page_index = 0
+
+    while True:
+        params = {
+            'part': 'snippet,contentDetails',
+            'channelId': channel_id,
+            'maxResults': 50,
+            'key': api_key
+        }
+        if next_page_token:
+            params['pageToken'] = next_page_token
+
+        page_key = f"{channel_id}:{page_index}"
+        page_cursor = page_cursors.get(page_key)
+        # Only trust a stored page if the page before it was identical too
+        page_cursor = page_cursor if page_cursor and page_cursor.get('payload', {}).get(
+            'page_token') == next_page_token else None
+        status, data, etag = await _get_json_conditional(
+            session, f"{YOUTUBE_API_URL}/playlists", params, page_cursor.get('etag') if page_cursor else None)
+
+        if status == 304 and page_cursor:
+            cursors.stats["not_modified"] += 1
+            items = page_cursor['payload'].get('items', [])
+            next_page_token = page_cursor['payload'].get('next_page_token')
+        elif data is not None:
+            items = data.get('items', [])
+            next_page_token = data.get('nextPageToken')
+            if cursors and etag:
+                cursors.update('youtube_playlists', page_key, etag=etag, item_count=len(items), payload={
+                    'page_token': params.get('pageToken'),
+                    'next_page_token': next_page_token,
+                    'items': [{
+                        'id': item['id'],
+                        'etag': item.get('etag'),
+                        'snippet': {'title': item['snippet']['title']},
+                        'contentDetails': {'itemCount': item['contentDetails']['itemCount']}
+                    } for item in items]
+                })
+        else:
+            return all_playlists if all_playlists else None
+
+        all_playlists.extend(items)
+        page_index += 1
+        if not next_page_token:
+            return all_playlists
+
+
+# Playlists whose items are fetched at once during content sync. Requests also
+# share the per-host connection limits of the "youtube" and "igdb" sessions.
+PLAYLIST_CONCURRENCY = 8
+
+# videos.list accepts at most 50 IDs per request
+VIDEOS_BATCH_SIZE = 50
+
+SKIP_PLAYLIST_PATTERNS = ['shorts', 'live', 'stream', 'highlight', 'clip']
+
+
+def _select_changed_playlists(all_playlists: List[Dict[str, Any]], playlist_cursors: Dict[str, Dict[str, Any]],
+                              cursors: Optional[SyncCursors]) -> List[Dict[str, Any]]:
+    """
+    Pick the game playlists that need their videos fetched.
+
+    With cursors, a playlist is skipped when its ETag matches the stored
+    cursor, or when only the ETag moved (description or thumbnail edits) but
+    the stored item count and title still match: no new episodes and no
+    [COMPLETED] marker, so there is nothing for the sync to do.
+    """
+    candidates = []
+    for playlist in all_playlists:
+        playlist_id = playlist['id']
+        playlist_title = playlist['snippet']['title']
+        video_count = playlist['contentDetails']['itemCount']
+
+        # Skip non-game playlists
+        if video_count < 3:
+            continue
+        if any(pattern in playlist_title.lower() for pattern in SKIP_PLAYLIST_PATTERNS):
+            continue
+
+        # The playlist resource ETag changes with its title and item count,
+        # so an unchanged ETag means no new episodes and no [COMPLETED] marker
+        playlist_cursor = playlist_cursors.get(playlist_id)
+        if cursors and playlist_cursor and playlist.get('etag'):
+            if playlist_cursor.get('etag') == playlist['etag']:
+                cursors.stats["unchanged"] += 1
+                continue
+            if (playlist_cursor.get('item_count') == video_count
+                    and (playlist_cursor.get('payload') or {}).get('title') == playlist_title):
+                cursors.stats["unchanged"] += 1
+                cursors.update(
+                    'youtube_playlist', playlist_id,
+                    etag=playlist['etag'],
+                    item_count=video_count,
+                    last_item_id=playlist_cursor.get('last_item_id'),
+                    last_published_at=playlist_cursor.get('last_published_at'),
+                    payload={'title': playlist_title}
+                )
+                continue
+        if cursors:
+            cursors.stats["changed"] += 1
+
+        # Extract clean canonical name (remove [COMPLETED] and other markers - case insensitive)
+        # Use cleaned playlist title directly (don't use video title extraction for playlists)
+        extracted_name = re.sub(r'\[completed\]', '', playlist_title, flags=re.IGNORECASE).strip()
+        if not extracted_name:
+            print(f"⚠️ Could not extract game name from: {playlist_title}")
+            continue
+
+        candidates.append({
+            'id': playlist_id,
+            'title': playlist_title,
+            'etag': playlist.get('etag'),
+            'video_count': video_count,
+            'extracted_name': extracted_name,
+            # Detect completion status from playlist title
+            'completion_status': 'completed' if '[COMPLETED]' in playlist_title.upper() else 'in_progress'
+        })
+    return candidates
+
+
+async def _fetch_packed_video_statistics(session, video_ids: List[str], api_key: str,
+                                         semaphore: asyncio.Semaphore) -> Tuple[Dict[str, Dict[str, Any]], Set[str]]:
+    """
+    Fetch statistics for videos of many playlists in full 50-ID batches.
+
+    Returns:
+        (stats by video ID, IDs whose batch failed)
+    """
+    unique_ids = list(dict.fromkeys(video_ids))
+    batches = [unique_ids[i:i + VIDEOS_BATCH_SIZE] for i in range(0, len(unique_ids), VIDEOS_BATCH_SIZE)]
+
+    async def fetch(batch: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        async with semaphore:
+            return await _fetch_video_batch(session, batch, api_key)
+
+    stats_data: Dict[str, Dict[str, Any]] = {}
+    failed_ids: Set[str] = set()
+    for batch, result in zip(batches, await asyncio.gather(*(fetch(batch) for batch in batches),
+                                                            return_exceptions=True)):
+        if isinstance(result, dict):
+            stats_data.update(result)
+        else:
+            if isinstance(result, BaseException):
+                print(f"❌ Error getting video statistics: {result}")
+            failed_ids.update(batch)
+    return stats_data, failed_ids
+
+
+def _build_playlist_game_data(candidate: Dict[str, Any], igdb_result: Dict[str, Any],
+                              videos_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate a playlist's full-length videos into a played game entry with IGDB enrichment"""
+    playlist_id = candidate['id']
+    playlist_title = candidate['title']
+    extracted_name = candidate['extracted_name']
+    completion_status = candidate['completion_status']
+
+    # Set defaults for low-confidence or no-match scenarios
+    canonical_name = extracted_name
+    igdb_id = None
+    igdb_genre = None
+    igdb_series = None
+    igdb_year = None
+    data_confidence = igdb_result.get('confidence', 0.0)
+
+    # Use IGDB data if confidence is high enough
+    if data_confidence >= 0.8:
+        canonical_name = igdb_result.get('canonical_name', extracted_name)
+        igdb_id = igdb_result.get('igdb_id')
+        igdb_genre = igdb_result.get('genre')
+        igdb_series = igdb_result.get('series_name')
+        igdb_year = igdb_result.get('release_year')
+        print(f"✅ IGDB validated: '{extracted_name}' → '{canonical_name}' (confidence: {data_confidence:.2f})")
+    else:
+        print(f"⚠️ Low IGDB confidence for '{extracted_name}': {data_confidence:.2f} - flagging for review")
+
+    # Calculate aggregated statistics
+    total_views = sum(v.get('view_count', 0) for v in videos_data)
+    total_playtime_seconds = sum(v.get('duration_seconds', 0) for v in videos_data)
+    total_playtime_minutes = total_playtime_seconds // 60
+    total_episodes = len(videos_data)
+
+    # Get first video date
+    first_video_date = videos_data[0].get('published_at')
+    completed_date = videos_data[-1].get('published_at') if completion_status == 'completed' else None
+
+    # Build alternative names ONLY from IGDB (no video titles or playlist names)
+    alternative_names = []
+    if igdb_result.get('alternative_names'):
+        alternative_names = igdb_result['alternative_names'][:5]  # Limit to 5 IGDB alternatives
+
+    # If no IGDB alternatives but we have the canonical name, add it
+    if not alternative_names and canonical_name != extracted_name:
+        alternative_names = [extracted_name]
+
+    # Fallback series name extraction from playlist title if IGDB doesn't provide one
+    series_name = igdb_series
+    if not series_name:
+        # Extract series from playlist title (remove brackets, episode markers, etc.)
+        clean_title = playlist_title.replace('[COMPLETED]', '').replace('[completed]', '').strip()
+        # Remove common patterns like "- Part 1", "Episode 5", etc.
+        series_name = re.sub(r'\s*-\s*(Part|Episode|Ep|#)\s*\d+.*$',
+                             '', clean_title, flags=re.IGNORECASE)
+        series_name = re.sub(r'\s*\d+\s*$', '', series_name).strip()  # Remove trailing numbers
+        # If it looks like a full game name with subtitle, try to extract just the series
+        if ':' in series_name or '–' in series_name or '—' in series_name:
+            # For titles like "Uncharted 3: Drake's Deception", extract "Uncharted"
+            parts = re.split(r'[:\–\—]', series_name)
+            if parts and len(parts[0].strip()) >= 3:
+                series_name = parts[0].strip()
+
+    # Create complete game data entry with IGDB enrichment
+    return {
+        'canonical_name': canonical_name,
+        'series_name': series_name or canonical_name,  # Use extracted series or canonical as fallback
+        'genre': igdb_genre,  # From IGDB
+        'release_year': igdb_year,  # From IGDB
+        'total_playtime_minutes': total_playtime_minutes,
+        'total_episodes': total_episodes,
+        'youtube_playlist_url': f"https://youtube.com/playlist?list={playlist_id}",
+        'youtube_views': total_views,
+        'twitch_views': 0,  # Explicit 0 for YouTube-only content (not NULL)
+        'completion_status': completion_status,
+        'alternative_names': alternative_names,
+        'first_played_date': first_video_date,
+        'completed_date': completed_date,
+        'igdb_id': igdb_id,  # IGDB tracking
+        'data_confidence': data_confidence,  # Confidence score
+        'notes': f"Auto-synced from YouTube playlist. {total_episodes} episodes, {total_playtime_minutes//60}h {total_playtime_minutes%60}m total."
+    }
+
+
+async def fetch_playlist_based_content_since(channel_id: str, start_timestamp: datetime,
+                                             cursors: Optional[SyncCursors] = None) -> List[Dict[str, Any]]:
     """
     Fetch new content from YouTube playlists since a given timestamp.
 
@@ -473,6 +745,18 @@ async def fetch_playlist_based_content_since(channel_id: str, start_timestamp: d
     - Populates complete metadata: series_name, youtube_playlist_url, completion_status, etc.
     - Aggregates views, playtime, and episode count per playlist
 
+    Changed playlists are processed together: their items are fetched by up
+    to PLAYLIST_CONCURRENCY workers while IGDB validates every title in one
+    batch, then the video statistics of all playlists are requested in full
+    50-ID videos.list batches.
+
+    Args:
+        channel_id: YouTube channel ID
+        start_timestamp: Videos published since then count as new content
+        cursors: Sync cursors; when given, only playlists changed since the
+                 stored cursor are processed and new cursors are recorded
+                 (call cursors.flush() to save them)
+
     Returns a list of game data dictionaries with complete metadata.
     """
     youtube_api_key = os.getenv('YOUTUBE_API_KEY')
@@ -480,112 +764,80 @@ async def fetch_playlist_based_content_since(channel_id: str, start_timestamp: d
         print("⚠️ YOUTUBE_API_KEY not configured")
         return []
 
+    if start_timestamp.tzinfo is None:
+        start_timestamp = start_timestamp.replace(tzinfo=timezone.utc)
+
     games_data = []
 
-    async with aiohttp.ClientSession() as session:
+    async with http_session("youtube") as session:
         try:
             # Step 1: Get all playlists from the channel (with pagination)
             print(f"🔄 Fetching playlists from channel {channel_id}")
 
-            all_playlists = []
-            next_page_token = None
-
-            while True:
-                url = f"https://www.googleapis.com/youtube/v3/playlists"
-                params = {
-                    'part': 'snippet,contentDetails',
-                    'channelId': channel_id,
-                    'maxResults': 50,
-                    'key': youtube_api_key
-                }
-                if next_page_token:
-                    params['pageToken'] = next_page_token
-
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        error_body = await response.text()
-                        print(f"❌ YouTube API error fetching playlists: {response.status}")
-                        print(f"❌ Error details: {error_body[:500]}")  # Log first 500 chars of error
-                        break
+            all_playlists = await _fetch_channel_playlists(session, channel_id, youtube_api_key, cursors) or []
+            print(f"✅ Found {len(all_playlists)} total playlists")
 
-                    data = await response.json()
-                    all_playlists.extend(data.get('items', []))
+            playlist_cursors = await cursors.load('youtube_playlist') if cursors else {}
+            candidates = _select_changed_playlists(all_playlists, playlist_cursors, cursors)
+            if not candidates:
+                print("✅ Fetched 0 games from playlists")
+                return []
 
-                    next_page_token = data.get('nextPageToken')
-                    if not next_page_token:
-                        break
+            # Step 2: Fetch playlist items concurrently while IGDB validates the titles
+            print(f"🔍 Validating {len(candidates)} playlist titles with IGDB...")
+            semaphore = asyncio.Semaphore(PLAYLIST_CONCURRENCY)
 
-            print(f"✅ Found {len(all_playlists)} total playlists")
+            async def fetch_items(playlist_id: str) -> Optional[List[Dict[str, Any]]]:
+                async with semaphore:
+                    return await _get_playlist_items(session, playlist_id, youtube_api_key)
 
-            # Step 2: Process each playlist
-            for playlist in all_playlists:
+            enrichment, *playlist_items = await asyncio.gather(
+                igdb.validate_and_enrich_many([c['extracted_name'] for c in candidates]),
+                *(fetch_items(c['id']) for c in candidates),
+                return_exceptions=True
+            )
+            if isinstance(enrichment, BaseException):
+                print(f"⚠️ IGDB validation failed, continuing without enrichment: {enrichment}")
+                enrichment = {}
+
+            # Step 3: Video statistics for every playlist, packed into full batches
+            stats_data, failed_ids = await _fetch_packed_video_statistics(
+                session, [item['video_id'] for items in playlist_items if isinstance(items, list) for item in items],
+                youtube_api_key, semaphore)
+
+            # Step 4: Aggregate each playlist (in channel order)
+            for candidate, items in zip(candidates, playlist_items):
+                playlist_title = candidate['title']
                 try:
-                    playlist_id = playlist['id']
-                    playlist_title = playlist['snippet']['title']
-                    video_count = playlist['contentDetails']['itemCount']
+                    if isinstance(items, BaseException):
+                        raise items
+                    if items is None or any(item['video_id'] in failed_ids for item in items):
+                        continue  # API error: leave the cursor so the playlist is retried
+
+                    videos_data = [dict(item, **stats_data[item['video_id']])
+                                   for item in items if item['video_id'] in stats_data]
+
+                    if cursors and candidate['etag']:
+                        latest = max(videos_data, key=lambda v: v.get('published_at', ''), default=None)
+                        cursors.update(
+                            'youtube_playlist', candidate['id'],
+                            etag=candidate['etag'],
+                            item_count=candidate['video_count'],
+                            last_item_id=latest.get('video_id') if latest else None,
+                            last_published_at=latest.get('published_at') if latest else None,
+                            payload={'title': playlist_title}
+                        )
 
-                    # Skip non-game playlists
-                    if video_count < 3:
-                        continue
-
-                    skip_patterns = ['shorts', 'live', 'stream', 'highlight', 'clip']
-                    if any(pattern in playlist_title.lower() for pattern in skip_patterns):
+                    if not videos_data:
                         continue
 
-                    # ALWAYS process playlists to keep metrics up-to-date
-                    # Check if playlist has NEW content (for logging/priority)
-                    has_new_content = await playlist_has_new_content(
-                        session, playlist_id, start_timestamp, youtube_api_key
-                    )
-
+                    has_new_content = any(
+                        _parse_published_at(v.get('published_at')) >= start_timestamp for v in videos_data)
                     if has_new_content:
                         print(f"✅ Processing playlist: {playlist_title} (has NEW content)")
                     else:
                         print(f"🔄 Processing playlist: {playlist_title} (updating metrics only)")
 
-                    # Detect completion status from playlist title
-                    completion_status = 'completed' if '[COMPLETED]' in playlist_title.upper() else 'in_progress'
-
-                    # Extract clean canonical name (remove [COMPLETED] and other markers - case insensitive)
-                    clean_title = re.sub(r'\[completed\]', '', playlist_title, flags=re.IGNORECASE).strip()
-                    # Use cleaned playlist title directly (don't use video title extraction for playlists)
-                    extracted_name = clean_title
-
-                    if not extracted_name:
-                        print(f"⚠️ Could not extract game name from: {playlist_title}")
-                        continue
-
-                    # Validate with IGDB for better accuracy
-                    print(f"🔍 Validating '{extracted_name}' with IGDB...")
-                    igdb_result = await igdb.validate_and_enrich(extracted_name)
-
-                    # Set defaults for low-confidence or no-match scenarios
-                    canonical_name = extracted_name
-                    igdb_id = None
-                    igdb_genre = None
-                    igdb_series = None
-                    igdb_year = None
-                    data_confidence = igdb_result.get('confidence', 0.0)
-
-                    # Use IGDB data if confidence is high enough
-                    if data_confidence >= 0.8:
-                        canonical_name = igdb_result.get('canonical_name', extracted_name)
-                        igdb_id = igdb_result.get('igdb_id')
-                        igdb_genre = igdb_result.get('genre')
-                        igdb_series = igdb_result.get('series_name')
-                        igdb_year = igdb_result.get('release_year')
-                        print(
-                            f"✅ IGDB validated: '{extracted_name}' → '{canonical_name}' (confidence: {data_confidence:.2f})")
-                    else:
-                        print(
-                            f"⚠️ Low IGDB confidence for '{extracted_name}': {data_confidence:.2f} - flagging for review")
-
-                    # Get all videos from this playlist with statistics
-                    videos_data = await get_playlist_videos_with_views(session, playlist_id, youtube_api_key)
-
-                    if not videos_data:
-                        continue
-
                     # Filter out Shorts (duration <= 65 seconds)
                     original_count = len(videos_data)
                     videos_data = [v for v in videos_data if v.get('duration_seconds', 0) > 65]
@@ -598,72 +850,15 @@ async def fetch_playlist_based_content_since(channel_id: str, start_timestamp: d
                         print(f"⏭️ SYNC: Skipping playlist '{playlist_title}' - no full videos found (only Shorts)")
                         continue
 
-                    # Calculate aggregated statistics
-                    total_views = sum(v.get('view_count', 0) for v in videos_data)
-                    total_playtime_seconds = sum(v.get('duration_seconds', 0) for v in videos_data)
-                    total_playtime_minutes = total_playtime_seconds // 60
-                    total_episodes = len(videos_data)
-
-                    # Get first video date
-                    first_video_date = None
-                    completed_date = None
-                    if videos_data:
-                        first_video_date = videos_data[0].get('published_at')
-                        if completion_status == 'completed':
-                            completed_date = videos_data[-1].get('published_at')
-
-                    # Build alternative names ONLY from IGDB (no video titles or playlist names)
-                    alternative_names = []
-                    if igdb_result.get('alternative_names'):
-                        alternative_names = igdb_result['alternative_names'][:5]  # Limit to 5 IGDB alternatives
-
-                    # If no IGDB alternatives but we have the canonical name, add it
-                    if not alternative_names and canonical_name != extracted_name:
-                        alternative_names = [extracted_name]
-
-                    # Fallback series name extraction from playlist title if IGDB doesn't provide one
-                    series_name = igdb_series
-                    if not series_name:
-                        # Extract series from playlist title (remove brackets, episode markers, etc.)
-                        clean_title = playlist_title.replace('[COMPLETED]', '').replace('[completed]', '').strip()
-                        # Remove common patterns like "- Part 1", "Episode 5", etc.
-                        series_name = re.sub(r'\s*-\s*(Part|Episode|Ep|#)\s*\d+.*$',
-                                             '', clean_title, flags=re.IGNORECASE)
-                        series_name = re.sub(r'\s*\d+\s*$', '', series_name).strip()  # Remove trailing numbers
-                        # If it looks like a full game name with subtitle, try to extract just the series
-                        if ':' in series_name or '–' in series_name or '—' in series_name:
-                            # For titles like "Uncharted 3: Drake's Deception", extract "Uncharted"
-                            parts = re.split(r'[:\–\—]', series_name)
-                            if parts and len(parts[0].strip()) >= 3:
-                                series_name = parts[0].strip()
-
-                    # Create complete game data entry with IGDB enrichment
-                    game_data = {
-                        'canonical_name': canonical_name,
-                        'series_name': series_name or canonical_name,  # Use extracted series or canonical as fallback
-                        'genre': igdb_genre,  # From IGDB
-                        'release_year': igdb_year,  # From IGDB
-                        'total_playtime_minutes': total_playtime_minutes,
-                        'total_episodes': total_episodes,
-                        'youtube_playlist_url': f"https://youtube.com/playlist?list={playlist_id}",
-                        'youtube_views': total_views,
-                        'twitch_views': 0,  # Explicit 0 for YouTube-only content (not NULL)
-                        'completion_status': completion_status,
-                        'alternative_names': alternative_names,
-                        'first_played_date': first_video_date,
-                        'completed_date': completed_date,
-                        'igdb_id': igdb_id,  # IGDB tracking
-                        'data_confidence': data_confidence,  # Confidence score
-                        'notes': f"Auto-synced from YouTube playlist. {total_episodes} episodes, {total_playtime_minutes//60}h {total_playtime_minutes%60}m total."
-                    }
-
+                    igdb_result = enrichment.get(candidate['extracted_name']) or {}
+                    game_data = _build_playlist_game_data(candidate, igdb_result, videos_data)
                     games_data.append(game_data)
                     print(
-                        f"✅ Processed: {canonical_name} - {total_episodes} episodes, {total_views:,} views, status: {completion_status}")
+                        f"✅ Processed: {game_data['canonical_name']} - {game_data['total_episodes']} episodes, "
+                        f"{game_data['youtube_views']:,} views, status: {game_data['completion_status']}")
 
                 except Exception as playlist_error:
-                    print(
-                        f"⚠️ Error processing playlist '{playlist.get('snippet', {}).get('title', 'Unknown')}': {playlist_error}")
+                    print(f"⚠️ Error processing playlist '{playlist_title}': {playlist_error}")
                     continue
 
         except Exception as e:
@@ -674,89 +869,18 @@ async def fetch_playlist_based_content_since(channel_id: str, start_timestamp: d
     return games_data
 
 
-async def playlist_has_new_content(session, playlist_id: str, start_timestamp: datetime, api_key: str) -> bool:
-    """
-    Check if a playlist has any videos published since the start timestamp.
-
-    Checks at least the first 2 pages (100 videos) before deciding, to handle:
-    - Playlists with manual reordering
-    - Unavailable/private videos that may appear out of order
-    - Mixed old/new content
-    """
+def _parse_published_at(published_at: Optional[str]) -> datetime:
+    """Parse a YouTube publishedAt timestamp (datetime.min in UTC if missing/invalid)"""
     try:
-        next_page_token = None
-        pages_checked = 0
-        min_pages_to_check = 2  # Check at least 2 pages (100 videos) to handle reordering
-        max_pages = 10  # Safety limit to prevent infinite loops (10 pages = 500 videos)
-        found_new_content = False
-
-        print(f"🔍 Checking playlist {playlist_id[:8]}... for content since {start_timestamp.strftime('%Y-%m-%d')}")
-
-        while pages_checked < max_pages:
-            url = f"https://www.googleapis.com/youtube/v3/playlistItems"
-            params = {
-                'part': 'snippet',
-                'playlistId': playlist_id,
-                'maxResults': 50,
-                'key': api_key
-            }
-            if next_page_token:
-                params['pageToken'] = next_page_token
-
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    print(f"⚠️ API error checking playlist: {response.status}")
-                    return False
-
-                data = await response.json()
-                items = data.get('items', [])
-
-                if not items:
-                    # No more videos in playlist
-                    return found_new_content
+        return datetime.fromisoformat(published_at.replace('Z', '+00:00'))  # type: ignore[union-attr]
+    except (AttributeError, ValueError):
+        return datetime.min.replace(tzinfo=timezone.utc)
 
-                # Check each video in this page
-                for item in items:
-                    try:
-                        published_at = datetime.fromisoformat(item['snippet']['publishedAt'].replace('Z', '+00:00'))
-
-                        # If we find a video newer than our timestamp, mark that we found new content
-                        if published_at >= start_timestamp:
-                            if not found_new_content:
-                                print(
-                                    f"✅ Found new content in playlist (published: {published_at.strftime('%Y-%m-%d')})")
-                            found_new_content = True
-                            # Don't return yet - keep checking to log properly
-                    except (KeyError, ValueError) as e:
-                        # Skip videos with invalid/missing dates (e.g., unavailable videos)
-                        continue
-
-                # Check if there are more pages
-                next_page_token = data.get('nextPageToken')
-                pages_checked += 1
-
-                # If we've found new content and checked minimum pages, we can stop
-                if found_new_content and pages_checked >= min_pages_to_check:
-                    return True
-
-                # If we've checked minimum pages and found nothing, stop
-                if not found_new_content and pages_checked >= min_pages_to_check:
-                    print(f"⏹️ Checked {pages_checked} pages, no content newer than {start_timestamp.strftime('%Y-%m-%d')}")
-                    return False
-
-                # If no more pages, return what we found
-                if not next_page_token:
-                    if not found_new_content:
-                        print(
-                            f"⏹️ Reached end of playlist, no content newer than {start_timestamp.strftime('%Y-%m-%d')}")
-                    return found_new_content
-
-        print(f"⚠️ Reached max pages ({max_pages}) for playlist check")
-        return found_new_content
 
-    except Exception as e:
-        print(f"⚠️ Error checking playlist for new content: {e}")
-        return False
+def playlist_id_from_url(playlist_url: str) -> Optional[str]:
+    """Extract the playlist ID from a youtube_playlist_url"""
+    match = re.search(r'[?&]list=([\w-]+)', playlist_url or '')
+    return match.group(1) if match else None
 
 
 def extract_youtube_urls(text: str) -> List[str]:
@@ -781,7 +905,7 @@ async def get_most_viewed_game_overall(channel_id: str = "UCPoUxLHeTnE9SUDAkqfJz
 
         print(f"🔄 Fetching overall YouTube analytics for channel: {channel_id}")
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session("youtube") as session:
             # Step 1: Get all playlists from the channel
             url = f"https://www.googleapis.com/youtube/v3/playlists"
             params = {
@@ -878,7 +1002,7 @@ async def get_youtube_analytics_for_game(game_name: str, query_type: str = "gene
 
         print(f"🔄 Fetching YouTube analytics for '{game_name}' (query type: {query_type})")
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session("youtube") as session:
             # Step 1: Find the playlist for this specific game
             playlist_data = await find_game_playlist(session, JONESY_CHANNEL_ID, game_name, youtube_api_key)
 
@@ -1012,59 +1136,50 @@ def calculate_playlist_match_score(game_name: str, playlist_name: str, original_
     return min(score, 1.0)
 
 
-async def get_playlist_videos_with_views(session, playlist_id: str, api_key: str) -> Optional[List[Dict[str, Any]]]:
-    """Get all videos from a playlist with their view counts."""
-    try:
-        videos = []
-        next_page_token = None
+async def _get_playlist_items(session, playlist_id: str, api_key: str) -> Optional[List[Dict[str, Any]]]:
+    """Get every item of a playlist (video ID, title, publish date, position); None on API error."""
+    items = []
+    next_page_token = None
 
-        while True:
-            # Get playlist items
-            url = f"https://www.googleapis.com/youtube/v3/playlistItems"
-            params = {
-                'part': 'snippet',
-                'playlistId': playlist_id,
-                'maxResults': 50,
-                'key': api_key
-            }
-            if next_page_token:
-                params['pageToken'] = next_page_token
+    while True:
+        params = {
+            'part': 'snippet',
+            'playlistId': playlist_id,
+            'maxResults': 50,
+            'key': api_key
+        }
+        if next_page_token:
+            params['pageToken'] = next_page_token
 
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    print(f"YouTube API error: {response.status}")
-                    return None
+        async with session.get(f"{YOUTUBE_API_URL}/playlistItems", params=params) as response:
+            if response.status != 200:
+                print(f"YouTube API error: {response.status}")
+                return None
+            data = await response.json()
 
-                data = await response.json()
+        for item in data['items']:
+            items.append({
+                'video_id': item['snippet']['resourceId']['videoId'],
+                'title': item['snippet']['title'],
+                'published_at': item['snippet']['publishedAt'],
+                'position': item['snippet']['position']
+            })
 
-                # Extract video IDs and basic info
-                video_ids = []
-                video_info = {}
-
-                for item in data['items']:
-                    video_id = item['snippet']['resourceId']['videoId']
-                    video_ids.append(video_id)
-                    video_info[video_id] = {
-                        'title': item['snippet']['title'],
-                        'published_at': item['snippet']['publishedAt'],
-                        'position': item['snippet']['position']
-                    }
+        next_page_token = data.get('nextPageToken')
+        if not next_page_token:
+            return items
 
-                # Get detailed video statistics (including view counts)
-                if video_ids:
-                    stats_data = await get_video_statistics(session, video_ids, api_key)
 
-                    # Combine info with stats
-                    for video_id, stats in stats_data.items():
-                        if video_id in video_info:
-                            video_data = video_info[video_id]
-                            video_data.update(stats)
-                            video_data['video_id'] = video_id
-                            videos.append(video_data)
+async def get_playlist_videos_with_views(session, playlist_id: str, api_key: str) -> Optional[List[Dict[str, Any]]]:
+    """Get all videos from a playlist with their view counts."""
+    try:
+        items = await _get_playlist_items(session, playlist_id, api_key)
+        if items is None:
+            return None
 
-                next_page_token = data.get('nextPageToken')
-                if not next_page_token:
-                    break
+        # Get detailed video statistics (including view counts) for all pages at once
+        stats_data = await get_video_statistics(session, [item['video_id'] for item in items], api_key)
+        videos = [dict(item, **stats_data[item['video_id']]) for item in items if item['video_id'] in stats_data]
 
         print(f"✅ Retrieved {len(videos)} videos with view data")
         return videos
@@ -1074,41 +1189,43 @@ async def get_playlist_videos_with_views(session, playlist_id: str, api_key: str
         return None
 
 
+async def _fetch_video_batch(session, video_ids: List[str], api_key: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Get statistics for up to 50 video IDs with one videos.list request; None on API error."""
+    params = {
+        'part': 'statistics,contentDetails',
+        'id': ','.join(video_ids),
+        'key': api_key
+    }
+    async with session.get(f"{YOUTUBE_API_URL}/videos", params=params) as response:
+        if response.status != 200:
+            print(f"YouTube API error: {response.status}")
+            return None
+        data = await response.json()
+
+    stats_data = {}
+    for item in data['items']:
+        stats = item['statistics']
+        content_details = item['contentDetails']
+        stats_data[item['id']] = {
+            'view_count': int(stats.get('viewCount', 0)),
+            'like_count': int(stats.get('likeCount', 0)),
+            'comment_count': int(stats.get('commentCount', 0)),
+            'duration': content_details.get('duration', ''),
+            'duration_seconds': parse_youtube_duration(content_details.get('duration', ''))
+        }
+    return stats_data
+
+
 async def get_video_statistics(session, video_ids: List[str], api_key: str) -> Dict[str, Dict[str, Any]]:
     """Get detailed statistics for a list of video IDs."""
     try:
         stats_data = {}
 
         # Process in chunks of 50 (API limit)
-        for i in range(0, len(video_ids), 50):
-            chunk = video_ids[i:i + 50]
-
-            url = f"https://www.googleapis.com/youtube/v3/videos"
-            params = {
-                'part': 'statistics,contentDetails',
-                'id': ','.join(chunk),
-                'key': api_key
-            }
-
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    print(f"YouTube API error: {response.status}")
-                    continue
-
-                data = await response.json()
-
-                for item in data['items']:
-                    video_id = item['id']
-                    stats = item['statistics']
-                    content_details = item['contentDetails']
-
-                    stats_data[video_id] = {
-                        'view_count': int(stats.get('viewCount', 0)),
-                        'like_count': int(stats.get('likeCount', 0)),
-                        'comment_count': int(stats.get('commentCount', 0)),
-                        'duration': content_details.get('duration', ''),
-                        'duration_seconds': parse_youtube_duration(content_details.get('duration', ''))
-                    }
+        for i in range(0, len(video_ids), VIDEOS_BATCH_SIZE):
+            chunk_stats = await _fetch_video_batch(session, video_ids[i:i + VIDEOS_BATCH_SIZE], api_key)
+            if chunk_stats:
+                stats_data.update(chunk_stats)
 
         return stats_data
 
@@ -1209,7 +1326,7 @@ async def fetch_vods_channel_recent_videos(channel_id: str) -> List[Dict[str, An
 
     videos_data = []
 
-    async with aiohttp.ClientSession() as session:
+    async with http_session("youtube") as session:
         try:
             # 1. Get the 'uploads' playlist ID for the channel
             url = f"https://www.googleapis.com/youtube/v3/channels"
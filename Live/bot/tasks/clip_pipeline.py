@@ -0,0 +1,407 @@
+"""
+Clip Pipeline Module
+
+Staged processing for clip-lore batches (the nightly backlog, the weekday
+clip scan and !scan_clips). Clips used to go through ClipParsingService one
+at a time: download, upload, poll, generate, delete, then a 60 second pause.
+Here each step is a stage with its own workers, joined by bounded queues:
+
+    download (yt-dlp)  ->  [preprocess (ffmpeg)]  ->  upload + poll (Gemini Files API)  ->  analysis (generate, save)
+
+so the next clips are downloaded and uploaded while the current one is
+being analysed. The optional preprocess stage shrinks each clip with ffmpeg
+before upload (see bot/utils/video_preprocess.py), and each finished clip
+reports the bytes it saved and its end-to-end time. With a ClipStore
+(bot/utils/clip_store.py) downloads are kept by content hash together with
+their analysis, so a reposted or retried clip skips the steps already done:
+known media isn't downloaded again, a stored analysis isn't regenerated and
+content that already has lore is only recorded as an alias.
+Generation is still paced and goes through the same quota guard as before; once the quota runs low the pipeline stops taking new work and
+marks the remaining clips as aborted so they are picked up next time.
+Bounded queues keep only a few clips on disk or in Gemini storage at once.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..commands.clips import ClipParsingService, canonicalize_clip_url
+from ..handlers.ai_handler import delete_media_file, generate_from_media, media_analysis_available, upload_media_file
+from ..utils.clip_store import ClipStore
+from ..utils.video_preprocess import ClipPreprocessOptions, format_bytes, preprocess_clip
+
+# Minimum gap between generation requests (the old per-clip pause)
+ANALYSIS_INTERVAL_SECONDS = 60.0
+
+# Pause before retrying a failed step (Gemini 503s are usually transient)
+RETRY_DELAY_SECONDS = 30.0
+
+
+class ClipJob:
+    """One clip moving through the pipeline."""
+
+    def __init__(self, index: int, message: Any, url: str, local_path: str):
+        self.index = index
+        self.message = message
+        self.url = url
+        self.canonical_url = canonicalize_clip_url(url)
+        self.local_path = local_path
+        self.upload_path = local_path
+        self.uploaded_file: Any = None
+        self.status = "queued"  # queued -> success | failed | aborted
+        self.error: Optional[str] = None
+        self.original_bytes = 0
+        self.upload_bytes = 0
+        self.started_at: Optional[float] = None
+        self.elapsed: Optional[float] = None
+        self.content_hash: Optional[str] = None
+        self.cached_analysis: Optional[str] = None
+        self.reused: Optional[str] = None  # "media", "analysis" or "lore" when the store saved work
+        self.pinned = False  # Stored media is pinned against eviction until the upload is done
+
+    @property
+    def success(self) -> bool:
+        return self.status == "success"
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(self.original_bytes - self.upload_bytes, 0)
+
+
+class ClipPipeline:
+    """
+    Bounded staged pipeline over a ClipParsingService.
+
+    The Gemini steps default to the ai_handler functions and the quota guard
+    to media_analysis_available; tests pass stubs for all of them.
+    """
+
+    def __init__(self, service: ClipParsingService,
+                 download_workers: int = 2,
+                 upload_workers: int = 2,
+                 queue_size: int = 2,
+                 max_attempts: int = 3,
+                 analysis_interval: Optional[float] = None,
+                 retry_delay: Optional[float] = None,
+                 quota_guard: Callable[[], bool] = media_analysis_available,
+                 upload: Callable[[str], Awaitable[Tuple[Any, str]]] = upload_media_file,
+                 generate: Callable[[Any, str], Awaitable[Tuple[Optional[str], str]]] = generate_from_media,
+                 delete: Callable[[Any], Awaitable[None]] = delete_media_file,
+                 preprocess: Optional[ClipPreprocessOptions] = None,
+                 store: Optional[ClipStore] = None,
+                 on_result: Optional[Callable[[ClipJob], Awaitable[None]]] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            service: Downloads clips, builds the prompt and saves lore
+            download_workers: Concurrent yt-dlp downloads
+            upload_workers: Concurrent Gemini uploads/polls
+            queue_size: Capacity of each queue between stages
+            max_attempts: Tries per step before a clip is marked failed
+            analysis_interval: Minimum seconds between generation requests
+            retry_delay: Seconds to wait before retrying a failed step
+            quota_guard: Returns False once the AI quota is (nearly) spent
+            upload / generate / delete: Gemini media steps
+            preprocess: ffmpeg settings for shrinking clips before upload
+                        (None or mode "off" skips the stage)
+            store: Content-addressed cache of downloads and analyses (None disables reuse)
+            on_result: Awaited as each clip finishes (reactions, progress)
+        """
+        self.service = service
+        self.download_workers = download_workers
+        self.upload_workers = upload_workers
+        self.max_attempts = max_attempts
+        self.analysis_interval = ANALYSIS_INTERVAL_SECONDS if analysis_interval is None else analysis_interval
+        self.retry_delay = RETRY_DELAY_SECONDS if retry_delay is None else retry_delay
+        self.quota_guard = quota_guard
+        self._upload = upload
+        self._generate = generate
+        self._delete = delete
+        self.preprocess = preprocess if preprocess is not None and preprocess.enabled else None
+        self.store = store
+        self.on_result = on_result
+
+        stage_names = ["download"] + (["preprocess"] if self.preprocess else []) + ["upload", "analysis"]
+        self.queues: Dict[str, asyncio.Queue] = {name: asyncio.Queue(maxsize=queue_size) for name in stage_names}
+        self.active = {name: 0 for name in stage_names}
+        self.aborted = False
+        self.results: List[ClipJob] = []
+        self._prompt = ""
+        self._last_generation: Optional[float] = None
+        self.stats = {
+            "success": 0,
+            "failed": 0,
+            "aborted": 0,
+            "retries": 0,
+            "bytes_downloaded": 0,
+            "bytes_uploaded": 0,
+            "reused": {"media": 0, "analysis": 0, "lore": 0},
+            "max_depth": {name: 0 for name in stage_names}
+        }
+
+    # ========== VISIBILITY ==========
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Clips waiting in front of each stage."""
+        return {stage: queue.qsize() for stage, queue in self.queues.items()}
+
+    def describe(self) -> str:
+        depths = self.queue_depths()
+        return ", ".join(f"{stage} {depths[stage]} waiting/{self.active[stage]} active" for stage in self.queues)
+
+    async def _put(self, stage: str, job: Optional[ClipJob]):
+        await self.queues[stage].put(job)
+        depth = self.queues[stage].qsize()
+        if depth > self.stats["max_depth"][stage]:
+            self.stats["max_depth"][stage] = depth
+
+    # ========== RUN ==========
+
+    async def run(self, clips: List[Tuple[Any, str]]) -> List[ClipJob]:
+        """Process (message, url) pairs; returns the finished jobs in completion order."""
+        jobs = [ClipJob(index, message, url, self.service.temp_path(message))
+                for index, (message, url) in enumerate(clips)]
+        if not jobs:
+            return []
+
+        # The played-games list goes into every prompt; query it once per batch
+        self._prompt = await asyncio.to_thread(self.service.build_prompt)
+        print(f"🎬 Clip pipeline starting: {len(jobs)} clips "
+              f"({self.download_workers} download, {self.upload_workers} upload, 1 analysis worker; "
+              f"pre-processing: {self.preprocess.mode if self.preprocess else 'off'})")
+
+        stages = [("download", self._download, self.download_workers)]
+        if self.preprocess:
+            stages.append(("preprocess", self._preprocess, 1))
+        stages += [
+            ("upload", self._upload_and_poll, self.upload_workers),
+            ("analysis", self._analyse, 1),
+        ]
+        workers = {name: [asyncio.create_task(self._worker(name, handler)) for _ in range(count)]
+                   for name, handler, count in stages}
+
+        try:
+            for job in jobs:
+                await self._put("download", job)
+            # Close each stage once everything upstream of it has drained
+            for name, _, count in stages:
+                for _ in range(count):
+                    await self._put(name, None)
+                await asyncio.gather(*workers[name])
+        finally:
+            for tasks in workers.values():
+                for task in tasks:
+                    task.cancel()
+
+        print(f"📊 Clip pipeline finished: {self.stats['success']} succeeded, {self.stats['failed']} failed, "
+              f"{self.stats['aborted']} aborted (max queue depths {self.stats['max_depth']})")
+        if any(self.stats["reused"].values()):
+            print(f"♻️ Reused from the clip store: {self.stats['reused']}")
+        if self.stats["bytes_downloaded"]:
+            saved = self.stats["bytes_downloaded"] - self.stats["bytes_uploaded"]
+            print(f"📦 Uploaded {format_bytes(self.stats['bytes_uploaded'])} of "
+                  f"{format_bytes(self.stats['bytes_downloaded'])} downloaded ({format_bytes(saved)} saved)")
+        return self.results
+
+    async def _worker(self, stage: str, handler: Callable[[ClipJob], Awaitable[Optional[str]]]):
+        queue = self.queues[stage]
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            if self.aborted:
+                await self._finish(job, "aborted")
+                continue
+
+            self.active[stage] += 1
+            try:
+                next_stage = await handler(job)
+            except Exception as e:
+                job.error = str(e)
+                next_stage = None
+                await self._finish(job, "failed")
+            finally:
+                self.active[stage] -= 1
+
+            if next_stage:
+                await self._put(next_stage, job)
+
+    async def _attempt(self, job: ClipJob, step: Callable[[], Awaitable[Tuple[Any, str]]]) -> Any:
+        """Run a step up to max_attempts times; None if it never succeeded or the quota ran out."""
+        for attempt in range(self.max_attempts):
+            if not self.quota_guard():
+                self._abort()
+                return None
+            result, status = await step()
+            if result:
+                return result
+            job.error = status
+            if attempt < self.max_attempts - 1 and self.quota_guard():
+                self.stats["retries"] += 1
+                print(f"⚠️ Clip {job.url} step failed ({status}), attempt {attempt + 1}/{self.max_attempts}. "
+                      f"Retrying in {self.retry_delay:.0f}s...")
+                await asyncio.sleep(self.retry_delay)
+        return None
+
+    def _abort(self):
+        if not self.aborted:
+            self.aborted = True
+            print("🚫 Primary AI is exhausted or unavailable. Aborting the rest of the clip batch.")
+
+    # ========== STAGES ==========
+
+    async def _download(self, job: ClipJob) -> Optional[str]:
+        job.started_at = time.monotonic()
+        if self.store is not None:
+            job.content_hash = self.store.hash_for_url(job.canonical_url)
+            if job.content_hash is not None:
+                reuse = self._reuse_stored(job)
+                if reuse:
+                    return await self._skip_to(job, reuse)
+            # A stable path per URL lets yt-dlp resume a download that failed last time
+            job.local_path = job.upload_path = self.store.begin_download(job.canonical_url)
+
+        async def step():
+            ok = await self.service.download(job.url, job.local_path)
+            return ok, ("success" if ok else "download_failed")
+
+        download_path = job.local_path
+        try:
+            if not await self._attempt(job, step):
+                await self._finish(job, "aborted" if self.aborted else "failed")
+                return None
+
+            if self.store is not None:
+                job.content_hash = await asyncio.to_thread(
+                    self.store.add_media, job.local_path, job.canonical_url, pin=True)
+                job.pinned = True
+        finally:
+            if self.store is not None:
+                self.store.end_download(download_path)
+
+        if self.store is not None:
+            # The same media may already be known under a different URL
+            return await self._skip_to(job, self._reuse_stored(job, downloaded=True))
+        job.original_bytes = job.upload_bytes = os.path.getsize(job.local_path)
+        return "preprocess" if self.preprocess else "upload"
+
+    def _reuse_stored(self, job: ClipJob, downloaded: bool = False) -> Optional[str]:
+        """Next step for a clip with known content, or None if it still has to be downloaded."""
+        if self.store.is_saved(job.content_hash):
+            job.reused = "lore"
+            return "saved"
+        job.cached_analysis = self.store.get_analysis(job.content_hash)
+        if job.cached_analysis:
+            job.reused = "analysis"
+            return "analysis"
+        if not job.pinned:
+            if not self.store.pin_media(job.content_hash):
+                return None
+            job.pinned = True
+        if not downloaded:
+            job.reused = "media"
+        job.local_path = job.upload_path = self.store.media_path(job.content_hash)
+        job.original_bytes = job.upload_bytes = os.path.getsize(job.local_path)
+        return "preprocess" if self.preprocess else "upload"
+
+    async def _skip_to(self, job: ClipJob, next_stage: str) -> Optional[str]:
+        if job.reused:
+            self.stats["reused"][job.reused] += 1
+            print(f"♻️ Clip {job.url}: reusing stored {job.reused} ({job.content_hash[:12]})")
+        if next_stage != "saved":
+            return next_stage
+        # Lore for this exact clip already exists; record the URL so reposts are skipped
+        await asyncio.to_thread(self.store.mark_saved, job.content_hash, job.canonical_url)
+        await self._finish(job, "success")
+        return None
+
+    async def _preprocess(self, job: ClipJob) -> Optional[str]:
+        result = await asyncio.to_thread(preprocess_clip, job.local_path, self.preprocess)
+        job.upload_path = result['path']
+        job.upload_bytes = result['output_bytes']
+        if result['status'] == 'processed':
+            print(f"🎞️ Pre-processed {job.url} in {result['seconds']:.1f}s: "
+                  f"{format_bytes(job.original_bytes)} -> {format_bytes(job.upload_bytes)}")
+        return "upload"
+
+    async def _upload_and_poll(self, job: ClipJob) -> Optional[str]:
+        job.uploaded_file = await self._attempt(job, lambda: self._upload(job.upload_path))
+        if job.uploaded_file is None:
+            await self._finish(job, "aborted" if self.aborted else "failed")
+            return None
+        self.stats["bytes_downloaded"] += job.original_bytes
+        self.stats["bytes_uploaded"] += job.upload_bytes
+        # The local copies aren't needed once Gemini has the clip
+        self._remove_local_files(job)
+        return "analysis"
+
+    async def _analyse(self, job: ClipJob) -> Optional[str]:
+        async def step():
+            if self._last_generation is not None:
+                wait = self._last_generation + self.analysis_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._last_generation = time.monotonic()
+            return await self._generate(job.uploaded_file, self._prompt)
+
+        response_text = job.cached_analysis
+        if not response_text:
+            response_text = await self._attempt(job, step)
+            if not response_text:
+                await self._finish(job, "aborted" if self.aborted else "failed")
+                return None
+            if self.store is not None:
+                await asyncio.to_thread(self.store.put_analysis, job.content_hash, response_text)
+
+        try:
+            saved = await asyncio.to_thread(self.service.save_analysis, job.canonical_url, job.url,
+                                            response_text, job.message)
+        except RuntimeError:
+            # Unparseable output: don't hand the same text back on the next retry
+            if self.store is not None:
+                await asyncio.to_thread(self.store.put_analysis, job.content_hash, None)
+            raise
+        if saved and self.store is not None:
+            await asyncio.to_thread(self.store.mark_saved, job.content_hash, job.canonical_url)
+        await self._finish(job, "success" if saved else "failed")
+        return None
+
+    def _remove_local_files(self, job: ClipJob):
+        # Stored originals stay for reuse (the store evicts them); derived copies always go
+        if self.store is None or not self.store.owns(job.local_path):
+            self.service.remove_temp_file(job.local_path)
+        if job.upload_path != job.local_path:
+            self.service.remove_temp_file(job.upload_path)
+        if job.pinned:
+            job.pinned = False
+            self.store.unpin(job.content_hash)
+
+    async def _finish(self, job: ClipJob, status: str):
+        job.status = status
+        if job.started_at is not None:
+            job.elapsed = time.monotonic() - job.started_at
+        self._remove_local_files(job)
+        if job.uploaded_file is not None:
+            uploaded, job.uploaded_file = job.uploaded_file, None
+            await self._delete(uploaded)
+
+        self.stats[status] += 1
+        self.results.append(job)
+        if status == "failed":
+            print(f"❌ Clip {job.url} failed: {job.error}")
+        detail = ""
+        if job.elapsed is not None:
+            detail = f" in {job.elapsed:.1f}s"
+        if job.reused:
+            detail += f", reused stored {job.reused}"
+        elif job.original_bytes:
+            detail += f", uploaded {format_bytes(job.upload_bytes)} of {format_bytes(job.original_bytes)}"
+        print(f"🎬 Clip {len(self.results)}: {job.url} -> {status}{detail} | queues: {self.describe()}")
+
+        if self.on_result is not None:
+            try:
+                await self.on_result(job)
+            except Exception as e:
+                print(f"⚠️ Clip result callback failed for {job.url}: {e}")
@@ -0,0 +1,296 @@
+"""
+Reminder Scheduler Module
+
+Event-driven replacement for the minute-by-minute reminder polling loops.
+Pending reminders (and delivered ones still waiting for their auto-action)
+are loaded once into in-memory min-heaps keyed by due time. A single sleeper
+task waits until the earliest one is due, or until UserDatabase.add_reminder /
+cancel_user_reminder / cancel_reminder wakes it through the reminder observer
+hook, so delivery is precise to well under a second and the database is not
+touched while nothing is due.
+
+Due reminders are delivered together: sends run concurrently and their
+status updates are written with one UPDATE per outcome.
+"""
+
+import asyncio
+import heapq
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# Auto-actions run this long after delivery unless a moderator intervenes
+AUTO_ACTION_DELAY_SECONDS = 5 * 60
+
+# Upper bound on a single sleep, so clock adjustments are picked up
+MAX_SLEEP_SECONDS = 3600
+
+
+def _due_epoch(reminder: Dict[str, Any], field: str) -> Optional[float]:
+    """Epoch seconds for a reminder timestamp (rows carry *_epoch computed by the database)."""
+    epoch = reminder.get(f"{field}_epoch")
+    if epoch is not None:
+        return float(epoch)
+    value = reminder.get(field)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return None
+
+
+class ReminderScheduler:
+    """
+    In-memory reminder timeline with a single sleeper task.
+
+    Presents the same start/stop/is_running/next_iteration surface as the
+    discord.ext.tasks loops it replaces, so start_all_scheduled_tasks and the
+    status report treat it like any other scheduled task.
+    """
+
+    def __init__(self, deliver: Callable[[Dict[str, Any]], Awaitable[None]],
+                 execute_auto_action: Callable[[Dict[str, Any]], Awaitable[None]],
+                 get_database: Callable[[], Any]):
+        """
+        Initialize the scheduler.
+
+        Args:
+            deliver: Sends one reminder (raises on failure)
+            execute_auto_action: Runs one reminder's auto-action
+            get_database: Returns the DatabaseManager (or None)
+        """
+        self._deliver = deliver
+        self._execute_auto_action = execute_auto_action
+        self._get_database = get_database
+
+        self._reminders: Dict[int, Dict[str, Any]] = {}
+        self._auto_actions: Dict[int, Dict[str, Any]] = {}
+        self._due: List[Tuple[float, int]] = []
+        self._auto_due: List[Tuple[float, int]] = []
+        self._cancelled: Set[int] = set()
+
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.stats = {
+            "loaded": 0,
+            "delivered": 0,
+            "failed": 0,
+            "auto_actions": 0,
+            "batches": 0,
+            "db_calls": 0
+        }
+
+    # ========== TASK LIFECYCLE ==========
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the sleeper task and subscribe to reminder changes (needs a running event loop)."""
+        if self.is_running():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        db = self._get_database()
+        if db is not None:
+            db.users.reminder_observer = self
+        self._task = self._loop.create_task(self._run())
+
+    def stop(self):
+        db = self._get_database()
+        if db is not None and getattr(db.users, 'reminder_observer', None) is self:
+            db.users.reminder_observer = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def next_iteration(self) -> Optional[datetime]:
+        """When the next reminder or auto-action is due."""
+        due = self._next_due()
+        return datetime.fromtimestamp(due, timezone.utc) if due is not None else None
+
+    def __len__(self) -> int:
+        return len(self._reminders) + len(self._auto_actions)
+
+    # ========== OBSERVER HOOKS (called from any thread) ==========
+
+    def reminder_added(self, reminder: Dict[str, Any]):
+        self._call_soon(self._schedule, dict(reminder))
+
+    def reminder_cancelled(self, reminder_id: int):
+        self._call_soon(self._cancel, reminder_id)
+
+    def _call_soon(self, callback, *args):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                callback(*args)
+                return
+        except RuntimeError:
+            pass
+        loop.call_soon_threadsafe(callback, *args)
+
+    # ========== TIMELINE ==========
+
+    def _schedule(self, reminder: Dict[str, Any]):
+        reminder_id = reminder.get('id')
+        due = _due_epoch(reminder, 'scheduled_time')
+        if reminder_id is None or due is None or reminder_id in self._cancelled:
+            return
+        self._reminders[reminder_id] = reminder
+        heapq.heappush(self._due, (due, reminder_id))
+        self._poke()
+
+    def _schedule_auto_action(self, reminder: Dict[str, Any], delivered_epoch: float):
+        reminder_id = reminder['id']
+        self._auto_actions[reminder_id] = reminder
+        heapq.heappush(self._auto_due, (delivered_epoch + AUTO_ACTION_DELAY_SECONDS, reminder_id))
+        self._poke()
+
+    def _cancel(self, reminder_id: int):
+        self._cancelled.add(reminder_id)
+        if self._reminders.pop(reminder_id, None) is not None:
+            self._poke()
+
+    def _poke(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    @staticmethod
+    def _peek(heap: List[Tuple[float, int]], live: Dict[int, Dict[str, Any]]) -> Optional[float]:
+        # Lazily drop entries for cancelled or already handled reminders
+        while heap and heap[0][1] not in live:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def _next_due(self) -> Optional[float]:
+        times = [t for t in (self._peek(self._due, self._reminders),
+                             self._peek(self._auto_due, self._auto_actions)) if t is not None]
+        return min(times) if times else None
+
+    @staticmethod
+    def _pop_due(heap: List[Tuple[float, int]], live: Dict[int, Dict[str, Any]], now: float) -> List[Dict[str, Any]]:
+        batch = []
+        while heap and heap[0][0] <= now:
+            _, reminder_id = heapq.heappop(heap)
+            reminder = live.pop(reminder_id, None)
+            if reminder is not None:
+                batch.append(reminder)
+        return batch
+
+    # ========== SLEEPER ==========
+
+    async def load(self) -> int:
+        """Load pending reminders and outstanding auto-actions from the database (once per start)."""
+        db = self._get_database()
+        if db is None:
+            print("❌ Database instance is None - reminder system disabled")
+            return 0
+
+        rows = await db.aio.run(db.get_scheduled_reminders)
+        self.stats["db_calls"] += 1
+        for row in rows:
+            if row['id'] in self._cancelled:
+                continue
+            if row.get('status') == 'pending':
+                self._schedule(row)
+            else:
+                delivered = _due_epoch(row, 'delivered_at')
+                if delivered is not None:
+                    self._schedule_auto_action(row, delivered)
+        self.stats["loaded"] += len(rows)
+        print(f"🕒 Reminder scheduler loaded {len(self._reminders)} pending reminders and "
+              f"{len(self._auto_actions)} pending auto-actions")
+        return len(rows)
+
+    async def _run(self):
+        try:
+            await self.load()
+        except Exception as e:
+            print(f"❌ Reminder scheduler could not load reminders: {e}")
+
+        while True:
+            try:
+                due = self._next_due()
+                timeout = MAX_SLEEP_SECONDS if due is None else min(max(due - time.time(), 0), MAX_SLEEP_SECONDS)
+                if timeout > 0:
+                    self._wake.clear()  # type: ignore
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=timeout)  # type: ignore
+                        continue  # Timeline changed; recompute the next due time
+                    except asyncio.TimeoutError:
+                        pass
+                await self.run_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Critical error in reminder scheduler: {e}")
+                import traceback
+                traceback.print_exc()
+                await asyncio.sleep(1)
+
+    async def run_due(self, now: Optional[float] = None):
+        """Deliver every due reminder and run every due auto-action as one batch each."""
+        now = time.time() if now is None else now
+        reminders = self._pop_due(self._due, self._reminders, now)
+        auto_actions = self._pop_due(self._auto_due, self._auto_actions, now)
+        if reminders:
+            await self._deliver_batch(reminders, now)
+        if auto_actions:
+            await self._auto_action_batch(auto_actions)
+
+    async def _deliver_batch(self, reminders: List[Dict[str, Any]], now: float):
+        db = self._get_database()
+        print(f"🕒 Reminder batch at {datetime.fromtimestamp(now, timezone.utc).strftime('%H:%M:%S UTC')} - "
+              f"delivering {len(reminders)} due reminders")
+
+        results = await asyncio.gather(*(self._deliver(reminder) for reminder in reminders), return_exceptions=True)
+        delivered, failed = [], []
+        for reminder, result in zip(reminders, results):
+            if isinstance(result, BaseException):
+                print(f"❌ Failed to deliver reminder {reminder.get('id')}: {result}")
+                failed.append(reminder['id'])
+            else:
+                delivered.append(reminder)
+
+        delivered_at = datetime.fromtimestamp(time.time(), timezone.utc)
+        if db is not None:
+            if delivered:
+                await db.aio.run(db.update_reminder_statuses,
+                                 [r['id'] for r in delivered], "delivered", delivered_at)
+                self.stats["db_calls"] += 1
+            if failed:
+                await db.aio.run(db.update_reminder_statuses, failed, "failed")
+                self.stats["db_calls"] += 1
+
+        for reminder in delivered:
+            if reminder.get("auto_action_enabled") and reminder.get("auto_action_type"):
+                print(f"📋 Reminder {reminder['id']} has auto-action enabled, will run in 5 minutes")
+                self._schedule_auto_action(dict(reminder, delivered_at=delivered_at), delivered_at.timestamp())
+
+        self.stats["batches"] += 1
+        self.stats["delivered"] += len(delivered)
+        self.stats["failed"] += len(failed)
+        print(f"📊 Reminder delivery summary: {len(delivered)} successful, {len(failed)} failed")
+
+    async def _auto_action_batch(self, reminders: List[Dict[str, Any]]):
+        db = self._get_database()
+        print(f"⚡ Processing {len(reminders)} auto-action reminders")
+
+        results = await asyncio.gather(*(self._execute_auto_action(reminder) for reminder in reminders),
+                                       return_exceptions=True)
+        executed = []
+        for reminder, result in zip(reminders, results):
+            if isinstance(result, BaseException):
+                print(f"❌ Failed to execute auto-action for reminder {reminder['id']}: {result}")
+            else:
+                executed.append(reminder['id'])
+
+        # Failed auto-actions stay outstanding and are picked up again on the next start
+        if db is not None and executed:
+            await db.aio.run(db.update_reminder_statuses, executed, "auto_completed",
+                             None, datetime.fromtimestamp(time.time(), timezone.utc))
+            self.stats["db_calls"] += 1
+        self.stats["auto_actions"] += len(executed)
@@ -6,8 +6,7 @@ Scheduled Tasks Module
 Handles all background scheduled tasks including:
 - Daily games updates
 - Midnight restarts
-- Reminder checking
-- Auto-action processing
+- Reminder delivery and auto-actions (event-driven, see reminder_scheduler)
 - Trivia Tuesday automation
 """
 
@@ -36,6 +35,7 @@ from .greetings import (
     pops_annual_birthday_greeting,
     tuesday_trivia_greeting,
 )
+from .reminder_scheduler import ReminderScheduler
 from .sync_vods import monday_content_sync
 from .sync_youtube_vods import sync_youtube_vods_channel
 from .trivia_preflight import (
@@ -806,7 +806,7 @@ async def daily_clip_scan_task():
             clip_url = match.group(0)
             canonical_url = canonicalize_clip_url(clip_url)
 
-            if not db.trivia.clip_lore_exists(canonical_url):
+            if not cog.clip_already_processed(canonical_url):
                 clips_to_process.append((message, clip_url))
             else:
                 # Clip already processed - ensure it has the ✅ reaction
@@ -827,71 +827,16 @@ async def daily_clip_scan_task():
 
     print(f"🎬 Processing {queued_count} new clips...")
 
-    jam_user = None
-    try:
-        jam_user = await bot.fetch_user(JAM_USER_ID)
-    except Exception as e:
-        print(f"Failed to fetch Jam user for DMs: {e}")
-
-    quota_exhausted = False
-    for idx, (msg, curl) in enumerate(clips_to_process):
-        if quota_exhausted:
-            break
-
-        success = False
+    pipeline = await cog.run_clip_pipeline(clips_to_process)
 
-        # Clear any old failure marks before retrying
+    if pipeline.aborted:
+        # Send a DM saying we aborted; aborted clips keep no ✅/❌ so they are retried tomorrow
+        remaining = pipeline.stats["aborted"]
         try:
-            if bot.user:
-                await msg.remove_reaction("❌", bot.user)
-        except Exception:
-            pass
-
-        # Add a simple retry loop for Gemini 503 errors
-        for attempt in range(3):
-            success = await cog.parser.process_clip(curl, msg)
-            if success:
-                break
-
-            from ..config import MAX_DAILY_REQUESTS
-            from ..handlers.ai_handler import ai_usage_stats, primary_ai
-            daily_used = ai_usage_stats.get("daily_requests", 0)
-            if ai_usage_stats.get("quota_exhausted",
-                                  False) or primary_ai != "gemini" or daily_used >= MAX_DAILY_REQUESTS - 50:
-                print("🚫 Primary AI is exhausted or unavailable. Aborting clip batch.")
-                quota_exhausted = True
-                break
-
-            print(f"⚠️ Clip processing failed (attempt {attempt + 1}/3). Retrying in 30s...")
-            await asyncio.sleep(30.0)
-
-        if quota_exhausted:
-            # Send a DM saying we aborted
-            if jam_user:
-                await jam_user.send(f"⚠️ **Clip Processing Aborted**\nThe AI quota was exhausted while processing clip {idx + 1}/{queued_count}. The remaining {queued_count - idx} clips will be processed tomorrow.")
-            # Do not apply ✅ or ❌, just leave it for tomorrow
-            try:
-                if bot.user:
-                    await msg.remove_reaction("👀", bot.user)
-            except Exception:
-                pass
-            break
-
-        try:
-            if bot.user:
-                if success:
-                    await msg.add_reaction("✅")
-                else:
-                    await msg.add_reaction("❌")
-        except discord.Forbidden:
-            print(
-                f"Missing permissions to add ✅/❌ reaction in channel {msg.channel.id}")
+            jam_user = await bot.fetch_user(JAM_USER_ID)
+            await jam_user.send(f"⚠️ **Clip Processing Aborted**\nThe AI quota was exhausted after processing {queued_count - remaining}/{queued_count} clips. The remaining {remaining} clips will be processed tomorrow.")
         except Exception as e:
-            print(f"Failed to add final reaction to clip {curl}: {e}")
-
-        # Sleep to respect rate limits if not the last clip
-        if idx < queued_count - 1:
-            await asyncio.sleep(60.0)
+            print(f"Failed to DM Jam about the aborted clip batch: {e}")
 
     print("✅ Daily clip scan processing complete.")
 
@@ -1124,185 +1069,6 @@ async def scheduled_ai_refresh():
         except Exception:
             pass
 
-## CONTINUOUS TASKS ##
-# Check reminders every minute
-
-
-@tasks.loop(minutes=1)
-async def check_due_reminders():
-    """Check for due reminders and deliver them"""
-    try:
-        uk_now = datetime.now(ZoneInfo("Europe/London"))
-
-        # Get dynamic database instance
-        db = get_database()
-
-        # Enhanced database diagnostics - only log issues or when processing reminders
-        if db is None:
-            print("❌ Database instance is None - reminder system disabled")
-            return
-
-        if not hasattr(db, 'get_due_reminders'):
-            print("❌ Database instance missing get_due_reminders - reminder system disabled")
-            return
-
-        # Check database connection - only log errors
-        try:
-            if hasattr(db, 'get_connection') and callable(getattr(db, 'get_connection')):
-                conn = db.get_connection()
-                if not conn:
-                    print("❌ No database connection available - reminder system disabled")
-                    return
-            else:
-                print("❌ Database get_connection method not available")
-                return
-        except Exception as db_check_e:
-            print(f"❌ Database check failed - reminder system disabled: {db_check_e}")
-            return
-
-        # Test database connection - only log errors
-        try:
-            if hasattr(db, 'get_connection') and callable(getattr(db, 'get_connection')):
-                conn = db.get_connection()  # type: ignore
-                if not conn:
-                    print("❌ Database connection failed in reminder check")
-                    return
-            else:
-                print("❌ Database get_connection method not available")
-                return
-        except Exception as conn_e:
-            print(f"❌ Database connection error: {conn_e}")
-            return
-
-        # Get due reminders - only log if found or if error occurs
-        try:
-            from typing import Any
-            due_reminders: list[dict[str, Any]] = db.get_due_reminders(uk_now)  # type: ignore
-
-            # Only log when there are actually reminders to process
-            if due_reminders and len(due_reminders) > 0:
-                print(
-                    f"🕒 Reminder check at {uk_now.strftime('%H:%M:%S UK')} - found {len(due_reminders)} due reminders")
-                for i, reminder in enumerate(due_reminders):
-                    print(
-                        f"  📌 Reminder {i+1}: ID={reminder.get('id')}, User={reminder.get('user_id')}, Text='{reminder.get('reminder_text', '')[:30]}...', Due={reminder.get('scheduled_time')}")
-
-        except Exception as query_e:
-            print(f"❌ Database query for due reminders failed: {query_e}")
-            import traceback
-            traceback.print_exc()
-            return
-
-        if not due_reminders:
-            # Silent return when no reminders - no logging needed
-            return
-
-        print(f" Processing {len(due_reminders)} due reminders")
-
-        # Get bot instance more reliably
-        bot = None
-        try:
-            # Try multiple methods to get bot instance
-            import sys
-            for name, obj in sys.modules.items():
-                if hasattr(obj, 'bot') and hasattr(obj.bot, 'user') and obj.bot.user:
-                    bot = obj.bot
-                    print(f"✅ Bot instance found: {bot.user.name if bot.user else 'Unknown'}")
-                    break
-
-            if not bot:
-                # Fallback: use global bot instance
-                bot = get_bot_instance()
-                if bot and hasattr(bot, 'user') and bot.user:
-                    print(f"✅ Bot instance from global: {bot.user.name if bot.user else 'Unknown'}")
-                else:
-                    print("❌ Bot instance not available for reminder delivery")
-                    return
-        except Exception as bot_e:
-            print(f"❌ Could not get bot instance: {bot_e}")
-            return
-
-        successful_deliveries = 0
-        failed_deliveries = 0
-
-        for reminder in due_reminders:
-            try:
-                reminder_id = reminder.get('id')
-                reminder_text = reminder.get('reminder_text', '')
-                print(
-                    f"📤 Delivering reminder {reminder_id}: {reminder_text[:50]}...")
-
-                await deliver_reminder(reminder)
-
-                # Mark as delivered
-                db.update_reminder_status(
-                    reminder_id, "delivered")  # type: ignore
-                print(
-                    f"✅ Reminder {reminder_id} delivered and marked as delivered")
-                successful_deliveries += 1
-
-                # Check if auto-action is enabled and should be triggered
-                if reminder.get("auto_action_enabled") and reminder.get(
-                        "auto_action_type"):
-                    print(
-                        f"📋 Reminder {reminder_id} has auto-action enabled, will check in 5 minutes")
-
-            except Exception as e:
-                print(
-                    f"❌ Failed to deliver reminder {reminder.get('id')}: {e}")
-                import traceback
-                traceback.print_exc()
-                # Mark as failed
-                try:
-                    db.update_reminder_status(  # type: ignore
-                        reminder.get('id'), "failed")  # type: ignore
-                    print(f"⚠️ Reminder {reminder.get('id')} marked as failed")
-                except Exception as mark_e:
-                    print(f"❌ Could not mark reminder as failed: {mark_e}")
-                failed_deliveries += 1
-
-        print(
-            f"📊 Reminder delivery summary: {successful_deliveries} successful, {failed_deliveries} failed")
-
-    except Exception as e:
-        print(f"❌ Critical error in check_due_reminders: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-@tasks.loop(minutes=1)  # Check for auto-actions every minute
-async def check_auto_actions():
-    """Check for reminders that need auto-actions triggered"""
-    try:
-        from ..database import get_database
-        db = get_database()
-        uk_now = datetime.now(ZoneInfo("Europe/London"))
-        auto_action_reminders = db.get_reminders_awaiting_auto_action(  # type: ignore
-            uk_now)  # type: ignore
-
-        if not auto_action_reminders:
-            return
-
-        print(
-            f"⚡ Processing {len(auto_action_reminders)} auto-action reminders")
-
-        for reminder in auto_action_reminders:
-            try:
-                await execute_auto_action(reminder)
-
-                # Mark auto-action as executed
-                db.update_reminder_status(  # type: ignore
-                    reminder["id"], "delivered", auto_executed_at=uk_now)
-
-                print(
-                    f"✅ Auto-action executed for reminder {reminder['id']}")
-
-            except Exception as e:
-                print(
-                    f"❌ Failed to execute auto-action for reminder {reminder['id']}: {e}")
-
-    except Exception as e:
-        print(f"❌ Error in check_auto_actions: {e}")
 
 # Run every hour to cleanup old recommendation messages
 
@@ -1441,18 +1207,7 @@ async def notify_scheduled_message_error(task_name: str, error_message: str, tim
 async def deliver_reminder(reminder: Dict[str, Any]) -> None:
     """Deliver a reminder to the appropriate channel/user with enhanced reliability"""
     try:
-        # Get bot instance using the same reliable method as check_due_reminders
-        bot = None
-        import sys
-        for name, obj in sys.modules.items():
-            if hasattr(obj, 'bot') and hasattr(obj.bot, 'user') and obj.bot.user:
-                bot = obj.bot
-                break
-
-        if not bot:
-            # Fallback: use global bot instance
-            bot = get_bot_instance()
-
+        bot = get_bot_instance()
         if not bot:
             raise RuntimeError("Bot instance not available for reminder delivery")
 
@@ -1713,6 +1468,10 @@ async def execute_auto_action(reminder: Dict[str, Any]) -> None:
     print("✅ Daily clip scan completed successfully.")
 
 
+# Reminders are delivered by an in-memory timeline rather than a polling loop
+reminder_scheduler = ReminderScheduler(deliver_reminder, execute_auto_action, get_database)
+
+
 def start_all_scheduled_tasks(bot):
     """Start all scheduled tasks with enhanced monitoring"""
     try:
@@ -1742,9 +1501,8 @@ def start_all_scheduled_tasks(bot):
             (cleanup_game_recommendations, "Game recommendation cleanup task (every hour)"),
             ## Every 15 minutes ##
             (check_stale_trivia_sessions, "Stale trivia session checker (every 15 minutes)"),
-            ## Continuously ##
-            (check_due_reminders, "Reminder checking task (every minute)"),
-            (check_auto_actions, "Auto-action checking task (every minute)")
+            ## Event-driven ##
+            (reminder_scheduler, "Reminder scheduler (reminders and auto-actions, on demand)")
         ]
 
         for task, description in tasks_to_start:
@@ -1785,8 +1543,7 @@ def get_scheduled_tasks_status():
             (monday_content_sync, "Weekly Content Sync (Monday 8am)"),
             (monday_vods_sync, "Weekly VODs Sync"),
             (scheduled_midnight_restart, "Midnight Restart"),
-            (check_due_reminders, "Reminder Check"),
-            (check_auto_actions, "Auto Actions"),
+            (reminder_scheduler, "Reminder Scheduler"),
             (trivia_tuesday, "Trivia Tuesday"),
             (scheduled_ai_refresh, "AI Refresh"),
             (daily_clip_scan_task, "Daily Clip Scan"),
@@ -1841,8 +1598,7 @@ def stop_all_scheduled_tasks():
             monday_vods_sync,
             scheduled_midnight_restart,
             daily_clip_scan_task,
-            check_due_reminders,
-            check_auto_actions,
+            reminder_scheduler,
             trivia_tuesday,
             scheduled_ai_refresh,
             monday_morning_greeting,
@@ -2,7 +2,7 @@ import asyncio
 import json
 import uuid
 from datetime import datetime, time, timedelta
-from typing import TYPE_CHECKING, Any, Dict, Optional, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, cast
 from zoneinfo import ZoneInfo
 
 import discord
@@ -19,6 +19,7 @@ from ..config import (
 )
 from ..database import get_database
 from ..handlers.ai_handler import call_ai_with_rate_limiting, filter_ai_response
+from ..handlers.context_snapshot import invalidate_context_snapshot
 from ..persona.sarcasm import apply_pops_arcade_sarcasm
 
 try:
@@ -32,12 +33,15 @@ try:
     from ..integrations.twitch import detect_multiple_games_in_title
     from ..integrations.twitch import extract_game_name_from_title as extract_game_from_twitch
     from ..integrations.twitch import fetch_new_vods_since
-    from ..integrations.youtube import fetch_playlist_based_content_since
+    from ..integrations.youtube import fetch_playlist_based_content_since, playlist_id_from_url
+    from ..integrations.sync_cursors import SyncCursors
 except ImportError:
     detect_multiple_games_in_title = None
     extract_game_from_twitch = None
     fetch_new_vods_since = None
     fetch_playlist_based_content_since = None
+    playlist_id_from_url = None
+    SyncCursors = None
 
 try:
     from ..handlers.conversations import notify_jam_weekly_message_failure, start_weekly_announcement_approval
@@ -62,6 +66,7 @@ def invalidate_game_cache(canonical_name: str):
         norm = canonical_name.lower().translate(str.maketrans('', '', string.punctuation)).replace(' ', '')
         _stale_game_names.add(norm)
         print(f"🔄 SYNC: Cache invalidated for '{canonical_name}' due to manual edit.")
+        invalidate_context_snapshot('timeline', 'engagement')
 
 
 db = get_database()
@@ -258,7 +263,7 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
 
     # Import IGDB integration
     try:
-        from ..integrations.igdb import should_use_igdb_data, validate_and_enrich
+        from ..integrations.igdb import should_use_igdb_data, validate_and_enrich, validate_and_enrich_many
         igdb_available = True
         print("✅ SYNC: IGDB integration available for data enrichment")
     except ImportError:
@@ -269,15 +274,34 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
         async def validate_and_enrich(game_name: str) -> Dict[str, Any]:
             return {'match_found': False}
 
+        async def validate_and_enrich_many(game_names: List[str]) -> Dict[str, Dict[str, Any]]:
+            return {}
+
         def should_use_igdb_data(confidence: float) -> bool:
             return False
 
+    # Persisted per-playlist/per-channel cursors: only changed playlists are fetched.
+    # Cursors for staged games are held until this session is approved; cursors of
+    # playlists that fail to process or stage are dropped so they're retried next week.
+    sync_cursors = SyncCursors(db.games) if SyncCursors else None
+
+    def hold_playlist_cursor(playlist_url: Optional[str]):
+        playlist_id = playlist_id_from_url(playlist_url or '') if playlist_id_from_url else None
+        if sync_cursors and playlist_id:
+            sync_cursors.hold('youtube_playlist', playlist_id)
+
+    def drop_playlist_cursor(playlist_url: Optional[str]):
+        playlist_id = playlist_id_from_url(playlist_url or '') if playlist_id_from_url else None
+        if sync_cursors and playlist_id:
+            sync_cursors.discard('youtube_playlist', playlist_id)
+
     # --- Data Gathering: YouTube playlists ---
     playlist_games = []
     try:
         playlist_games = await fetch_playlist_based_content_since(  # type: ignore
             "UCPoUxLHeTnE9SUDAkqfJzDQ",  # Jonesy's channel
-            start_sync_time
+            start_sync_time,
+            cursors=sync_cursors
         )
 
         print(f"🔄 SYNC: Found {len(playlist_games)} game playlists with new content (YouTube)")
@@ -288,13 +312,15 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
     # --- Data Gathering: Twitch VODs ---
     twitch_vods = []
     try:
-        twitch_vods = await fetch_new_vods_since("jonesyspacecat", start_sync_time)  # type: ignore
+        twitch_vods = await fetch_new_vods_since("jonesyspacecat", start_sync_time, cursors=sync_cursors)  # type: ignore
         print(f"🔄 SYNC: Found {len(twitch_vods)} new Twitch VODs")
     except Exception as twitch_error:
         print(f"❌ SYNC: Failed to fetch Twitch VODs: {twitch_error}")
 
     # Check if we have any content
     if not playlist_games and not twitch_vods:
+        if sync_cursors:
+            await sync_cursors.flush()
         return {"status": "no_new_content"}
 
     # --- Performance Optimization: Pre-fetch all games ---
@@ -382,6 +408,28 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
     games_updated = 0
     completed_games = []  # Track games that changed to 'completed'
 
+    # IGDB prefetch: resolve every playlist game that needs enrichment in a few
+    # concurrent multi-queries instead of one rate-limited request per playlist
+    igdb_prefetched: Dict[str, Dict[str, Any]] = {}
+    if igdb_available and playlist_games:
+        igdb_candidates = []
+        for game_data in playlist_games:
+            candidate_name = game_data.get('canonical_name')
+            playlist_url = game_data.get('youtube_playlist_url', '')
+            if not candidate_name or (playlist_url and db.games.is_vod_skipped(playlist_url)):
+                continue
+            existing = find_game_in_cache(candidate_name)
+            if existing and existing.get('genre') and existing.get('release_year') and existing.get('alternative_names'):
+                continue
+            igdb_candidates.append(candidate_name)
+
+        if igdb_candidates:
+            try:
+                print(f"🔍 SYNC: Prefetching IGDB data for {len(igdb_candidates)} games...")
+                igdb_prefetched = await validate_and_enrich_many(igdb_candidates)
+            except Exception as prefetch_error:
+                print(f"⚠️ SYNC: IGDB prefetch failed, falling back to per-game lookups: {prefetch_error}")
+
     # Process YouTube playlist games
     for game_data in playlist_games:
         try:
@@ -401,6 +449,7 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
                 if not is_valid:
                     print(
                         f"⚠️ SYNC: Data validation errors for '{game_data.get('canonical_name', 'Unknown')}': {errors}")
+                    drop_playlist_cursor(game_data.get('youtube_playlist_url'))
                     continue
 
             canonical_name = game_data['canonical_name']
@@ -422,8 +471,10 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
                 print(f"⏭️ SYNC: Skipping IGDB for '{canonical_name}' - metadata already complete")
             if igdb_available and not _igdb_metadata_complete:
                 try:
-                    print(f"🔍 SYNC: Querying IGDB for '{canonical_name}'...")
-                    igdb_data = await validate_and_enrich(canonical_name)
+                    igdb_data = igdb_prefetched.get(canonical_name)
+                    if igdb_data is None:
+                        print(f"🔍 SYNC: Querying IGDB for '{canonical_name}'...")
+                        igdb_data = await validate_and_enrich(canonical_name)
 
                     if igdb_data and igdb_data.get('match_found'):
                         confidence = igdb_data.get('confidence', 0.0)
@@ -575,13 +626,16 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
                 # ❌ first_played_date - Historical record
 
                 # Stage update for approval
-                db.games.stage_game_for_approval(
+                if db.games.stage_game_for_approval(
                     sync_session_id=sync_session_id,
                     game_data=game_data,
                     action_type='update',
                     confidence_score=1.0,  # High confidence for YouTube playlist data
                     source_platform='youtube'
-                )
+                ):
+                    hold_playlist_cursor(game_data.get('youtube_playlist_url'))
+                else:
+                    drop_playlist_cursor(game_data.get('youtube_playlist_url'))
                 print(
                     f"✅ SYNC: Staged update for '{canonical_name}' - {new_episodes} episodes, status: {completion_status}")
                 games_updated += 1
@@ -616,19 +670,23 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
                         'notes',
                         f"Auto-synced from YouTube on {datetime.now(ZoneInfo('Europe/London')).strftime('%Y-%m-%d')}")}
 
-                db.games.stage_game_for_approval(
+                if db.games.stage_game_for_approval(
                     sync_session_id=sync_session_id,
                     game_data=full_game_data,
                     action_type='add',
                     confidence_score=1.0,  # High confidence for YouTube playlist data
                     source_platform='youtube'
-                )
+                ):
+                    hold_playlist_cursor(full_game_data.get('youtube_playlist_url'))
+                else:
+                    drop_playlist_cursor(full_game_data.get('youtube_playlist_url'))
                 print(
                     f"✅ SYNC: Staged new game '{canonical_name}' - {game_data.get('total_episodes', 0)} episodes, {game_data.get('youtube_views', 0):,} views")
                 games_added += 1
 
         except Exception as game_error:
             print(f"⚠️ SYNC: Error processing game '{game_data.get('canonical_name', 'Unknown')}': {game_error}")
+            drop_playlist_cursor(game_data.get('youtube_playlist_url'))
             continue
 
     # Process Twitch VODs with smart extraction and IGDB enrichment
@@ -865,6 +923,12 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
             print(f"⚠️ SYNC: Error processing Twitch VOD '{vod.get('title', 'Unknown')}': {vod_error}")
             continue
 
+    # --- Save Sync Cursors ---
+    if sync_cursors:
+        await sync_cursors.flush(sync_session_id)
+        print(f"🔄 SYNC: Playlists - {sync_cursors.stats['changed']} changed, "
+              f"{sync_cursors.stats['unchanged']} unchanged (skipped)")
+
     # --- Get Staging Summary ---
     summary = db.games.get_staging_session_summary(sync_session_id)
     print(f"🔄 SYNC: Session {sync_session_id} complete - {summary['total_count']} games staged for approval")
@@ -930,6 +994,9 @@ async def perform_full_content_sync(start_sync_time: datetime, is_scheduled: boo
         except Exception as dm_err:
             print(f"⚠️ SYNC: Could not send post-sync summary DM: {dm_err}")
 
+    # New views and playtime change the AI's timeline/engagement figures
+    invalidate_context_snapshot('timeline', 'engagement')
+
     # --- Enhanced Reporting ---
     return {
         "status": "pending_approval",
@@ -0,0 +1,350 @@
+"""
+Bulk Stats Refresh Module
+
+Shared engine for the scripts that refresh played game stats from the
+YouTube and Twitch APIs (scripts/bulk_update_youtube_stats.py and
+scripts/bulk_update_twitch_stats.py):
+
+- games are fetched by a bounded pool of workers, paced by a quota budget
+  (total API units for the run and an optional units-per-second rate)
+- changed stats are written in batches with GamesDatabase.bulk_update_game_stats
+- finished games are recorded in a JSON checkpoint file, so an interrupted
+  or quota-limited run resumes where it stopped
+- dry-run mode fetches everything and prints the changes without writing
+- progress and a final throughput report are printed
+
+Usage:
+    refresh = BulkStatsRefresh(db, "youtube", fetch_stats, cost=playlist_cost,
+                               quota_units=5000, checkpoint_path="youtube_refresh.json")
+    report = await refresh.run(games)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..integrations.http_client import AsyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
+StatsFetcher = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class RefreshCheckpoint:
+    """
+    JSON file recording which games a refresh run has finished.
+
+    A checkpoint belongs to one named run ("youtube", "twitch"); a file left
+    by a different run is ignored. Scripts may keep extra resumable state
+    (e.g. fetched pages) under `state`.
+    """
+
+    def __init__(self, path: Optional[str], run_name: str):
+        """
+        Load the checkpoint for a run (memory only when path is None).
+
+        Args:
+            path: Checkpoint file path
+            run_name: Name of the refresh run
+        """
+        self.path = path
+        self.run_name = run_name
+        self.done: Dict[str, str] = {}
+        self.state: Dict[str, Any] = {}
+        self.resumed = False
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get('run') == run_name:
+                    self.done = dict(data.get('done', {}))
+                    self.state = dict(data.get('state', {}))
+                    self.resumed = True
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable refresh checkpoint {path}: {e}")
+
+    def is_done(self, key: str) -> bool:
+        return key in self.done
+
+    def mark_done(self, key: str, outcome: str):
+        self.done[key] = outcome
+
+    def save(self):
+        """Write the checkpoint atomically."""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'run': self.run_name, 'done': self.done, 'state': self.state}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget the run (after it finished completely)."""
+        self.done = {}
+        self.state = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class QuotaBudget:
+    """
+    API quota for one refresh run.
+
+    `total_units` caps the units the run may spend (None for no cap); games
+    that no longer fit are left for the next run while cheaper ones still go
+    ahead, and `exhausted` is set once pending games had to be left over.
+    `units_per_second` paces requests with a token bucket.
+    """
+
+    def __init__(self, total_units: Optional[int] = None, units_per_second: Optional[float] = None):
+        self.total_units = total_units
+        self.used = 0
+        self.exhausted = False
+        self._bucket = AsyncTokenBucket(units_per_second, max(1.0, units_per_second)) if units_per_second else None
+
+    def reserve(self, units: int) -> bool:
+        """Reserve units for a game; False if the remaining budget cannot cover it."""
+        if self.total_units is not None and self.used + units > self.total_units:
+            return False
+        self.used += units
+        return True
+
+    async def pace(self, units: int):
+        """Wait until the reserved units may be spent."""
+        if self._bucket is not None:
+            for _ in range(units):
+                await self._bucket.acquire()
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, int):
+        return f"{value:,}"
+    if isinstance(value, list):
+        return f"{len(value)} item(s)"
+    return repr(value)
+
+
+def diff_stats(game: Dict[str, Any], new_stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the fields of new_stats that differ from the game's stored values."""
+    changes = {}
+    for field, value in new_stats.items():
+        current = game.get(field)
+        if field in ('youtube_views', 'twitch_views', 'total_episodes', 'total_playtime_minutes'):
+            current = current or 0
+        if current != value:
+            changes[field] = value
+    return changes
+
+
+class BulkStatsRefresh:
+    """
+    Fetch fresh stats for many games and write the changes in batches.
+
+    The fetcher returns the new stat values for a game (any of
+    GamesDatabase.BULK_STAT_COLUMNS), None if they could not be fetched, or
+    an empty dict to skip the game.
+    """
+
+    def __init__(self, db, run_name: str, fetch: StatsFetcher, *,
+                 cost: Optional[Callable[[Dict[str, Any]], int]] = None,
+                 concurrency: int = 8,
+                 quota_units: Optional[int] = None,
+                 units_per_second: Optional[float] = None,
+                 batch_size: int = 100,
+                 checkpoint_path: Optional[str] = None,
+                 dry_run: bool = False,
+                 progress_every: int = 25):
+        """
+        Initialize the refresh.
+
+        Args:
+            db: Database with bulk_update_game_stats (DatabaseManager)
+            run_name: Name of the run, used in output and the checkpoint
+            fetch: Coroutine function returning a game's new stats
+            cost: API units a game's fetch will spend (default 1)
+            concurrency: Games fetched at once
+            quota_units: Total API units the run may spend (None for no cap)
+            units_per_second: Sustained API units per second (None for no pacing)
+            batch_size: Changed games per database write
+            checkpoint_path: Checkpoint file; None disables resuming
+            dry_run: Print the changes instead of writing them
+            progress_every: Print progress after this many games
+        """
+        self.db = db
+        self.run_name = run_name
+        self.fetch = fetch
+        self.cost = cost or (lambda game: 1)
+        self.concurrency = max(1, concurrency)
+        self.budget = QuotaBudget(quota_units, units_per_second)
+        self.batch_size = max(1, batch_size)
+        # A dry run neither resumes nor records progress
+        self.checkpoint = RefreshCheckpoint(None if dry_run else checkpoint_path, run_name)
+        self.dry_run = dry_run
+        self.progress_every = max(1, progress_every)
+        self.diffs: List[Dict[str, Any]] = []
+        self._pending: List[Dict[str, Any]] = []
+        self._write_lock = asyncio.Lock()
+        self.stats = {
+            "games": 0,
+            "resumed": 0,
+            "processed": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "skipped": 0,
+            "deferred": 0,
+            "writes": 0
+        }
+
+    async def run(self, games: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Refresh the given games (played game rows with an 'id').
+
+        Returns:
+            Report dict (see report())
+        """
+        started = time.perf_counter()
+        self.stats["games"] = len(games)
+        if self.checkpoint.resumed:
+            print(f"♻️ Resuming {self.run_name} refresh: {len(self.checkpoint.done)} game(s) already done")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for game in games:
+            if self.checkpoint.is_done(str(game['id'])):
+                self.stats["resumed"] += 1
+            else:
+                queue.put_nowait(game)
+
+        progress = {"last_printed": 0}
+        deferred: List[Dict[str, Any]] = []
+
+        async def worker():
+            while not queue.empty():
+                game = queue.get_nowait()
+                units = self.cost(game)
+                if not self.budget.reserve(units):
+                    # Too expensive for what is left; cheaper games may still fit
+                    deferred.append(game)
+                    continue
+                await self.budget.pace(units)
+                await self._refresh_game(game)
+
+                self.stats["processed"] += 1
+                if self.stats["processed"] - progress["last_printed"] >= self.progress_every:
+                    progress["last_printed"] = self.stats["processed"]
+                    self._print_progress(started)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        await self._flush()
+
+        self.stats["deferred"] = len(deferred)
+        self.budget.exhausted = bool(deferred)
+        if self.budget.exhausted:
+            print(f"⏸️ Quota budget of {self.budget.total_units} units reached: "
+                  f"{self.stats['deferred']} game(s) left for the next run")
+
+        if not self.dry_run:
+            if self.stats["failed"] or self.stats["deferred"]:
+                self.checkpoint.save()
+            else:
+                self.checkpoint.clear()
+
+        report = self.report(time.perf_counter() - started)
+        self._print_report(report)
+        return report
+
+    async def _refresh_game(self, game: Dict[str, Any]):
+        key = str(game['id'])
+        name = game.get('canonical_name', 'Unknown')
+        try:
+            new_stats = await self.fetch(game)
+        except Exception as e:
+            print(f"   ❌ {name}: {e}")
+            new_stats = None
+
+        if new_stats is None:
+            self.stats["failed"] += 1  # Not checkpointed: retried on the next run
+            return
+        if not new_stats:
+            self.stats["skipped"] += 1
+            self.checkpoint.mark_done(key, "skipped")
+            return
+
+        changes = diff_stats(game, new_stats)
+        if not changes:
+            self.stats["unchanged"] += 1
+            self.checkpoint.mark_done(key, "unchanged")
+            return
+
+        self.diffs.append({'id': game['id'], 'canonical_name': name, 'changes': {
+            field: (game.get(field), value) for field, value in changes.items()}})
+        if self.dry_run:
+            described = ', '.join(f"{field} {_format_value(game.get(field))} → {_format_value(value)}"
+                                  for field, value in changes.items())
+            print(f"   ~ {name}: {described}")
+            self.stats["updated"] += 1
+            return
+
+        self._pending.append({'id': game['id'], **changes})
+        if len(self._pending) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self):
+        """Write pending changes in one batch and checkpoint the written games."""
+        async with self._write_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            written = await asyncio.to_thread(self.db.bulk_update_game_stats, batch)
+            self.stats["writes"] += 1
+            if written is None:
+                print(f"   ❌ Database write of {len(batch)} game(s) failed")
+                self.stats["failed"] += len(batch)
+                return
+            # Games deleted since they were read match no row; they are still done
+            self.stats["updated"] += len(batch)
+            for update in batch:
+                self.checkpoint.mark_done(str(update['id']), "updated")
+            self.checkpoint.save()
+
+    def _print_progress(self, started: float):
+        elapsed = time.perf_counter() - started
+        remaining = self.stats["games"] - self.stats["resumed"]
+        rate = self.stats["processed"] / elapsed if elapsed > 0 else 0.0
+        print(f"📈 [{self.stats['processed']}/{remaining}] {rate:.1f} games/s, "
+              f"{self.budget.used} quota units used")
+
+    def report(self, elapsed_seconds: float) -> Dict[str, Any]:
+        """Run statistics, quota use and throughput."""
+        return {
+            "run": self.run_name,
+            "dry_run": self.dry_run,
+            **self.stats,
+            "quota_used": self.budget.used,
+            "quota_exhausted": self.budget.exhausted,
+            "elapsed_seconds": round(elapsed_seconds, 2),
+            "games_per_second": round(self.stats["processed"] / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0,
+            "diffs": self.diffs
+        }
+
+    @staticmethod
+    def _print_report(report: Dict[str, Any]):
+        print("\n" + "=" * 80)
+        print(f"📊 {report['run'].upper()} REFRESH {'DRY RUN ' if report['dry_run'] else ''}SUMMARY")
+        print("=" * 80)
+        print(f"{'🔍 Would update' if report['dry_run'] else '✅ Updated'}: {report['updated']}")
+        print(f"➖ Unchanged: {report['unchanged']}")
+        print(f"⏭️ Skipped: {report['skipped']}")
+        print(f"❌ Failed: {report['failed']}")
+        if report['resumed']:
+            print(f"♻️ Done in an earlier run: {report['resumed']}")
+        if report['deferred']:
+            print(f"⏸️ Left for the next run: {report['deferred']}")
+        print(f"💾 Database writes: {report['writes']}")
+        print(f"📡 Quota units used: {report['quota_used']}")
+        print(f"⏱️ {report['processed']} games in {report['elapsed_seconds']:.1f}s "
+              f"({report['games_per_second']:.1f} games/s)")
@@ -0,0 +1,315 @@
+"""
+Clip Store Module
+
+Local content-addressed store for downloaded clips, so reposts and retries
+don't download or analyse the same media twice. URL canonicalisation only
+catches identical links; the store also keys clips by the SHA-256 of the
+downloaded media:
+
+    temp/clip_store/
+        downloads/<url key>.mp4   in-progress yt-dlp downloads (resumable .part files)
+        objects/<sha256>.mp4      downloaded media (plus any pre-processed copy)
+        index.json                canonical URL -> hash, hash -> analysis / saved flag
+
+A clip whose URL (or content) has been seen skips the download; one whose
+hash already has a Gemini analysis skips the upload and generation too.
+Stored media is evicted least-recently-used first once objects/ grows past
+max_bytes; the index (URLs, hashes and analysis text) is small and kept.
+Eviction never touches media pinned by clips still in the pipeline (see
+pin_media / unpin). The same pass ages out files left in downloads/ by
+downloads that were never retried, once they are older than download_max_age
+and no job is writing them (see begin_download / end_download).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ClipStore:
+    """
+    Thread-safe clip media and analysis cache on the local filesystem.
+
+    Methods that hash or move files block; call them through asyncio.to_thread.
+    """
+
+    def __init__(self, root: str = "temp/clip_store", max_bytes: int = 1024 * 1024 * 1024,
+                 download_max_age: float = 24 * 3600):
+        """
+        Initialize the store (the index is loaded immediately).
+
+        Args:
+            root: Directory holding downloads, objects and the index
+            max_bytes: Media size above which least-recently-used files are evicted
+            download_max_age: Seconds before an unused partial download is deleted
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.download_max_age = download_max_age
+        self._lock = threading.RLock()
+        self._downloads_dir = os.path.join(root, "downloads")
+        self._objects_dir = os.path.join(root, "objects")
+        self._index_path = os.path.join(root, "index.json")
+        os.makedirs(self._downloads_dir, exist_ok=True)
+        os.makedirs(self._objects_dir, exist_ok=True)
+        self._urls: Dict[str, str] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._pinned: Counter = Counter()  # content hash -> in-flight jobs using its media
+        self._downloading: Counter = Counter()  # download key -> in-flight jobs writing it
+        self.stats = {
+            "content_duplicates": 0,
+            "evicted_files": 0,
+            "evicted_bytes": 0,
+            "stale_downloads": 0
+        }
+        self._load()
+
+    # ========== INDEX ==========
+
+    def _load(self):
+        if not os.path.exists(self._index_path):
+            return
+        try:
+            with open(self._index_path, "r") as f:
+                index = json.load(f)
+            self._urls = dict(index.get("urls", {}))
+            self._entries = dict(index.get("entries", {}))
+        except Exception as e:
+            logger.error(f"Could not read clip store index, starting empty: {e}")
+
+    def _save(self):
+        tmp_path = f"{self._index_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"urls": self._urls, "entries": self._entries}, f)
+            os.replace(tmp_path, self._index_path)
+        except Exception as e:
+            logger.error(f"Could not write clip store index: {e}")
+
+    def _entry(self, content_hash: str) -> Dict[str, Any]:
+        return self._entries.setdefault(content_hash, {"urls": [], "analysis": None, "saved": False})
+
+    # ========== PATHS ==========
+
+    def download_path(self, canonical_url: str) -> str:
+        """Stable download target per URL, so a failed download resumes on retry."""
+        key = hashlib.sha256(canonical_url.encode()).hexdigest()[:32]
+        return os.path.join(self._downloads_dir, f"{key}.mp4")
+
+    def begin_download(self, canonical_url: str) -> str:
+        """Download path for a URL, kept from ageing out until end_download()."""
+        path = self.download_path(canonical_url)
+        with self._lock:
+            self._downloading[self._download_key(path)] += 1
+        return path
+
+    def end_download(self, path: str):
+        with self._lock:
+            key = self._download_key(path)
+            self._downloading[key] -= 1
+            if self._downloading[key] <= 0:
+                del self._downloading[key]
+
+    @staticmethod
+    def _download_key(path: str) -> str:
+        # downloads/<key>.mp4 and yt-dlp's <key>.mp4.part / .ytdl files share the key
+        return os.path.basename(path).split(".", 1)[0]
+
+    def media_path(self, content_hash: str) -> str:
+        return os.path.join(self._objects_dir, f"{content_hash}.mp4")
+
+    def owns(self, path: str) -> bool:
+        """True for files the store manages (callers must not delete them)."""
+        root = os.path.abspath(self.root) + os.sep
+        return os.path.abspath(path).startswith(root)
+
+    # ========== LOOKUPS ==========
+
+    def hash_for_url(self, canonical_url: str) -> Optional[str]:
+        with self._lock:
+            return self._urls.get(canonical_url)
+
+    def has_media(self, content_hash: str) -> bool:
+        """True if the media is still on disk (and marks it recently used)."""
+        path = self.media_path(content_hash)
+        with self._lock:
+            if not os.path.exists(path):
+                return False
+            self._touch(path)
+            return True
+
+    def pin_media(self, content_hash: str) -> bool:
+        """
+        Keep media safe from eviction while a clip is in flight; release with unpin().
+
+        Returns:
+            True if the media is on disk and now pinned, False if it is gone
+        """
+        with self._lock:
+            if not self.has_media(content_hash):
+                return False
+            self._pinned[content_hash] += 1
+            return True
+
+    def unpin(self, content_hash: str):
+        with self._lock:
+            self._pinned[content_hash] -= 1
+            if self._pinned[content_hash] <= 0:
+                del self._pinned[content_hash]
+
+    def get_analysis(self, content_hash: str) -> Optional[str]:
+        with self._lock:
+            return self._entries.get(content_hash, {}).get("analysis")
+
+    def is_saved(self, content_hash: str) -> bool:
+        """True once lore for this content has been saved (under any URL)."""
+        with self._lock:
+            return bool(self._entries.get(content_hash, {}).get("saved"))
+
+    def url_saved(self, canonical_url: str) -> bool:
+        """True if this URL's media already has lore, possibly under another URL."""
+        with self._lock:
+            content_hash = self._urls.get(canonical_url)
+            return content_hash is not None and bool(self._entries.get(content_hash, {}).get("saved"))
+
+    # ========== UPDATES ==========
+
+    def add_media(self, path: str, canonical_url: str, pin: bool = False) -> str:
+        """
+        Hash a finished download and move it into the store.
+
+        Args:
+            path: The finished download
+            canonical_url: URL the media was downloaded from
+            pin: Pin the stored media (release with unpin()) before evicting
+
+        Returns:
+            The content hash; if the same media was already stored, the new
+            copy is discarded and the URL becomes an alias of the old entry
+        """
+        content_hash = file_sha256(path)
+        target = self.media_path(content_hash)
+        with self._lock:
+            if os.path.exists(target):
+                os.remove(path)
+                self.stats["content_duplicates"] += 1
+            else:
+                os.replace(path, target)
+            self._touch(target)
+            if pin:
+                self._pinned[content_hash] += 1
+            self._link(content_hash, canonical_url)
+            self._save()
+        self.evict(keep=target)
+        return content_hash
+
+    def _link(self, content_hash: str, canonical_url: str):
+        self._urls[canonical_url] = content_hash
+        entry = self._entry(content_hash)
+        if canonical_url not in entry["urls"]:
+            entry["urls"].append(canonical_url)
+
+    def put_analysis(self, content_hash: str, analysis: Optional[str]):
+        with self._lock:
+            self._entry(content_hash)["analysis"] = analysis
+            self._save()
+
+    def mark_saved(self, content_hash: str, canonical_url: str):
+        """Record that lore exists for this content; reposts under canonical_url are skipped."""
+        with self._lock:
+            self._link(content_hash, canonical_url)
+            self._entry(content_hash)["saved"] = True
+            self._save()
+
+    # ========== EVICTION ==========
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            now = time.time()
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+
+    def _media_files(self) -> List[os.DirEntry]:
+        """Stored media (objects/ only; downloads/ holds in-progress files)."""
+        with os.scandir(self._objects_dir) as entries:
+            return [entry for entry in entries if entry.is_file()]
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._media_files())
+
+    def _evict_stale_downloads(self) -> int:
+        """Delete downloads/ files older than download_max_age that no job is writing."""
+        cutoff = time.time() - self.download_max_age
+        freed = 0
+        with os.scandir(self._downloads_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or self._download_key(entry.path) in self._downloading:
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime > cutoff:
+                    continue
+                try:
+                    os.remove(entry.path)
+                except OSError as e:
+                    logger.error(f"Could not remove stale download {entry.path}: {e}")
+                    continue
+                freed += stat.st_size
+                self.stats["stale_downloads"] += 1
+        return freed
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete least-recently-used media until the store fits in max_bytes,
+        and stale partial downloads.
+
+        Pinned media (and its pre-processed copy) is never deleted.
+
+        Args:
+            keep: A path that must survive (e.g. the file about to be uploaded)
+
+        Returns:
+            Number of bytes freed
+        """
+        with self._lock:
+            freed = self._evict_stale_downloads()
+            files = sorted(self._media_files(), key=lambda entry: entry.stat().st_mtime)
+            total = sum(entry.stat().st_size for entry in files)
+            evicted = 0
+            for entry in files:
+                if total - evicted <= self.max_bytes:
+                    break
+                if keep and os.path.abspath(entry.path) == os.path.abspath(keep):
+                    continue
+                # objects/<sha256>.mp4 and objects/<sha256>.small.mp4 belong to the same clip
+                if entry.name.split(".", 1)[0] in self._pinned:
+                    continue
+                size = entry.stat().st_size
+                try:
+                    os.remove(entry.path)
+                except OSError as e:
+                    logger.error(f"Could not evict {entry.path}: {e}")
+                    continue
+                evicted += size
+                self.stats["evicted_files"] += 1
+                self.stats["evicted_bytes"] += size
+            return freed + evicted
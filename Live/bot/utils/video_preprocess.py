@@ -0,0 +1,147 @@
+"""
+Video Pre-processing Utilities
+
+Shrinks downloaded clips with ffmpeg before they are uploaded to Gemini.
+Upload size and Gemini's server-side processing time dominate clip analysis,
+and the model needs neither full resolution nor full frame rate to describe
+a reaction. Two modes are available:
+
+- transcode: trim to a maximum duration, downscale, drop the frame rate and
+  re-encode audio as low-bitrate mono
+- keyframes: a one-frame-per-second picture strip with the same audio track
+
+Pre-processing is optional. If ffmpeg is missing or fails, or the result is
+not actually smaller, the original file is used.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
+PREPROCESS_MODES = ("off", "transcode", "keyframes")
+
+
+class ClipPreprocessOptions:
+    """ffmpeg settings for one clip run."""
+
+    def __init__(self, mode: str = "transcode", max_duration: int = 90, max_height: int = 360,
+                 fps: int = 10, keyframe_fps: float = 1.0, audio_bitrate: str = "32k",
+                 crf: int = 30, timeout: float = 120.0):
+        """
+        Args:
+            mode: "transcode", "keyframes" or "off"
+            max_duration: Seconds of the clip to keep
+            max_height: Output height cap in pixels (never upscales)
+            fps: Output frame rate in transcode mode
+            keyframe_fps: Frames per second kept in keyframes mode
+            audio_bitrate: AAC bitrate for the mono audio track
+            crf: x264 quality (higher is smaller)
+            timeout: Seconds before ffmpeg is abandoned
+        """
+        if mode not in PREPROCESS_MODES:
+            raise ValueError(f"Unknown clip pre-processing mode '{mode}' (expected one of {', '.join(PREPROCESS_MODES)})")
+        self.mode = mode
+        self.max_duration = max_duration
+        self.max_height = max_height
+        self.fps = fps
+        self.keyframe_fps = keyframe_fps
+        self.audio_bitrate = audio_bitrate
+        self.crf = crf
+        self.timeout = timeout
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def __repr__(self) -> str:
+        return f"ClipPreprocessOptions(mode={self.mode!r}, max_duration={self.max_duration}, max_height={self.max_height})"
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def output_path_for(input_path: str) -> str:
+    root, _ = os.path.splitext(input_path)
+    return f"{root}.small.mp4"
+
+
+def build_ffmpeg_command(input_path: str, output_path: str, options: ClipPreprocessOptions) -> List[str]:
+    """ffmpeg arguments for the configured mode."""
+    scale = f"scale=-2:'min({options.max_height},ih)'"
+    if options.mode == "keyframes":
+        video_filter = f"fps={options.keyframe_fps},{scale}"
+        video_codec = ["-c:v", "libx264", "-preset", "veryfast", "-tune", "stillimage", "-crf", str(options.crf + 2)]
+    else:
+        video_filter = f"{scale},fps={options.fps}"
+        video_codec = ["-c:v", "libx264", "-preset", "veryfast", "-crf", str(options.crf)]
+
+    return [
+        "ffmpeg", "-y", "-v", "error",
+        "-i", input_path,
+        "-t", str(options.max_duration),
+        "-vf", video_filter,
+        *video_codec,
+        "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", options.audio_bitrate, "-ac", "1",
+        "-movflags", "+faststart",
+        output_path,
+    ]
+
+
+def preprocess_clip(input_path: str, options: Optional[ClipPreprocessOptions],
+                    runner=subprocess.run) -> Dict[str, Any]:
+    """
+    Shrink a clip for upload (blocking; run it in a thread).
+
+    Returns:
+        {'path', 'status', 'original_bytes', 'output_bytes', 'seconds'} where
+        path is the file to upload: the shrunken copy when status is
+        'processed', otherwise the original
+    """
+    started = time.perf_counter()
+    original_bytes = os.path.getsize(input_path)
+    result = {
+        'path': input_path,
+        'status': 'skipped',
+        'original_bytes': original_bytes,
+        'output_bytes': original_bytes,
+        'seconds': 0.0
+    }
+    if options is None or not options.enabled:
+        return result
+    if runner is subprocess.run and not ffmpeg_available():
+        result['status'] = 'ffmpeg_unavailable'
+        return result
+
+    output_path = output_path_for(input_path)
+    try:
+        completed = runner(build_ffmpeg_command(input_path, output_path, options),
+                           capture_output=True, timeout=options.timeout)
+        if completed.returncode != 0 or not os.path.exists(output_path):
+            stderr = (completed.stderr or b"").decode(errors="replace").strip()
+            print(f"⚠️ ffmpeg failed for {input_path}: {stderr[:200]}")
+            result['status'] = 'failed'
+        elif os.path.getsize(output_path) >= original_bytes:
+            result['status'] = 'kept_original'
+        else:
+            result.update(path=output_path, status='processed', output_bytes=os.path.getsize(output_path))
+    except subprocess.TimeoutExpired:
+        print(f"⚠️ ffmpeg timed out after {options.timeout:.0f}s for {input_path}")
+        result['status'] = 'timeout'
+    except Exception as e:
+        print(f"⚠️ Could not pre-process {input_path}: {e}")
+        result['status'] = 'failed'
+
+    if result['path'] != output_path and os.path.exists(output_path):
+        os.remove(output_path)
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def format_bytes(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.0f} KB"
@@ -98,7 +98,26 @@ intents.message_content = True
 intents.members = True
 intents.guilds = True
 
-bot = commands.Bot(
+
+class AshBot(commands.Bot):
+    """commands.Bot that releases shared resources when the bot shuts down"""
+
+    async def close(self):
+        try:
+            from bot.integrations.http_client import close_http_client
+            await close_http_client()
+            print("✅ Shared HTTP sessions closed")
+        except Exception as e:
+            print(f"⚠️ Failed to close shared HTTP sessions: {e}")
+        try:
+            from bot.handlers.ai_executor import get_ai_executor
+            get_ai_executor().shutdown()
+        except Exception as e:
+            print(f"⚠️ Failed to stop the AI executor: {e}")
+        await super().close()
+
+
+bot = AshBot(
     command_prefix='!',
     intents=intents,
     help_command=None,
@@ -637,6 +656,31 @@ async def on_ready():
     # Initialize all modular components
     status_report = await initialize_modular_components()
 
+    # Load active trivia sessions so answer detection never queries per message
+    if db is not None:
+        try:
+            loaded = await db.aio.run(db.load_trivia_session_registry)
+            if loaded >= 0:
+                print(f"🧠 Trivia session registry loaded ({loaded} active session(s))")
+        except Exception as e:
+            print(f"⚠️ Failed to load trivia session registry: {e}")
+
+        # Warm the AI context snapshot so the first AI reply doesn't pay for it
+        try:
+            from bot.handlers.context_snapshot import get_context_snapshot
+            version = await db.aio.run(get_context_snapshot().refresh, db)
+            print(f"🧠 AI context snapshot ready (v{version})")
+        except Exception as e:
+            print(f"⚠️ Failed to warm AI context snapshot: {e}")
+
+        # Restore persisted AI responses before the first AI request needs them
+        try:
+            from bot.handlers.ai_cache import get_cache
+            restored = await db.aio.run(get_cache().load_persistent)
+            print(f"🧠 AI response cache warmed ({restored} persisted entries)")
+        except Exception as e:
+            print(f"⚠️ Failed to warm AI response cache: {e}")
+
     # CRITICAL: Initialize AI with async model testing
     try:
         from bot.handlers.ai_handler import safe_initialize_ai_async  # type: ignore
@@ -872,7 +916,8 @@ async def is_trivia_answer_reply(message):
         if db is None:
             return False, None
 
-        # Get active trivia session
+        # Active sessions come from the in-process session registry, so
+        # non-trivia messages cost no database query and no Discord API call
         try:
             active_session = db.get_active_trivia_session()
             if not active_session:
@@ -880,27 +925,17 @@ async def is_trivia_answer_reply(message):
         except Exception:
             return False, None
 
-        # Check if this message is a reply
-        is_reply = False
-        if hasattr(message, 'reference') and message.reference:
-            try:
-                replied_to_message = await message.channel.fetch_message(message.reference.message_id)
-                replied_to_id = replied_to_message.id
-                session_question_msg_id = active_session.get('question_message_id')
-                session_confirmation_msg_id = active_session.get('confirmation_message_id')
-
-                if replied_to_id == session_question_msg_id or replied_to_id == session_confirmation_msg_id:
-                    is_reply = True
-            except (discord.NotFound, discord.Forbidden):
-                pass
+        # Match replies against the stored question/confirmation message IDs
+        reference = getattr(message, 'reference', None)
+        if reference and reference.message_id:
+            replied_session = db.get_active_trivia_session_for_message(reference.message_id)
+            if replied_session:
+                print(
+                    f"🧠 TRIVIA: Detected answer reply from user {message.author.id}: '{message.content}' → session {replied_session['id']}")
+                return True, replied_session
 
         is_in_trivia_channel = getattr(message.channel, 'id', None) == MEMBERS_CHANNEL_ID
 
-        if is_reply:
-            print(
-                f"🧠 TRIVIA: Detected answer reply from user {message.author.id}: '{message.content}' → session {active_session['id']}")
-            return True, active_session
-
         if is_in_trivia_channel:
             msg_content = message.content.strip().upper()
             q_type = active_session.get('question_type', '')
@@ -1000,8 +1035,8 @@ async def process_trivia_answer(message, trivia_session):
 
         print(f"🧠 TRIVIA: Processing answer - Original: '{answer_text}' → Normalized: '{normalized_answer}'")
 
-        # Submit answer to database (returns Dict with 'success' and 'answer_id' or 'error')
-        result = db.submit_trivia_answer(
+        # Queue answer for the next batched write (returns Dict with 'success' and 'queued' or 'error')
+        result = await db.aio.queue_trivia_answer(
             session_id=trivia_session['id'],
             user_id=message.author.id,
             answer_text=answer_text,
@@ -1010,14 +1045,13 @@ async def process_trivia_answer(message, trivia_session):
 
         # Verify the result is a Dict
         if not isinstance(result, dict):
-            print(f"❌ TRIVIA: Unexpected return type from submit_trivia_answer: {type(result)}")
+            print(f"❌ TRIVIA: Unexpected return type from queue_trivia_answer: {type(result)}")
             return False
 
         # Check if submission was successful
         if result.get('success'):
-            answer_id = result.get('answer_id')
             print(
-                f"✅ TRIVIA: Submitted answer #{answer_id} from user {message.author.id} for session {trivia_session['id']}")
+                f"✅ TRIVIA: Queued answer from user {message.author.id} for session {trivia_session['id']}")
 
             # React to acknowledge the submission
             try:
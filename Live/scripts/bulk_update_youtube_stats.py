@@ -2,21 +2,43 @@
 Bulk Update YouTube Stats for All Games
 Date: 2025-12-26
 Purpose: Update view counts for all games with YouTube playlists
+
+Playlists are fetched concurrently within a YouTube API quota budget and the
+changes are written in batches. An interrupted or quota-limited run resumes
+from its checkpoint file; pass --restart to start over.
+
+Usage:
+    python scripts/bulk_update_youtube_stats.py --dry-run
+    python scripts/bulk_update_youtube_stats.py --quota 5000 --concurrency 8
 """
 
+import argparse
 import asyncio
+import math
 import os
 import sys
-from datetime import datetime
 from typing import Any, Dict, Optional
 
 import aiohttp
-from bot.database import get_database
-from bot.integrations.youtube import get_playlist_videos_with_views
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from bot.database import get_database  # noqa: E402
+from bot.integrations.http_client import close_http_client, http_session  # noqa: E402
+from bot.integrations.youtube import get_playlist_videos_with_views, playlist_id_from_url  # noqa: E402
+from bot.utils.bulk_refresh import BulkStatsRefresh  # noqa: E402
+
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(__file__), '.bulk_update_youtube_stats.checkpoint.json')
+
+# YouTube Data API daily quota is 10,000 units; leave room for the bot itself
+DEFAULT_QUOTA_UNITS = 5000
+
+
+def playlist_quota_cost(game: Dict[str, Any]) -> int:
+    """Quota units to refresh a playlist: one playlistItems and one videos.list call per 50 episodes."""
+    return 2 * math.ceil(max(1, game.get('total_episodes') or 0) / 50)
+
 
 async def fetch_youtube_playlist_stats(playlist_id: str, youtube_api_key: str,
                                        session: aiohttp.ClientSession) -> Optional[Dict[str, Any]]:
@@ -47,10 +69,14 @@ async def fetch_youtube_playlist_stats(playlist_id: str, youtube_api_key: str,
         return None
 
 
-async def bulk_update_youtube_stats():
-    """Main function to update all YouTube game stats"""
+async def bulk_update_youtube_stats(dry_run: bool = False, concurrency: int = 8,
+                                    quota_units: Optional[int] = DEFAULT_QUOTA_UNITS,
+                                    units_per_second: Optional[float] = None,
+                                    checkpoint_path: Optional[str] = DEFAULT_CHECKPOINT,
+                                    restart: bool = False, db=None) -> Optional[Dict[str, Any]]:
+    """Main function to update all YouTube game stats; returns the refresh report"""
     print("=" * 80)
-    print("📺 BULK YOUTUBE STATS UPDATE")
+    print(f"📺 BULK YOUTUBE STATS UPDATE{' (DRY RUN)' if dry_run else ''}")
     print("=" * 80)
 
     # Check API credentials
@@ -58,96 +84,79 @@ async def bulk_update_youtube_stats():
     if not youtube_api_key:
         print("❌ YOUTUBE_API_KEY not configured")
         print("   Set environment variable: export YOUTUBE_API_KEY=...")
-        return
+        return None
 
     # Get database
-    db = get_database()
+    db = db or get_database()
 
     # Fetch all games with YouTube playlists
     print("\n🔍 Fetching games with YouTube playlists...")
 
     all_games = db.get_all_played_games()
-    youtube_games = [g for g in all_games if g.get('youtube_playlist_url')]
+    youtube_games = [g for g in all_games if g.get('youtube_playlist_url') and g.get('id')]
 
     print(f"✅ Found {len(youtube_games)} games with YouTube playlists")
 
     if not youtube_games:
         print("ℹ️ No games with YouTube data to update")
-        return
-
-    # Extract playlist IDs
-    import re
-
-    updated_count = 0
-    failed_count = 0
-    skipped_count = 0
-
-    async with aiohttp.ClientSession() as session:
-        for i, game in enumerate(youtube_games, 1):
-            game_name = game.get('canonical_name', 'Unknown')
-            game_id = game.get('id')
-            playlist_url = game.get('youtube_playlist_url', '')
-
-            print(f"\n[{i}/{len(youtube_games)}] {game_name}")
-            print(f"   Current views: {game.get('youtube_views', 0):,}")
-
-            # Extract playlist ID from URL
-            playlist_match = re.search(r'list=([a-zA-Z0-9_-]+)', playlist_url)
-
-            if not playlist_match:
-                print(f"   ⚠️ Could not extract playlist ID from URL")
-                skipped_count += 1
-                continue
-
-            playlist_id = playlist_match.group(1)
-
-            # Fetch current stats
-            stats = await fetch_youtube_playlist_stats(playlist_id, youtube_api_key, session)
-
-            if not stats:
-                print(f"   ❌ Failed to fetch stats")
-                failed_count += 1
-                continue
-
-            # Update database
-            new_views = stats['total_views']
-            old_views = game.get('youtube_views', 0) or 0
-            view_change = new_views - old_views
+        return None
 
-            if not game_id:
-                print(f"   ⚠️ No game ID found, skipping")
-                skipped_count += 1
-                continue
+    if restart and checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
 
-            success = db.update_played_game(
-                game_id,
-                youtube_views=new_views,
-                total_episodes=stats['total_videos'],
-                total_playtime_minutes=stats['total_duration_minutes']
+    try:
+        async with http_session("youtube") as session:
+            async def fetch_stats(game: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                playlist_id = playlist_id_from_url(game['youtube_playlist_url'])
+                if not playlist_id:
+                    print(f"   ⚠️ {game.get('canonical_name')}: could not extract playlist ID from URL")
+                    return {}
+
+                stats = await fetch_youtube_playlist_stats(playlist_id, youtube_api_key, session)
+                if not stats:
+                    print(f"   ❌ {game.get('canonical_name')}: failed to fetch stats")
+                    return None
+
+                return {
+                    'youtube_views': stats['total_views'],
+                    'total_episodes': stats['total_videos'],
+                    'total_playtime_minutes': stats['total_duration_minutes']
+                }
+
+            refresh = BulkStatsRefresh(
+                db, "youtube", fetch_stats,
+                cost=playlist_quota_cost,
+                concurrency=concurrency,
+                quota_units=quota_units,
+                units_per_second=units_per_second,
+                checkpoint_path=checkpoint_path,
+                dry_run=dry_run
             )
-
-            if success:
-                print(f"   ✅ Updated: {new_views:,} views (Δ{view_change:+,})")
-                print(
-                    f"   Episodes: {stats['total_videos']}, Playtime: {stats['total_duration_minutes'] // 60}h {stats['total_duration_minutes'] % 60}m")
-                updated_count += 1
-            else:
-                print(f"   ❌ Database update failed")
-                failed_count += 1
-
-            # Rate limiting (YouTube quota conservation)
-            await asyncio.sleep(0.5)
-
-    # Summary
-    print("\n" + "=" * 80)
-    print("📊 UPDATE SUMMARY")
-    print("=" * 80)
-    print(f"✅ Successfully updated: {updated_count}")
-    print(f"❌ Failed: {failed_count}")
-    print(f"⏭️ Skipped: {skipped_count}")
-    print(f"📺 Total YouTube games: {len(youtube_games)}")
-    print("\n✅ YouTube stats update complete!")
+            return await refresh.run(youtube_games)
+    finally:
+        await close_http_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh YouTube views, episodes and playtime for played games')
+    parser.add_argument('--dry-run', action='store_true', help='Show the changes without writing them')
+    parser.add_argument('--concurrency', type=int, default=8, help='Playlists fetched at once')
+    parser.add_argument('--quota', type=int, default=DEFAULT_QUOTA_UNITS,
+                        help='YouTube API units this run may spend (0 for no limit)')
+    parser.add_argument('--units-per-second', type=float, default=None, help='Pace API requests')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Checkpoint file for resuming')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and refresh every game')
+    args = parser.parse_args()
+
+    asyncio.run(bulk_update_youtube_stats(
+        dry_run=args.dry_run,
+        concurrency=args.concurrency,
+        quota_units=args.quota or None,
+        units_per_second=args.units_per_second,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart
+    ))
 
 
 if __name__ == "__main__":
-    asyncio.run(bulk_update_youtube_stats())
+    main()
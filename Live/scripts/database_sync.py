@@ -6,22 +6,38 @@ Database Sync Utility for Discord Bot
 Syncs specific tables from live database to staging database.
 Clears staging data first, then imports fresh data from live.
 
+Rows are streamed with COPY rather than loaded into Python: every table is
+exported from live in parallel (COPY ... TO STDOUT, all from one shared
+snapshot so the tables are consistent with each other) into a spool file
+that stays in memory up to SPOOL_MAX_MEMORY and spills to disk beyond it,
+then loaded into staging with COPY ... FROM STDIN. All staging changes
+(TRUNCATE, loads, sequence resets) happen in a single transaction, so a
+failed sync leaves staging untouched.
+
+With --incremental, tables that have an updated_at column and a primary key
+only copy rows updated since the newest row already in staging; those rows
+replace their staging versions. Rows deleted on live are not removed from
+staging in this mode.
+
 Usage:
     python database_sync.py
     python database_sync.py --tables played_games,trivia_questions
     python database_sync.py --dry-run
     python database_sync.py --force (skip confirmation)
+    python database_sync.py --incremental --workers 4
 """
 
 import argparse
 import logging
 import os
 import sys
-from typing import Any, Dict, List, Optional, Tuple, Union
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extensions import connection as Connection
-from psycopg2.extras import RealDictCursor
 
 # Set up logging
 logging.basicConfig(
@@ -31,6 +47,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Exported table data kept in memory up to this size, then spilled to a temp file
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+DEFAULT_WORKERS = 4
+
 
 class DatabaseSyncManager:
     """Manages syncing data between live and staging databases"""
@@ -63,13 +84,11 @@ class DatabaseSyncManager:
         """Connect to both live and staging databases"""
         try:
             logger.info("🔗 Connecting to live database...")
-            self.live_conn = psycopg2.connect(
-                self.live_url, cursor_factory=RealDictCursor)
+            self.live_conn = psycopg2.connect(self.live_url)
             logger.info("✓ Connected to live database")
 
             logger.info("🔗 Connecting to staging database...")
-            self.staging_conn = psycopg2.connect(
-                self.staging_url, cursor_factory=RealDictCursor)
+            self.staging_conn = psycopg2.connect(self.staging_url)
             logger.info("✓ Connected to staging database")
 
             return True
@@ -144,140 +163,150 @@ class DatabaseSyncManager:
 
         return valid_tables, missing_tables
 
-    def clear_staging_table(
-            self,
-            table_name: str,
-            dry_run: bool = False) -> int:
-        """Clear all data from a staging table"""
-        if dry_run:
-            if self.staging_conn:
-                return self.get_table_row_count(self.staging_conn, table_name)
-            logger.info(f"🔍 [DRY RUN] Would clear staging table: {table_name}")
-            return 0
-
-        if not self.staging_conn:
-            raise Exception("No staging database connection")
-
-        try:
-            with self.staging_conn.cursor() as cur:
-                # Get count before clearing
-                row_count = self.get_table_row_count(
-                    self.staging_conn, table_name)
-
-                # Clear the table
-                cur.execute(f"DELETE FROM {table_name}")
-                self.staging_conn.commit()
-
-                logger.info(
-                    f"🗑️  Cleared staging table '{table_name}': {row_count} rows deleted")
-                return row_count
-
-        except Exception as e:
-            logger.error(f"❌ Error clearing table {table_name}: {e}")
-            if self.staging_conn:
-                self.staging_conn.rollback()
-            raise
-
-    def sync_table_data(self, table_name: str, dry_run: bool = False) -> int:
-        """Sync data from live to staging for a specific table"""
-        if dry_run:
-            if self.live_conn:
-                live_count = self.get_table_row_count(
-                    self.live_conn, table_name)
-                logger.info(
-                    f"🔍 [DRY RUN] Would sync {live_count} rows to staging table: {table_name}")
-                return live_count
-            return 0
-
-        if not self.live_conn or not self.staging_conn:
-            raise Exception("Missing database connections")
-
+    def get_table_columns(self, conn, table_name: str) -> List[str]:
+        """Get a table's column names in column order"""
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = %s
+                ORDER BY ordinal_position
+            """, (table_name,))
+            return [row[0] for row in cur.fetchall()]
+
+    def get_primary_key(self, conn, table_name: str) -> List[str]:
+        """Get a table's primary key columns (empty if it has none)"""
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT a.attname
+                FROM pg_index i
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                WHERE i.indrelid = %s::regclass AND i.indisprimary
+                ORDER BY array_position(i.indkey, a.attnum)
+            """, (table_name,))
+            return [row[0] for row in cur.fetchall()]
+
+    def plan_table(self, table_name: str, incremental: bool = False) -> Dict[str, Any]:
+        """
+        Decide how a table is synced.
+
+        Only columns present in both databases are copied. A table is synced
+        incrementally when requested, it has updated_at and a primary key on
+        both sides, and staging already has rows; otherwise it is replaced.
+        """
+        live_columns = self.get_table_columns(self.live_conn, table_name)
+        staging_columns = set(self.get_table_columns(self.staging_conn, table_name))
+        columns = [column for column in live_columns if column in staging_columns]
+        skipped = [column for column in live_columns if column not in staging_columns]
+        if skipped:
+            logger.warning(f"⚠️  '{table_name}': columns missing in staging are not synced: {', '.join(skipped)}")
+
+        plan: Dict[str, Any] = {"table": table_name, "columns": columns, "mode": "full", "since": None, "key": []}
+        if not incremental:
+            return plan
+
+        key = self.get_primary_key(self.staging_conn, table_name)
+        if "updated_at" not in columns or not key or not set(key) <= set(columns):
+            logger.info(f"ℹ️  '{table_name}' has no updated_at column or primary key: full sync")
+            return plan
+
+        with self.staging_conn.cursor() as cur:
+            cur.execute(sql.SQL("SELECT MAX(updated_at) FROM {}").format(sql.Identifier(table_name)))
+            since = cur.fetchone()[0]
+        if since is None:
+            return plan
+
+        plan.update(mode="incremental", since=since, key=key)
+        return plan
+
+    def _export_query(self, plan: Dict[str, Any]) -> sql.Composed:
+        """SELECT of the rows to copy for a table plan"""
+        query = sql.SQL("SELECT {} FROM {}").format(
+            sql.SQL(', ').join(map(sql.Identifier, plan["columns"])), sql.Identifier(plan["table"]))
+        if plan["mode"] == "incremental":
+            query = sql.SQL("{} WHERE updated_at > {}").format(query, sql.Literal(plan["since"]))
+        return query
+
+    def count_rows_to_copy(self, plan: Dict[str, Any]) -> int:
+        """Count the live rows a table plan would copy"""
+        with self.live_conn.cursor() as cur:
+            cur.execute(sql.SQL("SELECT COUNT(*) FROM ({}) AS rows_to_copy").format(
+                self._export_query(plan)))
+            return int(cur.fetchone()[0])
+
+    def export_table(self, plan: Dict[str, Any], snapshot_id: Optional[str]):
+        """
+        Stream a table's rows out of live with COPY TO STDOUT into a spool file.
+
+        Runs on a worker thread with its own live connection, reading from the
+        exported snapshot so every table sees the same point in time.
+
+        Returns:
+            Spool file positioned at the start
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        conn = psycopg2.connect(self.live_url)
         try:
-            # Get all data from live table
-            with self.live_conn.cursor() as live_cur:
-                live_cur.execute(f"SELECT * FROM {table_name}")
-                rows = live_cur.fetchall()
-
-            if not rows:
-                logger.info(f"📭 No data to sync for table '{table_name}'")
-                return 0
-
-            # Get column names from the first row (handle both dict and tuple
-            # results)
-            first_row = rows[0]
-            if hasattr(
-                first_row,
-                'keys') and callable(
-                getattr(
-                    first_row,
-                    'keys',
-                    None)):
-                # For RealDictRow objects, we can get keys
-                columns = list(first_row.keys())  # type: ignore
-            else:
-                # Fallback: get column names from cursor description
-                with self.live_conn.cursor() as desc_cur:
-                    desc_cur.execute(f"SELECT * FROM {table_name} LIMIT 1")
-                    columns = [
-                        desc[0] for desc in desc_cur.description] if desc_cur.description else []
-
-            if not columns:
-                logger.warning(
-                    f"⚠️  Could not determine columns for table {table_name}")
-                return 0
-
-            # Prepare insert statement
-            placeholders = ', '.join(['%s'] * len(columns))
-            insert_sql = f"""
-                INSERT INTO {table_name} ({', '.join(columns)})
-                VALUES ({placeholders})
-            """
-
-            # Insert data in batches
-            with self.staging_conn.cursor() as staging_cur:
-                batch_size = 100
-                inserted_count = 0
-
-                # Determine if we have dict-like rows (RealDictRow) or
-                # tuple-like rows
-                is_dict_like = hasattr(first_row, 'keys')
-
-                for i in range(0, len(rows), batch_size):
-                    batch = rows[i:i + batch_size]
-                    # Handle both dict-like and tuple-like rows consistently
-                    if is_dict_like:
-                        # For RealDictRow objects, extract values by column
-                        # name
-                        batch_values = [tuple(row[col]
-                                              for col in columns) for row in batch]
-                    else:
-                        # For tuple rows, use as-is
-                        batch_values = [tuple(row) for row in batch]
-
-                    staging_cur.executemany(insert_sql, batch_values)
-                    inserted_count += len(batch)
-
-                    # Show progress for large tables
-                    if len(rows) > 1000 and i % 1000 == 0:
-                        logger.info(
-                            f"   📥 Inserted {inserted_count}/{len(rows)} rows...")
-
-                self.staging_conn.commit()
-                logger.info(
-                    f"✅ Synced table '{table_name}': {inserted_count} rows imported")
-                return inserted_count
-
-        except Exception as e:
-            logger.error(f"❌ Error syncing table {table_name}: {e}")
-            if self.staging_conn:
-                self.staging_conn.rollback()
+            conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+            with conn.cursor() as cur:
+                if snapshot_id:
+                    cur.execute("SET TRANSACTION SNAPSHOT %s", (snapshot_id,))
+                cur.copy_expert(
+                    sql.SQL("COPY ({}) TO STDOUT").format(self._export_query(plan)).as_string(conn), spool)
+            conn.rollback()
+            spool.seek(0)
+            return spool
+        except Exception:
+            spool.close()
             raise
+        finally:
+            conn.close()
+
+    def load_table(self, cur, plan: Dict[str, Any], spool) -> Tuple[int, int]:
+        """
+        Load an exported table into staging with COPY FROM STDIN.
+
+        Full plans copy straight into the (already truncated) table.
+        Incremental plans copy into a temp table, then replace the staging
+        rows with the same primary key.
+
+        Returns:
+            (rows cleared or replaced, rows imported)
+        """
+        table = sql.Identifier(plan["table"])
+        columns = sql.SQL(', ').join(map(sql.Identifier, plan["columns"]))
+
+        if plan["mode"] == "full":
+            cur.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN").format(table, columns).as_string(cur), spool)
+            return 0, cur.rowcount
+
+        temp_table = sql.Identifier(f"sync_{plan['table']}")
+        cur.execute(sql.SQL("CREATE TEMP TABLE {} (LIKE {}) ON COMMIT DROP").format(temp_table, table))
+        cur.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN").format(temp_table, columns).as_string(cur), spool)
+        key_match = sql.SQL(' AND ').join(
+            sql.SQL("t.{0} = s.{0}").format(sql.Identifier(column)) for column in plan["key"])
+        cur.execute(sql.SQL("DELETE FROM {} AS t USING {} AS s WHERE {}").format(table, temp_table, key_match))
+        replaced = cur.rowcount
+        cur.execute(sql.SQL("INSERT INTO {} ({}) OVERRIDING SYSTEM VALUE SELECT {} FROM {}").format(
+            table, columns, columns, temp_table))
+        return replaced, cur.rowcount
+
+    def reset_sequences(self, cur, plan: Dict[str, Any]):
+        """Move serial sequences past the copied ids so new staging rows don't collide"""
+        for column in plan["columns"]:
+            cur.execute("SELECT pg_get_serial_sequence(%s, %s)", (plan["table"], column))
+            sequence = cur.fetchone()[0]
+            if sequence:
+                cur.execute(sql.SQL("SELECT setval(%s, COALESCE(MAX({0}), 1), MAX({0}) IS NOT NULL) FROM {1}").format(
+                    sql.Identifier(column), sql.Identifier(plan["table"])), (sequence,))
 
     def sync_tables(self,
                     tables_to_sync: List[str],
                     dry_run: bool = False,
-                    force: bool = False) -> Dict[str,
-                                                 int]:
+                    force: bool = False,
+                    incremental: bool = False,
+                    workers: int = DEFAULT_WORKERS) -> Dict[str,
+                                                            int]:
         """Main sync process - clear staging and import from live"""
 
         if not self.connect_databases():
@@ -297,52 +326,94 @@ class DatabaseSyncManager:
                 logger.error("❌ No valid tables to sync")
                 return {}
 
+            plans = [self.plan_table(table, incremental) for table in valid_tables]
+            full_tables = [plan["table"] for plan in plans if plan["mode"] == "full"]
+
             # Show sync summary
-            logger.info(f"\n📋 Sync Summary:")
-            logger.info(f"   Source: LIVE_DATABASE_URL")
-            logger.info(f"   Target: DATABASE_URL (staging)")
-            logger.info(f"   Tables: {', '.join(valid_tables)}")
+            logger.info("\n📋 Sync Summary:")
+            logger.info("   Source: LIVE_DATABASE_URL")
+            logger.info("   Target: DATABASE_URL (staging)")
+            for plan in plans:
+                detail = f"rows updated after {plan['since']}" if plan["mode"] == "incremental" else "replace all rows"
+                logger.info(f"   Table: {plan['table']} ({detail})")
             logger.info(f"   Mode: {'DRY RUN' if dry_run else 'LIVE SYNC'}")
 
-            # Confirmation (unless forced or dry run)
-            if not dry_run and not force:
+            sync_results = {}
+            if dry_run:
+                for plan in plans:
+                    cleared = self.get_table_row_count(self.staging_conn, plan["table"]) \
+                        if plan["mode"] == "full" else 0
+                    rows = self.count_rows_to_copy(plan)
+                    logger.info(f"🔍 [DRY RUN] Would sync {rows} rows to staging table: {plan['table']}")
+                    sync_results[f"{plan['table']}_cleared"] = cleared
+                    sync_results[f"{plan['table']}_imported"] = rows
+                return sync_results
+
+            # Confirmation (unless forced)
+            if not force and full_tables:
                 logger.warning(
-                    f"\n⚠️  WARNING: This will PERMANENTLY DELETE all data in staging tables!")
+                    f"\n⚠️  WARNING: This will PERMANENTLY DELETE all data in staging tables: {', '.join(full_tables)}")
                 confirmation = input(
-                    f"Type 'yes' to continue: ").strip().lower()
+                    "Type 'yes' to continue: ").strip().lower()
                 if confirmation != 'yes':
                     logger.info("🚫 Sync cancelled by user")
                     return {}
 
-            logger.info(f"\n🚀 Starting sync process...")
+            logger.info("\n🚀 Starting sync process...")
+            return self._copy_tables(plans, workers)
 
-            # Clear staging tables in reverse order (to handle foreign keys)
-            sync_results = {}
-            clearing_order = list(reversed(valid_tables))
-
-            logger.info(f"🗑️  Clearing staging tables...")
-            for table in clearing_order:
-                try:
-                    cleared_count = self.clear_staging_table(table, dry_run)
-                    sync_results[f"{table}_cleared"] = cleared_count
-                except Exception as e:
-                    logger.error(f"❌ Failed to clear {table}: {e}")
-                    return {}
+        finally:
+            self.close_connections()
 
-            # Import data in forward order (to respect dependencies)
-            logger.info(f"📥 Importing data from live database...")
-            for table in valid_tables:
-                try:
-                    imported_count = self.sync_table_data(table, dry_run)
-                    sync_results[f"{table}_imported"] = imported_count
-                except Exception as e:
-                    logger.error(f"❌ Failed to sync {table}: {e}")
-                    return {}
+    def _copy_tables(self, plans: List[Dict[str, Any]], workers: int) -> Dict[str, int]:
+        """Export tables from live in parallel and load them into staging in one transaction"""
+        sync_results: Dict[str, int] = {}
+
+        # Hold a snapshot open on the main live connection for the export workers
+        self.live_conn.rollback()
+        self.live_conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        with self.live_conn.cursor() as cur:
+            cur.execute("SELECT pg_export_snapshot()")
+            snapshot_id = cur.fetchone()[0]
 
+        executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="sync-export")
+        exports: List[Future] = [executor.submit(self.export_table, plan, snapshot_id) for plan in plans]
+        try:
+            with self.staging_conn.cursor() as cur:
+                full_tables = [plan["table"] for plan in plans if plan["mode"] == "full"]
+                if full_tables:
+                    for table in full_tables:
+                        sync_results[f"{table}_cleared"] = self.get_table_row_count(self.staging_conn, table)
+                    cur.execute(sql.SQL("TRUNCATE {}").format(
+                        sql.SQL(', ').join(map(sql.Identifier, full_tables))))
+                    logger.info(f"🗑️  Truncated staging tables: {', '.join(full_tables)}")
+
+                # Load in dependency order as each export finishes
+                logger.info("📥 Importing data from live database...")
+                for plan, export in zip(plans, exports):
+                    with export.result() as spool:
+                        replaced, imported = self.load_table(cur, plan, spool)
+                    self.reset_sequences(cur, plan)
+                    if plan["mode"] == "incremental":
+                        sync_results[f"{plan['table']}_cleared"] = replaced
+                    sync_results[f"{plan['table']}_imported"] = imported
+                    logger.info(f"✅ Synced table '{plan['table']}': {imported} rows imported")
+
+            self.staging_conn.commit()
             return sync_results
 
+        except Exception as e:
+            logger.error(f"❌ Sync failed, staging left unchanged: {e}")
+            self.staging_conn.rollback()
+            for export in exports:
+                export.cancel()
+            return {}
         finally:
-            self.close_connections()
+            executor.shutdown(wait=True)
+            for export in exports:
+                if export.done() and not export.cancelled() and export.exception() is None:
+                    export.result().close()
+            self.live_conn.rollback()
 
     def print_results(self, results: Dict[str, int], dry_run: bool = False):
         """Print sync results summary"""
@@ -393,6 +464,7 @@ Examples:
   python database_sync.py --tables played_games,trivia_questions
   python database_sync.py --dry-run
   python database_sync.py --force
+  python database_sync.py --incremental --workers 4
         """)
 
     parser.add_argument(
@@ -413,6 +485,19 @@ Examples:
         help="Skip confirmation prompt"
     )
 
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only copy rows updated since the newest staging row (tables with updated_at and a primary key)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Tables exported from live in parallel (default: {DEFAULT_WORKERS})"
+    )
+
     args = parser.parse_args()
 
     # Initialize sync manager
@@ -441,7 +526,9 @@ Examples:
         results = sync_manager.sync_tables(
             tables_to_sync=tables_to_sync,
             dry_run=args.dry_run,
-            force=args.force
+            force=args.force,
+            incremental=args.incremental,
+            workers=args.workers
         )
 
         # Print results
@@ -111,6 +111,11 @@ async def regenerate_all_alternative_names(db, dry_run: bool = True) -> Dict[str
     print("=" * 80 + "\n")
     print("⏱️  Note: This may take a few minutes due to API rate limiting...\n")
 
+    # Resolve every uncached title up front in batched multi-queries; the
+    # per-game lookups below then come from the (persistent) IGDB cache
+    warm_stats = await igdb.warm_cache_from_played_games(games)
+    print(f"💾 IGDB cache: {warm_stats['already_cached']} cached, {warm_stats['fetched']} fetched\n")
+
     for i, game in enumerate(games, 1):
         canonical_name = game['canonical_name']
         game_id = game['id']
@@ -179,10 +184,6 @@ async def regenerate_all_alternative_names(db, dry_run: bool = True) -> Dict[str
 
             print()
 
-            # Add small delay to respect API rate limits (if not dry-run)
-            if not dry_run and i < len(games):
-                await asyncio.sleep(0.5)  # 500ms between requests
-
         except Exception as e:
             stats['errors'].append(f"{canonical_name}: Regeneration failed - {str(e)}")
             stats['failed'] += 1
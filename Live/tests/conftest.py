@@ -69,6 +69,25 @@ TEST_ENV_VARS = {
 }
 
 
+def pytest_addoption(parser):
+    parser.addoption("--run-benchmarks", action="store_true", default=False,
+                     help="Run wall-clock benchmark tests (marked benchmark)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock comparison, skipped unless --run-benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Timing comparisons are too noisy for the default run; they are opt-in."""
+    if config.getoption("--run-benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="benchmark: run with --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
@@ -35,6 +35,7 @@ echo ""
 DRY_RUN=""
 FORCE=""
 TABLES=""
+INCREMENTAL=""
 
 while [[ $# -gt 0 ]]; do
     case $1 in
@@ -50,6 +51,10 @@ while [[ $# -gt 0 ]]; do
             TABLES="--tables $2"
             shift 2
             ;;
+        --incremental)
+            INCREMENTAL="--incremental"
+            shift
+            ;;
         -h|--help)
             echo "Usage: $0 [OPTIONS]"
             echo ""
@@ -57,6 +62,7 @@ while [[ $# -gt 0 ]]; do
             echo "  --dry-run          Show what would be synced without making changes"
             echo "  --force            Skip confirmation prompt"
             echo "  --tables TABLES    Comma-separated list of tables to sync"
+            echo "  --incremental      Only copy rows updated since the last sync"
             echo "  -h, --help         Show this help message"
             echo ""
             echo "Examples:"
@@ -76,7 +82,7 @@ done
 
 # Run the Python script
 echo "🚀 Starting database sync..."
-python3 database_sync.py $DRY_RUN $FORCE $TABLES
+python3 database_sync.py $DRY_RUN $FORCE $INCREMENTAL $TABLES
 
 echo ""
 echo "✅ Database sync completed!"
@@ -0,0 +1,317 @@
+"""
+Tests for the bounded, bucketed AI response cache.
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.handlers.ai_cache import AIResponseCache, PersistentCacheTier  # noqa: E402
+
+FAQ_QUERY = "where is the best place to find the schedule"
+
+
+def expire_entry(cache, query, user_id, channel_id=None, is_dm=False):
+    """Move an entry's expiry into the past (and its heap slot with it)."""
+    key = cache._generate_cache_key(query, user_id, channel_id, is_dm)
+    past = datetime.now(ZoneInfo("Europe/London")) - timedelta(seconds=1)
+    cache.cache[key]["expires_at"] = past
+    cache._expiry_heap = [(past.timestamp(), key) if k == key else (ts, k) for ts, k in cache._expiry_heap]
+    cache._expiry_heap.sort()
+
+
+class FakeCacheBackend:
+    """In-memory stand-in for the StatsDatabase ai_response_cache methods."""
+
+    def __init__(self, rows=None):
+        self.rows = {row["cache_key"]: row for row in rows or []}
+        self.load_calls = 0
+
+    def load_ai_cache_entries(self, limit=2000):
+        self.load_calls += 1
+        now = datetime.now(ZoneInfo("Europe/London"))
+        live = [row for row in self.rows.values() if row["expires_at"] > now]
+        return sorted(live, key=lambda row: row["created_at"], reverse=True)[:limit]
+
+    def save_ai_cache_entries(self, entries):
+        for entry in entries:
+            self.rows[entry["cache_key"]] = dict(entry)
+        return len(entries)
+
+
+def persisted_row(cache, query, response, user_id, channel_id, query_type="faq", expires_in=timedelta(days=1)):
+    now = datetime.now(ZoneInfo("Europe/London"))
+    return {
+        "cache_key": cache._generate_cache_key(query, user_id, channel_id, False),
+        "original_query": query,
+        "response": response,
+        "user_id": user_id,
+        "channel_id": channel_id,
+        "is_dm": False,
+        "query_type": query_type,
+        "created_at": now - timedelta(hours=1),
+        "expires_at": now + expires_in,
+    }
+
+
+class TestAIResponseCache:
+    """Test eviction, expiry, bucketing and stats."""
+
+    def test_exact_hit_and_stats(self):
+        cache = AIResponseCache()
+        cache.set(FAQ_QUERY, "Check the schedule channel.", user_id=1, channel_id=10)
+
+        assert cache.get(FAQ_QUERY, user_id=1, channel_id=10) == "Check the schedule channel."
+        assert cache.get("something else entirely", user_id=1, channel_id=10) is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["cache_size"] == 1
+        assert stats["memory_bytes"] > 0
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = AIResponseCache(max_entries=3)
+        for i in range(3):
+            cache.set(f"statement number {i}", f"response {i}", user_id=1, channel_id=10)
+
+        # Touch the oldest entry so the second one becomes least recently used
+        assert cache.get("statement number 0", user_id=1, channel_id=10) == "response 0"
+        cache.set("statement number 3", "response 3", user_id=1, channel_id=10)
+
+        assert cache.get("statement number 1", user_id=1, channel_id=10) is None
+        assert cache.get("statement number 0", user_id=1, channel_id=10) == "response 0"
+        assert cache.get_stats()["evictions"] == 1
+        assert len(cache.cache) == 3
+
+    def test_memory_bound(self):
+        cache = AIResponseCache(max_entries=100, max_bytes=4000)
+        for i in range(10):
+            cache.set(f"statement number {i}", "x" * 1000, user_id=1, channel_id=10)
+
+        stats = cache.get_stats()
+        assert stats["memory_bytes"] <= 4000
+        assert stats["cache_size"] < 10
+        assert cache.get("statement number 9", user_id=1, channel_id=10) == "x" * 1000
+
+    def test_ttl_expiry_without_cleanup(self):
+        cache = AIResponseCache()
+        cache.set("first statement", "one", user_id=1, channel_id=10)
+        expire_entry(cache, "first statement", 1, 10)
+
+        # Any later operation evicts the expired entry via the expiry heap
+        cache.set("second statement", "two", user_id=1, channel_id=10)
+        assert len(cache.cache) == 1
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_fuzzy_faq_match_within_conversation_bucket(self):
+        cache = AIResponseCache()
+        cache.set(FAQ_QUERY, "Check the schedule channel.", user_id=1, channel_id=10)
+
+        similar = FAQ_QUERY + "s"
+        assert cache.get(similar, user_id=1, channel_id=10) == "Check the schedule channel."
+        # Other users and channels are separate buckets
+        assert cache.get(similar, user_id=2, channel_id=10) is None
+        assert cache.get(similar, user_id=1, channel_id=11) is None
+        assert cache.get(similar, user_id=1, is_dm=True) is None
+
+    def test_buckets_track_removals(self):
+        cache = AIResponseCache(max_entries=1)
+        cache.set(FAQ_QUERY, "a", user_id=1, channel_id=10)
+        cache.set("another statement", "b", user_id=2, channel_id=10)
+
+        assert cache.get_stats()["buckets"] == 1
+        cache.clear()
+        stats = cache.get_stats()
+        assert stats["buckets"] == 0
+        assert stats["memory_bytes"] == 0
+
+    def test_replacing_entry_keeps_accounting(self):
+        cache = AIResponseCache()
+        cache.set(FAQ_QUERY, "short", user_id=1, channel_id=10)
+        cache.set(FAQ_QUERY, "a much longer replacement response", user_id=1, channel_id=10)
+
+        assert len(cache.cache) == 1
+        entry = next(iter(cache.cache.values()))
+        assert cache.get_stats()["memory_bytes"] == entry["size_bytes"]
+
+    def test_cleanup_expired(self):
+        cache = AIResponseCache()
+        cache.set("first statement", "one", user_id=1, channel_id=10)
+        key = cache._generate_cache_key("first statement", 1, 10, False)
+        cache.cache[key]["expires_at"] = datetime.now(ZoneInfo("Europe/London")) - timedelta(seconds=1)
+
+        assert cache.cleanup_expired() == 1
+        assert len(cache.cache) == 0
+
+
+class TestPersistentCacheTier:
+    """Test warm-up from and write-through to the persistent tier."""
+
+    def test_write_through_only_for_persisted_categories(self):
+        backend = FakeCacheBackend()
+        tier = PersistentCacheTier(backend)
+        cache = AIResponseCache()
+        cache.attach_persistent_tier(tier)
+
+        cache.set(FAQ_QUERY, "Check the schedule channel.", user_id=1, channel_id=10)
+        cache.set("what is jonesy doing right now", "Streaming.", user_id=1, channel_id=10)
+        assert tier.flush(timeout=5)
+
+        assert [row["original_query"] for row in backend.rows.values()] == [FAQ_QUERY]
+        assert tier.stats["writes"] == 1
+
+    def test_cold_start_serves_persisted_entries(self):
+        template = AIResponseCache()
+        backend = FakeCacheBackend([
+            persisted_row(template, FAQ_QUERY, "Check the schedule channel.", 1, 10),
+            persisted_row(template, "old question", "stale", 1, 10, expires_in=timedelta(seconds=-1)),
+        ])
+
+        cache = AIResponseCache()
+        cache.attach_persistent_tier(PersistentCacheTier(backend))
+        assert cache.load_persistent() == 1
+        assert cache.load_persistent() == 0  # only ever loads once
+
+        assert cache.get(FAQ_QUERY, user_id=1, channel_id=10) == "Check the schedule channel."
+        assert cache.get("old question", user_id=1, channel_id=10) is None
+        assert backend.load_calls == 1
+
+        persistent = cache.get_cache_info()["persistent"]
+        assert persistent["restored_entries"] == 1
+        assert persistent["hits"] == 1
+        assert persistent["api_calls_saved"] == 1
+        assert persistent["cold_start_hit_rate"] == 50.0
+
+    def test_get_and_set_never_touch_the_database(self):
+        template = AIResponseCache()
+        backend = FakeCacheBackend([persisted_row(template, FAQ_QUERY, "Check the schedule channel.", 1, 10)])
+        cache = AIResponseCache()
+        cache.attach_persistent_tier(PersistentCacheTier(backend))
+
+        assert cache.get(FAQ_QUERY, user_id=1, channel_id=10) is None
+        cache.set("first statement", "one", user_id=1, channel_id=10)
+        assert backend.load_calls == 0
+
+    def test_warm_up_failure_leaves_memory_cache_working(self):
+        class BrokenBackend(FakeCacheBackend):
+            def load_ai_cache_entries(self, limit=2000):
+                raise RuntimeError("database unavailable")
+
+        cache = AIResponseCache()
+        cache.attach_persistent_tier(PersistentCacheTier(BrokenBackend()))
+        assert cache.load_persistent() == 0
+        cache.set("first statement", "one", user_id=1, channel_id=10)
+
+        assert cache.get("first statement", user_id=1, channel_id=10) == "one"
+        assert cache.get_cache_info()["persistent"]["restored_entries"] == 0
+
+
+class TestRequestCoalescing:
+    """Test identical in-flight requests share one upstream AI call."""
+
+    @staticmethod
+    def upstream(calls, answer="Check the schedule channel.", delay=0.05):
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(delay)
+            return answer, "success"
+        return call
+
+    @pytest.mark.asyncio
+    async def test_concurrent_repeats_from_a_member_share_one_call(self):
+        cache = AIResponseCache()
+        calls = []
+        keys = [cache.coalescing_key(FAQ_QUERY + suffix, 1, channel_id=10) for suffix in ["", "?", "  ", "!", ""]]
+        results = await asyncio.gather(*(cache.coalesce(key, self.upstream(calls)) for key in keys))
+
+        assert len(calls) == 1
+        assert [coalesced for _, coalesced in results].count(True) == 4
+        assert all(result == ("Check the schedule channel.", "success") for result, _ in results)
+        stats = cache.get_stats()
+        assert stats["coalesced"] == 4 and stats["api_calls_saved"] == 4 and stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_coalescing_respects_conversation_and_user(self):
+        cache = AIResponseCache()
+        calls = []
+        keys = [
+            cache.coalescing_key(FAQ_QUERY, 1, channel_id=10),
+            cache.coalescing_key(FAQ_QUERY, 2, channel_id=10),  # answers are personalised: per member
+            cache.coalescing_key(FAQ_QUERY, 1, channel_id=20),  # another channel
+            cache.coalescing_key(FAQ_QUERY, 3, is_dm=True),
+            cache.coalescing_key(FAQ_QUERY, 3, is_dm=True),
+            cache.coalescing_key("tell me a story", 1, channel_id=10),
+            cache.coalescing_key("tell me a story", 2, channel_id=10),
+            cache.coalescing_key("tell me a story", 2, channel_id=10),
+        ]
+        await asyncio.gather(*(cache.coalesce(key, self.upstream(calls)) for key in keys))
+        assert len(calls) == 6 and cache.get_stats()["coalesced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_followers_retry_when_the_leader_fails(self):
+        cache = AIResponseCache()
+        key = cache.coalescing_key(FAQ_QUERY, 1, channel_id=10)
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            raise RuntimeError("connection reset")
+
+        leader = asyncio.ensure_future(cache.coalesce(key, failing))
+        await asyncio.sleep(0)
+        follower = await cache.coalesce(key, self.upstream(calls, delay=0))
+        with pytest.raises(RuntimeError):
+            await leader
+
+        assert follower == (("Check the schedule channel.", "success"), False)
+        assert len(calls) == 2 and cache.get_stats()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_call_ai_with_rate_limiting_burst(self, monkeypatch):
+        from types import SimpleNamespace
+
+        from bot.handlers import ai_handler
+
+        generations = []
+
+        def generate_content(model, contents, config):
+            generations.append(contents)
+            time.sleep(0.05)
+            return SimpleNamespace(text="The schedule is pinned in #announcements.")
+
+        cache = AIResponseCache()
+        monkeypatch.setattr(ai_handler, "gemini_client",
+                            SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+        monkeypatch.setattr(ai_handler, "primary_ai", "gemini")
+        monkeypatch.setattr(ai_handler, "current_gemini_model", "stub-model")
+        monkeypatch.setattr(ai_handler, "models_tested", True)
+        monkeypatch.setattr(ai_handler, "CACHE_AVAILABLE", True)
+        monkeypatch.setattr(ai_handler, "get_cache", lambda: cache)
+        monkeypatch.setattr(ai_handler, "check_rate_limits", lambda priority="medium": (True, "OK"))
+        monkeypatch.setattr(ai_handler, "_build_full_system_instruction", lambda *args: ("persona", "context"))
+        monkeypatch.setattr(ai_handler, "ai_usage_stats", dict(ai_handler.ai_usage_stats, daily_requests=0,
+                                                               quota_exhausted=False, backup_active=False))
+
+        # One member fires the same question repeatedly while another asks it once
+        user_ids = [100] * 8 + [101]
+        results = await asyncio.gather(*(ai_handler.call_ai_with_rate_limiting(FAQ_QUERY, user_id, channel_id=10)
+                                         for user_id in user_ids))
+
+        assert len(generations) == 2 and ai_handler.ai_usage_stats["daily_requests"] == 2
+        assert sorted(status for _, status in results) == ["coalesced"] * 7 + ["success"] * 2
+        assert {text for text, _ in results} == {"The schedule is pinned in #announcements."}
+        # The leading request's cache entry answers a repeat without another call
+        assert await ai_handler.call_ai_with_rate_limiting(FAQ_QUERY, 100, channel_id=10) == (
+            "The schedule is pinned in #announcements.", "cache_hit")
+        assert cache.get_stats()["coalesced"] == 7
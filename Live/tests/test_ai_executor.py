@@ -0,0 +1,192 @@
+"""
+Tests for the shared, priority-ordered AI call executor.
+"""
+import asyncio
+import concurrent.futures
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.handlers.ai_executor import AIExecutor  # noqa: E402
+
+
+class Gate:
+    """A blocking 'API call' that holds its thread until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.started.set()
+        self.release.wait(5)
+        return "done"
+
+
+class InFlight:
+    """Counts concurrent calls per label."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+
+    def call(self, label, seconds=0.02):
+        with self.lock:
+            self.active[label] = self.active.get(label, 0) + 1
+            self.peak[label] = max(self.peak.get(label, 0), self.active[label])
+        time.sleep(seconds)
+        with self.lock:
+            self.active[label] -= 1
+        return label
+
+
+async def wait_until(event: threading.Event):
+    while not event.is_set():
+        await asyncio.sleep(0.005)
+
+
+class TestAIExecutor:
+    """Test admission order, concurrency caps, timeouts and metrics."""
+
+    @pytest.mark.asyncio
+    async def test_waiting_calls_admitted_by_priority(self):
+        executor = AIExecutor(max_workers=1)
+        gate = Gate()
+        blocker = asyncio.ensure_future(executor.run(gate, priority="medium"))
+        await wait_until(gate.started)
+
+        order = []
+        waiting = [asyncio.ensure_future(executor.run(order.append, priority, priority=priority))
+                   for priority in ("low", "medium", "high", "startup", "high")]
+        await asyncio.sleep(0.02)
+        assert executor.snapshot()["queued"] == {"startup": 1, "high": 2, "medium": 1, "low": 1}
+
+        gate.release.set()
+        await asyncio.gather(blocker, *waiting)
+        assert order == ["startup", "high", "high", "medium", "low"]
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_background_calls_capped_below_total(self):
+        executor = AIExecutor(max_workers=3, priority_limits={"low": 1})
+        tracker = InFlight()
+        calls = [executor.run(tracker.call, "low", priority="low") for _ in range(4)]
+        calls += [executor.run(tracker.call, "high", priority="high") for _ in range(4)]
+        results = await asyncio.gather(*calls)
+
+        assert sorted(results) == ["high"] * 4 + ["low"] * 4
+        assert tracker.peak["low"] == 1 and tracker.peak["high"] >= 2
+        snapshot = executor.snapshot()
+        assert snapshot["running"] == {"startup": 0, "high": 0, "medium": 0, "low": 0}
+        assert snapshot["priorities"]["low"]["completed"] == 4
+        # Later low calls waited for the single background slot
+        assert snapshot["priorities"]["low"]["max_queue_wait_ms"] >= 40
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timed_out_call_frees_slot_within_abandoned_cap(self):
+        executor = AIExecutor(max_workers=1, max_abandoned=1)
+        gate = Gate()
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(gate, priority="high", timeout=0.02)
+
+        # The hung call's thread is still running, but its slot went back to the pool
+        assert await executor.run(lambda: "next", priority="high", timeout=5) == "next"
+        assert executor.snapshot()["abandoned"] == 1
+
+        gate.release.set()
+        while executor.snapshot()["abandoned"]:
+            await asyncio.sleep(0.005)
+        stats = executor.snapshot()["priorities"]["high"]
+        assert (stats["requests"], stats["completed"], stats["timeouts"], stats["abandoned"]) == (2, 1, 1, 1)
+        assert sum(executor.snapshot()["running"].values()) == 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_covers_wait_for_a_held_slot(self):
+        executor = AIExecutor(max_workers=1, max_abandoned=0)
+        gate = Gate()
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(gate, priority="high", timeout=0.02)
+        assert executor.snapshot()["running"]["high"] == 1  # Over the abandoned cap: slot kept
+
+        # A later call gives up after its own timeout instead of queueing forever
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(lambda: "never", priority="high", timeout=0.02)
+        snapshot = executor.snapshot()
+        assert snapshot["queued"]["high"] == 0 and snapshot["priorities"]["high"]["queue_timeouts"] == 1
+
+        gate.release.set()
+        assert await executor.run(lambda: "next", priority="high", timeout=5) == "next"
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_errors_and_cancelled_waiters_release_slots(self):
+        executor = AIExecutor(max_workers=1)
+
+        def fail():
+            raise RuntimeError("503 UNAVAILABLE")
+
+        with pytest.raises(RuntimeError):
+            await executor.run(fail)
+
+        gate = Gate()
+        blocker = asyncio.ensure_future(executor.run(gate))
+        await wait_until(gate.started)
+        waiter = asyncio.ensure_future(executor.run(lambda: "never"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        gate.release.set()
+        await blocker
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert await executor.run(lambda: "free", priority="low") == "free"
+        snapshot = executor.snapshot()
+        assert snapshot["queued"]["medium"] == 0 and sum(snapshot["running"].values()) == 0
+        assert snapshot["priorities"]["medium"]["errors"] == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_threads_reused_across_calls(self):
+        executor = AIExecutor(max_workers=2, max_abandoned=0)
+        names = await asyncio.gather(*(executor.run(lambda: threading.current_thread().name, priority="medium")
+                                       for _ in range(30)))
+        assert len(set(names)) <= 2 and all(name.startswith("ai-call") for name in names)
+        executor.shutdown()
+
+
+@pytest.mark.benchmark
+class TestAIExecutorOverhead:
+    """Per-call executor creation (the old pattern) versus the shared executor."""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_overhead(self):
+        calls = 300
+        loop = asyncio.get_running_loop()
+
+        started = time.perf_counter()
+        for _ in range(calls):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+                await asyncio.wait_for(loop.run_in_executor(pool, lambda: None), timeout=5)
+        per_call_pool = (time.perf_counter() - started) * 1000 / calls
+
+        executor = AIExecutor(max_workers=4)
+        started = time.perf_counter()
+        for _ in range(calls):
+            await executor.run(lambda: None, priority="high", timeout=5)
+        shared = (time.perf_counter() - started) * 1000 / calls
+        executor.shutdown()
+
+        print(f"\nDispatch overhead per AI call: {per_call_pool:.3f}ms with a new executor, "
+              f"{shared:.3f}ms with the shared executor")
+        assert shared < per_call_pool
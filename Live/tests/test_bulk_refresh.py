@@ -0,0 +1,335 @@
+"""
+Tests for the bulk stats refresh engine and the YouTube/Twitch refresh scripts,
+run against stubbed APIs and an in-memory played games table.
+"""
+import json
+import os
+import sys
+from collections import Counter
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.database import games as games_module  # noqa: E402
+from bot.database.games import GamesDatabase  # noqa: E402
+from bot.integrations import http_client, twitch, youtube  # noqa: E402
+from bot.integrations.http_client import HTTPClientManager  # noqa: E402
+from bot.utils.bulk_refresh import BulkStatsRefresh, diff_stats  # noqa: E402
+from scripts import bulk_update_twitch_stats, bulk_update_youtube_stats  # noqa: E402
+
+
+class FakeStatsDatabase:
+    """In-memory played games table recording each batched write."""
+
+    def __init__(self, games):
+        self.games = {game['id']: dict(game) for game in games}
+        self.writes = []
+        self.fail_writes = False
+        self.missing_ids = set()
+
+    def get_all_played_games(self):
+        return [dict(game) for game in self.games.values()]
+
+    def get_played_game(self, name):
+        return next((dict(g) for g in self.games.values() if g['canonical_name'].lower() == name.lower()), None)
+
+    def bulk_update_game_stats(self, updates, page_size=500):
+        if self.fail_writes:
+            return None
+        self.writes.append([dict(update) for update in updates])
+        matched = [update for update in updates if update['id'] not in self.missing_ids]
+        for update in matched:
+            self.games[update['id']].update({k: v for k, v in update.items() if k != 'id'})
+        return len(matched)
+
+
+def make_games(count):
+    return [{'id': i, 'canonical_name': f"Game {i}", 'youtube_views': 100 * i, 'total_episodes': 10,
+             'total_playtime_minutes': 600, 'youtube_playlist_url': f"https://youtube.com/playlist?list=PL{i}"}
+            for i in range(1, count + 1)]
+
+
+def views_fetcher(calls, fail=()):
+    async def fetch(game):
+        calls.append(game['id'])
+        if game['id'] in fail:
+            return None
+        # Odd games gained views, even games are unchanged
+        return {'youtube_views': game['youtube_views'] + (50 if game['id'] % 2 else 0), 'total_episodes': 10}
+    return fetch
+
+
+class TestBulkStatsRefresh:
+    """Test batching, diffing, checkpoints and the quota budget."""
+
+    @pytest.mark.asyncio
+    async def test_changes_written_in_batches(self):
+        db = FakeStatsDatabase(make_games(7))
+        calls = []
+        report = await BulkStatsRefresh(db, "youtube", views_fetcher(calls), batch_size=2,
+                                        concurrency=3).run(db.get_all_played_games())
+
+        assert sorted(calls) == list(range(1, 8))
+        assert [len(batch) for batch in db.writes] == [2, 2]
+        assert db.writes[0][0] == {'id': db.writes[0][0]['id'], 'youtube_views': db.writes[0][0]['youtube_views']}
+        assert db.games[7]['youtube_views'] == 750 and db.games[6]['youtube_views'] == 600
+        assert (report['updated'], report['unchanged'], report['failed'], report['writes']) == (4, 3, 0, 2)
+        assert report['quota_used'] == 7 and report['processed'] == 7
+
+    @pytest.mark.asyncio
+    async def test_interrupted_run_resumes_from_checkpoint(self, tmp_path):
+        checkpoint = str(tmp_path / "refresh.json")
+        db = FakeStatsDatabase(make_games(6))
+
+        calls = []
+        first = await BulkStatsRefresh(db, "youtube", views_fetcher(calls, fail={3, 4}),
+                                       checkpoint_path=checkpoint).run(db.get_all_played_games())
+        assert first['failed'] == 2
+        with open(checkpoint) as f:
+            assert sorted(json.load(f)['done'], key=int) == ['1', '2', '5', '6']
+
+        calls = []
+        second = await BulkStatsRefresh(db, "youtube", views_fetcher(calls),
+                                        checkpoint_path=checkpoint).run(db.get_all_played_games())
+        assert sorted(calls) == [3, 4]
+        assert second['resumed'] == 4 and second['updated'] == 1
+        assert not os.path.exists(checkpoint)  # Finished: the next run starts fresh
+
+    @pytest.mark.asyncio
+    async def test_quota_budget_defers_remaining_games(self, tmp_path):
+        checkpoint = str(tmp_path / "refresh.json")
+        db = FakeStatsDatabase(make_games(5))
+
+        calls = []
+        report = await BulkStatsRefresh(db, "youtube", views_fetcher(calls), cost=lambda game: 2, quota_units=5,
+                                        concurrency=1, checkpoint_path=checkpoint).run(db.get_all_played_games())
+        assert calls == [1, 2]
+        assert report['quota_exhausted'] and report['deferred'] == 3 and report['quota_used'] == 4
+
+        calls = []
+        await BulkStatsRefresh(db, "youtube", views_fetcher(calls), cost=lambda game: 2, quota_units=100,
+                               checkpoint_path=checkpoint).run(db.get_all_played_games())
+        assert sorted(calls) == [3, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_expensive_game_does_not_stop_cheaper_ones(self):
+        db = FakeStatsDatabase(make_games(5))
+        calls = []
+        # Game 2 alone would need more than is left after game 1
+        report = await BulkStatsRefresh(db, "youtube", views_fetcher(calls),
+                                        cost=lambda game: 8 if game['id'] == 2 else 1, quota_units=6,
+                                        concurrency=1).run(db.get_all_played_games())
+
+        assert calls == [1, 3, 4, 5]
+        assert report['quota_exhausted'] and report['deferred'] == 1 and report['quota_used'] == 4
+
+    @pytest.mark.asyncio
+    async def test_dry_run_reports_diff_without_writing(self, tmp_path, capsys):
+        checkpoint = str(tmp_path / "refresh.json")
+        db = FakeStatsDatabase(make_games(3))
+        report = await BulkStatsRefresh(db, "youtube", views_fetcher([]), dry_run=True,
+                                        checkpoint_path=checkpoint).run(db.get_all_played_games())
+
+        assert db.writes == [] and not os.path.exists(checkpoint)
+        assert report['updated'] == 2
+        assert report['diffs'][0] == {'id': 1, 'canonical_name': 'Game 1', 'changes': {'youtube_views': (100, 150)}}
+        assert "Game 3: youtube_views 300 → 350" in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_not_checkpointed(self, tmp_path):
+        checkpoint = str(tmp_path / "refresh.json")
+        db = FakeStatsDatabase(make_games(2))
+        db.fail_writes = True
+        report = await BulkStatsRefresh(db, "youtube", views_fetcher([]),
+                                        checkpoint_path=checkpoint).run(db.get_all_played_games())
+
+        assert report['failed'] == 1
+        with open(checkpoint) as f:
+            assert json.load(f)['done'] == {'2': 'unchanged'}
+
+    @pytest.mark.asyncio
+    async def test_write_matching_no_rows_is_not_a_failure(self, tmp_path):
+        db = FakeStatsDatabase(make_games(1))
+        db.missing_ids = {1}
+        checkpoint = str(tmp_path / "checkpoint.json")
+        report = await BulkStatsRefresh(db, "youtube", views_fetcher([]),
+                                        checkpoint_path=checkpoint).run(db.get_all_played_games())
+
+        assert report['failed'] == 0 and report['updated'] == 1
+        assert not os.path.exists(checkpoint)
+
+    def test_diff_treats_missing_counters_as_zero(self):
+        game = {'youtube_views': None, 'twitch_vod_urls': ['a']}
+        assert diff_stats(game, {'youtube_views': 0, 'twitch_vod_urls': ['a']}) == {}
+        assert diff_stats(game, {'twitch_vod_urls': ['a', 'b']}) == {'twitch_vod_urls': ['a', 'b']}
+
+
+class TestBulkUpdateGameStats:
+    """Test the batched UPDATE ... FROM (VALUES ...) write."""
+
+    def test_one_statement_per_column_set(self):
+        cursor = MagicMock()
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cursor
+        games = GamesDatabase(MagicMock(get_connection=lambda: conn))
+        games._rankings = MagicMock()
+        conn.commit.reset_mock()
+
+        captured = []
+
+        def fake_execute_values(cur, sql, rows, template=None, page_size=100, fetch=False):
+            captured.append((' '.join(sql.split()), rows, template))
+            return [{'id': row[0]} for row in rows]
+
+        with patch.object(games_module, "execute_values", fake_execute_values):
+            updated = games.bulk_update_game_stats([
+                {'id': 1, 'youtube_views': 10, 'total_episodes': 3},
+                {'id': 2, 'total_episodes': 4, 'youtube_views': 20},
+                {'id': 3, 'twitch_vod_urls': ['https://www.twitch.tv/videos/1'], 'total_episodes': 2},
+                {'id': 4, 'unknown_column': 1},
+            ])
+
+        assert updated == 3
+        assert len(captured) == 2
+        sql, rows, template = captured[0]
+        assert "SET total_episodes = v.total_episodes, youtube_views = v.youtube_views" in sql
+        assert "FROM (VALUES %s) AS v(id, total_episodes, youtube_views)" in sql
+        assert rows == [(1, 3, 10), (2, 4, 20)]
+        assert template == '(%s::integer, %s::integer, %s::integer)'
+        assert captured[1][1] == [(3, 2, '["https://www.twitch.tv/videos/1"]')]
+        conn.commit.assert_called_once()
+        games._rankings.invalidate.assert_called_once()
+
+    def test_error_returns_none_and_rolls_back(self):
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = MagicMock()
+        games = GamesDatabase(MagicMock(get_connection=lambda: conn))
+
+        with patch.object(games_module, "execute_values", side_effect=RuntimeError("boom")):
+            assert games.bulk_update_game_stats([{'id': 1, 'youtube_views': 10}]) is None
+        assert games.bulk_update_game_stats([]) == 0
+        conn.rollback.assert_called_once()
+
+
+class StubAPIs:
+    """YouTube Data API and Twitch Helix stubs serving a small channel."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.playlists = {'PL1': ['a1', 'a2', 'a3'], 'PL2': ['b1', 'b2'], 'PL3': []}
+        self.views = {'a1': 100, 'a2': 200, 'a3': 300, 'b1': 50, 'b2': 50}
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/youtube/v3/playlistItems', self.playlist_items)
+        app.router.add_get('/youtube/v3/videos', self.videos)
+        app.router.add_post('/oauth2/token', self.token)
+        app.router.add_get('/helix/users', self.users)
+        app.router.add_get('/helix/videos', self.twitch_videos)
+        return app
+
+    async def playlist_items(self, request):
+        self.calls['playlistItems'] += 1
+        return web.json_response({'items': [
+            {'snippet': {'resourceId': {'videoId': video_id}, 'title': video_id, 'position': position,
+                         'publishedAt': '2025-05-01T12:00:00Z'}}
+            for position, video_id in enumerate(self.playlists[request.query['playlistId']])]})
+
+    async def videos(self, request):
+        self.calls['videos'] += 1
+        return web.json_response({'items': [
+            {'id': video_id, 'statistics': {'viewCount': str(self.views[video_id])},
+             'contentDetails': {'duration': 'PT30M'}} for video_id in request.query['id'].split(',')]})
+
+    async def token(self, request):
+        return web.json_response({'access_token': 'stub-token', 'expires_in': 3600})
+
+    async def users(self, request):
+        return web.json_response({'data': [{'id': '42'}]})
+
+    async def twitch_videos(self, request):
+        self.calls['twitch_videos'] += 1
+        return web.json_response({'data': [
+            {'title': 'Dead Space part 2', 'game_name': 'Dead Space', 'game_id': '21779', 'duration': '2h',
+             'view_count': 10, 'url': 'https://www.twitch.tv/videos/2'},
+            {'title': 'Dead Space part 1', 'game_name': 'Dead Space', 'game_id': '21779', 'duration': '1h30m',
+             'view_count': 12, 'url': 'https://www.twitch.tv/videos/1'},
+            {'title': 'Just chatting', 'game_name': 'Just Chatting', 'game_id': '509658', 'duration': '1h',
+             'view_count': 3, 'url': 'https://www.twitch.tv/videos/0'}], 'pagination': {}})
+
+
+@asynccontextmanager
+async def stub_apis(monkeypatch):
+    api = StubAPIs()
+    server = TestServer(api.app())
+    await server.start_server()
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'stub-key')
+    monkeypatch.setenv('TWITCH_CLIENT_ID', 'stub-client')
+    monkeypatch.setenv('TWITCH_CLIENT_SECRET', 'stub-secret')
+    monkeypatch.setattr(http_client, "_http_client", HTTPClientManager())
+    monkeypatch.setattr(http_client, "TWITCH_OAUTH_TOKEN_URL", str(server.make_url('/oauth2/token')))
+    monkeypatch.setattr(youtube, "YOUTUBE_API_URL", str(server.make_url('/youtube/v3')))
+    monkeypatch.setattr(twitch, "TWITCH_HELIX_URL", str(server.make_url('/helix')))
+    try:
+        yield api
+    finally:
+        await server.close()
+
+
+class TestRefreshScripts:
+    """Run both refresh scripts end to end against the stubs."""
+
+    @pytest.mark.asyncio
+    async def test_youtube_refresh(self, monkeypatch, tmp_path):
+        db = FakeStatsDatabase([
+            {'id': 1, 'canonical_name': 'Alpha', 'youtube_views': 500, 'total_episodes': 3,
+             'total_playtime_minutes': 90, 'youtube_playlist_url': 'https://youtube.com/playlist?list=PL1'},
+            {'id': 2, 'canonical_name': 'Beta', 'youtube_views': 0, 'total_episodes': 0,
+             'total_playtime_minutes': 0, 'youtube_playlist_url': 'https://youtube.com/playlist?list=PL2'},
+            {'id': 3, 'canonical_name': 'Empty', 'youtube_views': 0, 'total_episodes': 0,
+             'total_playtime_minutes': 0, 'youtube_playlist_url': 'https://youtube.com/playlist?list=PL3'},
+            {'id': 4, 'canonical_name': 'No playlist', 'youtube_playlist_url': 'https://youtube.com/watch?v=x'},
+        ])
+        checkpoint = str(tmp_path / "youtube.json")
+
+        async with stub_apis(monkeypatch) as api:
+            report = await bulk_update_youtube_stats.bulk_update_youtube_stats(
+                db=db, checkpoint_path=checkpoint, quota_units=None)
+
+            # Only the playlist that failed is fetched again
+            api.calls.clear()
+            await bulk_update_youtube_stats.bulk_update_youtube_stats(db=db, checkpoint_path=checkpoint)
+            assert api.calls['playlistItems'] == 1
+
+        assert db.writes == [[{'id': 1, 'youtube_views': 600},
+                              {'id': 2, 'youtube_views': 100, 'total_episodes': 2, 'total_playtime_minutes': 60}]] or \
+            db.writes == [[{'id': 2, 'youtube_views': 100, 'total_episodes': 2, 'total_playtime_minutes': 60},
+                           {'id': 1, 'youtube_views': 600}]]
+        assert (report['updated'], report['failed'], report['skipped']) == (2, 1, 1)
+        assert report['quota_used'] == 8
+
+    @pytest.mark.asyncio
+    async def test_twitch_dry_run(self, monkeypatch, tmp_path):
+        db = FakeStatsDatabase([
+            {'id': 7, 'canonical_name': 'Dead Space', 'total_episodes': 1, 'total_playtime_minutes': 60,
+             'twitch_vod_urls': ['https://www.twitch.tv/videos/1']}])
+
+        async with stub_apis(monkeypatch):
+            report = await bulk_update_twitch_stats.bulk_update_twitch_stats(
+                dry_run=True, db=db, checkpoint_path=str(tmp_path / "twitch.json"))
+
+        assert db.writes == []
+        assert report['not_found'] == 1 and report['vods'] == 3
+        assert report['diffs'] == [{'id': 7, 'canonical_name': 'Dead Space', 'changes': {
+            'total_episodes': (1, 2),
+            'total_playtime_minutes': (60, 210),
+            'twitch_vod_urls': (['https://www.twitch.tv/videos/1'],
+                                ['https://www.twitch.tv/videos/2', 'https://www.twitch.tv/videos/1'])}}]
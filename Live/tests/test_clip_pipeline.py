@@ -0,0 +1,426 @@
+"""
+Tests for the staged clip-lore pipeline and ffmpeg pre-processing, using a stubbed yt-dlp
+downloader, Gemini client and ffmpeg.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.commands.clips import ClipParsingService  # noqa: E402
+from bot.handlers import ai_handler  # noqa: E402
+from bot.tasks import clip_pipeline  # noqa: E402
+from bot.tasks.clip_pipeline import ClipPipeline  # noqa: E402
+from bot.utils.clip_store import ClipStore  # noqa: E402
+from bot.utils.video_preprocess import ClipPreprocessOptions, build_ffmpeg_command, preprocess_clip  # noqa: E402
+
+LORE = {"game_title": "Dead Space", "reaction": "screamed", "trigger": "necromorph in a vent",
+        "lore_summary": "Jonesy screamed at a vent.", "notable_quote": "", "emotion_category": "Terror",
+        "characters_involved": "Necromorph", "clip_outcome": "Death"}
+
+
+class Concurrency:
+    """Tracks how many calls of each kind are in flight, and their overlap."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.overlapped = 0
+
+    def enter(self, kind):
+        with self.lock:
+            self.active[kind] = self.active.get(kind, 0) + 1
+            if kind == "download" and self.active.get("generate"):
+                self.overlapped += 1
+
+    def leave(self, kind):
+        with self.lock:
+            self.active[kind] -= 1
+
+
+class StubGeminiClient:
+    """files.upload/get/delete and models.generate_content with fixed latencies."""
+
+    def __init__(self, tracker, latency=0.0, fail_generations=0):
+        self.tracker = tracker
+        self.latency = latency
+        self.fail_generations = fail_generations
+        self.uploaded = set()
+        self.deleted = []
+        self.generations = 0
+        self.files = SimpleNamespace(upload=self._upload, get=self._get, delete=self._delete)
+        self.models = SimpleNamespace(generate_content=self._generate)
+
+    def _file(self, name, state):
+        return SimpleNamespace(name=name, state=SimpleNamespace(name=state))
+
+    def _upload(self, file):
+        time.sleep(self.latency)
+        name = f"files/{os.path.basename(file)}"
+        self.uploaded.add(name)
+        return self._file(name, "PROCESSING")
+
+    def _get(self, name):
+        time.sleep(self.latency / 2)
+        return self._file(name, "ACTIVE")
+
+    def _delete(self, name):
+        self.deleted.append(name)
+
+    def _generate(self, model, contents, config):
+        self.tracker.enter("generate")
+        try:
+            time.sleep(self.latency * 2)
+            self.generations += 1
+            if self.fail_generations:
+                self.fail_generations -= 1
+                raise RuntimeError("connection reset by peer")
+            return SimpleNamespace(text=json.dumps(LORE))
+        finally:
+            self.tracker.leave("generate")
+
+
+class StubClipService(ClipParsingService):
+    """ClipParsingService with a fake database and a sleeping stand-in for yt-dlp."""
+
+    def __init__(self, tracker, latency=0.0, tmp_path="."):
+        self.tracker = tracker
+        self.latency = latency
+        self.tmp_path = tmp_path
+        self.saved = []
+        self.prompt_queries = 0
+        self.downloads = 0
+        self.media = {}  # url -> file contents (b"clip" otherwise)
+        self.db = SimpleNamespace(
+            games=SimpleNamespace(get_all_played_games=self._played_games),
+            trivia=SimpleNamespace(add_clip_lore=lambda **row: self.saved.append(row) or True,
+                                   clip_lore_exists=lambda url: False))
+
+    def _played_games(self):
+        self.prompt_queries += 1
+        return [{'canonical_name': 'Dead Space'}]
+
+    def temp_path(self, message):
+        return os.path.join(self.tmp_path, f"clip_{message.id}.mp4")
+
+    def _download_video_sync(self, url, output_path):
+        self.tracker.enter("download")
+        try:
+            time.sleep(self.latency)
+            self.downloads += 1
+            with open(output_path, "wb") as f:
+                f.write(self.media.get(url, b"clip"))
+            return output_path
+        finally:
+            self.tracker.leave("download")
+
+
+def clips(count):
+    return [(SimpleNamespace(id=1000 + i, author=SimpleNamespace(id=42)), f"https://clips.twitch.tv/Clip{i}")
+            for i in range(count)]
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    def install(tracker, **kwargs):
+        client = StubGeminiClient(tracker, **kwargs)
+        monkeypatch.setattr(ai_handler, "gemini_client", client)
+        monkeypatch.setattr(ai_handler, "primary_ai", "gemini")
+        monkeypatch.setattr(ai_handler, "current_gemini_model", "stub-model")
+        monkeypatch.setattr(ai_handler, "MEDIA_POLL_SECONDS", 0.0)
+        monkeypatch.setattr(ai_handler, "ai_usage_stats", dict(ai_handler.ai_usage_stats, daily_requests=0,
+                                                               quota_exhausted=False))
+        monkeypatch.setattr(ai_handler, "check_rate_limits", lambda priority="medium": (True, "OK"))
+        return client
+    return install
+
+
+class TestClipPipeline:
+    """Test clips flow through every stage and clean up after themselves."""
+
+    @pytest.mark.asyncio
+    async def test_processes_batch_and_cleans_up(self, gemini, tmp_path):
+        tracker = Concurrency()
+        client = gemini(tracker, latency=0.01)
+        service = StubClipService(tracker, latency=0.01, tmp_path=str(tmp_path))
+        finished = []
+
+        async def on_result(job):
+            finished.append(job.status)
+
+        pipeline = ClipPipeline(service, analysis_interval=0, retry_delay=0, on_result=on_result)
+        results = await pipeline.run(clips(6))
+
+        assert [job.status for job in results] == finished == ["success"] * 6
+        assert sorted(row['message_id'] for row in service.saved) == list(range(1000, 1006))
+        assert service.saved[0]['game_title'] == "Dead Space"
+        assert sorted(client.deleted) == sorted(client.uploaded) and len(client.deleted) == 6
+        assert list(tmp_path.iterdir()) == []
+        # One played-games query for the whole batch instead of one per clip
+        assert service.prompt_queries == 1
+        assert pipeline.queue_depths() == {"download": 0, "upload": 0, "analysis": 0}
+        assert max(pipeline.stats["max_depth"].values()) <= 2
+
+    @pytest.mark.asyncio
+    async def test_generation_retried_on_transient_error(self, gemini, tmp_path):
+        tracker = Concurrency()
+        client = gemini(tracker, fail_generations=1)
+        pipeline = ClipPipeline(StubClipService(tracker, tmp_path=str(tmp_path)), analysis_interval=0, retry_delay=0)
+
+        results = await pipeline.run(clips(2))
+        assert [job.status for job in results] == ["success", "success"]
+        assert client.generations == 3 and pipeline.stats["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_quota_exhaustion_aborts_remaining_clips(self, gemini, tmp_path):
+        tracker = Concurrency()
+        client = gemini(tracker)
+        limit = {"uploads_left": 3}
+        original_upload = client.files.upload
+
+        def counted_upload(file):
+            limit["uploads_left"] -= 1
+            return original_upload(file)
+
+        client.files.upload = counted_upload
+        pipeline = ClipPipeline(StubClipService(tracker, tmp_path=str(tmp_path)), analysis_interval=0,
+                                retry_delay=0, quota_guard=lambda: limit["uploads_left"] > 0)
+
+        results = await pipeline.run(clips(8))
+        statuses = [job.status for job in results]
+        assert pipeline.aborted
+        assert len(statuses) == 8 and statuses.count("aborted") >= 5
+        assert "failed" not in statuses
+        assert sorted(client.deleted) == sorted(client.uploaded)
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestClipStore:
+    """Test reposts and retries reuse stored media and analyses instead of redoing them."""
+
+    def service(self, tmp_path):
+        service = StubClipService(Concurrency(), tmp_path=str(tmp_path))
+        service.media = {f"https://clips.twitch.tv/Clip{i}": f"clip {i}".encode() for i in range(2)}
+        return service
+
+    @pytest.mark.asyncio
+    async def test_repost_skips_download_and_gemini(self, gemini, tmp_path):
+        client = gemini(Concurrency())
+        service = self.service(tmp_path)
+        store = ClipStore(root=str(tmp_path / "store"))
+        results = await ClipPipeline(service, analysis_interval=0, retry_delay=0, store=store).run(clips(2))
+        assert [job.status for job in results] == ["success", "success"]
+        assert (service.downloads, client.generations, len(service.saved)) == (2, 2, 2)
+
+        # The same clip again: once under another Twitch URL shape, once re-uploaded elsewhere
+        alias = "https://youtube.com/clip/UgkxClip0"
+        service.media[alias] = b"clip 0"
+        reposts = [(SimpleNamespace(id=2000, author=SimpleNamespace(id=7)),
+                    "https://www.twitch.tv/jonesy/clip/Clip0?filter=clips"),
+                   (SimpleNamespace(id=2001, author=SimpleNamespace(id=7)), alias)]
+        pipeline = ClipPipeline(service, analysis_interval=0, retry_delay=0, store=store)
+        results = await pipeline.run(reposts)
+
+        assert [(job.status, job.reused) for job in results] == [("success", "lore")] * 2
+        assert service.downloads == 3  # only the new URL is fetched, to learn its hash
+        assert (client.generations, len(client.uploaded), len(service.saved)) == (2, 2, 2)
+        assert store.url_saved("https://youtube.com/clip/ugkxclip0")
+        assert store.stats["content_duplicates"] == 1
+        assert pipeline.stats["reused"] == {"media": 0, "analysis": 0, "lore": 2}
+
+    @pytest.mark.asyncio
+    async def test_retry_after_failed_save_skips_gemini(self, gemini, tmp_path):
+        client = gemini(Concurrency())
+        service = self.service(tmp_path)
+        outcomes = iter([False, True])
+
+        def add_clip_lore(**row):
+            if not next(outcomes):
+                return False  # e.g. the database was unreachable
+            service.saved.append(row)
+            return True
+
+        service.db.trivia.add_clip_lore = add_clip_lore
+        store = ClipStore(root=str(tmp_path / "store"))
+
+        first = await ClipPipeline(service, analysis_interval=0, retry_delay=0, store=store).run(clips(1))
+        assert first[0].status == "failed" and client.generations == 1
+
+        # A restarted bot reloads the index from disk
+        store = ClipStore(root=str(tmp_path / "store"))
+        retry = await ClipPipeline(service, analysis_interval=0, retry_delay=0, store=store).run(clips(1))
+        assert (retry[0].status, retry[0].reused) == ("success", "analysis")
+        assert (service.downloads, client.generations, len(client.uploaded)) == (1, 1, 1)
+        assert len(service.saved) == 1 and store.url_saved("https://clips.twitch.tv/clip0")
+
+    def test_least_recently_used_media_evicted(self, tmp_path):
+        store = ClipStore(root=str(tmp_path / "store"), max_bytes=250)
+        hashes = []
+        for index, name in enumerate("abc"):
+            path = tmp_path / f"{name}.mp4"
+            path.write_bytes(name.encode() * 100)
+            hashes.append(store.add_media(str(path), f"https://clips.twitch.tv/{name}"))
+            os.utime(store.media_path(hashes[-1]), (index, index))
+            if name == "b":
+                assert store.has_media(hashes[0])  # "a" is used again, so "b" is now the oldest
+
+        assert [store.has_media(h) for h in hashes] == [True, False, True]
+        assert store.size() == 200 and store.stats["evicted_bytes"] == 100
+        # The index outlives the media: "b" keeps its hash and is simply downloaded again
+        assert store.hash_for_url("https://clips.twitch.tv/b") == hashes[1]
+
+    def test_eviction_spares_downloads_and_pinned_media(self, tmp_path):
+        store = ClipStore(root=str(tmp_path / "store"), max_bytes=150)
+        partial = store.download_path("https://clips.twitch.tv/in-progress") + ".part"
+        with open(partial, "wb") as f:
+            f.write(b"x" * 500)
+
+        path = tmp_path / "a.mp4"
+        path.write_bytes(b"a" * 100)
+        pinned = store.add_media(str(path), "https://clips.twitch.tv/a", pin=True)
+        os.utime(store.media_path(pinned), (0, 0))
+        with open(store.media_path(pinned).replace(".mp4", ".small.mp4"), "wb") as f:
+            f.write(b"s" * 10)
+        path = tmp_path / "b.mp4"
+        path.write_bytes(b"b" * 100)
+        newest = store.add_media(str(path), "https://clips.twitch.tv/b")
+
+        # Over budget, but the oldest media is pinned by a job still in the pipeline
+        assert os.path.exists(partial)
+        assert store.has_media(pinned) and store.has_media(newest)
+        assert store.stats["evicted_files"] == 0
+
+        store.unpin(pinned)
+        store.evict()
+        assert not store.has_media(pinned) and store.has_media(newest)
+        assert os.path.exists(partial)
+
+    def test_eviction_ages_out_abandoned_downloads(self, tmp_path):
+        store = ClipStore(root=str(tmp_path / "store"), download_max_age=3600)
+        abandoned = store.download_path("https://clips.twitch.tv/abandoned") + ".part"
+        fresh = store.download_path("https://clips.twitch.tv/fresh") + ".part"
+        active = store.begin_download("https://clips.twitch.tv/active") + ".part"
+        for partial in (abandoned, fresh, active):
+            with open(partial, "wb") as f:
+                f.write(b"x" * 10)
+        os.utime(abandoned, (0, 0))
+        os.utime(active, (0, 0))
+
+        assert store.evict() == 10
+        assert not os.path.exists(abandoned)
+        assert os.path.exists(fresh) and os.path.exists(active)
+        assert store.stats["stale_downloads"] == 1
+
+        # Once its job lets go, a stale download is fair game too
+        store.end_download(active[:-len(".part")])
+        store.evict()
+        assert not os.path.exists(active)
+
+
+@pytest.mark.benchmark
+class TestClipPipelineThroughput:
+    """Backlog throughput: sequential process_clip versus the staged pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_backlog_throughput(self, gemini, tmp_path):
+        count, latency, pause = 8, 0.05, 0.1
+
+        tracker = Concurrency()
+        gemini(tracker, latency=latency)
+        service = StubClipService(tracker, latency=latency, tmp_path=str(tmp_path))
+        started = time.perf_counter()
+        for index, (message, url) in enumerate(clips(count)):
+            assert await service.process_clip(url, message)
+            if index < count - 1:
+                await asyncio.sleep(pause)  # The old fixed pause between clips
+        sequential = time.perf_counter() - started
+
+        tracker = Concurrency()
+        gemini(tracker, latency=latency)
+        pipeline = ClipPipeline(StubClipService(tracker, latency=latency, tmp_path=str(tmp_path)),
+                                analysis_interval=pause, retry_delay=0)
+        started = time.perf_counter()
+        results = await pipeline.run(clips(count))
+        pipelined = time.perf_counter() - started
+
+        print(f"\n{count} clips: sequential {sequential:.2f}s, pipelined {pipelined:.2f}s "
+              f"({sequential / pipelined:.1f}x), downloads overlapping generation: {tracker.overlapped}")
+        assert all(job.success for job in results)
+        assert tracker.overlapped > 0
+        assert pipelined < sequential * 0.75
+
+
+def fake_ffmpeg(shrink_to=None, returncode=0):
+    """subprocess.run stand-in that 'encodes' by writing the output file."""
+    calls = []
+
+    def run(command, capture_output, timeout):
+        calls.append(command)
+        if returncode == 0:
+            with open(command[-1], "wb") as f:
+                f.write(b"x" * shrink_to)
+        return SimpleNamespace(returncode=returncode, stderr=b"" if returncode == 0 else b"Invalid data")
+    run.calls = calls
+    return run
+
+
+class TestVideoPreprocess:
+    """Test the ffmpeg pre-processing step and its fallbacks."""
+
+    def test_commands_for_each_mode(self):
+        transcode = build_ffmpeg_command("in.mp4", "out.mp4", ClipPreprocessOptions(max_duration=45, max_height=360))
+        assert transcode[transcode.index("-t") + 1] == "45"
+        assert transcode[transcode.index("-vf") + 1] == "scale=-2:'min(360,ih)',fps=10"
+        assert transcode[transcode.index("-b:a") + 1] == "32k" and transcode[-1] == "out.mp4"
+
+        keyframes = build_ffmpeg_command("in.mp4", "out.mp4", ClipPreprocessOptions(mode="keyframes", max_height=240))
+        assert keyframes[keyframes.index("-vf") + 1] == "fps=1.0,scale=-2:'min(240,ih)'"
+        assert "stillimage" in keyframes
+
+        with pytest.raises(ValueError):
+            ClipPreprocessOptions(mode="gif")
+
+    def test_shrinks_or_falls_back_to_original(self, tmp_path):
+        clip = tmp_path / "clip_1.mp4"
+        clip.write_bytes(b"v" * 10_000)
+        options = ClipPreprocessOptions()
+
+        result = preprocess_clip(str(clip), options, runner=fake_ffmpeg(shrink_to=2_000))
+        assert result['status'] == 'processed' and result['path'].endswith("clip_1.small.mp4")
+        assert (result['original_bytes'], result['output_bytes']) == (10_000, 2_000)
+        os.remove(result['path'])
+
+        bigger = preprocess_clip(str(clip), options, runner=fake_ffmpeg(shrink_to=20_000))
+        broken = preprocess_clip(str(clip), options, runner=fake_ffmpeg(returncode=1))
+        off = preprocess_clip(str(clip), ClipPreprocessOptions(mode="off"), runner=fake_ffmpeg(shrink_to=1))
+        assert [r['status'] for r in (bigger, broken, off)] == ['kept_original', 'failed', 'skipped']
+        assert all(r['path'] == str(clip) for r in (bigger, broken, off))
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["clip_1.mp4"]
+
+    @pytest.mark.asyncio
+    async def test_pipeline_uploads_preprocessed_clip(self, gemini, tmp_path, monkeypatch):
+        tracker = Concurrency()
+        client = gemini(tracker)
+        runner = fake_ffmpeg(shrink_to=1)
+        monkeypatch.setattr(clip_pipeline, "preprocess_clip",
+                            lambda path, options: preprocess_clip(path, options, runner=runner))
+
+        pipeline = ClipPipeline(StubClipService(tracker, tmp_path=str(tmp_path)), analysis_interval=0,
+                                retry_delay=0, preprocess=ClipPreprocessOptions(mode="keyframes"))
+        results = await pipeline.run(clips(3))
+
+        assert all(job.success for job in results) and len(runner.calls) == 3
+        assert sorted(client.uploaded) == [f"files/clip_{1000 + i}.small.mp4" for i in range(3)]
+        assert all(job.bytes_saved == 3 and job.elapsed is not None for job in results)
+        assert (pipeline.stats["bytes_downloaded"], pipeline.stats["bytes_uploaded"]) == (12, 3)
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,379 @@
+"""
+Tests for incremental YouTube/Twitch content sync (ETags and persisted cursors),
+replaying recorded API responses from a local aiohttp stub server.
+"""
+import asyncio
+import copy
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.integrations import http_client, twitch, youtube  # noqa: E402
+from bot.integrations.http_client import HTTPClientManager  # noqa: E402
+from bot.integrations.sync_cursors import SyncCursors  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'content_sync_api.json')
+CHANNEL_ID = "UCPoUxLHeTnE9SUDAkqfJzDQ"
+SINCE = datetime(2025, 6, 10, tzinfo=timezone.utc)
+
+
+class RecordedAPI:
+    """Replays recorded YouTube Data API / Twitch Helix responses, honouring If-None-Match."""
+
+    def __init__(self):
+        with open(FIXTURES) as f:
+            self.data = json.load(f)
+        self.calls = Counter()
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/youtube/v3/playlists', self.playlists)
+        app.router.add_get('/youtube/v3/playlistItems', self.playlist_items)
+        app.router.add_get('/youtube/v3/videos', self.videos)
+        app.router.add_post('/oauth2/token', self.token)
+        app.router.add_get('/helix/users', self.twitch_users)
+        app.router.add_get('/helix/videos', self.twitch_videos)
+        app.router.add_get('/helix/games', self.twitch_games)
+        return app
+
+    async def playlists(self, request):
+        self.calls['playlists'] += 1
+        body = self.data['playlists']
+        if request.headers.get('If-None-Match') == body['etag']:
+            self.calls['playlists_304'] += 1
+            return web.Response(status=304)
+        return web.json_response(body, headers={'ETag': body['etag']})
+
+    async def playlist_items(self, request):
+        playlist_id = request.query['playlistId']
+        self.calls[f"items:{playlist_id}"] += 1
+        return web.json_response(self.data['playlistItems'][playlist_id])
+
+    async def videos(self, request):
+        self.calls['videos'] += 1
+        ids = request.query['id'].split(',')
+        return web.json_response({'items': [v for v in self.data['videos'] if v['id'] in ids]})
+
+    async def token(self, request):
+        return web.json_response({'access_token': 'stub-token', 'expires_in': 3600})
+
+    async def twitch_users(self, request):
+        self.calls['twitch_users'] += 1
+        return web.json_response(self.data['twitch']['users'])
+
+    async def twitch_videos(self, request):
+        self.calls['twitch_videos'] += 1
+        return web.json_response(self.data['twitch']['videos'])
+
+    async def twitch_games(self, request):
+        self.calls['twitch_games'] += 1
+        games = [g for g in self.data['twitch']['games']['data'] if g['id'] == request.query['id']]
+        return web.json_response({'data': games})
+
+    def add_episode(self):
+        """Publish Silent Hill 2 part 4: the playlist and the listing both get new ETags."""
+        self.data['playlistItems']['PLsilenthill2']['items'].append(copy.deepcopy(self.data['new_episode']))
+        playlist = self.data['playlists']['items'][0]
+        playlist['etag'] = 'pl-sh2-v2'
+        playlist['contentDetails']['itemCount'] = 4
+        self.data['playlists']['etag'] = 'playlists-v2'
+
+    def edit_description(self):
+        """Edit the Alien: Isolation description: new ETags, same title and episodes."""
+        self.data['playlists']['items'][1]['etag'] = 'pl-alien-v2'
+        self.data['playlists']['etag'] = 'playlists-v3'
+
+
+class FakeCursorBackend:
+    """In-memory stand-in for the content_sync_cursors table."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def get_sync_cursors(self, source):
+        return {key: json.loads(json.dumps(row)) for (src, key, session), row in self.rows.items()
+                if src == source and session == ''}
+
+    def save_sync_cursors(self, source, cursors, session_id=''):
+        for key, cursor in cursors.items():
+            self.rows[(source, key, session_id)] = json.loads(json.dumps(cursor, default=str))
+        return len(cursors)
+
+    def commit_sync_cursors(self, session_id):
+        held = [(src, key) for (src, key, session) in self.rows if session == session_id]
+        for src, key in held:
+            self.rows[(src, key, '')] = self.rows.pop((src, key, session_id))
+        return len(held)
+
+
+@asynccontextmanager
+async def recorded_api(monkeypatch):
+    api = RecordedAPI()
+    server = TestServer(api.app())
+    await server.start_server()
+
+    async def no_igdb(game_name):
+        return {'canonical_name': game_name, 'confidence': 0.0, 'match_found': False}
+
+    async def no_igdb_many(game_names):
+        return {game_name: await no_igdb(game_name) for game_name in game_names}
+
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'stub-key')
+    monkeypatch.setenv('TWITCH_CLIENT_ID', 'stub-client')
+    monkeypatch.setenv('TWITCH_CLIENT_SECRET', 'stub-secret')
+    monkeypatch.setattr(http_client, "_http_client", HTTPClientManager())
+    monkeypatch.setattr(http_client, "TWITCH_OAUTH_TOKEN_URL", str(server.make_url('/oauth2/token')))
+    monkeypatch.setattr(youtube, "YOUTUBE_API_URL", str(server.make_url('/youtube/v3')))
+    monkeypatch.setattr(twitch, "TWITCH_HELIX_URL", str(server.make_url('/helix')))
+    monkeypatch.setattr(youtube.igdb, "validate_and_enrich", no_igdb)
+    monkeypatch.setattr(youtube.igdb, "validate_and_enrich_many", no_igdb_many)
+    try:
+        yield api
+    finally:
+        await http_client.close_http_client()
+        await server.close()
+
+
+async def sync_playlists(backend, session_id='', hold=(), discard=()):
+    cursors = SyncCursors(backend)
+    games = await youtube.fetch_playlist_based_content_since(CHANNEL_ID, SINCE, cursors=cursors)
+    for playlist_id in hold:
+        cursors.hold('youtube_playlist', playlist_id)
+    for playlist_id in discard:
+        cursors.discard('youtube_playlist', playlist_id)
+    await cursors.flush(session_id)
+    return games, cursors
+
+
+class TestIncrementalYouTubeSync:
+    """Test that unchanged playlists are skipped and changed ones are re-fetched."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_channel_costs_one_conditional_request(self, monkeypatch):
+        backend = FakeCursorBackend()
+        async with recorded_api(monkeypatch) as api:
+            first, _ = await sync_playlists(backend)
+            first_calls = dict(api.calls)
+            second, cursors = await sync_playlists(backend)
+
+        assert sorted(g['canonical_name'] for g in first) == ['Alien: Isolation', 'Silent Hill 2']
+        assert first_calls['items:PLsilenthill2'] == 1 and first_calls['items:PLaliensiso'] == 1
+
+        assert second == []
+        assert api.calls['playlists_304'] == 1
+        assert api.calls['items:PLsilenthill2'] == 1 and api.calls['videos'] == first_calls['videos']
+        assert cursors.stats == {"not_modified": 1, "unchanged": 2, "changed": 0}
+
+    @pytest.mark.asyncio
+    async def test_only_changed_playlist_is_refetched(self, monkeypatch):
+        backend = FakeCursorBackend()
+        async with recorded_api(monkeypatch) as api:
+            await sync_playlists(backend)
+            api.add_episode()
+            games, cursors = await sync_playlists(backend)
+
+        assert [g['canonical_name'] for g in games] == ['Silent Hill 2']
+        assert games[0]['total_episodes'] == 4
+        assert api.calls['items:PLsilenthill2'] == 2 and api.calls['items:PLaliensiso'] == 1
+        assert cursors.stats["changed"] == 1
+
+        cursor = backend.get_sync_cursors('youtube_playlist')['PLsilenthill2']
+        assert cursor['etag'] == 'pl-sh2-v2'
+        assert cursor['last_item_id'] == 'sh2d' and cursor['item_count'] == 4
+
+    @pytest.mark.asyncio
+    async def test_held_cursor_waits_for_approval(self, monkeypatch):
+        backend = FakeCursorBackend()
+        async with recorded_api(monkeypatch) as api:
+            await sync_playlists(backend)
+            api.add_episode()
+
+            # Staged but not yet approved: the next sync offers the playlist again
+            await sync_playlists(backend, session_id='session-1', hold=['PLsilenthill2'])
+            pending, _ = await sync_playlists(backend)
+            assert [g['canonical_name'] for g in pending] == ['Silent Hill 2']
+
+            await sync_playlists(backend, session_id='session-2', hold=['PLsilenthill2'])
+            backend.commit_sync_cursors('session-2')
+            approved, _ = await sync_playlists(backend)
+
+        assert approved == []
+
+    @pytest.mark.asyncio
+    async def test_discarded_cursor_is_retried(self, monkeypatch):
+        backend = FakeCursorBackend()
+        async with recorded_api(monkeypatch) as api:
+            await sync_playlists(backend)
+            api.add_episode()
+
+            # Processing or staging failed: the playlist must come back next sync
+            await sync_playlists(backend, session_id='session-1', hold=['PLsilenthill2'], discard=['PLsilenthill2'])
+            retried, _ = await sync_playlists(backend)
+
+        assert [g['canonical_name'] for g in retried] == ['Silent Hill 2']
+        assert all(session == '' for _, _, session in backend.rows)
+
+    @pytest.mark.asyncio
+    async def test_etag_only_change_skipped_by_stored_counts(self, monkeypatch):
+        backend = FakeCursorBackend()
+        async with recorded_api(monkeypatch) as api:
+            await sync_playlists(backend)
+            api.edit_description()
+            games, cursors = await sync_playlists(backend)
+
+        assert games == []
+        assert api.calls['items:PLaliensiso'] == 1
+        assert cursors.stats == {"not_modified": 0, "unchanged": 2, "changed": 0}
+
+        cursor = backend.get_sync_cursors('youtube_playlist')['PLaliensiso']
+        assert cursor['etag'] == 'pl-alien-v2' and cursor['item_count'] == 4
+
+    @pytest.mark.asyncio
+    async def test_video_statistics_packed_across_playlists(self, monkeypatch):
+        async with recorded_api(monkeypatch) as api:
+            games = await youtube.fetch_playlist_based_content_since(CHANNEL_ID, SINCE)
+
+        # Silent Hill 2 and Alien: Isolation share one videos.list request
+        assert [g['canonical_name'] for g in games] == ['Silent Hill 2', 'Alien: Isolation']
+        assert api.calls['videos'] == 1
+
+    @pytest.mark.asyncio
+    async def test_without_cursors_processes_everything(self, monkeypatch):
+        async with recorded_api(monkeypatch) as api:
+            first = await youtube.fetch_playlist_based_content_since(CHANNEL_ID, SINCE)
+            second = await youtube.fetch_playlist_based_content_since(CHANNEL_ID, SINCE)
+
+        assert first == second and len(first) == 2
+        assert api.calls['playlists_304'] == 0
+
+
+class FakeYouTubeChannel:
+    """Generated channel of many game playlists, answering every request after a fixed latency."""
+
+    def __init__(self, playlists=200, episodes=12, latency=0.01):
+        self.latency = latency
+        self.calls = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.playlists = {f"PL{i:04d}": [f"v{i:04d}e{e:02d}" for e in range(episodes)] for i in range(playlists)}
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/youtube/v3/playlists', self.listing)
+        app.router.add_get('/youtube/v3/playlistItems', self.playlist_items)
+        app.router.add_get('/youtube/v3/videos', self.videos)
+        return app
+
+    async def respond(self, kind, body):
+        self.calls[kind] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return web.json_response(body)
+
+    async def listing(self, request):
+        ids = list(self.playlists)
+        start = int(request.query.get('pageToken', 0))
+        body = {'etag': 'listing', 'items': [
+            {'id': playlist_id, 'etag': f"etag-{playlist_id}", 'snippet': {'title': f"Game {playlist_id}"},
+             'contentDetails': {'itemCount': len(self.playlists[playlist_id])}}
+            for playlist_id in ids[start:start + 50]]}
+        if start + 50 < len(ids):
+            body['nextPageToken'] = str(start + 50)
+        return await self.respond('playlists', body)
+
+    async def playlist_items(self, request):
+        video_ids = self.playlists[request.query['playlistId']]
+        return await self.respond('playlistItems', {'items': [
+            {'snippet': {'resourceId': {'videoId': video_id}, 'title': video_id, 'position': position,
+                         'publishedAt': f"2025-05-{1 + position:02d}T12:00:00Z"}}
+            for position, video_id in enumerate(video_ids)]})
+
+    async def videos(self, request):
+        return await self.respond('videos', {'items': [
+            {'id': video_id, 'statistics': {'viewCount': '100'}, 'contentDetails': {'duration': 'PT45M'}}
+            for video_id in request.query['id'].split(',')]})
+
+
+@pytest.mark.benchmark
+class TestPlaylistSyncBenchmark:
+    """Serial playlist processing (one worker) versus the worker pool, against 200 playlists."""
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_speedup(self, monkeypatch):
+        channel = FakeYouTubeChannel()
+        server = TestServer(channel.app())
+        await server.start_server()
+
+        async def no_igdb_many(game_names):
+            return {game_name: {'canonical_name': game_name, 'confidence': 0.0} for game_name in game_names}
+
+        monkeypatch.setenv('YOUTUBE_API_KEY', 'stub-key')
+        monkeypatch.setattr(http_client, "_http_client", HTTPClientManager())
+        monkeypatch.setattr(youtube, "YOUTUBE_API_URL", str(server.make_url('/youtube/v3')))
+        monkeypatch.setattr(youtube.igdb, "validate_and_enrich_many", no_igdb_many)
+
+        timings = {}
+        try:
+            for workers in (1, youtube.PLAYLIST_CONCURRENCY):
+                monkeypatch.setattr(youtube, "PLAYLIST_CONCURRENCY", workers)
+                channel.calls.clear()
+                started = time.perf_counter()
+                games = await youtube.fetch_playlist_based_content_since(CHANNEL_ID, SINCE)
+                timings[workers] = time.perf_counter() - started
+                assert len(games) == 200 and games[0]['total_episodes'] == 12
+        finally:
+            await http_client.close_http_client()
+            await server.close()
+
+        serial, pooled = timings[1], timings[youtube.PLAYLIST_CONCURRENCY]
+        # 2400 videos in full batches; per-playlist calls would have needed 200
+        assert channel.calls['videos'] == 48
+        assert channel.peak_in_flight <= youtube.PLAYLIST_CONCURRENCY
+        print(f"\n200 playlists: {serial:.2f}s with one worker, {pooled:.2f}s with "
+              f"{youtube.PLAYLIST_CONCURRENCY} workers ({serial / pooled:.1f}x), "
+              f"{channel.calls['videos']} videos.list requests")
+        assert pooled < serial
+
+
+class TestIncrementalTwitchSync:
+    """Test that the channel cursor saves the user and game lookups."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_reuses_user_and_game_lookups(self, monkeypatch):
+        backend = FakeCursorBackend()
+        async with recorded_api(monkeypatch) as api:
+            monkeypatch.setattr(twitch.igdb, "validate_and_enrich", youtube.igdb.validate_and_enrich)
+            cursors = SyncCursors(backend)
+            first = await twitch.fetch_new_vods_since("jonesyspacecat", SINCE, cursors=cursors)
+            await cursors.flush()
+            first_calls = dict(api.calls)
+
+            second = await twitch.fetch_new_vods_since("jonesyspacecat", SINCE, cursors=SyncCursors(backend))
+
+        assert [v['url'] for v in first] == [v['url'] for v in second] == [
+            "https://www.twitch.tv/videos/2001", "https://www.twitch.tv/videos/2000"]
+        assert first[0]['canonical_name'] == 'Dead Space'
+        assert first_calls['twitch_users'] == 1 and first_calls['twitch_games'] == 1
+        assert api.calls['twitch_users'] == 1 and api.calls['twitch_games'] == 1
+        assert api.calls['twitch_videos'] == 2
+
+        cursor = backend.get_sync_cursors('twitch_channel')['jonesyspacecat']
+        assert cursor['last_item_id'] == '2001'
+        assert cursor['payload']['game_names'] == {'21779': 'Dead Space'}
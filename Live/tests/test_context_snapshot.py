@@ -0,0 +1,153 @@
+"""
+Tests for the precomputed AI operational-context snapshot.
+"""
+import os
+import sys
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.database.trivia_registry import TriviaSessionRegistry  # noqa: E402
+from bot.handlers import context_snapshot  # noqa: E402
+from bot.handlers.context_snapshot import ContextSnapshot, build_examples_text  # noqa: E402
+
+GAMES = [
+    {'canonical_name': 'Dead Space', 'first_played_date': date(2019, 3, 1), 'release_year': 2008,
+     'twitch_views': 5000, 'total_views': 12000, 'views_per_hour': 800.0},
+    {'canonical_name': 'Portal', 'first_played_date': date(2020, 5, 1), 'release_year': 2007,
+     'twitch_views': 3000, 'total_views': 9000, 'views_per_hour': 1200.0},
+    {'canonical_name': 'Celeste', 'first_played_date': date(2021, 1, 9), 'release_year': 2018,
+     'twitch_views': 1000, 'total_views': 4000, 'views_per_hour': 400.0},
+    {'canonical_name': 'Sekiro', 'first_played_date': date(2023, 8, 20), 'release_year': 2019,
+     'twitch_views': 9000, 'total_views': 20000, 'views_per_hour': 1500.0},
+]
+
+
+class FakeContextDatabase:
+    """DatabaseManager stand-in counting the queries behind the AI context sections."""
+
+    def __init__(self, query_delay=0.0):
+        self.query_delay = query_delay
+        self.queries = 0
+        self.latest_trivia = {'question_text': 'Which game came first?', 'correct_answer': 'Portal',
+                              'category': 'history', 'dynamic_query_type': None}
+        self.trivia = SimpleNamespace(get_latest_trivia_session=self._query(lambda: self.latest_trivia),
+                                      session_registry=TriviaSessionRegistry())
+
+    def _query(self, result):
+        def run(*args, **kwargs):
+            self.queries += 1
+            time.sleep(self.query_delay)
+            return result()
+        return run
+
+    def get_gaming_timeline(self, order='ASC', limit=None):
+        games = sorted(GAMES, key=lambda g: g['first_played_date'], reverse=order == 'DESC')
+        return self._query(lambda: games[:limit] if limit else games)()
+
+    def get_platform_comparison_stats(self):
+        return self._query(lambda: {'youtube': {'game_count': 4, 'total_views': 45000},
+                                    'twitch': {'game_count': 4, 'total_views': 18000},
+                                    'cross_platform_count': 4})()
+
+    def get_games_by_twitch_views(self, limit=10):
+        return self._query(lambda: sorted(GAMES, key=lambda g: -g['twitch_views'])[:limit])()
+
+    def get_games_by_total_views(self, limit=10):
+        return self._query(lambda: sorted(GAMES, key=lambda g: -g['total_views'])[:limit])()
+
+    def get_engagement_metrics(self, limit=10):
+        return self._query(lambda: sorted(GAMES, key=lambda g: -g['views_per_hour'])[:limit])()
+
+
+class TestContextSnapshot:
+    """Test the snapshot serves prompt text from memory and refreshes on change."""
+
+    def test_fragment_contains_every_section(self):
+        text = ContextSnapshot().fragment(FakeContextDatabase())
+        assert 'The correct answer was: Portal' in text
+        assert 'First games played chronologically:\n  • Dead Space' in text
+        assert 'Most recently played games:\n  • Sekiro' in text
+        assert 'Twitch Leaders: Sekiro (9,000 views), Dead Space (5,000 views), Portal (3,000 views)' in text
+        assert 'Engagement Efficiency: Sekiro (1,500 views/hr)' in text
+
+    def test_repeat_calls_issue_no_queries(self):
+        db = FakeContextDatabase()
+        snapshot = ContextSnapshot()
+        first = snapshot.fragment(db)
+        queries = db.queries
+        for _ in range(50):
+            assert snapshot.fragment(db) == first
+        assert db.queries == queries == 7
+
+    def test_trivia_section_follows_registry_version(self):
+        db = FakeContextDatabase()
+        snapshot = ContextSnapshot()
+        snapshot.fragment(db)
+
+        db.latest_trivia = dict(db.latest_trivia, correct_answer='Celeste')
+        db.trivia.session_registry.activate({'id': 1})
+        queries = db.queries
+        assert 'The correct answer was: Celeste' in snapshot.fragment(db)
+        assert db.queries == queries + 1
+
+    def test_invalidate_and_expiry(self):
+        db = FakeContextDatabase()
+        snapshot = ContextSnapshot(ttl_seconds=0.05)
+        snapshot.fragment(db)
+
+        GAMES[0]['twitch_views'] = 50000
+        try:
+            snapshot.invalidate('engagement')
+            assert 'Twitch Leaders: Dead Space (50,000 views)' in snapshot.fragment(db)
+
+            # After the TTL the stale text is served while a background thread rebuilds
+            GAMES[0]['twitch_views'] = 60000
+            time.sleep(0.06)
+            assert '50,000 views' in snapshot.fragment(db)
+            deadline = time.monotonic() + 2
+            while '60,000 views' not in snapshot.fragment(db) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert '60,000 views' in snapshot.fragment(db)
+            assert snapshot.stats["background_refreshes"] >= 1
+        finally:
+            GAMES[0]['twitch_views'] = 5000
+
+    def test_examples_text_rendered_once(self, monkeypatch):
+        monkeypatch.setattr(context_snapshot, "_examples_text", None)
+        text = context_snapshot.get_examples_text()
+        assert text.startswith("\n\n--- BEHAVIORAL EXAMPLES ---") and text.endswith("--- END EXAMPLES ---\n")
+        assert context_snapshot.get_examples_text() is text
+        assert build_examples_text([{'user': 'hi', 'assistant': 'Hello.', 'context': 'greeting'}]).count(
+            "Example 1 [greeting]:\nUser: hi\nAsh: Hello.") == 1
+
+
+@pytest.mark.benchmark
+class TestContextSnapshotLatency:
+    """Per-request context assembly before and after the snapshot (5ms per query)."""
+
+    def test_prompt_assembly_latency(self):
+        db = FakeContextDatabase(query_delay=0.005)
+        requests = 20
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            ContextSnapshot().fragment(db)  # a fresh snapshot pays for every query, like the old path
+        before_ms = (time.perf_counter() - started) * 1000 / requests
+
+        snapshot = ContextSnapshot()
+        snapshot.fragment(db)
+        started = time.perf_counter()
+        for _ in range(requests):
+            snapshot.fragment(db) + context_snapshot.get_examples_text()
+        after_ms = (time.perf_counter() - started) * 1000 / requests
+
+        print(f"\nContext assembly per request: {before_ms:.2f}ms before, {after_ms:.3f}ms with snapshot")
+        assert after_ms * 20 < before_ms
@@ -603,14 +603,15 @@ class TestStatisticsAndQueries:
         """Test getting series ranked by playtime."""
         db, mock_cursor = db_with_mock_connection
 
+        # Series totals are aggregated from the played_games rows in memory
+        mock_cursor.fetchone.return_value = {'version': 4}
         mock_cursor.fetchall.return_value = [
-            {
-                'series_name': 'Series A',
-                'game_count': 3,
-                'total_playtime_minutes': 1800,
-                'total_episodes': 50,
-                'avg_playtime_per_game': 600.0
-            }
+            {'id': 1, 'canonical_name': 'Game A1', 'series_name': 'Series A',
+             'total_playtime_minutes': 1200, 'total_episodes': 30},
+            {'id': 2, 'canonical_name': 'Game A2', 'series_name': 'Series A',
+             'total_playtime_minutes': 600, 'total_episodes': 20},
+            {'id': 3, 'canonical_name': 'Unplayed', 'series_name': 'Series B',
+             'total_playtime_minutes': 0, 'total_episodes': 0}
         ]
 
         result = db.games.get_series_by_total_playtime()
@@ -618,6 +619,8 @@ class TestStatisticsAndQueries:
         assert len(result) == 1
         assert result[0]['series_name'] == 'Series A'
         assert result[0]['total_playtime_minutes'] == 1800
+        assert result[0]['game_count'] == 2
+        assert result[0]['avg_playtime_per_game'] == 900.0
 
     def test_get_games_by_genre_flexible(self, db_with_mock_connection):
         """Test flexible genre searching."""
@@ -646,5 +649,103 @@ class TestStatisticsAndQueries:
             assert 'LIKE' in sql_call
 
 
+class TestAsyncDatabase:
+    """Test the non-blocking AsyncDatabase facade."""
+
+    class SlowDatabase:
+        """Stand-in for DatabaseManager whose queries block like a slow table scan."""
+        POOL_MAX_CONNECTIONS = 8
+
+        def __init__(self, delay=0.05):
+            self.delay = delay
+
+        def get_played_game(self, name):
+            import time
+            time.sleep(self.delay)
+            return {'canonical_name': name}
+
+    @staticmethod
+    async def _measure_lag(workload):
+        """Run workload alongside a 5ms heartbeat and return the worst heartbeat delay."""
+        import time
+        worst = 0.0
+        done = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal worst
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                worst = max(worst, time.perf_counter() - started - 0.005)
+
+        beat = asyncio.create_task(heartbeat())
+        await asyncio.sleep(0)
+        await workload()
+        done.set()
+        await beat
+        return worst
+
+    @pytest.mark.asyncio
+    async def test_delegates_hot_paths(self):
+        """Async methods should return the sync method's result."""
+        from bot.database.async_db import AsyncDatabase
+
+        mock_db = MagicMock()
+        mock_db.get_played_game.return_value = {'id': 1}
+        mock_db.submit_trivia_answer.return_value = {'success': True, 'answer_id': 7}
+        aio = AsyncDatabase(mock_db, max_workers=2)
+
+        assert await aio.get_played_game('Test Game') == {'id': 1}
+        result = await aio.submit_trivia_answer(1, 2, 'answer', 'answer')
+        assert result['answer_id'] == 7
+        mock_db.submit_trivia_answer.assert_called_once_with(1, 2, 'answer', 'answer')
+        assert aio.get_stats()['calls'] == 2
+        aio.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_queries_run_off_the_event_loop_thread(self):
+        """Lookups through the facade should execute on worker threads."""
+        import threading
+
+        from bot.database.async_db import AsyncDatabase
+
+        threads = []
+        mock_db = MagicMock()
+        mock_db.get_played_game.side_effect = lambda name: threads.append(threading.get_ident()) or {'id': 1}
+        aio = AsyncDatabase(mock_db, max_workers=2)
+
+        await asyncio.gather(*(aio.get_played_game(f"Game {i}") for i in range(8)))
+        aio.shutdown()
+
+        assert len(threads) == 8
+        assert threading.get_ident() not in threads
+
+    @pytest.mark.benchmark
+    @pytest.mark.asyncio
+    async def test_reduces_event_loop_lag_under_concurrent_queries(self):
+        """Concurrent lookups through the facade should not stall the event loop."""
+        from bot.database.async_db import AsyncDatabase
+
+        slow_db = self.SlowDatabase()
+        aio = AsyncDatabase(slow_db)
+        names = [f"Game {i}" for i in range(8)]
+
+        async def blocking_workload():
+            for name in names:
+                slow_db.get_played_game(name)
+
+        async def async_workload():
+            results = await asyncio.gather(*(aio.get_played_game(name) for name in names))
+            assert [r['canonical_name'] for r in results] == names
+
+        blocking_lag = await self._measure_lag(blocking_workload)
+        async_lag = await self._measure_lag(async_workload)
+        aio.shutdown()
+
+        # The sync path blocks for every query back-to-back; the facade only yields.
+        assert blocking_lag > 0.3
+        assert async_lag < blocking_lag / 4
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
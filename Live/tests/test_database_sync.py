@@ -0,0 +1,183 @@
+"""
+Tests for the COPY-based live → staging database sync (scripts/database_sync.py).
+
+The end-to-end tests need two local Postgres databases and are skipped unless
+SYNC_TEST_LIVE_DATABASE_URL and SYNC_TEST_STAGING_DATABASE_URL are set, e.g.:
+
+    createdb sync_live && createdb sync_staging
+    SYNC_TEST_LIVE_DATABASE_URL=postgresql:///sync_live \\
+    SYNC_TEST_STAGING_DATABASE_URL=postgresql:///sync_staging pytest tests/test_database_sync.py
+"""
+import io
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from scripts import database_sync  # noqa: E402
+from scripts.database_sync import DatabaseSyncManager  # noqa: E402
+
+LIVE_URL = os.getenv("SYNC_TEST_LIVE_DATABASE_URL")
+STAGING_URL = os.getenv("SYNC_TEST_STAGING_DATABASE_URL")
+
+SCHEMA = """
+    DROP TABLE IF EXISTS sync_test_answers;
+    DROP TABLE IF EXISTS sync_test_games;
+    CREATE TABLE sync_test_games (
+        id SERIAL PRIMARY KEY,
+        canonical_name TEXT NOT NULL,
+        alternative_names TEXT,
+        total_episodes INTEGER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE sync_test_answers (
+        id SERIAL PRIMARY KEY,
+        game_id INTEGER REFERENCES sync_test_games(id),
+        answer TEXT
+    );
+"""
+
+
+def make_manager(monkeypatch, live_url="postgresql://live", staging_url="postgresql://staging"):
+    monkeypatch.setenv("LIVE_DATABASE_URL", live_url)
+    monkeypatch.setenv("DATABASE_URL", staging_url)
+    return DatabaseSyncManager()
+
+
+class TestCopyTablesTransaction:
+    """Test that staging changes commit together or not at all."""
+
+    def plans(self):
+        return [{"table": "played_games", "columns": ["id"], "mode": "full", "since": None, "key": []},
+                {"table": "trivia_answers", "columns": ["id"], "mode": "full", "since": None, "key": []}]
+
+    def setup_manager(self, monkeypatch, export):
+        manager = make_manager(monkeypatch)
+        manager.live_conn = MagicMock()
+        manager.live_conn.cursor.return_value.__enter__.return_value.fetchone.return_value = ("snap-1",)
+        manager.staging_conn = MagicMock()
+        manager.get_table_row_count = lambda conn, table: 3
+        manager.export_table = export
+        manager.reset_sequences = MagicMock()
+        loaded = []
+        manager.load_table = lambda cur, plan, spool: loaded.append((plan["table"], spool.read())) or (0, 2)
+        return manager, loaded
+
+    def test_tables_load_in_order_and_commit_once(self, monkeypatch):
+        exported = []
+
+        def export(plan, snapshot_id):
+            exported.append(snapshot_id)
+            return io.BytesIO(plan["table"].encode())
+
+        manager, loaded = self.setup_manager(monkeypatch, export)
+        results = manager._copy_tables(self.plans(), workers=2)
+
+        assert loaded == [("played_games", b"played_games"), ("trivia_answers", b"trivia_answers")]
+        assert exported == ["snap-1", "snap-1"]
+        assert results == {"played_games_cleared": 3, "trivia_answers_cleared": 3,
+                           "played_games_imported": 2, "trivia_answers_imported": 2}
+        manager.staging_conn.commit.assert_called_once()
+        manager.staging_conn.rollback.assert_not_called()
+
+    def test_failed_export_rolls_back_staging(self, monkeypatch):
+        def export(plan, snapshot_id):
+            if plan["table"] == "trivia_answers":
+                raise RuntimeError("connection lost")
+            return io.BytesIO(b"rows")
+
+        manager, loaded = self.setup_manager(monkeypatch, export)
+        assert manager._copy_tables(self.plans(), workers=2) == {}
+        manager.staging_conn.commit.assert_not_called()
+        manager.staging_conn.rollback.assert_called_once()
+
+
+@pytest.mark.skipif(not (LIVE_URL and STAGING_URL), reason="needs two local Postgres databases")
+class TestStreamingSyncPostgres:
+    """Full and incremental sync between two real databases."""
+
+    @pytest.fixture
+    def databases(self):
+        import psycopg2
+
+        live = psycopg2.connect(LIVE_URL)
+        staging = psycopg2.connect(STAGING_URL)
+        for conn in (live, staging):
+            with conn.cursor() as cur:
+                cur.execute(SCHEMA)
+            conn.commit()
+
+        with live.cursor() as cur:
+            cur.execute("""
+                INSERT INTO sync_test_games (canonical_name, alternative_names, total_episodes, updated_at)
+                SELECT 'Game ' || n, E'tab\\tand\\nnewline, "quotes"', n % 50, TIMESTAMP '2025-01-01' + n * INTERVAL '1 minute'
+                FROM generate_series(1, 5000) AS n
+            """)
+            cur.execute("INSERT INTO sync_test_answers (game_id, answer) SELECT n, 'answer ' || n FROM generate_series(1, 5000) n")
+        live.commit()
+        with staging.cursor() as cur:
+            cur.execute("INSERT INTO sync_test_games (canonical_name) VALUES ('stale staging row')")
+        staging.commit()
+
+        yield live, staging
+
+        for conn in (live, staging):
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute("DROP TABLE IF EXISTS sync_test_answers; DROP TABLE IF EXISTS sync_test_games")
+            conn.commit()
+            conn.close()
+
+    @staticmethod
+    def rows(conn, table):
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT * FROM {table} ORDER BY id")
+            result = cur.fetchall()
+        conn.rollback()
+        return result
+
+    def test_full_then_incremental_sync(self, databases, monkeypatch):
+        live, staging = databases
+        tables = ["sync_test_games", "sync_test_answers"]
+
+        results = make_manager(monkeypatch, LIVE_URL, STAGING_URL).sync_tables(tables, force=True, workers=2)
+        assert results["sync_test_games_cleared"] == 1 and results["sync_test_games_imported"] == 5000
+        for table in tables:
+            assert self.rows(staging, table) == self.rows(live, table)
+
+        # New staging rows continue after the copied ids
+        with staging.cursor() as cur:
+            cur.execute("INSERT INTO sync_test_games (canonical_name) VALUES ('new') RETURNING id")
+            assert cur.fetchone()[0] == 5001
+        staging.rollback()
+
+        with live.cursor() as cur:
+            cur.execute("UPDATE sync_test_games SET total_episodes = 99, updated_at = TIMESTAMP '2026-01-01' "
+                        "WHERE id IN (10, 20)")
+            cur.execute("INSERT INTO sync_test_games (canonical_name, updated_at) VALUES ('Brand new', '2026-01-02')")
+        live.commit()
+
+        results = make_manager(monkeypatch, LIVE_URL, STAGING_URL).sync_tables(
+            ["sync_test_games"], force=True, incremental=True)
+        assert results == {"sync_test_games_cleared": 2, "sync_test_games_imported": 3}
+        assert self.rows(staging, "sync_test_games") == self.rows(live, "sync_test_games")
+
+    def test_dry_run_changes_nothing(self, databases, monkeypatch):
+        live, staging = databases
+        results = make_manager(monkeypatch, LIVE_URL, STAGING_URL).sync_tables(["sync_test_games"], dry_run=True)
+        assert results == {"sync_test_games_cleared": 1, "sync_test_games_imported": 5000}
+        assert len(self.rows(staging, "sync_test_games")) == 1
+
+    def test_spilled_export_streams_from_disk(self, databases, monkeypatch):
+        live, staging = databases
+        monkeypatch.setattr(database_sync, "SPOOL_MAX_MEMORY", 1024)
+        results = make_manager(monkeypatch, LIVE_URL, STAGING_URL).sync_tables(
+            ["sync_test_games", "sync_test_answers"], force=True, workers=1)
+        assert results["sync_test_answers_imported"] == 5000
+        assert self.rows(staging, "sync_test_games") == self.rows(live, "sync_test_games")
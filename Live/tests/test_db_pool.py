@@ -0,0 +1,231 @@
+"""
+Tests for scoped database connections, pool waits/fallbacks and pool telemetry.
+"""
+import gc
+import logging
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+from psycopg2 import pool
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.database import core  # noqa: E402
+from bot.database.core import DatabaseManager, scoped_connections  # noqa: E402
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    """ThreadedConnectionPool stand-in that raises PoolError when every connection is out."""
+
+    def __init__(self, maxconn):
+        self.maxconn = maxconn
+        self.used = set()
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        with self.lock:
+            if len(self.used) >= self.maxconn:
+                raise pool.PoolError("connection pool exhausted")
+            conn = FakeConnection()
+            self.used.add(conn)
+            return conn
+
+    def putconn(self, conn):
+        with self.lock:
+            self.used.remove(conn)
+
+
+def make_manager(maxconn=2):
+    with patch.dict(os.environ, {}, clear=True):
+        manager = DatabaseManager()
+    manager.database_url = "postgresql://test"
+    manager._connection_pool = FakePool(maxconn)
+    return manager
+
+
+@scoped_connections
+class LeakyDatabase:
+    """Domain module in the old style: checks out connections and never closes them."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def get_connection(self):
+        return self.db.get_connection()
+
+    def leaky(self):
+        conn = self.get_connection()
+        conn.cursor()
+        return "ok"
+
+    def outer(self):
+        conn = self.get_connection()
+        self.leaky()
+        # The nested call's connection is back; ours is still held
+        return len(self.db._connection_pool.used), conn.closed
+
+    def tidy(self):
+        conn = self.get_connection()
+        conn.close()
+
+    async def poll(self):
+        return "async"
+
+    @staticmethod
+    def helper():
+        return "static"
+
+
+class TestConnectionScopes:
+    """Test that domain methods can no longer leak pooled connections."""
+
+    def test_scoped_method_returns_forgotten_connection(self):
+        manager = make_manager(maxconn=2)
+        leaky = LeakyDatabase(manager)
+
+        for _ in range(30):
+            assert leaky.leaky() == "ok"
+            assert not manager._connection_pool.used
+
+        stats = manager.get_pool_stats()
+        assert stats["checkouts"] == 30 and stats["checked_out"] == 0
+        assert stats["fallback_connects"] == 0 and stats["pool_exhausted"] == 0
+        assert stats["released_by_scope"] == 30 and stats["released_by_gc"] == 0
+        assert stats["holders"]["LeakyDatabase.leaky"]["leaked"] == 30
+
+    def test_nested_scopes_release_their_own_connections(self):
+        manager = make_manager(maxconn=2)
+        leaky = LeakyDatabase(manager)
+
+        assert leaky.outer() == (1, False)
+        assert not manager._connection_pool.used
+
+        leaky.tidy()
+        stats = manager.get_pool_stats()
+        assert stats["leaked"] == 2
+        assert stats["holders"]["LeakyDatabase.tidy"]["leaked"] == 0
+
+    @pytest.mark.asyncio
+    async def test_decorator_skips_async_and_static_methods(self):
+        assert LeakyDatabase.helper() == "static"
+        assert await LeakyDatabase(make_manager()).poll() == "async"
+        assert not hasattr(LeakyDatabase.get_connection, "__wrapped__")
+        assert hasattr(LeakyDatabase.leaky, "__wrapped__")
+
+
+class TestConnectionApi:
+    """Test the checkout() and transaction() context managers."""
+
+    def test_transaction_commits_or_rolls_back_and_always_releases(self):
+        manager = make_manager()
+
+        with manager.transaction() as conn:
+            raw = conn._conn
+        assert (raw.commits, raw.rollbacks) == (1, 0)
+
+        with pytest.raises(ValueError):
+            with manager.transaction() as conn:
+                raw = conn._conn
+                raise ValueError("bad row")
+        assert (raw.commits, raw.rollbacks) == (0, 1)
+
+        with manager.checkout() as conn:
+            assert conn is not None
+        assert not manager._connection_pool.used
+        assert manager.get_pool_stats()["leaked"] == 0
+
+    def test_unavailable_database(self):
+        with patch.dict(os.environ, {}, clear=True):
+            manager = DatabaseManager()
+
+        with manager.checkout() as conn:
+            assert conn is None
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                pass
+
+
+class TestPoolExhaustion:
+    """Test waiting for a returned connection before opening an unpooled one."""
+
+    def test_waits_for_returned_connection(self):
+        manager = make_manager(maxconn=1)
+        held = manager.get_connection()
+        threading.Timer(0.05, held.close).start()
+
+        conn = manager.get_connection()
+        assert conn._pool is manager._connection_pool
+        conn.close()
+
+        stats = manager.get_pool_stats()
+        assert stats["pool_exhausted"] == 1 and stats["fallback_connects"] == 0
+        assert stats["max_wait_ms"] >= 40
+
+    def test_falls_back_after_wait_and_closes_fallback(self):
+        manager = make_manager(maxconn=1)
+        held = manager.get_connection()
+        fallback = FakeConnection()
+
+        with patch.object(core, "POOL_WAIT_SECONDS", 0.02), \
+                patch.object(core.psycopg2, "connect", return_value=fallback):
+            with manager.checkout() as conn:
+                assert conn._conn is fallback
+        held.close()
+
+        assert fallback.closed
+        stats = manager.get_pool_stats()
+        assert stats["fallback_connects"] == 1 and stats["checked_out"] == 0
+        assert not manager._connection_pool.used
+
+
+class TestLeakDebugMode:
+    """Test that debug mode reports where leaked connections were checked out."""
+
+    def test_reports_call_site_of_leaks(self, caplog):
+        manager = make_manager()
+        manager.pool_telemetry.debug = True
+
+        with caplog.at_level(logging.WARNING, logger=core.logger.name):
+            LeakyDatabase(manager).leaky()
+            conn = manager.get_connection()
+            del conn
+            gc.collect()
+
+        messages = [record.getMessage() for record in caplog.records if "Leaked" in record.getMessage()]
+        assert len(messages) == 2
+        assert "LeakyDatabase.leaky" in messages[0] and "returned by scope" in messages[0]
+        assert "test_db_pool.py" in messages[0] and "in leaky" in messages[0]
+        assert "unscoped" in messages[1] and "returned by gc" in messages[1]
+        assert "in test_reports_call_site_of_leaks" in messages[1]
+        assert manager.get_pool_stats()["released_by_gc"] == 1
+
+    def test_no_call_site_capture_by_default(self):
+        manager = make_manager()
+        conn = manager.get_connection()
+        assert conn._call_site is None
+        conn.close()
@@ -0,0 +1,200 @@
+"""
+Tests for the in-memory played games name index.
+"""
+import difflib
+import json
+import os
+import random
+import sys
+import time
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.database.game_index import GameNameIndex  # noqa: E402
+from bot.database.games import GamesDatabase  # noqa: E402
+
+# Use the real normalization helpers without touching the database
+_helpers = GamesDatabase.__new__(GamesDatabase)
+normalize = _helpers._normalize_for_matching
+parse_list = _helpers._parse_comma_separated_list
+
+WORDS = [
+    'dark', 'souls', 'resident', 'evil', 'legend', 'zelda', 'hollow', 'knight', 'silent', 'hill',
+    'final', 'fantasy', 'god', 'war', 'metal', 'gear', 'solid', 'dead', 'space', 'last', 'us',
+    'hitman', 'world', 'assassination', 'half', 'life', 'mass', 'effect', 'star', 'wars', 'alien',
+    'isolation', 'outer', 'wilds', 'elden', 'ring', 'blood', 'borne', 'sekiro', 'shadows', 'die', 'twice',
+]
+
+
+def legacy_resolve(rows, name):
+    """Reference copy of the table-scanning get_played_game cascade (returns a game ID)."""
+    name_lower = name.lower().strip()
+    name_normalized = normalize(name)
+
+    def alt_names_of(text):
+        try:
+            return json.loads(text) if text else []
+        except (json.JSONDecodeError, TypeError):
+            return parse_list(text)
+
+    for row in rows:
+        if row['canonical_name'].lower().strip() == name_lower:
+            return row['id']
+    for row in rows:
+        if row['canonical_name'] and normalize(row['canonical_name']) == name_normalized:
+            return row['id']
+    for row in rows:
+        text = row.get('alternative_names') or ''
+        if not text or name_lower not in text.lower():
+            continue
+        for alt in alt_names_of(text):
+            if alt.lower().strip() == name_lower or normalize(alt) == name_normalized:
+                return row['id']
+
+    names_map = {}
+    for row in rows:
+        names_map[row['canonical_name'].lower().strip()] = row
+        for alt in alt_names_of(row.get('alternative_names') or ''):
+            names_map[alt.lower().strip()] = row
+    matches = difflib.get_close_matches(name_lower, list(names_map.keys()), n=1, cutoff=0.75)
+    return names_map[matches[0]]['id'] if matches else None
+
+
+def make_rows(count, seed=42):
+    """Generate realistic-looking played_games rows."""
+    rng = random.Random(seed)
+    rows = []
+    for game_id in range(1, count + 1):
+        words = rng.sample(WORDS, rng.randint(2, 4))
+        canonical = ' '.join(w.title() for w in words)
+        if rng.random() < 0.3:
+            canonical += f" {rng.randint(2, 5)}"
+        if rng.random() < 0.2:
+            canonical = canonical.replace(' ', ': ', 1)
+        alternatives = []
+        if rng.random() < 0.6:
+            alternatives.append(''.join(w[0] for w in words).upper())
+        if rng.random() < 0.3:
+            alternatives.append(' '.join(words[:2]))
+        rows.append({'id': game_id, 'canonical_name': canonical, 'alternative_names': json.dumps(alternatives)})
+    return rows
+
+
+def make_queries(rows, count, seed=7):
+    """Mix of exact, punctuation-variant, alternative, misspelt and unknown names."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        row = rng.choice(rows)
+        kind = rng.randint(0, 4)
+        if kind == 0:
+            queries.append(row['canonical_name'].upper())
+        elif kind == 1:
+            queries.append(row['canonical_name'].replace(':', '').replace(' ', '-', 1))
+        elif kind == 2:
+            alts = json.loads(row['alternative_names'])
+            queries.append(alts[0] if alts else row['canonical_name'])
+        elif kind == 3:
+            name = row['canonical_name'].lower()
+            pos = rng.randrange(len(name))
+            queries.append(name[:pos] + name[pos + 1:])
+        else:
+            queries.append(' '.join(rng.sample(WORDS, 2)) + ' remastered')
+    return queries
+
+
+def build_index(rows):
+    index = GameNameIndex(normalize, parse_list)
+    index.build(rows)
+    return index
+
+
+class TestGameNameIndex:
+    """Test GameNameIndex lookups and incremental maintenance."""
+
+    def test_cascade_match_types(self):
+        rows = [
+            {'id': 1, 'canonical_name': 'HITMAN: World of Assassination', 'alternative_names': '["HWOA"]'},
+            {'id': 2, 'canonical_name': 'The Last of Us', 'alternative_names': '["TLOU", "Last of Us Part 1"]'},
+            {'id': 3, 'canonical_name': 'Hollow Knight', 'alternative_names': 'HK, Hollow'},
+        ]
+        index = build_index(rows)
+
+        assert index.resolve('hitman: world of assassination') == (1, 'exact')
+        assert index.resolve('HITMAN World of Assassination') == (1, 'normalized')
+        assert index.resolve('tlou') == (2, 'alternative')
+        assert index.resolve('hk') == (3, 'alternative')
+        assert index.resolve('Hollow Knigt') == (3, 'fuzzy')
+        assert index.resolve('Completely Unknown') is None
+
+    def test_incremental_updates(self):
+        index = build_index([{'id': 1, 'canonical_name': 'Dead Space', 'alternative_names': '[]'}])
+
+        index.upsert({'id': 2, 'canonical_name': 'Alien Isolation', 'alternative_names': '["AI"]'})
+        assert index.resolve('ai') == (2, 'alternative')
+
+        index.upsert({'id': 1, 'canonical_name': 'Dead Space Remake', 'alternative_names': '[]'})
+        assert index.resolve('dead space remake') == (1, 'exact')
+
+        index.remove(2)
+        assert index.resolve('ai') is None
+        assert index.resolve('alien isolation') is None
+        assert len(index) == 1
+
+    def test_updates_ignored_until_built(self):
+        index = GameNameIndex(normalize, parse_list)
+        index.upsert({'id': 1, 'canonical_name': 'Dead Space', 'alternative_names': '[]'})
+        assert index.is_stale()
+        assert len(index) == 0
+
+    def test_parity_with_table_scan_cascade(self):
+        rows = make_rows(500)
+        index = build_index(rows)
+        for query in make_queries(rows, 300):
+            match = index.resolve(query)
+            assert (match[0] if match else None) == legacy_resolve(rows, query), query
+
+    def test_fuzzy_candidates_never_drop_a_match(self):
+        rows = make_rows(300, seed=3)
+        index = build_index(rows)
+        keys = list(index._fuzzy_owners)
+        for query in make_queries(rows, 100, seed=11):
+            query_lower = query.lower().strip()
+            candidates = set(index.fuzzy_candidates(query_lower))
+            for key in keys:
+                if difflib.SequenceMatcher(None, key, query_lower).ratio() >= 0.75:
+                    assert key in candidates, (query_lower, key)
+
+
+@pytest.mark.benchmark
+class TestGameNameIndexBenchmark:
+    """Latency comparison between the name index and the table-scan cascade."""
+
+    @pytest.mark.parametrize("game_count", [500, 5000, 50000])
+    def test_lookup_latency(self, game_count):
+        rows = make_rows(game_count)
+        queries = make_queries(rows, 20)
+
+        started = time.perf_counter()
+        index = build_index(rows)
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        indexed = [index.resolve(q) for q in queries]
+        index_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        # The legacy cascade is slow at scale; sample a few queries
+        sample = queries[:3] if game_count >= 50000 else queries
+        started = time.perf_counter()
+        legacy = [legacy_resolve(rows, q) for q in sample]
+        legacy_ms = (time.perf_counter() - started) * 1000 / len(sample)
+
+        print(f"\n{game_count} games: build {build_seconds * 1000:.0f}ms, "
+              f"index {index_ms:.3f}ms/lookup, table scan {legacy_ms:.3f}ms/lookup")
+        assert [m[0] if m else None for m in indexed[:len(sample)]] == legacy
+        assert index_ms < legacy_ms
@@ -0,0 +1,238 @@
+"""
+Tests for the precomputed played games rankings store.
+"""
+import os
+import random
+import sys
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.database.game_rankings import GameRankings  # noqa: E402
+from bot.database.games import GamesDatabase  # noqa: E402
+
+ROWS = [
+    {'id': 1, 'canonical_name': 'Dark Souls', 'series_name': 'Souls', 'genre': 'RPG', 'release_year': 2011,
+     'first_played_date': date(2020, 3, 1), 'completion_status': 'completed', 'total_episodes': 40,
+     'total_playtime_minutes': 2400, 'youtube_views': 9000, 'twitch_views': 1000,
+     'youtube_playlist_url': 'https://youtube.com/p1', 'twitch_vod_urls': 'https://twitch.tv/v1'},
+    {'id': 2, 'canonical_name': 'Dark Souls II', 'series_name': 'Souls', 'genre': 'RPG', 'release_year': 2014,
+     'first_played_date': date(2021, 6, 1), 'completion_status': 'completed', 'total_episodes': 30,
+     'total_playtime_minutes': 2400, 'youtube_views': 3000, 'twitch_views': 0,
+     'youtube_playlist_url': 'https://youtube.com/p2', 'twitch_vod_urls': ''},
+    {'id': 3, 'canonical_name': 'Silent Hill', 'series_name': 'Silent Hill', 'genre': 'Horror',
+     'release_year': 1999, 'first_played_date': date(2019, 10, 31), 'completion_status': 'in_progress',
+     'total_episodes': 10, 'total_playtime_minutes': 900, 'youtube_views': None, 'twitch_views': 4000,
+     'youtube_playlist_url': None, 'twitch_vod_urls': 'https://twitch.tv/v3'},
+    {'id': 4, 'canonical_name': 'Untitled Goose Game', 'series_name': '', 'genre': None, 'release_year': None,
+     'first_played_date': None, 'completion_status': 'completed', 'total_episodes': 0,
+     'total_playtime_minutes': 0, 'youtube_views': 0, 'twitch_views': 0,
+     'youtube_playlist_url': None, 'twitch_vod_urls': None},
+]
+
+
+def build(rows=ROWS, version=1):
+    rankings = GameRankings()
+    rankings.build(rows, version)
+    return rankings
+
+
+class TestGameRankings:
+    """Test top-N, ranks and aggregates against the SQL they replace."""
+
+    def test_top_n_in_both_directions(self):
+        rankings = build()
+
+        by_playtime = rankings.top('playtime', 'DESC', 15)
+        assert [g['canonical_name'] for g in by_playtime][2:] == ['Silent Hill']
+        assert {g['canonical_name'] for g in by_playtime[:2]} == {'Dark Souls', 'Dark Souls II'}
+        assert set(by_playtime[0]) == {'canonical_name', 'series_name', 'total_episodes',
+                                       'total_playtime_minutes', 'completion_status', 'genre'}
+        assert rankings.top('playtime', 'ASC', 1)[0]['canonical_name'] == 'Silent Hill'
+        assert rankings.top('episodes', 'ASC', 1)[0]['total_episodes'] == 10
+        assert rankings.top('played_date', 'ASC', 1)[0] == {'canonical_name': 'Silent Hill',
+                                                            'first_played_date': date(2019, 10, 31)}
+        assert rankings.top('release_year', 'DESC', 1)[0]['release_year'] == 2014
+        assert rankings.top('playtime', 'DESC', 0) == []
+
+    def test_view_and_engagement_rankings(self):
+        rankings = build()
+
+        assert [g['canonical_name'] for g in rankings.top('twitch_views', 'DESC', 10)] == ['Silent Hill', 'Dark Souls']
+        total = rankings.top('total_views', 'DESC', 10)
+        assert [(g['canonical_name'], g['total_views']) for g in total] == [
+            ('Dark Souls', 10000), ('Silent Hill', 4000), ('Dark Souls II', 3000)]
+        assert total[1]['youtube_views'] == 0
+
+        engagement = rankings.top('engagement', 'DESC', 10)
+        assert [g['canonical_name'] for g in engagement] == ['Silent Hill', 'Dark Souls', 'Dark Souls II']
+        assert engagement[0]['views_per_hour'] == 266.7 and engagement[1]['views_per_episode'] == 250.0
+        assert [g['canonical_name'] for g in rankings.search_engagement('dark souls')] == ['Dark Souls', 'Dark Souls II']
+
+        assert rankings.top('avg_episode_length', 'DESC', 15)[0]['avg_minutes_per_episode'] == 90.0
+        longest = rankings.top('completed_length', 'DESC', 10)
+        assert [g['canonical_name'] for g in longest] == ['Dark Souls', 'Dark Souls II']
+
+    def test_ranks_share_ties(self):
+        rankings = build()
+
+        assert rankings.rank(1, 'playtime') == {'rank': 1, 'total': 3, 'value': 2400, 'ranked': True}
+        assert rankings.rank(2, 'playtime')['rank'] == 1
+        assert rankings.rank(3, 'playtime')['rank'] == 3
+        assert rankings.rank(4, 'playtime') == {'rank': 4, 'total': 3, 'value': 0, 'ranked': False}
+        assert rankings.rank(99, 'playtime') is None
+        assert rankings.game_id_for_name('  silent HILL ') == 3
+
+    def test_aggregates(self):
+        rankings = build()
+
+        assert rankings.series_by_playtime() == [
+            {'series_name': 'Souls', 'game_count': 2, 'total_playtime_minutes': 4800,
+             'total_episodes': 70, 'avg_playtime_per_game': 2400.0},
+            {'series_name': 'Silent Hill', 'game_count': 1, 'total_playtime_minutes': 900,
+             'total_episodes': 10, 'avg_playtime_per_game': 900.0}]
+        genres = rankings.genre_statistics()
+        assert [g['genre'] for g in genres] == ['RPG', 'Horror']
+        assert genres[0]['completion_rate'] == 100.0 and genres[1]['completed_count'] == 0
+
+        platforms = rankings.platform_statistics()
+        assert platforms['youtube'] == {'game_count': 2, 'total_views': 12000,
+                                        'avg_views_per_game': 6000.0, 'total_content': 70}
+        assert platforms['twitch']['game_count'] == 2 and platforms['cross_platform_count'] == 1
+
+    def test_returned_rows_are_copies(self):
+        rankings = build()
+        rankings.top('playtime', 'DESC', 1)[0]['canonical_name'] = 'changed'
+        rankings.series_by_playtime()[0]['game_count'] = 0
+        assert rankings.top('playtime', 'DESC', 3)[2]['canonical_name'] == 'Silent Hill'
+        assert rankings.series_by_playtime()[0]['game_count'] == 2
+
+
+class FakeCursor:
+    def __init__(self, table):
+        self.table = table
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.table.queries.append(' '.join(sql.split())[:40])
+        if 'FROM table_versions' in sql:
+            self.result = [{'version': self.table.version}]
+        elif 'FROM played_games' in sql:
+            self.result = [dict(row) for row in self.table.rows]
+        else:
+            self.result = []
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.version = 1
+        self.queries = []
+
+    def connection(self):
+        table = self
+        return SimpleNamespace(cursor=lambda: FakeCursor(table), commit=lambda: None,
+                               rollback=lambda: None, close=lambda: None)
+
+
+def make_games_db(table):
+    manager = SimpleNamespace(get_connection=table.connection,
+                              _validate_order_direction=lambda order: 'ASC' if order.upper() == 'ASC' else 'DESC')
+    games = GamesDatabase(manager)
+    table.queries.clear()
+    return games
+
+
+class TestGamesDatabaseRankings:
+    """Test that GamesDatabase serves rankings from memory until the table version moves."""
+
+    def test_queries_served_from_memory_until_version_changes(self):
+        table = FakeTable([dict(row) for row in ROWS])
+        games = make_games_db(table)
+
+        assert games.get_games_by_playtime('ASC', limit=1)[0]['canonical_name'] == 'Silent Hill'
+        assert len(table.queries) == 2  # version + one full read
+
+        games.get_series_by_total_playtime()
+        games.get_games_by_twitch_views(limit=1)
+        games.get_genre_statistics()
+        context = games.get_ranking_context('Silent Hill', 'all')
+        assert context['rankings']['playtime'] == {'rank': 3, 'total': 3, 'percentile': 33.3}
+        assert context['rankings']['episodes']['rank'] == 3
+        assert len(table.queries) == 2
+
+        # Version unchanged at the next check: no rebuild
+        games._rankings.verify_seconds = 0
+        games.get_games_by_playtime()
+        assert table.queries[2:] == ['SELECT version FROM table_versions WHERE']
+
+        # A write from elsewhere bumps the version
+        table.rows[2]['total_playtime_minutes'] = 5000
+        table.version = 2
+        assert games.get_games_by_playtime('DESC', limit=1)[0]['canonical_name'] == 'Silent Hill'
+        assert games._rankings.stats['builds'] == 2
+
+    def test_own_writes_invalidate(self):
+        table = FakeTable([dict(row) for row in ROWS])
+        games = make_games_db(table)
+        games.get_games_by_episode_count()
+        assert games._rankings.is_loaded
+
+        games._rankings.invalidate()
+        table.rows.append(dict(ROWS[0], id=5, canonical_name='Dark Souls III', total_episodes=99))
+        assert games.get_games_by_episode_count('DESC', limit=1)[0]['canonical_name'] == 'Dark Souls III'
+
+    def test_stale_build_not_trusted_after_invalidate(self):
+        rankings = GameRankings()
+        generation = rankings.generation
+        rankings.invalidate()  # A write landed while rows were being read
+        rankings.build(ROWS, version=1, generation=generation)
+        assert len(rankings) == 4 and rankings.needs_check()
+
+
+@pytest.mark.benchmark
+class TestGameRankingsBenchmark:
+    """Build cost and per-query latency for a large table."""
+
+    def test_query_latency(self):
+        rng = random.Random(5)
+        rows = [{'id': i, 'canonical_name': f'Game {i}', 'series_name': f'Series {i % 150}',
+                 'genre': rng.choice(['RPG', 'Horror', 'Action', 'Puzzle']), 'release_year': rng.randint(1985, 2024),
+                 'first_played_date': date(2015 + i % 10, 1 + i % 12, 1), 'completion_status': 'completed',
+                 'total_episodes': rng.randint(0, 120), 'total_playtime_minutes': rng.randint(0, 9000),
+                 'youtube_views': rng.randint(0, 50000), 'twitch_views': rng.randint(0, 20000),
+                 'youtube_playlist_url': 'u', 'twitch_vod_urls': 'v'} for i in range(1, 5001)]
+
+        started = time.perf_counter()
+        rankings = build(rows)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        queries = 2000
+        started = time.perf_counter()
+        for i in range(queries):
+            rankings.top('playtime', 'DESC', 15)
+            rankings.rank(1 + i % 5000, 'episodes')
+        per_query_us = (time.perf_counter() - started) * 1e6 / (queries * 2)
+
+        print(f"\nRankings for {len(rows)} games built in {build_ms:.1f}ms; "
+              f"{per_query_us:.1f}us per top-15/rank query")
+        assert per_query_us < 1000
@@ -0,0 +1,148 @@
+"""
+Tests for the shared HTTP client manager and token cache, against a local aiohttp stub server.
+"""
+import asyncio
+import os
+import sys
+
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.integrations import http_client  # noqa: E402
+from bot.integrations.http_client import HTTPClientManager, TokenCache  # noqa: E402
+
+
+class StubUpstream:
+    """Local stand-in for the Twitch token endpoint and a slow API endpoint."""
+
+    def __init__(self):
+        self.token_requests = 0
+        self.peers = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/oauth2/token', self.token)
+        app.router.add_get('/api', self.api)
+        return app
+
+    async def token(self, request):
+        self.token_requests += 1
+        await asyncio.sleep(0.01)
+        return web.json_response({'access_token': f"token-{self.token_requests}", 'expires_in': 3600})
+
+    async def api(self, request):
+        self.peers.add(request.transport.get_extra_info('peername'))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        return web.json_response({'ok': True})
+
+
+@asynccontextmanager
+async def stub_server():
+    upstream = StubUpstream()
+    server = TestServer(upstream.app())
+    await server.start_server()
+    upstream.url = lambda path: str(server.make_url(path))
+    try:
+        yield upstream
+    finally:
+        await http_client.close_http_client()
+        await server.close()
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """Fresh global client manager per test."""
+    client = HTTPClientManager(limits={"twitch": 2})
+    monkeypatch.setattr(http_client, "_http_client", client)
+    return client
+
+
+class TestHTTPClientManager:
+    """Test session pooling, per-host limits and shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_session_reused_with_keepalive(self, manager):
+        async with stub_server() as stub:
+            for _ in range(5):
+                async with http_client.http_session("twitch") as session:
+                    async with session.get(stub.url('/api')) as response:
+                        assert response.status == 200
+                        await response.json()
+
+        assert manager.stats["sessions_created"] == 1
+        assert len(stub.peers) == 1  # One TCP connection served every request
+
+    @pytest.mark.asyncio
+    async def test_per_host_concurrency_limit(self, manager):
+        async with stub_server() as stub:
+            async def call():
+                async with http_client.http_session("twitch") as session:
+                    async with session.get(stub.url('/api')) as response:
+                        return response.status
+
+            statuses = await asyncio.gather(*(call() for _ in range(8)))
+
+        assert statuses == [200] * 8
+        assert stub.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_close_shuts_sessions(self, manager):
+        session = manager.session("youtube")
+        await http_client.close_http_client()
+
+        assert session.closed
+        assert manager.get_stats()["open_sessions"] == []
+        assert manager.session("youtube") is not session
+        await manager.close()
+
+
+class TestTokenCache:
+    """Test token reuse, concurrent fetch collapsing and invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_twitch_token_cached_until_expiry(self, manager, monkeypatch):
+        async with stub_server() as stub:
+            monkeypatch.setattr(http_client, "TWITCH_OAUTH_TOKEN_URL", stub.url('/oauth2/token'))
+
+            tokens = await asyncio.gather(*(http_client.get_twitch_app_token("id", "secret") for _ in range(5)))
+            assert tokens == ["token-1"] * 5
+            assert await http_client.get_twitch_app_token("id", "secret") == "token-1"
+            assert stub.token_requests == 1
+
+            http_client.invalidate_twitch_app_token("id")
+            assert await http_client.get_twitch_app_token("id", "secret") == "token-2"
+
+    @pytest.mark.asyncio
+    async def test_expired_token_refetched(self):
+        cache = TokenCache(refresh_margin_seconds=60)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return f"token-{len(calls)}", 30  # Expires inside the refresh margin
+
+        assert await cache.get("key", fetch) == "token-1"
+        assert await cache.get("key", fetch) == "token-2"
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_not_cached(self):
+        cache = TokenCache()
+
+        async def fail():
+            return None
+
+        assert await cache.get("key", fail) is None
+        assert cache.stats["failures"] == 1
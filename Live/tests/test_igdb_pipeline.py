@@ -0,0 +1,311 @@
+"""
+Tests for the IGDB rate limiter, concurrent multi-query enrichment and enrichment cache,
+against a local aiohttp stub server.
+"""
+import asyncio
+import os
+import re
+import sys
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.integrations import http_client, igdb, igdb_cache  # noqa: E402
+from bot.integrations.http_client import AsyncTokenBucket, HTTPClientManager  # noqa: E402
+from bot.integrations.igdb_cache import IGDBEnrichmentCache  # noqa: E402
+
+WORDS = ['dark', 'souls', 'hollow', 'knight', 'silent', 'hill', 'dead', 'space', 'outer', 'wilds', 'mass',
+         'effect', 'alien', 'isolation', 'elden', 'ring', 'metal', 'gear', 'final', 'fantasy', 'half', 'life']
+CATALOGUE = [
+    {'id': i + 1, 'name': f"{WORDS[i % len(WORDS)].title()} {WORDS[(i * 7 + 3) % len(WORDS)].title()} {i}",
+     'genres': [{'name': 'Adventure'}], 'release_dates': [{'y': 2000 + i % 25}],
+     'alternative_names': [{'name': f"Game {i}"}]}
+    for i in range(80)
+]
+CATALOGUE.append({'id': 500, 'name': 'HITMAN: World of Assassination', 'genres': [{'name': 'Shooter'}]})
+
+
+class StubIGDB:
+    """Local stand-in for the Twitch token endpoint and IGDB games/multiquery endpoints."""
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.requests = 0
+        self.fail_status = None  # Set to answer every search with this error status
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/oauth2/token', self.token)
+        app.router.add_post('/v4/games', self.games)
+        app.router.add_post('/v4/multiquery', self.multiquery)
+        return app
+
+    @staticmethod
+    def search(term):
+        term = term.lower()
+        return [game for game in CATALOGUE if game['name'].lower().startswith(term)][:5]
+
+    async def token(self, request):
+        return web.json_response({'access_token': 'stub-token', 'expires_in': 3600})
+
+    async def games(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if self.fail_status:
+            return web.json_response({'message': 'unavailable'}, status=self.fail_status)
+        body = await request.text()
+        return web.json_response(self.search(re.search(r'search "(.*?)";', body).group(1)))
+
+    async def multiquery(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if self.fail_status:
+            return web.json_response({'message': 'unavailable'}, status=self.fail_status)
+        body = await request.text()
+        queries = re.findall(r'query games "(\d+)" \{ search "(.*?)";', body)
+        assert len(queries) <= igdb.MULTIQUERY_BATCH_SIZE
+        return web.json_response([{'name': name, 'result': self.search(term)} for name, term in queries])
+
+
+@asynccontextmanager
+async def stub_igdb(monkeypatch, rate=40.0):
+    stub = StubIGDB()
+    server = TestServer(stub.app())
+    await server.start_server()
+
+    monkeypatch.setenv('IGDB_CLIENT_ID', 'stub-client')
+    monkeypatch.setenv('IGDB_CLIENT_SECRET', 'stub-secret')
+    monkeypatch.setattr(http_client, "_http_client", HTTPClientManager())
+    monkeypatch.setattr(http_client, "TWITCH_OAUTH_TOKEN_URL", str(server.make_url('/oauth2/token')))
+    monkeypatch.setattr(igdb, "IGDB_GAMES_URL", str(server.make_url('/v4/games')))
+    monkeypatch.setattr(igdb, "IGDB_MULTIQUERY_URL", str(server.make_url('/v4/multiquery')))
+    monkeypatch.setattr(igdb, "_rate_limiter", AsyncTokenBucket(rate=rate, capacity=4))
+    monkeypatch.setattr(igdb, "_enrichment_cache", IGDBEnrichmentCache())
+    try:
+        yield stub
+    finally:
+        await http_client.close_http_client()
+        await server.close()
+
+
+def titles(count):
+    return [game['name'] for game in CATALOGUE[:count]]
+
+
+class FakeClock:
+    """Frozen monotonic clock whose sleeps are recorded instead of waited."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+class TestAsyncTokenBucket:
+    """Test burst and sustained rate under concurrent callers."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_sustained_rate(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(http_client, "time", SimpleNamespace(monotonic=clock.monotonic))
+        monkeypatch.setattr(http_client, "asyncio", SimpleNamespace(sleep=clock.sleep))
+        bucket = AsyncTokenBucket(rate=20.0, capacity=4)
+
+        await asyncio.gather(*(bucket.acquire() for _ in range(12)))
+
+        # 4 immediately, then 8 more spaced at 20/s
+        assert clock.sleeps == pytest.approx([k / 20 for k in range(1, 9)])
+        assert bucket.stats["waited"] == 8
+
+        # Once the queued tokens are due and the bucket has refilled, a full burst goes through again
+        clock.now += 8 / 20 + 4 / 20
+        for _ in range(4):
+            await bucket.acquire()
+        assert len(clock.sleeps) == 8
+        await bucket.acquire()
+        assert clock.sleeps[-1] == pytest.approx(1 / 20)
+
+
+class TestIGDBPipeline:
+    """Test multi-query enrichment matches per-title enrichment."""
+
+    @pytest.mark.asyncio
+    async def test_many_matches_single_lookups(self, monkeypatch):
+        names = titles(25) + ['HITMAN World of Assassination', 'Unknown Game Nobody Played']
+        async with stub_igdb(monkeypatch) as stub:
+            batched = await igdb.validate_and_enrich_many(names)
+            batch_requests = stub.requests
+
+            igdb.clear_cache()
+            single = {name: await igdb.validate_and_enrich(name) for name in names}
+
+        assert batched == single
+        assert batched['HITMAN World of Assassination']['canonical_name'] == 'HITMAN: World of Assassination'
+        assert batched['Unknown Game Nobody Played']['match_found'] is False
+        # Three batches of variant 1, one batch of variant 2 for the two misses
+        assert batch_requests == 4
+
+    @pytest.mark.asyncio
+    async def test_bulk_validate_keeps_order_and_uses_cache(self, monkeypatch):
+        names = titles(12)
+        async with stub_igdb(monkeypatch) as stub:
+            results = await igdb.bulk_validate_games(list(reversed(names)))
+            requests_after_first = stub.requests
+            await igdb.bulk_validate_games(names)
+
+        assert [r['canonical_name'] for r in results] == list(reversed(names))
+        assert stub.requests == requests_after_first
+
+
+class FakeCacheBackend:
+    """In-memory stand-in for the igdb_cache table."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def load_igdb_cache_entries(self, limit):
+        rows = sorted(self.rows.values(), key=lambda row: row['cached_at'], reverse=True)
+        return [dict(row) for row in rows[:limit]]
+
+    def save_igdb_cache_entries(self, entries, max_rows):
+        for entry in entries:
+            self.rows[entry['cache_key']] = dict(entry)
+        return len(entries)
+
+
+class TestIGDBEnrichmentCache:
+    """Test negative caching, normalized keys, expiry, size bound, persistence and warm-up."""
+
+    def test_lru_bound_and_expiry(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(igdb_cache.time, "time", lambda: now[0])
+        cache = IGDBEnrichmentCache(max_entries=2, ttl_seconds=100, negative_ttl_seconds=10)
+        cache.put('a', 'A', {'canonical_name': 'A', 'match_found': True})
+        cache.put('b', 'B', {'canonical_name': 'B', 'match_found': False})
+        cache.get('a', 'A')
+        cache.put('c', 'C', {'canonical_name': 'C', 'match_found': True})
+        cache.put('d', 'D', {'canonical_name': 'D', 'error': 'No IGDB access token'})
+
+        assert len(cache) == 2 and cache.stats["evictions"] == 1
+        assert cache.get('b', 'B') is None  # Least recently used was evicted
+        assert cache.get('d', 'D') is None  # Errors are never cached
+
+        now[0] += 50
+        assert cache.get('a', 'A')['canonical_name'] == 'A'
+        now[0] += 60
+        assert cache.get('a', 'A') is None
+
+    @pytest.mark.asyncio
+    async def test_negative_and_normalized_hits(self, monkeypatch):
+        name = CATALOGUE[3]['name']
+        async with stub_igdb(monkeypatch) as stub:
+            first = await igdb.validate_and_enrich(name)
+            missing = await igdb.validate_and_enrich('Unknown Game Nobody Played')
+            requests_after_first = stub.requests
+
+            respelled = await igdb.validate_and_enrich(f"  the {name.upper()} ")
+            assert await igdb.validate_and_enrich('unknown game  nobody played') == dict(
+                missing, canonical_name='unknown game  nobody played')
+            assert stub.requests == requests_after_first
+
+            # A "no match" is tied to the spelling that produced it
+            await igdb.validate_and_enrich('The Unknown Game Nobody Played')
+            assert stub.requests > requests_after_first
+
+        assert respelled['canonical_name'] == first['canonical_name'] == name
+        assert respelled['confidence'] == igdb.calculate_confidence(f"  the {name.upper()} ", name)
+        assert igdb.get_cache_stats()['negative_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_outage_is_not_cached_as_no_match(self, monkeypatch):
+        backend = FakeCacheBackend()
+        names = titles(3) + ['HITMAN World of Assassination']
+        async with stub_igdb(monkeypatch) as stub:
+            monkeypatch.setattr(igdb, "_enrichment_cache", IGDBEnrichmentCache(backend=backend))
+            stub.fail_status = 503
+            batched = await igdb.validate_and_enrich_many(names)
+            single = await igdb.validate_and_enrich(names[0])
+            # One failed batch, no fall-through to the colon variant
+            assert stub.requests == 2
+
+            stub.fail_status = None
+            recovered = await igdb.validate_and_enrich_many(names)
+
+        assert all(result['error'] == 'IGDB request failed' for result in batched.values())
+        assert single['error'] == 'IGDB request failed'
+        assert all(result['match_found'] for result in recovered.values())
+        assert igdb.get_cache_stats()['negative_hits'] == 0
+        assert len(backend.rows) == len(names)
+
+    @pytest.mark.asyncio
+    async def test_cache_survives_restart(self, monkeypatch):
+        backend = FakeCacheBackend()
+        names = titles(5) + ['Unknown Game Nobody Played']
+        async with stub_igdb(monkeypatch) as stub:
+            monkeypatch.setattr(igdb, "_enrichment_cache", IGDBEnrichmentCache(backend=backend))
+            before = await igdb.validate_and_enrich_many(names)
+            assert len(backend.rows) == len(names)
+
+            requests_before_restart = stub.requests
+            monkeypatch.setattr(igdb, "_enrichment_cache", IGDBEnrichmentCache(backend=backend))
+            after = await igdb.validate_and_enrich_many(names)
+
+        assert after == before
+        assert stub.requests == requests_before_restart
+        assert igdb.get_cache_stats()['loaded'] == len(names)
+
+    @pytest.mark.asyncio
+    async def test_warm_up_from_played_games(self, monkeypatch):
+        games = [{'canonical_name': name} for name in titles(30)]
+        games.append({'canonical_name': 'Excluded Game', 'skip_igdb_enrichment': True})
+        async with stub_igdb(monkeypatch) as stub:
+            await igdb.validate_and_enrich(games[0]['canonical_name'])
+            warmed = await igdb.warm_cache_from_played_games(games)
+
+            requests_after_warm = stub.requests
+            for game in games[:-1]:
+                assert (await igdb.validate_and_enrich(game['canonical_name']))['match_found']
+            rewarmed = await igdb.warm_cache_from_played_games(games)
+
+        assert warmed == {'titles': 30, 'already_cached': 1, 'fetched': 29}
+        assert rewarmed['fetched'] == 0
+        assert stub.requests == requests_after_warm
+
+
+@pytest.mark.benchmark
+class TestIGDBPipelineBenchmark:
+    """Wall-clock comparison of serial enrichment against the multi-query pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_enrichment_wall_clock(self, monkeypatch):
+        names = titles(60)
+        async with stub_igdb(monkeypatch) as stub:
+            started = time.perf_counter()
+            for name in names:
+                await igdb.validate_and_enrich(name)
+            serial_seconds = time.perf_counter() - started
+            serial_requests = stub.requests
+
+            igdb.clear_cache()
+            stub.requests = 0
+            started = time.perf_counter()
+            await igdb.validate_and_enrich_many(names)
+            pipeline_seconds = time.perf_counter() - started
+
+        print(f"\n{len(names)} titles: serial {serial_seconds:.2f}s ({serial_requests} requests), "
+              f"pipeline {pipeline_seconds:.2f}s ({stub.requests} requests)")
+        assert pipeline_seconds < serial_seconds / 5
@@ -0,0 +1,133 @@
+"""
+Tests for the precompiled query router in message_handler.route_query.
+"""
+import os
+import re
+import sys
+import time
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.handlers import message_handler  # noqa: E402
+from bot.handlers.message_handler import QUERY_PATTERNS, route_query  # noqa: E402
+
+CHAT_CORPUS = [
+    # Everyday chat the router should ignore
+    "lol that boss fight was brutal",
+    "good morning everyone!",
+    "did anyone catch the stream last night? the ending was wild",
+    "pizza with pineapple is actually fine, fight me",
+    "brb getting coffee",
+    "I can't believe she missed that jump 😂",
+    "gg wp",
+    "is the stream starting soon?",
+    "who else is watching from the UK",
+    "that soundtrack slaps",
+    "i think the new trailer drops tomorrow",
+    "Ash, are you there?",
+    "what time is it where you are",
+    "hello ash how are you today",
+    "anyone want to play co-op later",
+    # Questions the router should classify
+    "What game series has the most playtime?",
+    "which game took the most time to complete",
+    "What's the most played game?",
+    "Has Jonesy played Dark Souls?",
+    "did captain jonesy play hollow knight",
+    "What horror games has Jonesy played?",
+    "what games from 2019 has jonesy played",
+    "how long did jonesy play Resident Evil 2?",
+    "what's the playtime for God of War",
+    "Is Outer Wilds recommended?",
+    "who recommended silent hill 2",
+    "which game has the most views",
+    "what's the most popular game on the channel",
+    "what game has the most twitch views?",
+    "which game has the most total views",
+    "compare youtube and twitch",
+    "youtube vs twitch which is better",
+    "what game has the best engagement rate",
+    "views per episode for hitman",
+    "compare Dark Souls and Bloodborne",
+    "which is longer Elden Ring or Sekiro?",
+    "what was the first game jonesy played",
+    "what is the most common genre",
+    "has jonesyspacecat played the last of us?",
+    "how many horror games has she played",
+]
+
+
+def legacy_route_query(content):
+    """Reference copy of the original route_query: re.search each pattern in order."""
+    lower_content = content.lower()
+    for query_type, patterns in QUERY_PATTERNS.items():
+        for pattern in patterns:
+            match = re.search(pattern, lower_content)
+            if match:
+                return query_type, match
+    return "unknown", None
+
+
+@pytest.fixture(autouse=True)
+def quiet_router(monkeypatch):
+    """route_query logs every message; silence it for tests and benchmarks."""
+    monkeypatch.setattr(message_handler, "print", lambda *args, **kwargs: None, raising=False)
+
+
+class TestQueryRouter:
+    """Test precompiled routing returns the same results as the original loop."""
+
+    @pytest.mark.parametrize("content", CHAT_CORPUS)
+    def test_parity_with_sequential_search(self, content):
+        query_type, match = route_query(content)
+        expected_type, expected_match = legacy_route_query(content)
+
+        assert query_type == expected_type
+        if expected_match is None:
+            assert match is None
+        else:
+            assert match is not None
+            assert match.span() == expected_match.span()
+            assert match.groups() == expected_match.groups()
+
+    def test_priority_order_preserved(self):
+        # Matches both "statistical" and "youtube_views" patterns; statistical comes first
+        query_type, _ = route_query("what game has the most playtime and views")
+        assert query_type == "statistical"
+
+    def test_capture_groups_preserved(self):
+        query_type, match = route_query("Has Jonesy played Dark Souls?")
+        assert query_type == "game_status"
+        assert match is not None
+        assert match.group(1) == "dark souls"
+
+    def test_unknown_message(self):
+        assert route_query("lol that boss fight was brutal") == ("unknown", None)
+
+
+@pytest.mark.benchmark
+class TestQueryRouterBenchmark:
+    """Micro-benchmark of the compiled router against the sequential loop."""
+
+    def test_router_throughput(self):
+        corpus = CHAT_CORPUS * 50
+
+        started = time.perf_counter()
+        for content in corpus:
+            legacy_route_query(content)
+        legacy_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for content in corpus:
+            route_query(content)
+        compiled_seconds = time.perf_counter() - started
+
+        per_message_us = compiled_seconds * 1e6 / len(corpus)
+        print(f"\n{len(corpus)} messages: sequential {legacy_seconds * 1000:.1f}ms, "
+              f"compiled {compiled_seconds * 1000:.1f}ms ({per_message_us:.1f}us/message)")
+        assert compiled_seconds < legacy_seconds
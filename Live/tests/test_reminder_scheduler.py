@@ -0,0 +1,152 @@
+"""
+Tests for the event-driven reminder scheduler that replaced the per-minute polling loops.
+"""
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.tasks import reminder_scheduler  # noqa: E402
+from bot.tasks.reminder_scheduler import ReminderScheduler  # noqa: E402
+
+
+class FakeReminderDatabase:
+    """DatabaseManager stand-in that records every reminder query."""
+
+    def __init__(self, rows=()):
+        self.rows = [dict(row) for row in rows]
+        self.calls = []
+        self.users = SimpleNamespace(reminder_observer=None)
+        self.aio = SimpleNamespace(run=self._run)
+
+    async def _run(self, func, *args):
+        return func(*args)
+
+    def get_scheduled_reminders(self):
+        self.calls.append(('load',))
+        return list(self.rows)
+
+    def update_reminder_statuses(self, reminder_ids, status, delivered_at=None, auto_executed_at=None):
+        self.calls.append(('update', sorted(reminder_ids), status))
+        return len(reminder_ids)
+
+    def add_reminder(self, reminder):
+        # What UserDatabase.add_reminder does after its INSERT commits
+        self.users.reminder_observer.reminder_added(reminder)
+
+
+def reminder(reminder_id, due_in, **extra):
+    return {'id': reminder_id, 'status': 'pending', 'user_id': 1, 'reminder_text': f"reminder {reminder_id}",
+            'scheduled_time_epoch': time.time() + due_in, **extra}
+
+
+@asynccontextmanager
+async def running_scheduler(db, fail_ids=()):
+    delivered = []
+    auto_actions = []
+
+    async def deliver(row):
+        if row['id'] in fail_ids:
+            raise RuntimeError("DMs closed")
+        delivered.append((row['id'], time.time() - row['scheduled_time_epoch']))
+
+    async def execute_auto_action(row):
+        auto_actions.append(row['id'])
+
+    scheduler = ReminderScheduler(deliver, execute_auto_action, lambda: db)
+    scheduler.start()
+    try:
+        yield scheduler, delivered, auto_actions
+    finally:
+        task = scheduler._task
+        scheduler.stop()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+class TestReminderTimeline:
+    """Test reminders come off the heap on time and in order."""
+
+    @pytest.mark.asyncio
+    async def test_delivers_in_order_with_sub_second_precision(self):
+        db = FakeReminderDatabase([reminder(1, 0.15), reminder(2, -30), reminder(3, 0.05)])
+        async with running_scheduler(db) as (scheduler, delivered, _):
+            await asyncio.sleep(0.3)
+
+        assert [reminder_id for reminder_id, _ in delivered] == [2, 3, 1]
+        # Reminders due in the future go out within a tick of their time, not on the next minute
+        assert all(lateness < 0.1 for reminder_id, lateness in delivered if reminder_id != 2)
+        assert db.users.reminder_observer is None
+
+    @pytest.mark.asyncio
+    async def test_new_reminder_wakes_sleeper(self):
+        db = FakeReminderDatabase()
+        async with running_scheduler(db) as (scheduler, delivered, _):
+            await asyncio.sleep(0.02)
+            assert scheduler.next_iteration is None
+            db.add_reminder(reminder(4, 0.05))
+            await asyncio.sleep(0.15)
+
+        assert [reminder_id for reminder_id, _ in delivered] == [4]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_reminder_is_not_delivered(self):
+        db = FakeReminderDatabase([reminder(1, 0.1), reminder(2, 0.1)])
+        async with running_scheduler(db) as (scheduler, delivered, _):
+            await asyncio.sleep(0.02)
+            scheduler.reminder_cancelled(1)
+            assert len(scheduler) == 1
+            await asyncio.sleep(0.2)
+
+        assert [reminder_id for reminder_id, _ in delivered] == [2]
+
+
+class TestReminderBatching:
+    """Test deliveries share status writes and idle periods cost no queries."""
+
+    @pytest.mark.asyncio
+    async def test_due_reminders_share_one_update(self):
+        db = FakeReminderDatabase([reminder(i, -1) for i in range(1, 51)])
+        async with running_scheduler(db, fail_ids={7, 9}) as (scheduler, delivered, _):
+            await asyncio.sleep(0.1)
+
+        assert len(delivered) == 48
+        assert db.calls == [('load',),
+                            ('update', [i for i in range(1, 51) if i not in (7, 9)], 'delivered'),
+                            ('update', [7, 9], 'failed')]
+        assert scheduler.stats["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_queries_while_idle(self):
+        db = FakeReminderDatabase([reminder(1, 3600)])
+        async with running_scheduler(db) as (scheduler, delivered, _):
+            await asyncio.sleep(0.2)
+            assert scheduler.next_iteration is not None
+
+        assert db.calls == [('load',)]
+        assert delivered == []
+
+    @pytest.mark.asyncio
+    async def test_auto_action_runs_after_delay(self, monkeypatch):
+        monkeypatch.setattr(reminder_scheduler, "AUTO_ACTION_DELAY_SECONDS", 0.1)
+        outstanding = dict(reminder(2, -600), status='delivered', auto_action_enabled=True,
+                           auto_action_type='youtube_post', delivered_at_epoch=time.time() - 60)
+        db = FakeReminderDatabase([reminder(1, 0, auto_action_enabled=True, auto_action_type='youtube_post'),
+                                   outstanding])
+        async with running_scheduler(db) as (scheduler, delivered, auto_actions):
+            await asyncio.sleep(0.05)
+            assert auto_actions == [2]
+            await asyncio.sleep(0.15)
+
+        assert auto_actions == [2, 1]
+        assert ('update', [1], 'delivered') in db.calls
+        assert [call for call in db.calls if call[-1] == 'auto_completed'] == [('update', [2], 'auto_completed'),
+                                                                               ('update', [1], 'auto_completed')]
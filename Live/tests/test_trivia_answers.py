@@ -0,0 +1,242 @@
+"""
+Tests for buffered trivia answer ingestion, including a burst of concurrent answers.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.database.async_db import AsyncDatabase  # noqa: E402
+from bot.database.trivia import TriviaDatabase  # noqa: E402
+
+SESSION_ID = 7
+SUBMITTER_ID = 999
+
+
+class FakeAnswerTable:
+    """trivia_sessions/trivia_answers stand-in enforcing the (session_id, user_id) unique index."""
+
+    def __init__(self, insert_delay=0.0, existing=()):
+        self.insert_delay = insert_delay
+        self.answers = [{'id': i + 1, 'session_id': SESSION_ID, 'user_id': uid, 'submitted_at': None}
+                        for i, uid in enumerate(existing)]
+        self.queries = 0
+        self.inserts = 0
+        self.fail_inserts = False
+        self.reject_user = None  # Rows for this user make the whole INSERT fail
+        self.inserts_allowed = threading.Event()  # Cleared to hold inserts back
+        self.inserts_allowed.set()
+        self.lock = threading.Lock()
+
+    def execute(self, cursor, sql, params):
+        with self.lock:
+            self.queries += 1
+        sql = ' '.join(sql.split())
+        if sql.startswith('SELECT ts.question_submitter_id'):
+            cursor.rows = [{'question_submitter_id': SUBMITTER_ID,
+                            'user_ids': [a['user_id'] for a in self.answers if a['session_id'] == params[0]]}]
+        elif sql.startswith('INSERT INTO trivia_answers'):
+            assert 'ON CONFLICT (session_id, user_id) DO NOTHING' in sql
+            if self.fail_inserts:
+                raise RuntimeError("connection lost")
+            if self.reject_user is not None and self.reject_user in params[1::6]:
+                raise RuntimeError("value too long for type character varying")
+            self.inserts_allowed.wait()
+            time.sleep(self.insert_delay)
+            with self.lock:
+                self.inserts += 1
+                for i in range(0, len(params), 6):
+                    session_id, user_id, text, normalized, conflict, submitted_at = params[i:i + 6]
+                    if any(a['session_id'] == session_id and a['user_id'] == user_id for a in self.answers):
+                        continue
+                    row = {'id': len(self.answers) + 1, 'session_id': session_id, 'user_id': user_id,
+                           'answer_text': text, 'conflict_detected': conflict, 'submitted_at': submitted_at}
+                    self.answers.append(row)
+                    cursor.rows.append({'id': row['id'], 'session_id': session_id, 'user_id': user_id})
+        elif sql.startswith('SELECT * FROM trivia_answers'):
+            cursor.rows = sorted((dict(a) for a in self.answers if a['session_id'] == params[0]),
+                                 key=lambda a: a['submitted_at'])
+
+
+class FakeCursor:
+    def __init__(self, table):
+        self.table = table
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        self.rows = []
+        self.table.execute(self, sql, params)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class FakeConnection:
+    def __init__(self, table):
+        self.table = table
+
+    def cursor(self):
+        return FakeCursor(self.table)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def trivia_db(table):
+    return TriviaDatabase(SimpleNamespace(get_connection=lambda: FakeConnection(table)))
+
+
+class TestTriviaAnswerBuffer:
+    """Test dedupe, conflict detection and batched writes through the sync API."""
+
+    def test_submit_dedupes_and_flags_submitter(self):
+        table = FakeAnswerTable(existing=[1])
+        trivia = trivia_db(table)
+
+        assert trivia.submit_trivia_answer(SESSION_ID, 1, 'Portal') == {'success': False, 'error': 'duplicate'}
+        result = trivia.submit_trivia_answer(SESSION_ID, 2, 'Celeste')
+        assert result['success'] and result['answer_id'] == 2
+        assert trivia.submit_trivia_answer(SESSION_ID, 2, 'Sekiro')['error'] == 'duplicate'
+        assert trivia.submit_trivia_answer(SESSION_ID, SUBMITTER_ID, 'B')['success']
+
+        assert [a['conflict_detected'] for a in table.answers[1:]] == [False, True]
+        # One priming query, then only the two inserts
+        assert table.queries == 3
+
+    def test_failed_flush_keeps_answers_queued(self):
+        table = FakeAnswerTable()
+        trivia = trivia_db(table)
+        trivia.prime_trivia_answers(SESSION_ID)
+        assert trivia.queue_trivia_answer(SESSION_ID, 1, 'Portal')['queued']
+
+        table.fail_inserts = True
+        assert trivia.flush_trivia_answers() == -1
+        table.fail_inserts = False
+        assert [a['user_id'] for a in trivia.get_trivia_session_answers(SESSION_ID)] == [1]
+        assert trivia.answer_buffer.stats["failed_flushes"] == 1
+
+    def test_rejected_row_is_dropped_after_repeated_failures(self):
+        table = FakeAnswerTable()
+        trivia = trivia_db(table)
+        trivia.prime_trivia_answers(SESSION_ID)
+        for user_id in (1, 2, 3):
+            trivia.queue_trivia_answer(SESSION_ID, user_id, f'answer {user_id}')
+
+        table.reject_user = 2
+        for _ in range(trivia.answer_buffer.MAX_BATCH_ATTEMPTS - 1):
+            assert trivia.flush_trivia_answers() == -1
+        # Row-by-row retry lets the good answers through and drops the bad one
+        assert trivia.flush_trivia_answers() == 2
+        assert [a['user_id'] for a in table.answers] == [1, 3]
+        assert trivia.answer_buffer.pending_count() == 0
+        assert trivia.answer_buffer.stats["dropped"] == 1
+
+        # The dropped member isn't treated as having answered
+        table.reject_user = None
+        assert trivia.queue_trivia_answer(SESSION_ID, 2, 'shorter answer')['queued']
+        assert trivia.queue_trivia_answer(SESSION_ID, 1, 'again') == {'success': False, 'error': 'duplicate'}
+        assert trivia.flush_trivia_answers() == 1
+
+    def test_outage_keeps_every_answer_queued(self):
+        table = FakeAnswerTable()
+        trivia = trivia_db(table)
+        buffer = trivia.answer_buffer
+        trivia.prime_trivia_answers(SESSION_ID)
+        trivia.queue_trivia_answer(SESSION_ID, 1, 'Portal')
+        trivia.queue_trivia_answer(SESSION_ID, 2, 'Celeste')
+
+        table.fail_inserts = True
+        for _ in range(buffer.MAX_BATCH_ATTEMPTS * 5):
+            assert trivia.flush_trivia_answers() == -1
+        assert buffer.pending_count() == 2 and buffer.stats["dropped"] == 0
+
+        table.fail_inserts = False
+        assert trivia.flush_trivia_answers() == 2
+        assert [a['user_id'] for a in table.answers] == [1, 2]
+
+    def test_unique_index_backstops_other_processes(self):
+        table = FakeAnswerTable()
+        trivia = trivia_db(table)
+        trivia.prime_trivia_answers(SESSION_ID)
+        # Another bot process answered for this user after we primed
+        table.answers.append({'id': 1, 'session_id': SESSION_ID, 'user_id': 5, 'submitted_at': None})
+
+        assert trivia.submit_trivia_answer(SESSION_ID, 5, 'Portal')['error'] == 'duplicate'
+        assert trivia.answer_buffer.stats["conflicts"] == 1
+
+
+class TestBufferedIngestionLoad:
+    """Simulate a Trivia Tuesday burst through the async facade."""
+
+    @pytest.mark.asyncio
+    async def test_burst_of_concurrent_answers(self, monkeypatch):
+        table = FakeAnswerTable(insert_delay=0.05)
+        trivia = trivia_db(table)
+        aio = AsyncDatabase(trivia, max_workers=4)
+        monkeypatch.setattr(aio, "ANSWER_FLUSH_SECONDS", 0.02)
+
+        # 300 members answer at once, 60 of them twice, plus the question's author
+        answers = [(user_id, f"answer {user_id}") for user_id in range(1, 301)]
+        answers += [(user_id, "second guess") for user_id in range(1, 61)]
+        answers.append((SUBMITTER_ID, "B"))
+
+        # Every answer is acknowledged while inserts are held back
+        table.inserts_allowed.clear()
+        results = await asyncio.wait_for(
+            asyncio.gather(*(aio.queue_trivia_answer(SESSION_ID, uid, text) for uid, text in answers)), timeout=5)
+        assert table.inserts == 0
+        table.inserts_allowed.set()
+
+        assert sum(r['success'] for r in results) == 301
+        assert sum(r.get('error') == 'duplicate' for r in results) == 60
+
+        await asyncio.wait_for(aio._answer_flush_task, timeout=2)
+        stored = trivia.get_trivia_session_answers(SESSION_ID)
+        assert len(stored) == 301 and len({a['user_id'] for a in stored}) == 301
+        assert all(a['answer_text'] != 'second guess' for a in stored)
+        # Arrival order is preserved for first-correct scoring
+        assert [a['user_id'] for a in stored] == list(range(1, 301)) + [SUBMITTER_ID]
+        assert [a['user_id'] for a in stored if a['conflict_detected']] == [SUBMITTER_ID]
+
+        # One priming query plus a handful of batches instead of three queries per answer
+        print(f"\n{len(answers)} answers: {table.queries} queries, {table.inserts} batches")
+        assert table.queries <= 5
+        aio.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_background_flush_retries_after_failure(self, monkeypatch):
+        table = FakeAnswerTable()
+        trivia = trivia_db(table)
+        aio = AsyncDatabase(trivia, max_workers=2)
+        monkeypatch.setattr(aio, "ANSWER_FLUSH_SECONDS", 0.01)
+
+        table.fail_inserts = True
+        assert (await aio.queue_trivia_answer(SESSION_ID, 1, 'Portal'))['success']
+        await asyncio.sleep(0.05)
+        assert table.answers == []
+
+        table.fail_inserts = False
+        await asyncio.wait_for(aio._answer_flush_task, timeout=2)
+        assert [a['user_id'] for a in table.answers] == [1]
+        aio.shutdown()
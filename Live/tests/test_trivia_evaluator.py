@@ -0,0 +1,152 @@
+"""
+Tests for batch trivia answer scoring against the original one-at-a-time evaluator.
+"""
+import difflib
+import os
+import random
+import re
+import sys
+import time
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.handlers.trivia import evaluator  # noqa: E402
+from bot.handlers.trivia.evaluator import evaluate_answer, evaluate_answers  # noqa: E402
+from bot.utils.text_processing import normalize_trivia_answer  # noqa: E402
+
+QUESTIONS = [
+    ("The Last of Us", "single", None),
+    ("Final Fantasy VII", "single", None),
+    ("42 hours", "single", None),
+    ("1200", "single", None),
+    ("blue", "single", None),
+    ("Dead Space", "multiple_choice", ["Portal", "Dead Space", "Celeste", "Sekiro"]),
+    ("Grand Theft Auto V", "single", None),
+]
+ANSWERS = [
+    "the last of us", "Last of Us", "tlou", "The Last Of Us Part II", "last us", "Uncharted",
+    "final fantasy 7", "FF VII", "ffvii", "Final Fantasy", "Fantasy VII", "Kingdom Hearts",
+    "42", "about 42 hours", "41 hours", "44h", "2 days", "1200", "1,150", "1190 minutes", "one thousand",
+    "b", "B", "blue", "Blue!", "red", "b)", "D.", "Dead space", "portal", "e", "Grand Theft Auto 5",
+    "gta", "GTA V", "gtav", "", "   ", "?", "I think it's the last of us", "Final Fantasy VII Remake",
+]
+
+
+def legacy_evaluate_answer(user_answer, correct_answer, question_type, multiple_choice_options=None):
+    """Reference copy of the original per-answer evaluate_answer."""
+    user_clean = user_answer.strip()
+    correct_clean = correct_answer.strip()
+    if question_type == 'multiple_choice' and multiple_choice_options:
+        match = re.match(r'^([a-dA-D])[\.\)]?$', user_clean)
+        if match:
+            index = ord(match.group(1).upper()) - ord('A')
+            if 0 <= index < len(multiple_choice_options):
+                user_clean = multiple_choice_options[index].strip()
+    user_normalized = normalize_trivia_answer(user_clean)
+    correct_normalized = normalize_trivia_answer(correct_clean)
+    if user_clean.lower() == correct_clean.lower():
+        return 1.0, "exact_case_insensitive"
+    if user_normalized.lower() == correct_normalized.lower():
+        return 1.0, "normalized_exact"
+    similarity_exact = difflib.SequenceMatcher(None, user_clean.lower(), correct_clean.lower()).ratio()
+    if similarity_exact >= 0.9:
+        return 1.0, "fuzzy_high"
+    if similarity_exact >= 0.7:
+        return 0.8, "fuzzy_close"
+    if len(correct_clean.split()) > 1:
+        correct_words = set(word.lower() for word in correct_clean.split())
+        answer_words = set(word.lower() for word in user_clean.split())
+        if len(correct_words) > 0:
+            overlap_ratio = len(correct_words.intersection(answer_words)) / len(correct_words)
+            if overlap_ratio >= 0.8:
+                return 1.0, "word_overlap_high"
+            elif overlap_ratio >= 0.6:
+                return 0.75, "word_overlap_medium"
+    if evaluator._contains_numbers(correct_clean) and evaluator._contains_numbers(user_clean):
+        for c_num in evaluator._extract_numbers(correct_clean):
+            for a_num in evaluator._extract_numbers(user_clean):
+                tolerance = max(1, c_num * 0.05) if c_num > 20 else 0
+                if abs(c_num - a_num) <= tolerance:
+                    return (1.0, "numerical_exact") if abs(c_num - a_num) == 0 else (0.8, "numerical_close")
+    if evaluator._check_abbreviation_match(user_clean, correct_clean):
+        return 1.0, "abbreviation_match"
+    if similarity_exact >= 0.3:
+        return similarity_exact, "weak_similarity"
+    return 0.0, "no_match"
+
+
+class LCSIndel:
+    """Pure-Python stand-in for rapidfuzz.distance.Indel (LCS-based similarity)."""
+
+    @staticmethod
+    def normalized_similarity(a, b):
+        if not a and not b:
+            return 1.0
+        previous = [0] * (len(b) + 1)
+        for char in a:
+            current = [0]
+            for j, other in enumerate(b):
+                current.append(previous[j] + 1 if char == other else max(previous[j + 1], current[j]))
+            previous = current
+        return 2 * previous[-1] / (len(a) + len(b))
+
+
+def session_answers(count, seed=7):
+    """A session's worth of answers: common guesses, typos and noise."""
+    rng = random.Random(seed)
+    answers = []
+    for _ in range(count):
+        answer = rng.choice(ANSWERS)
+        roll = rng.random()
+        if roll < 0.3 and answer:
+            i = rng.randrange(len(answer))
+            answer = answer[:i] + rng.choice('aeiourst ') + answer[i + 1:]
+        elif roll < 0.4:
+            answer = ''.join(rng.choice('abcdefghij klmnop') for _ in range(rng.randint(1, 25)))
+        answers.append(answer)
+    return answers
+
+
+class TestBatchEvaluator:
+    """Test evaluate_answers gives exactly the original scores."""
+
+    @pytest.mark.parametrize("indel", [None, LCSIndel], ids=["difflib", "indel-bound"])
+    def test_matches_original_scores(self, monkeypatch, indel):
+        monkeypatch.setattr(evaluator, "Indel", indel)
+        answers = ANSWERS + session_answers(400)
+        for correct, question_type, options in QUESTIONS:
+            expected = [legacy_evaluate_answer(a, correct, question_type, options) for a in answers]
+            assert evaluate_answers(answers, correct, question_type, options) == expected
+            assert [evaluate_answer(a, correct, question_type, options) for a in answers] == expected
+
+    def test_letter_answers_map_to_options(self):
+        options = ["Portal", "Dead Space", "Celeste", "Sekiro"]
+        scores = evaluate_answers(["b", "B)", "Dead Space", "a", "e"], "Dead Space", "multiple_choice", options)
+        assert [score for score, _ in scores] == [1.0, 1.0, 1.0, 0.0, 0.0]
+
+
+@pytest.mark.benchmark
+class TestBatchEvaluatorBenchmark:
+    """Wall-clock comparison for grading a 500-answer session."""
+
+    def test_500_answer_session(self):
+        answers = session_answers(500, seed=11)
+        correct, question_type, options = QUESTIONS[1]
+
+        started = time.perf_counter()
+        expected = [legacy_evaluate_answer(a, correct, question_type, options) for a in answers]
+        legacy_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        scores = evaluate_answers(answers, correct, question_type, options)
+        batch_seconds = time.perf_counter() - started
+
+        print(f"\n500 answers: per-answer {legacy_seconds * 1000:.1f}ms, batch {batch_seconds * 1000:.1f}ms "
+              f"(rapidfuzz {'on' if evaluator.RAPIDFUZZ_AVAILABLE else 'off'})")
+        assert scores == expected
+        assert batch_seconds < legacy_seconds
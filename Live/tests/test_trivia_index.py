@@ -0,0 +1,212 @@
+"""
+Tests for the trivia duplicate detection index.
+"""
+import difflib
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+from bot.database.trivia import TriviaDatabase  # noqa: E402
+from bot.database.trivia_index import TriviaDuplicateIndex  # noqa: E402
+from bot.utils.text_processing import (  # noqa: E402
+    calculate_concept_similarity,
+    extract_question_concepts,
+    normalize_trivia_answer,
+)
+
+# Use the real normalization helper without touching the database
+normalize = TriviaDatabase.__new__(TriviaDatabase)._normalize_question_text
+
+GAMES = [
+    'Dark Souls', 'Resident Evil', 'Hollow Knight', 'Silent Hill', 'Final Fantasy', 'God Of War',
+    'Metal Gear Solid', 'Dead Space', 'The Last Of Us', 'Hitman', 'Half Life', 'Mass Effect',
+    'Alien Isolation', 'Outer Wilds', 'Elden Ring', 'Bloodborne', 'Sekiro', 'Portal', 'Celeste',
+]
+TEMPLATES = [
+    "How many episodes did Jonesy play of {game}?",
+    "What is the total playtime for {game}?",
+    "Which game took longer to complete: {game} or {other}?",
+    "When did Jonesy first play {game}?",
+    "Did Jonesy finish {game}?",
+    "How many views does {game} have on YouTube?",
+    "What genre is {game}?",
+    "Which year was {game} released?",
+]
+STATUSES = ['available', 'answered', 'retired', 'pending_approval']
+
+
+def legacy_check(rows, question_text, similarity_threshold=0.8, question_answer=None):
+    """Reference copy of the original per-row check_question_duplicate loop."""
+    if not rows:
+        return None
+    if question_answer:
+        recent = [r for r in rows if r['status'] == 'answered']
+        dated = sorted((r for r in recent if r['last_used_at'] is not None),
+                       key=lambda r: r['last_used_at'], reverse=True)
+        recent_ids = [r['id'] for r in (dated + [r for r in recent if r['last_used_at'] is None])][:10]
+        new_answer = normalize_trivia_answer(question_answer).lower()
+        for row in rows:
+            if not row['correct_answer']:
+                continue
+            if normalize_trivia_answer(row['correct_answer']).lower() == new_answer:
+                if row['status'] == 'answered' and row['id'] in recent_ids:
+                    return row['id'], 'answer_recent', 0.9
+
+    new_normalized = normalize(question_text)
+    new_concepts = extract_question_concepts(question_text)
+    for row in rows:
+        text_similarity = difflib.SequenceMatcher(
+            None, new_normalized.lower(), normalize(row['question_text']).lower()).ratio()
+        concept_similarity = calculate_concept_similarity(
+            new_concepts, extract_question_concepts(row['question_text']))
+        combined = max(text_similarity, concept_similarity)
+        if row['status'] == 'retired':
+            threshold = min(similarity_threshold * 1.25, 0.97)
+        else:
+            threshold = similarity_threshold
+        if combined >= threshold:
+            return row['id'], "semantic" if concept_similarity > text_similarity else "text", combined
+    return None
+
+
+def make_rows(count, seed=42):
+    """Generate a question pool in duplicate-check order (retired first, newest first)."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    rows = []
+    for question_id in range(1, count + 1):
+        game, other = rng.sample(GAMES, 2)
+        rows.append({
+            'id': question_id,
+            'question_text': rng.choice(TEMPLATES).format(game=game, other=other),
+            'status': rng.choice(STATUSES),
+            'created_at': start + timedelta(hours=question_id),
+            'correct_answer': rng.choice([game, other, str(rng.randint(1, 60)), None]),
+            'last_used_at': start + timedelta(hours=rng.randint(0, 5000)) if rng.random() < 0.8 else None,
+        })
+    rows.sort(key=lambda r: (r['status'] != 'retired', -r['created_at'].timestamp()))
+    return rows
+
+
+def make_candidates(count, seed=7):
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(count):
+        game, other = rng.sample(GAMES, 2)
+        text = rng.choice(TEMPLATES + ["Name a game with {game} in the soundtrack",
+                                       "lol what was the funniest {game} moment"]).format(game=game, other=other)
+        if rng.random() < 0.3:
+            text = text.replace('Jonesy', 'Captain Jonesy').rstrip('?')
+        candidates.append((text, rng.choice([game, None])))
+    return candidates
+
+
+def build_index(rows):
+    index = TriviaDuplicateIndex(normalize)
+    index.sync(rows)
+    return index
+
+
+def summarize(result):
+    return None if result is None else (result['duplicate_id'], result['match_type'], result['similarity_score'])
+
+
+class TestTriviaDuplicateIndex:
+    """Test duplicate detection parity, caching and batch checks."""
+
+    @pytest.mark.parametrize("threshold", [0.5, 0.8, 0.85, 0.95])
+    def test_parity_with_full_scan(self, threshold):
+        rows = make_rows(200)
+        index = build_index(rows)
+        for text, answer in make_candidates(150):
+            expected = legacy_check(rows, text, threshold, answer)
+            assert summarize(index.find_duplicate(text, threshold, answer)) == expected, text
+
+    def test_features_reused_between_syncs(self):
+        rows = make_rows(50)
+        index = build_index(rows)
+        assert index.stats["features_computed"] == 50
+
+        rows[0] = dict(rows[0], question_text="What is the total playtime for Celeste?")
+        rows[1] = dict(rows[1], status='retired')
+        index.sync(rows[:-1])
+
+        assert index.stats["features_computed"] == 51
+        assert len(index) == 49
+        assert index.find_duplicate("What is the total playtime for Celeste?")['duplicate_id'] == rows[0]['id']
+
+    def test_removed_questions_stop_matching(self):
+        rows = [{'id': 1, 'question_text': "How many episodes did Jonesy play of Portal?", 'status': 'available',
+                 'created_at': None, 'correct_answer': "12", 'last_used_at': None}]
+        index = build_index(rows)
+        assert index.find_duplicate("How many episodes did Jonesy play of Portal?") is not None
+
+        index.sync([])
+        assert index.find_duplicate("How many episodes did Jonesy play of Portal?") is None
+
+    def test_recent_answer_duplicate(self):
+        rows = [{'id': 1, 'question_text': "Which game did Jonesy stream longest?", 'status': 'answered',
+                 'created_at': None, 'correct_answer': "The Last of Us", 'last_used_at': datetime(2025, 5, 1)}]
+        index = build_index(rows)
+
+        result = index.find_duplicate("Name the game with the most episodes", question_answer="TLOU")
+        assert result['match_type'] == 'answer_recent'
+        assert result['duplicate_id'] == 1
+
+    def test_batch_matches_individual_checks(self):
+        rows = make_rows(200)
+        index = build_index(rows)
+        candidates = make_candidates(60, seed=13)
+
+        batch = index.find_duplicates(candidates, 0.8, within_batch=False)
+        assert [summarize(r) for r in batch] == [summarize(index.find_duplicate(t, 0.8, a)) for t, a in candidates]
+
+    def test_batch_flags_duplicates_within_batch(self):
+        index = build_index([{'id': 1, 'question_text': "What genre is Portal?", 'status': 'available',
+                              'created_at': None, 'correct_answer': "Puzzle", 'last_used_at': None}])
+        results = index.find_duplicates([
+            ("How many episodes did Jonesy play of Celeste?", None),
+            ("How many episodes did Jonesy play of Celeste", None),
+            ("What genre is Portal?", None),
+        ])
+
+        assert results[0] is None
+        assert results[1]['duplicate_id'] is None and results[1]['batch_index'] == 0
+        assert results[2]['duplicate_id'] == 1
+
+
+@pytest.mark.benchmark
+class TestTriviaDuplicateIndexBenchmark:
+    """Throughput comparison between the index and the full-scan loop."""
+
+    @pytest.mark.parametrize("pool_size", [200, 2000])
+    def test_check_throughput(self, pool_size):
+        rows = make_rows(pool_size)
+        candidates = make_candidates(20, seed=99)
+
+        started = time.perf_counter()
+        index = build_index(rows)
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index.sync(rows)  # Steady state: pool refetched, nothing changed
+        indexed = [summarize(index.find_duplicate(t, 0.8, a)) for t, a in candidates]
+        index_ms = (time.perf_counter() - started) * 1000 / len(candidates)
+
+        started = time.perf_counter()
+        legacy = [legacy_check(rows, t, 0.8, a) for t, a in candidates]
+        legacy_ms = (time.perf_counter() - started) * 1000 / len(candidates)
+
+        print(f"\n{pool_size} questions: build {build_seconds * 1000:.0f}ms, "
+              f"index {index_ms:.2f}ms/check, full scan {legacy_ms:.2f}ms/check")
+        assert indexed == legacy
+        assert index_ms < legacy_ms
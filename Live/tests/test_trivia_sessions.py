@@ -0,0 +1,206 @@
+"""
+Tests for the in-process trivia session registry and per-message answer detection.
+"""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+# Add the Live directory to sys.path
+live_path = os.path.join(os.path.dirname(__file__), '..')
+if live_path not in sys.path:
+    sys.path.insert(0, live_path)
+
+import main  # noqa: E402
+from bot.database.trivia import TriviaDatabase  # noqa: E402
+from bot.database.trivia_registry import TriviaSessionRegistry  # noqa: E402
+
+QUESTION = {
+    'question_text': 'What was the first game Jonesy streamed?', 'question_type': 'multiple_choice',
+    'correct_answer': 'B', 'multiple_choice_options': ['Portal', 'Dead Space', 'Celeste', 'Sekiro'],
+    'is_dynamic': False, 'dynamic_query_type': None, 'submitted_by_user_id': None, 'category': 'history'
+}
+
+
+class FakeTriviaTables:
+    """Just enough of trivia_sessions/trivia_questions to drive the session lifecycle, counting queries."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.queries = 0
+        self.next_id = 1
+
+    def joined(self, session_id):
+        return {**self.sessions[session_id], **QUESTION}
+
+    def execute(self, cursor, sql, params):
+        self.queries += 1
+        sql = ' '.join(sql.split())
+        if sql.startswith('SELECT submitted_by_user_id'):
+            cursor.rows = [{'submitted_by_user_id': None}]
+        elif sql.startswith('INSERT INTO trivia_sessions'):
+            session_id, self.next_id = self.next_id, self.next_id + 1
+            self.sessions[session_id] = {
+                'id': session_id, 'question_id': params[0], 'status': 'active',
+                'started_at': datetime.now(timezone.utc) + timedelta(seconds=session_id),
+                'question_message_id': None, 'confirmation_message_id': None, 'channel_id': None
+            }
+            cursor.rows = [{'id': session_id}]
+        elif 'WHERE ts.id = %s' in sql:
+            cursor.rows = [self.joined(params[0])]
+        elif "WHERE ts.status = 'active'" in sql:
+            # Startup load and the hanging-session sweep (every session counts as hanging here)
+            cursor.rows = [self.joined(sid) for sid, s in self.sessions.items() if s['status'] == 'active']
+        elif sql.startswith('UPDATE trivia_sessions SET question_message_id'):
+            session = self.sessions[params[3]]
+            session.update(question_message_id=params[0], confirmation_message_id=params[1], channel_id=params[2])
+            cursor.rowcount = 1
+        elif sql.startswith("UPDATE trivia_sessions SET status = 'expired'"):
+            self.sessions[params[0]]['status'] = 'expired'
+        else:
+            cursor.rows = []
+
+
+class FakeCursor:
+    def __init__(self, tables):
+        self.tables = tables
+        self.rows = []
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        self.rows = []
+        self.tables.execute(self, sql, params)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class FakeConnection:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def cursor(self):
+        return FakeCursor(self.tables)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def trivia_db(tables):
+    return TriviaDatabase(SimpleNamespace(get_connection=lambda: FakeConnection(tables)))
+
+
+def guild_message(content, reply_to=None, channel_id=1):
+    async def fetch_message(message_id):
+        raise AssertionError("answer detection must not call the Discord API")
+
+    reference = SimpleNamespace(message_id=reply_to) if reply_to else None
+    return SimpleNamespace(content=content, reference=reference, author=SimpleNamespace(id=42),
+                           channel=SimpleNamespace(id=channel_id, fetch_message=fetch_message))
+
+
+class TestTriviaSessionRegistry:
+    """Test the registry follows the session lifecycle."""
+
+    def test_lifecycle_and_reply_matching(self):
+        registry = TriviaSessionRegistry()
+        started = datetime(2025, 6, 10, 12, tzinfo=timezone.utc)
+        registry.load([{'id': 1, 'started_at': started, 'question_message_id': 100}])
+        registry.activate({'id': 2, 'started_at': started + timedelta(minutes=5)})
+        registry.set_messages(2, 200, 201, 9)
+
+        assert registry.active()['id'] == 2
+        assert registry.session_for_message(100)['id'] == 1
+        assert registry.session_for_message(201)['channel_id'] == 9
+        assert registry.session_for_message(999) is None
+
+        registry.set_messages(2, 300, None, 9)
+        assert registry.session_for_message(200) is None
+
+        registry.end(2)
+        assert registry.active()['id'] == 1 and registry.session_for_message(300) is None
+        registry.end(1)
+        assert registry.active() is None and len(registry) == 0
+
+    def test_returns_copies(self):
+        registry = TriviaSessionRegistry()
+        registry.load([{'id': 1, 'status': 'active'}])
+        registry.active()['status'] = 'mutated'
+        assert registry.active()['status'] == 'active'
+
+
+class TestTriviaSessionDatabase:
+    """Test TriviaDatabase keeps the registry authoritative without per-call queries."""
+
+    def test_no_queries_after_startup_load(self):
+        tables = FakeTriviaTables()
+        db = trivia_db(tables)
+        assert db.load_session_registry() == 0
+
+        session_id = db.create_trivia_session(5)
+        db.update_trivia_session_messages(session_id, 1000, 1001, 1)
+        queries = tables.queries
+
+        for _ in range(100):
+            assert db.get_active_trivia_session()['id'] == session_id
+            assert db.get_active_trivia_session_for_message(12345) is None
+        assert db.get_active_trivia_session_for_message(1001)['question_text'] == QUESTION['question_text']
+        assert tables.queries == queries
+
+    def test_registry_survives_restart_and_cleanup(self):
+        tables = FakeTriviaTables()
+        session_id = trivia_db(tables).create_trivia_session(5)
+        tables.sessions[session_id].update(question_message_id=1000, confirmation_message_id=1001)
+
+        # A fresh process loads the still-active session on first use
+        restarted = trivia_db(tables)
+        assert restarted.get_active_trivia_session_for_message(1000)['id'] == session_id
+        assert restarted.session_registry.stats["loads"] == 1
+
+        restarted.cleanup_hanging_trivia_sessions()
+        assert restarted.get_active_trivia_session() is None
+        assert restarted.session_registry.stats["loads"] == 1
+
+
+class TestTriviaAnswerDetection:
+    """Test is_trivia_answer_reply in main.py is served from the registry."""
+
+    @pytest.mark.asyncio
+    async def test_replies_and_standalone_answers(self, monkeypatch):
+        tables = FakeTriviaTables()
+        trivia = trivia_db(tables)
+        trivia.load_session_registry()
+        monkeypatch.setattr(main, "db", SimpleNamespace(
+            get_active_trivia_session=trivia.get_active_trivia_session,
+            get_active_trivia_session_for_message=trivia.get_active_trivia_session_for_message))
+        monkeypatch.setattr(main, "MEMBERS_CHANNEL_ID", 1)
+
+        assert await main.is_trivia_answer_reply(guild_message("hello")) == (False, None)
+
+        session_id = trivia.create_trivia_session(5)
+        trivia.update_trivia_session_messages(session_id, 1000, 1001, 1)
+        queries = tables.queries
+
+        is_answer, session = await main.is_trivia_answer_reply(guild_message("Dead Space", reply_to=1001))
+        assert is_answer and session['id'] == session_id
+        assert (await main.is_trivia_answer_reply(guild_message("b)")))[0]
+        assert await main.is_trivia_answer_reply(guild_message("lol", reply_to=555)) == (False, None)
+        assert await main.is_trivia_answer_reply(guild_message("B", channel_id=2)) == (False, None)
+        assert tables.queries == queries
@@ -84,7 +84,7 @@ async def test_fetch_vods_channel_logic():
             return MockTD()
 
     with patch('os.getenv', return_value='fake_key'), \
-            patch('aiohttp.ClientSession', return_value=MockSession()), \
+            patch('bot.integrations.youtube.http_session', return_value=MockSession()), \
             patch.dict('sys.modules', {'isodate': MockIsoDate()}):
 
         results = await fetch_vods_channel_recent_videos("fake_channel_id")